@@ -0,0 +1,142 @@
+"""Microbenchmark for the extraction of inlined records
+
+Run with:
+
+    python benchmarks/bench_extract_inlined.py [-n NUMBER] [-w WIDTH] [-d DEPTH]
+
+Submitted records can contain inlined records in their `relations`-slot. The
+benchmark reports the throughput of `_ModelStore.extract_inlined`, which
+serializes a submission once and flattens the serialized tree, and of the
+previous implementation, which copied every record, compared every inlined
+record with a new `Thing`-instance, and cleaned every serialized record with
+`cleaned_json`. It uses a wide graph, i.e., a record with `WIDTH` inlined
+records, and a deep graph, i.e., a chain of `DEPTH` inlined records.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from argparse import ArgumentParser
+from itertools import chain
+from pathlib import Path
+
+from dump_things_service.store.model_store import ModelStore
+from dump_things_service.utils import cleaned_json
+
+schema = str(
+    Path(__file__).parent.parent
+    / 'dump_things_service'
+    / 'tests'
+    / 'testschema.yaml'
+)
+
+parser = ArgumentParser(prog='Benchmark extraction of inlined records')
+parser.add_argument('-n', '--number', type=int, default=20)
+parser.add_argument('-w', '--width', type=int, default=2000)
+parser.add_argument('-d', '--depth', type=int, default=200)
+
+
+def previous_extract_inlined(model, record):
+    if record.relations is None:
+        return [record]
+    extracted_sub_records = list(
+        chain(
+            *[
+                previous_extract_inlined(model, sub_record)
+                for sub_record in record.relations.values()
+                if sub_record != model.Thing(pid=sub_record.pid)
+            ]
+        )
+    )
+    new_record = record.model_copy()
+    new_record.relations = {
+        sub_record_pid: model.Thing(pid=sub_record_pid)
+        for sub_record_pid in record.relations
+    }
+    return [new_record, *extracted_sub_records]
+
+
+def previous_flatten(model, record):
+    return [
+        (
+            obj.__class__.__name__,
+            cleaned_json(
+                obj.model_dump(exclude_none=True, mode='json'),
+                remove_keys=('@type',),
+            ),
+        )
+        for obj in previous_extract_inlined(model, record)
+    ]
+
+
+def create_thing(model, pid, relations=None):
+    return model.Thing(
+        pid=pid,
+        annotations={'abc:comment': f'record {pid}'},
+        relations=relations,
+    )
+
+
+def create_wide_record(model, width):
+    return model.Person(
+        pid='abc:wide',
+        given_name='Wide',
+        relations={
+            f'abc:wide-{index}': create_thing(
+                model,
+                f'abc:wide-{index}',
+                # Every inlined record refers to an already extracted record
+                {'abc:wide': model.Thing(pid='abc:wide')},
+            )
+            for index in range(width)
+        },
+    )
+
+
+def create_deep_record(model, depth):
+    record = create_thing(model, f'abc:deep-{depth}')
+    for index in reversed(range(1, depth)):
+        record = create_thing(model, f'abc:deep-{index}', {record.pid: record})
+    return model.Person(
+        pid='abc:deep',
+        given_name='Deep',
+        relations={record.pid: record},
+    )
+
+
+def report(name: str, number: int, seconds: float):
+    print(f'{name:<40} {number / seconds:>14,.1f} submissions/s')
+
+
+def main():
+    arguments = parser.parse_args()
+    store = ModelStore(
+        schema=schema,
+        backend=None,
+        tags={'id': 'abc:id', 'time': 'abc:time'},
+    )
+    model = store.model
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * arguments.depth))
+
+    number = arguments.number
+    for name, record in (
+        (f'wide ({arguments.width} records)', create_wide_record(model, arguments.width)),
+        (f'deep ({arguments.depth} records)', create_deep_record(model, arguments.depth)),
+    ):
+        assert store.extract_inlined(record) == previous_flatten(model, record)
+        report(
+            f'{name}, previous',
+            number,
+            timeit.timeit(lambda: previous_flatten(model, record), number=number),
+        )
+        report(
+            f'{name}, single pass',
+            number,
+            timeit.timeit(lambda: store.extract_inlined(record), number=number),
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Benchmark Forgejo authentication against a local fake Forgejo instance
+
+Run with:
+
+    python benchmarks/bench_forgejo_auth.py [-n NUMBER] [-l LATENCY]
+
+The benchmark runs offline. It starts the fake Forgejo instance from
+`dump_things_service.tests.fake_forgejo` (requires `pytest-httpserver`) with
+a simulated response latency and reports the time for uncached
+authentications, i.e., each authentication uses a new token.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import time
+from argparse import ArgumentParser
+
+from pytest_httpserver import HTTPServer
+
+from dump_things_service.auth.forgejo import ForgejoAuthenticationSource
+from dump_things_service.tests.fake_forgejo import setup_fake_forgejo
+
+parser = ArgumentParser(prog='Benchmark Forgejo authentication')
+parser.add_argument('-n', '--number', type=int, default=50)
+parser.add_argument(
+    '-l',
+    '--latency',
+    type=float,
+    default=0.02,
+    help='simulated latency of every Forgejo response in seconds',
+)
+
+
+def main():
+    arguments = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    http_server = HTTPServer(threaded=True)
+    http_server.start()
+    try:
+        auth_source = ForgejoAuthenticationSource(
+            api_url=setup_fake_forgejo(http_server, latency=arguments.latency),
+            organization='org_1',
+            team='team_1',
+            label_type='user',
+            repository='repo_1',
+        )
+        number = arguments.number
+
+        start = time.perf_counter()
+        for i in range(number):
+            auth_source.authenticate(f'sequential-{i}')
+        duration = time.perf_counter() - start
+        print(
+            f'sequential: {number} authentications in {duration:.3f}s '
+            f'({1000 * duration / number:.1f} ms per authentication)'
+        )
+
+        async def authenticate_concurrently():
+            await asyncio.gather(*(
+                auth_source.authenticate_async(f'concurrent-{i}')
+                for i in range(number)
+            ))
+
+        start = time.perf_counter()
+        asyncio.run(authenticate_concurrently())
+        duration = time.perf_counter() - start
+        print(
+            f'concurrent: {number} authentications in {duration:.3f}s '
+            f'({number / duration:.1f} authentications per second)'
+        )
+    finally:
+        http_server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
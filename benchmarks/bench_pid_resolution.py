@@ -0,0 +1,76 @@
+"""Microbenchmark for PID resolution and IRI -> CURIE conversion
+
+Run with:
+
+    python benchmarks/bench_pid_resolution.py [SCHEMA] [-n NUMBER]
+
+If no schema is given, the test schema of the service is used. The benchmark
+reports the throughput of `resolve_curie`, of `_ModelStore.get_curie`, and of
+a linear prefix scan, which was used before schema indices were introduced.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from argparse import ArgumentParser
+from pathlib import Path
+
+from dump_things_service.model import get_model_for_schema
+from dump_things_service.resolve_curie import resolve_curie
+from dump_things_service.schema_index import get_schema_index
+
+default_schema = str(
+    Path(__file__).parent.parent
+    / 'dump_things_service'
+    / 'tests'
+    / 'testschema.yaml'
+)
+
+parser = ArgumentParser(prog='Benchmark PID resolution')
+parser.add_argument('schema', nargs='?', default=default_schema)
+parser.add_argument('-n', '--number', type=int, default=100_000)
+
+
+def linear_get_curie(model, iri: str) -> str:
+    for prefix_info in model.linkml_meta.root.get('prefixes', {}).values():
+        reference = prefix_info['prefix_reference']
+        if iri.startswith(reference):
+            return iri.replace(reference, prefix_info['prefix_prefix'] + ':', 1)
+    return iri
+
+
+def report(name: str, number: int, seconds: float):
+    print(f'{name:<30} {number / seconds:>14,.0f} ops/s')
+
+
+def main():
+    arguments = parser.parse_args()
+    model = get_model_for_schema(arguments.schema)[0]
+    schema_index = get_schema_index(model)
+
+    prefix, reference = next(reversed(schema_index.prefixes.items()))
+    curie = f'{prefix}:some/record-identifier'
+    iri = f'{reference}some/record-identifier'
+
+    number = arguments.number
+    report(
+        'resolve_curie',
+        number,
+        timeit.timeit(lambda: resolve_curie(model, curie), number=number),
+    )
+    report(
+        'SchemaIndex.get_curie',
+        number,
+        timeit.timeit(lambda: schema_index.get_curie(iri), number=number),
+    )
+    report(
+        'linear prefix scan',
+        number,
+        timeit.timeit(lambda: linear_get_curie(model, iri), number=number),
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Benchmark for the ingestion of TTL records
+
+Run with:
+
+    python benchmarks/bench_rdflib_loader.py [-c CLASSES] [-n NUMBER]
+
+The benchmark generates a schema with CLASSES classes in a hierarchy of
+depth ten, where every class adds two attributes and uses shared slots. It
+converts NUMBER TTL records of different classes to JSON with a shared
+format converter, twice, and reports the throughput of both passes. Every
+record has about 25 triples, including inlined annotations.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+import yaml
+
+from dump_things_service import Format
+from dump_things_service.converter import get_format_converter
+from dump_things_service.model import get_model_for_schema
+
+parser = ArgumentParser(prog='Benchmark TTL ingestion')
+parser.add_argument('-c', '--classes', type=int, default=300)
+parser.add_argument('-n', '--number', type=int, default=500)
+
+shared_slot_count = 50
+hierarchy_depth = 10
+
+
+def create_schema(class_count: int) -> dict:
+    schema = {
+        'id': 'http://example.org/bench-schema',
+        'name': 'bench_schema',
+        'prefixes': {
+            'abc': 'http://example.org/bench-schema/abc/',
+            'linkml': 'https://w3id.org/linkml/',
+            'xyz': 'http://example.org/bench-schema/xyz/',
+        },
+        'imports': ['linkml:types'],
+        'default_range': 'string',
+        'default_prefix': 'abc',
+        'slots': {
+            'pid': {'identifier': True, 'range': 'uriorcurie', 'required': True},
+            'annotations': {
+                'range': 'Annotation',
+                'inlined': True,
+                'multivalued': True,
+            },
+            'annotation_tag': {'range': 'Thing'},
+            'annotation_value': {'range': 'string'},
+            **{
+                f'shared_{index}': {'multivalued': index % 2 == 0}
+                for index in range(shared_slot_count)
+            },
+        },
+        'classes': {
+            'Thing': {
+                'slots': ['pid', 'annotations'],
+                'attributes': {'schema_type': {'range': 'string'}},
+            },
+            'Annotation': {
+                'slots': ['annotation_tag', 'annotation_value'],
+                'slot_usage': {'annotation_tag': {'key': True}},
+            },
+        },
+    }
+    for index in range(class_count):
+        parent = 'Thing' if index % hierarchy_depth == 0 else f'Class{index - 1}'
+        schema['classes'][f'Class{index}'] = {
+            'is_a': parent,
+            'slots': [
+                f'shared_{(index * 7 + offset) % shared_slot_count}'
+                for offset in range(5)
+            ],
+            'attributes': {
+                f'attribute_{index}_a': {},
+                f'attribute_{index}_b': {'multivalued': True},
+            },
+        }
+    return schema
+
+
+def get_class_slots(schema: dict, class_name: str) -> list[tuple[str, bool]]:
+    slots = []
+    while class_name != 'Thing':
+        class_definition = schema['classes'][class_name]
+        slots.extend(
+            (slot, schema['slots'][slot].get('multivalued', False))
+            for slot in class_definition['slots']
+        )
+        slots.extend(
+            (attribute, attribute.endswith('_b'))
+            for attribute in class_definition['attributes']
+        )
+        class_name = class_definition['is_a']
+    return slots
+
+
+def create_ttl_record(schema: dict, class_name: str, index: int, rng: random.Random) -> str:
+    lines = [
+        '@prefix abc: <http://example.org/bench-schema/abc/> .',
+        '@prefix xyz: <http://example.org/bench-schema/xyz/> .',
+        '',
+        f'xyz:record-{index} a abc:{class_name} ;',
+        f'    abc:schema_type "abc:{class_name}" ;',
+    ]
+    slots = get_class_slots(schema, class_name)
+    for slot, multivalued in rng.sample(slots, min(len(slots), 10)):
+        values = range(2) if multivalued else range(1)
+        lines.extend(f'    abc:{slot} "value {value} of {slot}" ;' for value in values)
+    lines.extend(
+        f'    abc:annotations [ abc:annotation_tag abc:tag-{tag} ; '
+        f'abc:annotation_value "annotation {tag}" ] ;'
+        for tag in range(3)
+    )
+    lines[-1] = lines[-1][:-1] + '.'
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    arguments = parser.parse_args()
+    schema = create_schema(arguments.classes)
+    rng = random.Random(0)
+    records = [
+        (class_name, create_ttl_record(schema, class_name, index, rng))
+        for index in range(arguments.number)
+        for class_name in [f'Class{rng.randrange(arguments.classes)}']
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        schema_path = Path(directory) / 'schema.yaml'
+        schema_path.write_text(yaml.safe_dump(schema, sort_keys=False))
+        schema_location = str(schema_path)
+
+        start = time.perf_counter()
+        get_model_for_schema(schema_location)
+        converter = get_format_converter(
+            schema_location,
+            input_format=Format.ttl,
+            output_format=Format.json,
+        )
+        print(f'model generation: {time.perf_counter() - start:.1f} s')
+
+        start = time.perf_counter()
+        converter.convert(*reversed(records[0]))
+        print(f'first conversion: {time.perf_counter() - start:.2f} s')
+
+        # Schema information is computed on first use, the second pass shows
+        # the steady state of a running service.
+        for name in ('first pass', 'second pass'):
+            start = time.perf_counter()
+            for class_name, ttl_record in records:
+                converter.convert(ttl_record, class_name)
+            seconds = time.perf_counter() - start
+            print(f'{name}: {arguments.number / seconds:,.1f} records/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Microbenchmark for record writes in record directory stores
+
+Run with:
+
+    python benchmarks/bench_record_dir_writes.py [-n NUMBER] [-t THREADS] [-i INTERVAL] [-d DIRECTORY]
+
+The benchmark writes NUMBER records into a fresh record directory store for
+every durability mode and reports the throughput. The records are written by
+THREADS concurrent writers, every write returns after the record is as
+durable as the mode guarantees. Group commits only pay off with concurrent
+writers, they share the synchronization of their directories. INTERVAL is
+the group commit interval in milliseconds. The stores are created in
+temporary directories below DIRECTORY, which defaults to the system's
+temporary directory. Results depend strongly on the file system and the
+storage device of DIRECTORY.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dump_things_service.backends.record_dir import (
+    Durability,
+    _RecordDirStore,
+    default_group_commit_interval,
+)
+
+schema = str(
+    Path(__file__).parent.parent
+    / 'dump_things_service'
+    / 'tests'
+    / 'testschema.yaml'
+)
+
+parser = ArgumentParser(prog='Benchmark record directory writes')
+parser.add_argument('-n', '--number', type=int, default=1000)
+parser.add_argument('-t', '--threads', type=int, default=1)
+parser.add_argument('-i', '--interval', type=int, default=default_group_commit_interval)
+parser.add_argument('-d', '--directory', default=None)
+
+
+def run(
+    durability: Durability,
+    number: int,
+    threads: int,
+    interval: int,
+    directory: str | None,
+) -> float:
+    with tempfile.TemporaryDirectory(dir=directory) as root:
+        store = _RecordDirStore(
+            root=Path(root).absolute(),
+            pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+            suffix='yaml',
+            durability=durability,
+            group_commit_interval=interval,
+        )
+        store.build_index(schema)
+
+        def write(i: int):
+            store.add_record(
+                iri=f'http://example.org/person-schema/abc/{i}',
+                class_name='Person',
+                json_object={
+                    'pid': f'abc:{i}',
+                    'given_name': f'Person {i}',
+                },
+            )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(write, range(number)))
+        return time.perf_counter() - start
+
+
+def main():
+    arguments = parser.parse_args()
+    for durability in Durability:
+        seconds = run(
+            durability,
+            arguments.number,
+            arguments.threads,
+            arguments.interval,
+            arguments.directory,
+        )
+        print(f'{durability.value:<10} {arguments.number / seconds:>12,.0f} writes/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Benchmark for record compression in sqlite stores
+
+Run with:
+
+    python benchmarks/bench_sqlite_compression.py [-n NUMBER] [-d DIRECTORY]
+
+The benchmark writes NUMBER records into a fresh sqlite store, once without
+compression, and once compressed with a dictionary that is trained on a
+sample of the records. It reports the database size per record, the write
+throughput, and the read throughput for batched reads and for single-record
+reads. The records resemble flat-social records with 2-4 KB of JSON text.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from dump_things_service.backends import RecordInfo
+from dump_things_service.backends.sqlite import _SQLiteBackend
+from dump_things_service.backends.sqlite_compression import train_dictionary
+
+parser = ArgumentParser(prog='Benchmark sqlite record compression')
+parser.add_argument('-n', '--number', type=int, default=20000)
+parser.add_argument('-d', '--directory', default=None)
+parser.add_argument('--level', type=int, default=3)
+
+given_names = ('Alex', 'Kim', 'Robin', 'Sam', 'Charlie', 'Jo')
+
+
+def create_record(index: int, rng: random.Random) -> dict:
+    return {
+        'pid': f'dlflatsocial:person-{index}',
+        'schema_type': 'dlflatsocial:Person',
+        'given_name': rng.choice(given_names),
+        'family_name': f'Family-{rng.randrange(5000)}',
+        'description': ' '.join(
+            rng.choice(('research', 'data', 'institute', 'neuroscience', 'member'))
+            for _ in range(rng.randrange(100, 300))
+        ),
+        'annotations': {
+            'http://purl.obolibrary.org/obo/NCIT_C54269': f'user-{rng.randrange(50)}',
+            'http://semanticscience.org/resource/SIO_001083':
+                f'2026-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}'
+                f'T{rng.randrange(24):02d}:00:00',
+        },
+        'relations': {
+            f'dlflatsocial:project-{project}': {
+                'pid': f'dlflatsocial:project-{project}',
+                'schema_type': 'dlflatsocial:Project',
+                'title': f'Project {project}',
+            }
+            for project in rng.sample(range(200), rng.randrange(3, 12))
+        },
+        'characterized_by': [
+            {
+                'predicate': 'dlflatsocial:has-affiliation',
+                'object': f'dlflatsocial:organization-{rng.randrange(40)}',
+            }
+            for _ in range(rng.randrange(1, 6))
+        ],
+    }
+
+
+def run(
+    directory: Path,
+    records: list[RecordInfo],
+    compress: bool,
+    level: int,
+) -> tuple[float, float, float, float]:
+    backend = _SQLiteBackend(directory / 'records.db')
+    if compress:
+        # Train on the records of a first batch, as the CLI would do on an
+        # existing store.
+        backend.add_records_bulk(records[:2000])
+        backend.set_compression_dictionary(
+            train_dictionary(backend.sample_records(2000)),
+            level,
+        )
+        backend.recompress_records()
+        remaining = records[2000:]
+    else:
+        remaining = records
+
+    start = time.perf_counter()
+    backend.add_records_bulk(remaining)
+    write_rate = len(remaining) / (time.perf_counter() - start)
+    backend.engine.dispose()
+    size = (directory / 'records.db').stat().st_size / len(records)
+
+    result_list = backend.get_all_records()
+    start = time.perf_counter()
+    for batch_start in range(0, len(result_list), 1000):
+        result_list.generate_elements(
+            batch_start,
+            result_list.list_info[batch_start:batch_start + 1000],
+        )
+    batch_rate = len(result_list) / (time.perf_counter() - start)
+
+    iris = [record.iri for record in random.Random(1).sample(records, 2000)]
+    start = time.perf_counter()
+    for iri in iris:
+        backend.get_record_by_iri(iri)
+    single_rate = len(iris) / (time.perf_counter() - start)
+    return size, write_rate, batch_rate, single_rate
+
+
+def main():
+    arguments = parser.parse_args()
+    rng = random.Random(0)
+    records = [
+        RecordInfo(
+            iri=f'https://example.org/person-{index}',
+            class_name='Person',
+            json_object=create_record(index, rng),
+            sort_key=f'{index:08d}',
+        )
+        for index in range(arguments.number)
+    ]
+    json_size = sum(len(json.dumps(record.json_object)) for record in records) / len(records)
+    print(f'{arguments.number} records, about {json_size:,.0f} bytes per record')
+    print(f'{"":<14}{"bytes/record":>14}{"writes/s":>12}{"batch reads/s":>16}{"reads/s":>10}')
+    for compress in (False, True):
+        with tempfile.TemporaryDirectory(dir=arguments.directory) as directory:
+            size, write_rate, batch_rate, single_rate = run(
+                Path(directory),
+                records,
+                compress,
+                arguments.level,
+            )
+        print(
+            f'{"compressed" if compress else "uncompressed":<14}'
+            f'{size:>14,.0f}{write_rate:>12,.0f}{batch_rate:>16,.0f}{single_rate:>10,.0f}'
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Microbenchmark for the conversion work of TTL submissions
+
+Run with:
+
+    python benchmarks/bench_ttl_submission.py [-n NUMBER]
+
+A TTL submission converts the posted TTL-record to JSON, validates the JSON
+object with a pydantic `TypeAdapter`, and converts the stored record back to
+TTL for the response. The benchmark reports the throughput of this work with
+converters and adapters that are created per request, and with the shared
+instances that are created during configuration processing.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from argparse import ArgumentParser
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from dump_things_service import Format
+from dump_things_service.converter import (
+    FormatConverter,
+    get_format_converter,
+)
+from dump_things_service.model import get_model_for_schema
+
+schema = str(
+    Path(__file__).parent.parent
+    / 'dump_things_service'
+    / 'tests'
+    / 'testschema.yaml'
+)
+
+ttl_record = """@prefix abc: <http://example.org/person-schema/abc/> .
+@prefix xyz: <http://example.org/person-schema/xyz/> .
+
+xyz:HenryAdams a abc:Person ;
+    abc:given_name "Henry" ;
+    abc:schema_type "abc:Person" .
+"""
+
+parser = ArgumentParser(prog='Benchmark TTL submissions')
+parser.add_argument('-n', '--number', type=int, default=200)
+
+
+def submit_per_request(model):
+    json_object = FormatConverter(
+        schema,
+        input_format=Format.ttl,
+        output_format=Format.json,
+    ).convert(ttl_record, 'Person')
+    record = TypeAdapter(model.Person).validate_python(json_object)
+    return FormatConverter(
+        schema,
+        input_format=Format.json,
+        output_format=Format.ttl,
+    ).convert(record.model_dump(mode='json', exclude_none=True), 'Person')
+
+
+def submit_shared(type_adapter):
+    json_object = get_format_converter(
+        schema,
+        input_format=Format.ttl,
+        output_format=Format.json,
+    ).convert(ttl_record, 'Person')
+    record = type_adapter.validate_python(json_object)
+    return get_format_converter(
+        schema,
+        input_format=Format.json,
+        output_format=Format.ttl,
+    ).convert(record.model_dump(mode='json', exclude_none=True), 'Person')
+
+
+def report(name: str, number: int, seconds: float):
+    print(f'{name:<30} {number / seconds:>14,.1f} requests/s')
+
+
+def main():
+    arguments = parser.parse_args()
+    model = get_model_for_schema(schema)[0]
+    type_adapter = TypeAdapter(model.Person)
+
+    # Warm up schema loading and model generation
+    submit_shared(type_adapter)
+
+    number = arguments.number
+    report(
+        'per-request instances',
+        number,
+        timeit.timeit(lambda: submit_per_request(model), number=number),
+    )
+    report(
+        'shared instances',
+        number,
+        timeit.timeit(lambda: submit_shared(type_adapter), number=number),
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,11 +7,14 @@ from typing import (
 from starlette.status import (
     HTTP_200_OK,
     HTTP_300_MULTIPLE_CHOICES,
+    HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
     HTTP_401_UNAUTHORIZED,
     HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
+    HTTP_405_METHOD_NOT_ALLOWED,
     HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 from starlette.status import (
     HTTP_413_REQUEST_ENTITY_TOO_LARGE as HTTP_413_CONTENT_TOO_LARGE,
@@ -24,13 +27,16 @@ __all__ = [
     'Format',
     'HTTP_200_OK',
     'HTTP_300_MULTIPLE_CHOICES',
+    'HTTP_304_NOT_MODIFIED',
     'HTTP_400_BAD_REQUEST',
     'HTTP_401_UNAUTHORIZED',
     'HTTP_403_FORBIDDEN',
     'HTTP_404_NOT_FOUND',
+    'HTTP_405_METHOD_NOT_ALLOWED',
     'HTTP_413_CONTENT_TOO_LARGE',
     'HTTP_422_UNPROCESSABLE_CONTENT',
     'HTTP_500_INTERNAL_SERVER_ERROR',
+    'HTTP_503_SERVICE_UNAVAILABLE',
     'JSON',
     'YAML',
     'config_file_name',
@@ -11,6 +11,7 @@ determine:
 from __future__ import annotations
 
 import abc
+import asyncio
 import dataclasses
 from typing import TYPE_CHECKING
 
@@ -47,3 +48,19 @@ class AuthenticationSource(metaclass=abc.ABCMeta):
         :raises AuthenticationError: If authentication fails.
         """
         raise NotImplementedError
+
+    async def authenticate_async(
+        self,
+        token: str,
+    ) -> AuthenticationInfo:
+        """
+        Authenticate a user without blocking the event loop.
+
+        The default implementation executes `authenticate` in a worker thread.
+        Authentication sources that perform I/O can override this method.
+
+        :param token: The authentication token.
+        :return: AuthenticationInfo
+        :raises AuthenticationError: If authentication fails.
+        """
+        return await asyncio.to_thread(self.authenticate, token)
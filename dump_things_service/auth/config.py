@@ -42,6 +42,13 @@ class ConfigAuthenticationSource(AuthenticationSource):
             incoming_label=token_info['incoming_label'],
         )
 
+    async def authenticate_async(
+        self,
+        token: str,
+    ) -> AuthenticationInfo:
+        # Config-based authentication does not perform I/O.
+        return self.authenticate(token)
+
     def _resolve_hashed_token(
         self,
         token: str
@@ -9,13 +9,14 @@ will emit a complete repository-record including the complete owner-record.
 """
 from __future__ import annotations
 
+import asyncio
+import atexit
+import concurrent.futures
+import hashlib
 import logging
-import time
-from functools import wraps
-from typing import Callable
+import threading
 
-import requests
-from requests.exceptions import Timeout
+import aiohttp
 
 from dump_things_service import (
     HTTP_300_MULTIPLE_CHOICES,
@@ -27,6 +28,10 @@ from dump_things_service.auth import (
     AuthenticationSource,
     InvalidTokenError,
 )
+from dump_things_service.cache import (
+    TTLCache,
+    cached,
+)
 from dump_things_service.config import TokenPermission
 
 logger = logging.getLogger('dump_things_service')
@@ -34,29 +39,63 @@ logger = logging.getLogger('dump_things_service')
 # Timeout for requests
 _timeout = 10
 
+# Number of requests that an authentication consists of, bounds the time
+# that callers wait for an authentication in the client loop.
+_lookup_count = 4
 
-# Base class for classes that use method-level caching. The cache lives in
-# the class instance and will be deleted when the instance is deleted.
-class MethodCache:
-    def __init__(self):
-        self.__cached_data = {}
+# Maximum number of pooled connections per Forgejo instance
+_connection_limit = 20
 
-    @staticmethod
-    def cache_temporary(
-        duration: int = 300,
-    ) -> Callable:
-        """ Cache results for a given time (default: 300 seconds) """
-        def decorator(func: Callable) -> Callable:
-            @wraps(func)
-            def wrapper(*args, **kwargs):
-                self = args[0]
-                key = (func.__qualname__, *(args[1:]), *(kwargs.items()))
-                cached_data = self.__cached_data.get(key)
-                if cached_data is None or time.time() - cached_data[0] > duration:
-                    self.__cached_data[key] = (time.time(), func(*args, **kwargs))
-                return self.__cached_data[key][1]
-            return wrapper
-        return decorator
+# All Forgejo requests are executed in a single background event loop. This
+# allows all authentication sources to keep pooled keep-alive connections,
+# independent of the thread or event loop from which they are called.
+_client_loop = None
+_client_loop_lock = threading.Lock()
+_client_sessions = []
+
+
+def _get_client_loop() -> asyncio.AbstractEventLoop:
+    global _client_loop
+
+    with _client_loop_lock:
+        if _client_loop is None:
+            _client_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_client_loop.run_forever,
+                name='forgejo-client',
+                daemon=True,
+            ).start()
+            atexit.register(_close_client_sessions)
+    return _client_loop
+
+
+def _close_client_sessions():
+    async def close_all():
+        for session in _client_sessions:
+            await session.close()
+
+    asyncio.run_coroutine_threadsafe(close_all(), _client_loop).result(_timeout)
+
+
+# All Forgejo authentication sources share one cache. Cache keys contain the
+# source configuration and a hash of the token, raw tokens are not stored.
+forgejo_cache = TTLCache('forgejo', ttl=300, max_size=4096)
+
+
+def _cache_key(
+    source: ForgejoAuthenticationSource,
+    token: str,
+    *args,
+) -> tuple:
+    return (
+        source.api_url,
+        source.organization,
+        source.team,
+        source.label_type,
+        source.repository,
+        hashlib.sha256(token.encode()).hexdigest(),
+        *args,
+    )
 
 
 class RemoteAuthenticationError(AuthenticationError):
@@ -67,7 +106,7 @@ class RemoteAuthenticationError(AuthenticationError):
         super().__init__(f'Authentication failed with status {status}: {message}')
 
 
-class ForgejoAuthenticationSource(AuthenticationSource, MethodCache):
+class ForgejoAuthenticationSource(AuthenticationSource):
     def __init__(
         self,
         api_url: str,
@@ -75,6 +114,8 @@ class ForgejoAuthenticationSource(AuthenticationSource, MethodCache):
         team: str,
         label_type: str,
         repository: str | None = None,
+        *,
+        timeout: float = _timeout,
     ):
         """
         Create a Forgejo authentication source.
@@ -92,6 +133,8 @@ class ForgejoAuthenticationSource(AuthenticationSource, MethodCache):
             is created.
         :param repository:  Optional repository. If this is provided, access
             will only be granted if the team has access to the repository.
+        :param timeout: Timeout in seconds for each request to the Forgejo
+            instance.
         """
         super().__init__()
         self.api_url = api_url[:-1] if api_url[-1] == '/' else api_url
@@ -99,78 +142,87 @@ class ForgejoAuthenticationSource(AuthenticationSource, MethodCache):
         self.team = team
         self.label_type = label_type
         self.repository = repository
+        self.timeout = timeout
+        # The client session is created lazily in the client loop.
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # This is only called in the client loop, i.e., in a single thread.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=_connection_limit),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Accept': 'application/json'},
+            )
+            _client_sessions.append(self._session)
+        return self._session
 
-    def _get_json_from_endpoint(
+    async def _get_json_from_endpoint(
         self,
         endpoint: str,
         token: str,
     ):
         try:
-            r = requests.get(
+            async with self._get_session().get(
                 url=f'{self.api_url}/{endpoint}',
-                headers={
-                    'Accept': 'application/json',
-                    'Authorization': f'token {token}',
-                },
-                timeout=_timeout,
-            )
-        except Timeout as e:
+                headers={'Authorization': f'token {token}'},
+            ) as r:
+                if r.status >= HTTP_300_MULTIPLE_CHOICES:
+                    msg = f'invalid token: ({r.status}): {await r.text()}'
+                    raise InvalidTokenError(msg)
+                return await r.json(content_type=None)
+        except asyncio.TimeoutError as e:
             msg = f'timeout in request to {self.api_url}'
             raise RemoteAuthenticationError(
                 status=HTTP_401_UNAUTHORIZED,
                 message=msg,
             ) from e
-        except requests.exceptions.RequestException as e:
+        except aiohttp.ClientError as e:
             msg = f'could not read from {self.api_url}/{endpoint}'
             raise RemoteAuthenticationError(
                 status=HTTP_401_UNAUTHORIZED,
                 message=msg,
             ) from e
 
-        if r.status_code >= HTTP_300_MULTIPLE_CHOICES:
-            msg = f'invalid token: ({r.status_code}): {r.text}'
-            raise InvalidTokenError(msg)
-        return r.json()
-
-    @MethodCache.cache_temporary(duration=120)
-    def _get_user(
+    @cached(forgejo_cache, ttl=120, key=_cache_key)
+    async def _get_user(
             self,
             token: str,
     ) -> dict:
-        return self._get_json_from_endpoint('user', token)
+        return await self._get_json_from_endpoint('user', token)
 
-    @MethodCache.cache_temporary()
-    def _get_organization(self, token: str) -> dict:
-        return self._get_json_from_endpoint(
+    @cached(forgejo_cache, stale_ttl=60, key=_cache_key)
+    async def _get_organization(self, token: str) -> dict:
+        return await self._get_json_from_endpoint(
             f'orgs/{self.organization}',
             token,
         )
 
-    @MethodCache.cache_temporary(duration=120)
-    def _get_teams_for_user(self, token: str) -> dict:
-        r = self._get_json_from_endpoint('user/teams', token)
+    @cached(forgejo_cache, ttl=120, key=_cache_key)
+    async def _get_teams_for_user(self, token: str) -> dict:
+        r = await self._get_json_from_endpoint('user/teams', token)
         return {team['name']: team for team in r}
 
-    @MethodCache.cache_temporary()
-    def _get_teams_for_organization(
+    @cached(forgejo_cache, stale_ttl=60, key=_cache_key)
+    async def _get_teams_for_organization(
         self,
         token: str,
         organization: str,
     ):
-        r = self._get_json_from_endpoint(
+        r = await self._get_json_from_endpoint(
             f'orgs/{organization}/teams',
             token,
         )
         return {team['name']: team for team in r}
 
-    @MethodCache.cache_temporary()
-    def _get_teams_for_repo(
+    @cached(forgejo_cache, stale_ttl=60, key=_cache_key)
+    async def _get_teams_for_repo(
         self,
         token: str,
         organization: str,
         repository: str,
     ):
-        r = self._get_json_from_endpoint(
+        r = await self._get_json_from_endpoint(
             f'repos/{organization}/{repository}/teams',
             token,
         )
@@ -210,39 +262,85 @@ class ForgejoAuthenticationSource(AuthenticationSource, MethodCache):
             )
         return permissions
 
-    @MethodCache.cache_temporary(duration=60)
     def authenticate(
         self,
         token: str,
     ) -> AuthenticationInfo:
+        future = asyncio.run_coroutine_threadsafe(
+            self._authenticate(token),
+            _get_client_loop(),
+        )
+        try:
+            return future.result(self.timeout * _lookup_count)
+        except concurrent.futures.TimeoutError as e:
+            future.cancel()
+            raise self._timeout_error() from e
 
-        logger.debug(f'starting Forgejo authentication: {self.api_url}, {self.organization}, {self.team}')
-
-        user_teams = self._get_teams_for_user(token)
-        logger.debug(f'user_teams: {user_teams}')
-
-        if self.team not in user_teams:
-            logger.debug(f'{self.team} not in user\'s teams')
-            msg = f'token user is not member of team `{self.team}`'
-            raise RemoteAuthenticationError(
-                status=HTTP_401_UNAUTHORIZED,
-                message=msg,
+    async def authenticate_async(
+        self,
+        token: str,
+    ) -> AuthenticationInfo:
+        future = asyncio.run_coroutine_threadsafe(
+            self._authenticate(token),
+            _get_client_loop(),
+        )
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                self.timeout * _lookup_count,
             )
+        except asyncio.TimeoutError as e:
+            raise self._timeout_error() from e
+
+    def _timeout_error(self) -> RemoteAuthenticationError:
+        # The client loop did not finish the authentication in time, e.g.,
+        # because it is blocked.
+        return RemoteAuthenticationError(
+            status=HTTP_401_UNAUTHORIZED,
+            message=f'timeout in authentication with {self.api_url}',
+        )
+
+    @cached(forgejo_cache, ttl=60, key=_cache_key)
+    async def _authenticate(
+        self,
+        token: str,
+    ) -> AuthenticationInfo:
 
-        organization = self._get_organization(token)
-        user_info = self._get_user(token)
+        logger.debug(f'starting Forgejo authentication: {self.api_url}, {self.organization}, {self.team}')
 
+        # All lookups are independent of each other, fetch them concurrently.
         if self.repository is not None:
-            organization_teams = self._get_teams_for_repo(
+            get_organization_teams = self._get_teams_for_repo(
                 token,
                 self.organization,
                 self.repository,
             )
         else:
-            organization_teams = self._get_teams_for_organization(
+            get_organization_teams = self._get_teams_for_organization(
                 token,
                 self.organization,
             )
+        (
+            user_teams,
+            organization,
+            user_info,
+            organization_teams,
+        ) = await asyncio.gather(
+            self._get_teams_for_user(token),
+            self._get_organization(token),
+            self._get_user(token),
+            get_organization_teams,
+        )
+        logger.debug(f'user_teams: {user_teams}')
+
+        if self.team not in user_teams:
+            logger.debug(f'{self.team} not in user\'s teams')
+            msg = f'token user is not member of team `{self.team}`'
+            raise RemoteAuthenticationError(
+                status=HTTP_401_UNAUTHORIZED,
+                message=msg,
+            )
+
         logger.debug(f'organization_teams: {organization_teams}')
 
         # Check that the configured team exists
@@ -9,6 +9,10 @@ with generators, i.e. it uses index- or slice-based access to the records.
 
 from __future__ import annotations
 
+import enum
+import hashlib
+import json
+import re
 from abc import (
     ABCMeta,
     abstractmethod,
@@ -17,12 +21,35 @@ from dataclasses import dataclass
 from typing import (
     TYPE_CHECKING,
     Any,
+    NamedTuple,
 )
 
 from dump_things_service.lazy_list import LazyList
+from dump_things_service.metrics import (
+    backend_seconds,
+    instrument_methods,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
+
+    from dump_things_service.backends.filters import Filter
+
+
+# Number of records that are read at once when all records are scanned
+read_batch_size = 1000
+
+# Top-level slots that hold references to other records. `extract_inlined`
+# replaces inlined records in these slots with `Thing`-placeholders, i.e.,
+# a mapping from the pid of the referenced record to `{'pid': <pid>}`.
+reference_slots = ('relations',)
+
+# Names of top-level slots that can be selected, see
+# `BackendResultList.select_fields`
+field_name_regex = re.compile('^[A-Za-z_][A-Za-z0-9_]*$')
 
 
 @dataclass
@@ -35,6 +62,40 @@ class RecordInfo:
     sort_key: str
 
 
+class PidInfo(NamedTuple):
+    """Identifiers of a stored record, see `StorageBackend.get_pid_infos`"""
+    iri: str
+    pid: str
+    class_name: str
+
+
+class ReferenceInfo(NamedTuple):
+    """A reference between records, see `StorageBackend.get_referrers`"""
+    # IRI, pid, and class name of the referencing record
+    iri: str
+    pid: str | None
+    class_name: str
+    # The top-level slot that holds the reference, and the referenced pid as
+    # it is written in the referencing record
+    slot: str
+    target: str
+
+
+class ChangeOperation(str, enum.Enum):
+    add = 'add'
+    remove = 'remove'
+    # The change log was re-created, see `change_log.py`
+    reset = 'reset'
+
+
+@dataclass
+class ChangeInfo:
+    seq: int
+    iri: str
+    class_name: str
+    operation: ChangeOperation
+
+
 @dataclass
 class ResultListInfo:
     iri: str
@@ -59,8 +120,44 @@ class BackendResultList(LazyList):
        integrated result. The `sort_key` supports this by providing a
        backend-independent, record-specific key that can be used to sort the
        records.
+
+    If fields were selected with `select_fields`, the generated records
+    contain only the selected top-level slots.
     """
 
+    # All backend result lists generate `RecordInfo` objects, results of
+    # different backends and layers can be combined.
+    family = 'backend_result_list'
+
+    # The selected top-level slots, `None` if all slots are returned
+    fields: tuple[str, ...] | None = None
+
+    def select_fields(
+        self,
+        fields: Iterable[str] | None,
+    ) -> BackendResultList:
+        """
+        Generate records that contain only the top-level slots `fields`.
+
+        Subclasses can override `generate_result` and `generate_results` to
+        read only the selected slots. Generated records are projected in any
+        case.
+
+        :param fields: The names of the selected slots, or `None` to select
+            all slots.
+        :return: The list itself.
+        """
+        if fields is None:
+            self.fields = None
+            return self
+        fields = tuple(dict.fromkeys(fields))
+        for field in fields:
+            if not field_name_regex.match(field):
+                msg = f'invalid field name: {field!r}'
+                raise ValueError(msg)
+        self.fields = fields
+        return self
+
     def generate_element(self, index: int, info: ResultListInfo) -> RecordInfo:
         """
         Generate a JSON representation of the record at index `index`.
@@ -69,9 +166,44 @@ class BackendResultList(LazyList):
         :param info: The tuple (iri, record_class_name, record_path).
         :return: A JSON object.
         """
-        return self.generate_result(
-            index, info.iri, info.class_name, info.sort_key, info.private
-        )
+        with backend_seconds.time(
+            backend=self.__class__.__name__,
+            operation='generate_result',
+        ):
+            record_info = self.generate_result(
+                index, info.iri, info.class_name, info.sort_key, info.private
+            )
+            if self.fields is not None:
+                record_info.json_object = project_record(
+                    record_info.json_object,
+                    self.fields,
+                )
+            return record_info
+
+    def generate_elements(
+        self,
+        start: int,
+        infos: list[ResultListInfo],
+    ) -> list[RecordInfo]:
+        """
+        Generate the records for multiple consecutive list elements.
+
+        :param start: The index of the first element.
+        :param infos: The infos of the elements.
+        :return: A list of RecordInfo objects.
+        """
+        with backend_seconds.time(
+            backend=self.__class__.__name__,
+            operation='generate_results',
+        ):
+            record_infos = self.generate_results(start, infos)
+            if self.fields is not None:
+                for record_info in record_infos:
+                    record_info.json_object = project_record(
+                        record_info.json_object,
+                        self.fields,
+                    )
+            return record_infos
 
     def unique_identifier(self, info: ResultListInfo) -> Any:
         # Return the IRI as unique identifier
@@ -102,8 +234,49 @@ class BackendResultList(LazyList):
         """
         raise NotImplementedError
 
+    def generate_results(
+        self,
+        start: int,
+        infos: list[ResultListInfo],
+    ) -> list[RecordInfo]:
+        """
+        Generate record info objects for multiple elements.
+
+        Subclasses can override this to read multiple records at once. This
+        implementation calls `generate_result` for every element.
+        """
+        return [
+            self.generate_result(
+                index, info.iri, info.class_name, info.sort_key, info.private
+            )
+            for index, info in enumerate(infos, start=start)
+        ]
+
 
 class StorageBackend(metaclass=ABCMeta):
+    # Operations that are timed in all backends, the timings are exposed via
+    # the `/metrics` endpoint.
+    instrumented_operations = (
+        'add_record',
+        'add_records_bulk',
+        'remove_record',
+        'get_record_by_iri',
+        'get_content_hash',
+        'get_content_hashes',
+        'get_records_of_classes',
+        'get_all_records',
+        'get_changes',
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_methods(
+            cls,
+            cls.instrumented_operations,
+            backend_seconds,
+            backend=cls.__name__,
+        )
+
     def __init__(
         self,
         order_by: Iterable[str] | None = None,
@@ -151,21 +324,147 @@ class StorageBackend(metaclass=ABCMeta):
     ) -> RecordInfo | None:
         raise NotImplementedError
 
+    def get_records_by_iris(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, RecordInfo]:
+        """Get multiple records
+
+        :return: A mapping from IRI to record, IRIs of non-existing records
+            are not included.
+        """
+        result = {}
+        for iri in iris:
+            record_info = self.get_record_by_iri(iri)
+            if record_info is not None:
+                result[iri] = record_info
+        return result
+
+    def get_content_hashes(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, str]:
+        """Get the content hashes of multiple records
+
+        :return: A mapping from IRI to content hash, IRIs of non-existing
+            records are not included.
+        """
+        result = {}
+        for iri in iris:
+            content_hash = self.get_content_hash(iri)
+            if content_hash is not None:
+                result[iri] = content_hash
+        return result
+
+    def get_content_hash(
+        self,
+        iri: str,
+    ) -> str | None:
+        """Get the content hash of the record with the IRI `iri`
+
+        The content hash changes whenever the stored record changes, it is
+        used as entity tag of the record. This implementation reads the
+        record. Backends that keep an index should return the hash from the
+        index, without reading the record.
+
+        :return: The content hash or `None` if no record has the IRI `iri`.
+        """
+        record_info = self.get_record_by_iri(iri)
+        if record_info is None:
+            return None
+        return create_content_hash(record_info.json_object)
+
     @abstractmethod
     def get_records_of_classes(
         self,
         class_names: Iterable[str],
         pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
     ) -> BackendResultList:
+        """Get all records of the given classes
+
+        :param pattern: Only return records with a text value that matches
+            the SQL-like pattern `pattern`.
+        :param filters: Only return records that match all filters, see
+            `filters.py`.
+        """
         raise NotImplementedError
 
     @abstractmethod
     def get_all_records(
         self,
         pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
     ) -> BackendResultList:
         raise NotImplementedError
 
+    def get_pid_infos(
+        self,
+    ) -> Iterator[PidInfo]:
+        """Yield IRI, pid, and class name of all stored records
+
+        This implementation reads all records. Backends that store the pid
+        should return it without reading the records.
+        """
+        result_list = self.get_all_records()
+        for start in range(0, len(result_list), read_batch_size):
+            for record_info in result_list.generate_elements(
+                start,
+                result_list.list_info[start:start + read_batch_size],
+            ):
+                yield PidInfo(
+                    record_info.iri,
+                    record_info.json_object['pid'],
+                    record_info.class_name,
+                )
+
+    def get_referrers(
+        self,
+        targets: Iterable[str],
+    ) -> list[ReferenceInfo]:
+        """Get the references to the given pids, ordered by referencing record
+
+        This implementation reads all records. Backends that store references
+        should look them up without reading the records.
+
+        :param targets: The pids of referenced records, compared to the keys
+            in the reference slots.
+        """
+        targets = set(targets)
+        result_list = self.get_all_records()
+        result = []
+        for start in range(0, len(result_list), read_batch_size):
+            for record_info in result_list.generate_elements(
+                start,
+                result_list.list_info[start:start + read_batch_size],
+            ):
+                result.extend(
+                    ReferenceInfo(
+                        record_info.iri,
+                        record_info.json_object.get('pid'),
+                        record_info.class_name,
+                        slot,
+                        target,
+                    )
+                    for slot, target in get_references(record_info.json_object)
+                    if target in targets
+                )
+        return result
+
+    def get_changes(
+        self,
+        since: int = 0,
+        limit: int = 1000,
+    ) -> list[ChangeInfo]:
+        """Get changes with a sequence number larger than `since`
+
+        :param since: Return changes after this sequence number.
+        :param limit: The maximum number of returned changes.
+        :return: Changes ordered by their sequence number.
+        """
+        msg = f'{self.__class__.__name__} does not record changes'
+        raise NotImplementedError(msg)
+
 
 def create_sort_key(
     json_object: dict[str, Any],
@@ -175,3 +474,53 @@ def create_sort_key(
         str(json_object.get(key)) if json_object.get(key) is not None else chr(0x10FFFF)
         for key in order_by
     )
+
+
+def get_references(
+    json_object: dict[str, Any],
+) -> list[tuple[str, str]]:
+    """Get slot and referenced pid of all references in `json_object`"""
+    references = []
+    for slot in reference_slots:
+        value = json_object.get(slot)
+        if isinstance(value, dict):
+            references.extend((slot, target) for target in value)
+        elif isinstance(value, list):
+            references.extend(
+                (slot, item['pid'] if isinstance(item, dict) else item)
+                for item in value
+                if isinstance(item, str) or (isinstance(item, dict) and 'pid' in item)
+            )
+    return references
+
+
+def project_record(
+    json_object: dict[str, Any],
+    fields: Iterable[str],
+) -> dict[str, Any]:
+    """Get the top-level slots `fields` of `json_object`"""
+    return {
+        field: json_object[field]
+        for field in fields
+        if json_object.get(field) is not None
+    }
+
+
+def create_content_hash(
+    json_object: dict[str, Any],
+) -> str:
+    """Create a hash of the canonical JSON representation of a record
+
+    Values that have no JSON representation, e.g., dates and timestamps
+    that YAML loaders create from unquoted values in record files, are
+    represented by their string form.
+    """
+    return hashlib.sha256(
+        json.dumps(
+            json_object,
+            sort_keys=True,
+            separators=(',', ':'),
+            ensure_ascii=False,
+            default=str,
+        ).encode('utf-8')
+    ).hexdigest()
@@ -0,0 +1,117 @@
+"""
+A change log for SQLAlchemy-based backends
+
+Backends record every `add_record` and `remove_record` operation in a
+`change`-table, in the same transaction that modifies the record. Changes are
+numbered by a monotonically increasing sequence number, i.e., consumers can
+request all changes after the last sequence number that they have seen.
+
+A `reset`-change indicates that the log was re-created, e.g., because an
+index was rebuilt. Consumers should discard their state when they see a
+`reset`-change. The log contains an `add`-change for every existing record
+after a `reset`-change.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+)
+
+from sqlalchemy import (
+    delete,
+    select,
+)
+from sqlalchemy.orm import (
+    Mapped,
+    Session,
+    mapped_column,
+)
+
+from dump_things_service.backends import (
+    ChangeInfo,
+    ChangeOperation,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Engine
+
+
+__all__ = [
+    'ChangeMixin',
+    'add_change',
+    'get_changes',
+    'is_empty',
+    'reset_changes',
+]
+
+
+class ChangeMixin:
+    """Columns of the change log, mix into a declarative model class"""
+    __tablename__ = 'change'
+    # Never reuse sequence numbers, even if the last changes are deleted
+    __table_args__: Any = {'sqlite_autoincrement': True}
+
+    seq: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    iri: Mapped[str] = mapped_column(nullable=False)
+    class_name: Mapped[str] = mapped_column(nullable=False)
+    operation: Mapped[str] = mapped_column(nullable=False)
+
+
+def add_change(
+    session: Session,
+    model: type[ChangeMixin],
+    iri: str,
+    class_name: str,
+    operation: ChangeOperation,
+):
+    session.add(model(iri=iri, class_name=class_name, operation=operation.value))
+
+
+def reset_changes(
+    session: Session,
+    model: type[ChangeMixin],
+    records: Iterable[tuple[str, str]],
+):
+    """Replace the change log by a `reset`-change and `add`-changes for `records`
+
+    :param records: `(iri, class_name)`-tuples of all existing records.
+    """
+    session.execute(delete(model))
+    add_change(session, model, '', '', ChangeOperation.reset)
+    for iri, class_name in records:
+        add_change(session, model, iri, class_name, ChangeOperation.add)
+
+
+def get_changes(
+    engine: Engine,
+    model: type[ChangeMixin],
+    since: int,
+    limit: int,
+) -> list[ChangeInfo]:
+    statement = (
+        select(model.seq, model.iri, model.class_name, model.operation)
+        .where(model.seq > since)
+        .order_by(model.seq)
+        .limit(limit)
+    )
+    with Session(engine) as session, session.begin():
+        return [
+            ChangeInfo(
+                seq=row.seq,
+                iri=row.iri,
+                class_name=row.class_name,
+                operation=ChangeOperation(row.operation),
+            )
+            for row in session.execute(statement)
+        ]
+
+
+def is_empty(
+    session: Session,
+    model: type[ChangeMixin],
+) -> bool:
+    return session.scalar(select(model.seq).limit(1)) is None
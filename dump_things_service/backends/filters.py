@@ -0,0 +1,244 @@
+"""
+Filters on the values of top-level slots
+
+A filter is given as `<slot>:<operator>:<value>`, e.g., `license:eq:CC0`. It
+matches a record if a value of the slot satisfies the operator. Values of
+multivalued slots and of inlined dictionaries are compared individually,
+i.e., `eq` matches if any value is equal. Only text and number values are
+compared. Filter values that are valid JSON numbers are compared to number
+values, all other filter values, and values in double quotes, are compared
+to text values.
+
+Backends evaluate filters in their databases. Slots that are configured as
+indexed slots are extracted into a table of slot values, filters on these
+slots use the indices of this table.
+"""
+
+from __future__ import annotations
+
+import enum
+import json
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+)
+
+from dump_things_service.backends import field_name_regex
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+__all__ = [
+    'Filter',
+    'FilterOperator',
+    'create_json_condition',
+    'create_slot_value_condition',
+    'create_slot_value_rows',
+    'get_slot_values',
+    'parse_filter',
+]
+
+
+class FilterOperator(str, enum.Enum):
+    eq = 'eq'
+    ne = 'ne'
+    lt = 'lt'
+    le = 'le'
+    gt = 'gt'
+    ge = 'ge'
+    # Text values that contain the filter value, case-sensitive
+    contains = 'contains'
+
+
+# SQL operators of the comparing filter operators. `ne` is evaluated as
+# negated `eq`, i.e., records without values match `ne`.
+sql_operators = {
+    FilterOperator.eq: '=',
+    FilterOperator.ne: '=',
+    FilterOperator.lt: '<',
+    FilterOperator.le: '<=',
+    FilterOperator.gt: '>',
+    FilterOperator.ge: '>=',
+}
+
+
+@dataclass(frozen=True)
+class Filter:
+    slot: str
+    operator: FilterOperator
+    value: str | int | float
+
+    def matches(self, json_object: dict[str, Any]) -> bool:
+        """Check whether `json_object` matches the filter"""
+        values = get_slot_values(json_object, self.slot)
+        if self.operator == FilterOperator.ne:
+            return not Filter(self.slot, FilterOperator.eq, self.value).matches(
+                json_object,
+            )
+        return any(self._matches_value(value) for value in values)
+
+    def _matches_value(self, value: str | int | float) -> bool:
+        if isinstance(self.value, str) != isinstance(value, str):
+            return False
+        if self.operator == FilterOperator.contains:
+            return isinstance(value, str) and self.value in value
+        if self.operator == FilterOperator.eq:
+            return value == self.value
+        if self.operator == FilterOperator.lt:
+            return value < self.value
+        if self.operator == FilterOperator.le:
+            return value <= self.value
+        if self.operator == FilterOperator.gt:
+            return value > self.value
+        return value >= self.value
+
+    @property
+    def is_number(self) -> bool:
+        return not isinstance(self.value, str)
+
+    @property
+    def value_column(self) -> str:
+        """The column of the slot value table that holds comparable values"""
+        return 'number_value' if self.is_number else 'text_value'
+
+
+def parse_filter(text: str) -> Filter:
+    """Parse a filter of the form `<slot>:<operator>:<value>`
+
+    :raise ValueError: If `text` is not a valid filter.
+    """
+    parts = text.split(':', 2)
+    if len(parts) != 3:
+        msg = f'filter must have the form <slot>:<operator>:<value>, got {text!r}'
+        raise ValueError(msg)
+    slot, operator, value = parts
+    if not field_name_regex.match(slot):
+        msg = f'invalid slot name in filter: {slot!r}'
+        raise ValueError(msg)
+    try:
+        operator = FilterOperator(operator)
+    except ValueError as e:
+        msg = (
+            f'invalid operator in filter: {operator!r}, expected one of: '
+            + ', '.join(member.value for member in FilterOperator)
+        )
+        raise ValueError(msg) from e
+    if operator == FilterOperator.contains:
+        return Filter(slot, operator, value)
+    return Filter(slot, operator, _parse_value(value))
+
+
+def _parse_value(value: str) -> str | int | float:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    try:
+        number = json.loads(value)
+    except ValueError:
+        return value
+    if isinstance(number, (int, float)) and not isinstance(number, bool):
+        return number
+    return value
+
+
+def get_slot_values(
+    json_object: dict[str, Any],
+    slot: str,
+) -> list[str | int | float]:
+    """Get the comparable values of the top-level slot `slot`"""
+    value = json_object.get(slot)
+    if isinstance(value, list):
+        values = value
+    elif isinstance(value, dict):
+        values = list(value.values())
+    else:
+        values = [value]
+    return [
+        value
+        for value in values
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool)
+    ]
+
+
+def create_slot_value_rows(
+    json_object: dict[str, Any],
+    slots: Iterable[str],
+) -> list[dict[str, Any]]:
+    """Create the rows of the slot value table for a record"""
+    return [
+        {
+            'slot': slot,
+            'text_value': value if isinstance(value, str) else None,
+            'number_value': None if isinstance(value, str) else value,
+        }
+        for slot in slots
+        for value in get_slot_values(json_object, slot)
+    ]
+
+
+def create_slot_value_condition(
+    filter_: Filter,
+    key_column: str,
+    table: str,
+    table_key_column: str,
+    parameter_name: str,
+) -> tuple[str, dict[str, Any]]:
+    """Create an SQL condition for `filter_` on a slot value table
+
+    :param key_column: The column of the main table that identifies records.
+    :param table: The name of the slot value table.
+    :param table_key_column: The column of `table` that refers to
+        `key_column`.
+    :param parameter_name: The prefix of the bound parameters.
+    :return: The condition and its bound parameters.
+    """
+    if filter_.operator == FilterOperator.contains:
+        comparison = f'instr(text_value, :{parameter_name}_value) > 0'
+    else:
+        comparison = (
+            f'{filter_.value_column} {sql_operators[filter_.operator]} '
+            f':{parameter_name}_value'
+        )
+    condition = (
+        f'{key_column} {"not in" if filter_.operator == FilterOperator.ne else "in"} '
+        f'(select {table_key_column} from {table} '
+        f'where slot = :{parameter_name}_slot and {comparison})'
+    )
+    return condition, {
+        f'{parameter_name}_slot': filter_.slot,
+        f'{parameter_name}_value': filter_.value,
+    }
+
+
+def create_json_condition(
+    filter_: Filter,
+    json_expression: str,
+    parameter_name: str,
+) -> tuple[str, dict[str, Any]]:
+    """Create an SQLite condition for `filter_` on the JSON text of records
+
+    The condition extracts the slot values with `json_each` and does not use
+    an index.
+
+    :param json_expression: The SQL expression that yields the JSON text.
+    :param parameter_name: The prefix of the bound parameters.
+    :return: The condition and its bound parameters.
+    """
+    if filter_.operator == FilterOperator.contains:
+        comparison = f"e.type = 'text' and instr(e.value, :{parameter_name}_value) > 0"
+    else:
+        value_types = "('integer', 'real')" if filter_.is_number else "('text')"
+        comparison = (
+            f'e.type in {value_types} and '
+            f'e.value {sql_operators[filter_.operator]} :{parameter_name}_value'
+        )
+    condition = (
+        f'{"not exists" if filter_.operator == FilterOperator.ne else "exists"} '
+        f'(select 1 from json_each({json_expression}, :{parameter_name}_path) as e '
+        f'where {comparison})'
+    )
+    return condition, {
+        f'{parameter_name}_path': f'$.{filter_.slot}',
+        f'{parameter_name}_value': filter_.value,
+    }
@@ -2,12 +2,31 @@
 Backend that stores records in a directory structure
 
 The disk-layout is described in <https://concepts.datalad.org/dump-things/>.
+
+Records are written atomically: the YAML document is written to a temporary
+file in the target directory, which is then renamed to the final name. The
+index is updated after the rename, i.e., the index never points to a
+partially written file. The durability of writes is configurable, see
+`Durability`.
+
+Result lists with selected fields are generated from the index, without
+reading record files, if the selected fields are covered by the pid and the
+configured summary fields, see `RecordDirIndex`.
+
+Filters on configured indexed slots are evaluated in the index. Filters on
+other slots are evaluated on the record files of the remaining candidates.
 """
 
 from __future__ import annotations
 
+import enum
+import json
 import logging
+import os
+import threading
+import time
 from pathlib import Path
+from uuid import uuid4
 from typing import (
     TYPE_CHECKING,
     Callable,
@@ -18,19 +37,35 @@ import yaml
 from dump_things_service import config_file_name
 from dump_things_service.backends import (
     BackendResultList,
+    ChangeInfo,
+    PidInfo,
     RecordInfo,
+    ReferenceInfo,
     ResultListInfo,
     StorageBackend,
+    create_content_hash,
     create_sort_key,
+    get_references,
 )
 from dump_things_service.backends.record_dir_index import RecordDirIndex
+from dump_things_service.backends.record_dir_watcher import (
+    RecordDirWatcher,
+    WatchMode,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
     from types import ModuleType
 
+    from dump_things_service.backends.filters import Filter
+    from dump_things_service.backends.record_dir_index import IndexEntry
+
 
 __all__ = [
+    'Durability',
     'RecordDirStore',
 ]
 
@@ -38,12 +73,164 @@ ignored_files = {'.', '..', config_file_name}
 
 lgr = logging.getLogger('dump_things_service')
 
+# Default time in milliseconds that a group commit waits for further writes
+default_group_commit_interval = 0
+
+
+class Durability(str, enum.Enum):
+    """Durability of record writes
+
+    - `none`: records are not explicitly synced to disk. A system crash
+      might lose recently written records, a process crash does not.
+    - `fsync`: every record is synced to disk before it is renamed to its
+      final name, its directory is synced after the rename. Newly created
+      directories are synced in their parent directories. All syncs are
+      done before `add_record` returns.
+    - `group`: like `fsync`, but the directories of concurrent writers are
+      synced in groups, which share the synchronization of a directory.
+    """
+    none = 'none'
+    fsync = 'fsync'
+    group = 'group'
+
+
+class _CommitGroup:
+    """Directories that are synced to disk together"""
+
+    def __init__(self):
+        self.directories: set[Path] = set()
+        self.done = threading.Event()
+        self.error: OSError | None = None
+
+
+class _GroupCommitter:
+    """Sync directories to disk in groups
+
+    Writers sync their record files themselves and wait in `add` until the
+    directories that contain the new entries are synced. A background thread
+    syncs one group at a time. Directories that are added while a group is
+    synced are collected in the next group, i.e., concurrent writers share
+    the synchronization of directories and wait for each other's syncs only
+    once.
+    """
+
+    def __init__(self, interval: float):
+        """
+        :param interval: The time in seconds that a group waits for further
+            directories before it is synced.
+        """
+        self.interval = interval
+        self.group = _CommitGroup()
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._thread = None
+
+    def add(self, directories: Iterable[Path]):
+        """Add directories and wait until they are synced to disk
+
+        :raise OSError: If the group of the directories could not be synced.
+        """
+        with self._lock:
+            group = self.group
+            group.directories.update(directories)
+            self._pending.set()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='record-dir-group-commit',
+                    daemon=True,
+                )
+                self._thread.start()
+        group.done.wait()
+        if group.error is not None:
+            raise group.error
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            if self.interval:
+                time.sleep(self.interval)
+            self.commit()
+
+    def commit(self):
+        """Sync the directories of the current group, release their writers"""
+        with self._lock:
+            group, self.group = self.group, _CommitGroup()
+            self._pending.clear()
+        try:
+            for directory in group.directories:
+                _fsync_path(directory)
+        except OSError as e:
+            group.error = e
+        group.done.set()
+
+
+def _fsync_path(path: Path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        # The record was removed in the meantime
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _create_directories(path: Path) -> list[Path]:
+    """Create `path` and its missing parents
+
+    :return: The directories that did not exist, outermost first.
+    """
+    missing = []
+    while not path.is_dir():
+        missing.append(path)
+        path = path.parent
+    missing.reverse()
+    for directory in missing:
+        directory.mkdir(exist_ok=True)
+    return missing
+
+
+def _write_atomically(
+    path: Path,
+    data: bytes,
+    *,
+    sync: bool,
+):
+    """Write `data` to a temporary file and rename it to `path`
+
+    If `sync` is true, the temporary file is synced to disk before it is
+    renamed, i.e., `path` refers either to the old or to the complete new
+    content after a crash. The directory of `path` is not synced.
+    """
+    # The temporary file does not carry the record suffix, so it is never
+    # picked up by an index rebuild.
+    temporary_path = path.parent / f'.{path.name}.{uuid4().hex}.tmp'
+    try:
+        with temporary_path.open('wb') as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        temporary_path.replace(path)
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
+
 
 class RecordDirResultList(BackendResultList):
     """
     The specific result list for record directory backends.
     """
 
+    def __init__(
+        self,
+        index: RecordDirIndex,
+    ):
+        super().__init__()
+        self.index = index
+
     def generate_result(
         self,
         _: int,
@@ -62,6 +249,65 @@ class RecordDirResultList(BackendResultList):
         :param path: The path where the record is stored
         :return: A RecordInfo object.
         """
+        summary = self._read_summaries([iri]).get(iri)
+        if summary is not None:
+            return RecordInfo(
+                iri=iri,
+                class_name=class_name,
+                json_object=summary,
+                sort_key=sort_key,
+            )
+        return self._read_record(iri, class_name, sort_key, path)
+
+    def generate_results(
+        self,
+        start: int,
+        infos: list[ResultListInfo],
+    ) -> list[RecordInfo]:
+        summaries = self._read_summaries([info.iri for info in infos])
+        return [
+            self._read_record(
+                info.iri, info.class_name, info.sort_key, info.private
+            )
+            if summaries.get(info.iri) is None
+            else RecordInfo(
+                iri=info.iri,
+                class_name=info.class_name,
+                json_object=summaries[info.iri],
+                sort_key=info.sort_key,
+            )
+            for info in infos
+        ]
+
+    def _read_summaries(
+        self,
+        iris: list[str],
+    ) -> dict[str, dict]:
+        # Summaries are only used if they contain all selected fields
+        if self.fields is None:
+            return {}
+        selected = set(self.fields) - {'pid'}
+        if not selected <= set(self.index.summary_fields):
+            return {}
+
+        result = {}
+        for iri, (pid, summary) in self.index.get_summaries(iris).items():
+            if pid is None or summary is None:
+                continue
+            summary = json.loads(summary)
+            if not selected <= summary.keys():
+                # The summary was created with other summary fields
+                continue
+            result[iri] = {'pid': pid, **summary}
+        return result
+
+    def _read_record(
+        self,
+        iri: str,
+        class_name: str,
+        sort_key: str,
+        path: Path,
+    ) -> RecordInfo:
         with path.open('r') as f:
             json_object = yaml.load(f, Loader=yaml.SafeLoader)
             return RecordInfo(
@@ -81,7 +327,28 @@ class _RecordDirStore(StorageBackend):
         pid_mapping_function: Callable,
         suffix: str,
         order_by: Iterable[str] | None = None,
+        durability: Durability = Durability.none,
+        group_commit_interval: int = default_group_commit_interval,
+        summary_fields: Iterable[str] = (),
+        indexed_slots: Iterable[str] = (),
     ):
+        """
+        Create a record directory store.
+
+        :param root: The absolute path of the store directory.
+        :param pid_mapping_function: Maps PIDs to paths relative to the class
+            directory.
+        :param suffix: The suffix of record files.
+        :param order_by: The record fields that determine the sort order.
+        :param durability: The durability of record writes.
+        :param group_commit_interval: The time in milliseconds that a group
+            commit waits for further writes, used if `durability` is
+            `Durability.group`.
+        :param summary_fields: The top-level slots that are stored in the
+            index, in addition to the pid.
+        :param indexed_slots: The top-level slots whose values are indexed
+            for filters.
+        """
         super().__init__(order_by=order_by)
         if not root.is_absolute():
             msg = f'Store root is not absolute: {root}'
@@ -89,7 +356,20 @@ class _RecordDirStore(StorageBackend):
         self.root = root
         self.pid_mapping_function = pid_mapping_function
         self.suffix = suffix
-        self.index = RecordDirIndex(root, suffix)
+        self.durability = Durability(durability)
+        self.group_commit_interval = group_commit_interval
+        self.group_committer = (
+            _GroupCommitter(group_commit_interval / 1000)
+            if self.durability == Durability.group
+            else None
+        )
+        self.index = RecordDirIndex(
+            root,
+            suffix,
+            summary_fields=summary_fields,
+            indexed_slots=indexed_slots,
+        )
+        self.watcher = None
 
     def get_uri(
         self
@@ -108,6 +388,20 @@ class _RecordDirStore(StorageBackend):
     ):
         self.index.rebuild_if_needed(schema, self.order_by)
 
+    def watch(
+        self,
+        schema: str,
+        mode: WatchMode = WatchMode.notify,
+    ):
+        """Update the index if record files are modified by other programs
+
+        :param schema: The schema that is used to resolve pids.
+        :param mode: How modifications are detected, see `WatchMode`.
+        """
+        if self.watcher is None:
+            self.watcher = RecordDirWatcher(self, schema, mode)
+            self.watcher.start()
+
     def add_record(
         self,
         iri: str,
@@ -119,7 +413,6 @@ class _RecordDirStore(StorageBackend):
         # Generate the class directory, apply the mapping function to the record
         # pid to get the final storage path.
         record_root = self.root / class_name
-        record_root.mkdir(exist_ok=True)
         storage_path = record_root / self.pid_mapping_function(pid=pid, suffix='yaml')
 
         # Ensure that the storage path is within the record root
@@ -131,8 +424,10 @@ class _RecordDirStore(StorageBackend):
             )
             raise ValueError(msg) from e
 
-        # Ensure all intermediate directories exist and save the YAML document
-        storage_path.parent.mkdir(parents=True, exist_ok=True)
+        # Ensure all intermediate directories exist and save the YAML
+        # document. The entries of new directories are synced in their
+        # parents, together with the entry of the record.
+        new_directories = _create_directories(storage_path.parent)
 
         # Convert the record object into a YAML object
         data = yaml.dump(
@@ -141,11 +436,36 @@ class _RecordDirStore(StorageBackend):
             allow_unicode=True,
             default_flow_style=False,
         )
-        storage_path.write_text(data, encoding='utf-8')
-
-        # Add the IRI to the index.
+        _write_atomically(
+            storage_path,
+            data.encode('utf-8'),
+            sync=self.durability != Durability.none,
+        )
+        if self.durability != Durability.none:
+            directories = [
+                storage_path.parent,
+                *(directory.parent for directory in new_directories),
+            ]
+            if self.group_committer:
+                self.group_committer.add(directories)
+            else:
+                for directory in directories:
+                    _fsync_path(directory)
+
+        # Add the IRI to the index. This is done after the record file is
+        # complete, so the index never refers to a partially written file.
         sort_string = create_sort_key(json_object, self.order_by)
-        self.index.add_iri_info(iri, class_name, str(storage_path), sort_string)
+        self.index.add_iri_info(
+            iri,
+            class_name,
+            str(storage_path),
+            sort_string,
+            create_content_hash(json_object),
+            pid,
+            self.index.create_summary(json_object),
+            self.index.create_slot_values(json_object),
+            get_references(json_object),
+        )
 
     def get_record_by_iri(
         self,
@@ -164,46 +484,155 @@ class _RecordDirStore(StorageBackend):
             sort_key=sort_key,
         )
 
+    def get_records_by_iris(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, RecordInfo]:
+        # A single index query for all records
+        return {
+            iri: RecordInfo(
+                iri=iri,
+                class_name=class_name,
+                json_object=yaml.load(Path(path).read_text(), Loader=yaml.SafeLoader),
+                sort_key=sort_key,
+            )
+            for iri, (class_name, path, sort_key) in self.index.get_infos_for_iris(
+                list(iris)
+            ).items()
+        }
+
+    def get_referrers(
+        self,
+        targets: Iterable[str],
+    ) -> list[ReferenceInfo]:
+        return [ReferenceInfo(*row) for row in self.index.get_referrers(targets)]
+
+    def get_content_hash(
+        self,
+        iri: str,
+    ) -> str | None:
+        hash_info = self.index.get_content_hash_for_iri(iri)
+        if hash_info is None:
+            return None
+        return self._complete_content_hash(iri, *hash_info)
+
+    def get_content_hashes(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, str]:
+        return {
+            iri: self._complete_content_hash(iri, *hash_info)
+            for iri, hash_info in self.index.get_content_hashes_for_iris(
+                list(iris)
+            ).items()
+        }
+
+    def _complete_content_hash(
+        self,
+        iri: str,
+        content_hash: str | None,
+        path: str,
+    ) -> str:
+        if content_hash is None:
+            # The record was indexed before content hashes were introduced,
+            # determine the hash once and store it in the index.
+            json_object = yaml.load(Path(path).read_text(), Loader=yaml.SafeLoader)
+            content_hash = create_content_hash(json_object)
+            self.index.set_content_hash(iri, content_hash)
+        return content_hash
+
     def get_records_of_classes(
         self,
         class_names: list[str],
         pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
     ) -> RecordDirResultList:
-        return RecordDirResultList().add_info(
-            sorted(
-                (
-                    ResultListInfo(
-                        iri=index_entry.iri,
-                        class_name=index_entry.class_name,
-                        sort_key=index_entry.sort_key,
-                        private=Path(index_entry.path),
-                    )
-                    for class_name in class_names
-                    for index_entry in self.index.get_info_for_class(class_name)
-                ),
-                key=lambda result_list_info: result_list_info.sort_key,
+        # The index returns the entries of all classes in a single, sorted
+        # query.
+        indexed_filters, other_filters = self._split_filters(filters)
+        return RecordDirResultList(self.index).add_info(
+            self._create_result_list_infos(
+                self.index.get_info_for_classes(class_names, indexed_filters),
+                other_filters,
             )
         )
 
     def get_all_records(
         self,
         pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
     ) -> RecordDirResultList:
-        return RecordDirResultList().add_info(
+        indexed_filters, other_filters = self._split_filters(filters)
+        return RecordDirResultList(self.index).add_info(
             sorted(
-                (
-                    ResultListInfo(
-                        iri=index_entry.iri,
-                        class_name=index_entry.class_name,
-                        sort_key=index_entry.sort_key,
-                        private=Path(index_entry.path),
-                    )
-                    for index_entry in self.index.get_info_for_all_classes()
+                self._create_result_list_infos(
+                    self.index.get_info_for_all_classes(indexed_filters),
+                    other_filters,
                 ),
                 key=lambda result_list_info: result_list_info.sort_key,
             )
         )
 
+    def _split_filters(
+        self,
+        filters: Iterable[Filter] | None,
+    ) -> tuple[list[Filter], list[Filter]]:
+        """Split filters into filters on indexed slots and other filters"""
+        indexed_filters, other_filters = [], []
+        for filter_ in filters or ():
+            if filter_.slot in self.index.indexed_slots:
+                indexed_filters.append(filter_)
+            else:
+                other_filters.append(filter_)
+        return indexed_filters, other_filters
+
+    def _create_result_list_infos(
+        self,
+        index_entries: Iterable[IndexEntry],
+        filters: list[Filter],
+    ) -> Iterator[ResultListInfo]:
+        for index_entry in index_entries:
+            path = Path(index_entry.path)
+            if filters:
+                # Filters on slots that are not indexed require the record
+                json_object = yaml.load(path.read_text(), Loader=yaml.SafeLoader)
+                if not all(filter_.matches(json_object) for filter_ in filters):
+                    continue
+            yield ResultListInfo(
+                iri=index_entry.iri,
+                class_name=index_entry.class_name,
+                sort_key=index_entry.sort_key,
+                private=path,
+            )
+
+    def get_pid_infos(
+        self,
+    ) -> Iterator[PidInfo]:
+        missing_pids = {}
+        for iri, pid, class_name, path in self.index.get_pid_infos():
+            if pid is None:
+                # The record was indexed before pids were indexed, read the
+                # pid once and store it in the index.
+                try:
+                    pid = yaml.load(
+                        Path(path).read_text(),
+                        Loader=yaml.SafeLoader,
+                    )['pid']
+                except Exception as e:  # noqa: BLE001
+                    lgr.error('Error: reading the pid from %s: %s', path, e)
+                    continue
+                missing_pids[iri] = pid
+            yield PidInfo(iri, pid, class_name)
+        if missing_pids:
+            self.index.set_pids(missing_pids)
+
+    def get_changes(
+        self,
+        since: int = 0,
+        limit: int = 1000,
+    ) -> list[ChangeInfo]:
+        return self.index.get_changes(since, limit)
+
     def remove_record(
         self,
         iri: str,
@@ -230,6 +659,10 @@ def RecordDirStore(  # noqa: N802
     pid_mapping_function: Callable,
     suffix: str,
     order_by: Iterable[str] | None = None,
+    durability: Durability = Durability.none,
+    group_commit_interval: int = default_group_commit_interval,
+    summary_fields: Iterable[str] = (),
+    indexed_slots: Iterable[str] = (),
 ) -> _RecordDirStore:
     """Get a record directory store for the given root directory."""
     existing_store = _existing_stores.get(root)
@@ -239,6 +672,10 @@ def RecordDirStore(  # noqa: N802
             pid_mapping_function=pid_mapping_function,
             suffix=suffix,
             order_by=order_by,
+            durability=durability,
+            group_commit_interval=group_commit_interval,
+            summary_fields=summary_fields,
+            indexed_slots=indexed_slots,
         )
         _existing_stores[root] = existing_store
 
@@ -1,22 +1,43 @@
 """
-A disk based index that associates IRIs with paths and sort-keys.
+A disk based index that associates IRIs with pids, paths, sort-keys, content
+hashes, and record summaries.
 
 It is mainly used in `RecordDirStore` to quickly access records by their IRIs,
 and has been externalized to cleanly isolate the index rebuilding logic from
 `RecordDirStore`. The reason is that index rebuilding from disk requires a
 schema because it has to resolve CURIEs in the records, i.e. the `pid`-entries.
+
+A summary contains the values of a configurable set of top-level slots of a
+record, i.e., the summary fields. Records, whose selected slots are covered by
+the summary and the pid, are read from the index instead of the record file.
+
+The values of a configurable set of top-level slots, i.e., the indexed slots,
+are stored in an indexed table. Filters on indexed slots are evaluated in the
+index (see `filters.py`).
+
+References between records are stored in an indexed table, i.e., referrers
+of a record are determined without reading record files.
 """
 
 from __future__ import annotations
 
+import json
 import logging
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import yaml
 from sqlalchemy import (
+    Index,
+    bindparam,
     create_engine,
     delete,
+    func,
+    insert,
+    inspect,
     select,
+    text,
+    update,
 )
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -26,7 +47,20 @@ from sqlalchemy.orm import (
 )
 
 from dump_things_service import config_file_name
-from dump_things_service.backends import create_sort_key
+from dump_things_service.backends import (
+    ChangeInfo,
+    ChangeOperation,
+    create_content_hash,
+    create_sort_key,
+    get_references,
+)
+from dump_things_service.backends import change_log
+from dump_things_service.backends.filters import (
+    create_slot_value_condition,
+    create_slot_value_rows,
+)
+from dump_things_service.backends.sql_locking import configure_locking
+from dump_things_service.backends.sql_migration import add_missing_columns
 from dump_things_service.model import get_model_for_schema
 from dump_things_service.resolve_curie import resolve_curie
 
@@ -35,7 +69,9 @@ if TYPE_CHECKING:
         Generator,
         Iterable,
     )
-    from pathlib import Path
+    from types import ModuleType
+
+    from dump_things_service.backends.filters import Filter
 
 
 __all__ = [
@@ -48,6 +84,9 @@ ignored_files = {'.', '..', config_file_name, index_file_name}
 
 lgr = logging.getLogger('dump_things_service')
 
+# Number of IRIs that are looked up in a single query
+lookup_batch_size = 500
+
 
 class Base(DeclarativeBase):
     pass
@@ -59,8 +98,59 @@ class IndexEntry(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     iri: Mapped[str] = mapped_column(nullable=False, unique=True, index=True)
     class_name: Mapped[str] = mapped_column(nullable=False)
-    path: Mapped[str] = mapped_column(nullable=False)
+    # Indexed to update entries of externally modified files, see
+    # `RecordDirIndex.update_paths`.
+    path: Mapped[str] = mapped_column(nullable=False, index=True)
     sort_key: Mapped[str] = mapped_column(nullable=False)
+    # Hash of the record content, `None` in indices that were created before
+    # content hashes were introduced. Those are filled in on first access.
+    content_hash: Mapped[str | None] = mapped_column(nullable=True)
+    # The `pid` of the record, `None` in indices that were created before
+    # pids were indexed. Those are filled in on first access.
+    pid: Mapped[str | None] = mapped_column(nullable=True, index=True)
+    # JSON-object with the summary fields of the record, see
+    # `RecordDirIndex.create_summary`. `None` if no summary fields were
+    # configured when the record was indexed.
+    summary: Mapped[str | None] = mapped_column(nullable=True)
+
+
+class Change(change_log.ChangeMixin, Base):
+    pass
+
+
+class SlotValue(Base):
+    """The values of indexed slots, used to evaluate filters"""
+
+    __tablename__ = 'slot_value'
+    __table_args__ = (
+        Index('ix_slot_value_text', 'slot', 'text_value'),
+        Index('ix_slot_value_number', 'slot', 'number_value'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    entry_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    slot: Mapped[str] = mapped_column(nullable=False)
+    text_value: Mapped[str | None] = mapped_column(nullable=True)
+    number_value: Mapped[float | None] = mapped_column(nullable=True)
+
+
+class Reference(Base):
+    """References between records, see `get_references`"""
+
+    __tablename__ = 'reference'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    entry_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    slot: Mapped[str] = mapped_column(nullable=False)
+    target: Mapped[str] = mapped_column(nullable=False, index=True)
+
+
+class IndexedSlot(Base):
+    """The slots whose values are stored in `slot_value`"""
+
+    __tablename__ = 'indexed_slot'
+
+    slot: Mapped[str] = mapped_column(primary_key=True)
 
 
 class RecordDirIndex:
@@ -69,6 +159,8 @@ class RecordDirIndex:
         store_dir: Path,
         suffix: str,
         *,
+        summary_fields: Iterable[str] = (),
+        indexed_slots: Iterable[str] = (),
         echo: bool = False,
     ):
         if not store_dir.is_absolute():
@@ -83,12 +175,51 @@ class RecordDirIndex:
 
         self.store_dir = store_dir
         self.suffix = suffix
+        self.summary_fields = tuple(summary_fields)
+        self.indexed_slots = tuple(indexed_slots)
         self.needs_rebuild = not (store_dir / index_file_name).exists()
         self.engine = create_engine(
             'sqlite:///' + str(store_dir / index_file_name),
             echo=echo,
         )
-        Base.metadata.create_all(self.engine)
+        # The index might be used by multiple processes, modify it only in
+        # transactions of `self.write_engine`.
+        self.write_engine = configure_locking(self.engine)
+        has_references = inspect(self.engine).has_table(Reference.__tablename__)
+        Base.metadata.create_all(self.write_engine)
+        add_missing_columns(self.engine, Base.metadata)
+        if not self.needs_rebuild:
+            self._create_change_log_if_missing()
+            self._update_indexed_slots()
+            if not has_references:
+                self._fill_references()
+
+    def create_summary(
+        self,
+        json_object: dict,
+    ) -> str | None:
+        """Create the summary of a record
+
+        The summary contains all summary fields, missing fields have the
+        value `None`. That allows to detect summaries that were created with
+        other summary fields.
+        """
+        if not self.summary_fields:
+            return None
+        return json.dumps(
+            {field: json_object.get(field) for field in self.summary_fields},
+            ensure_ascii=False,
+            default=str,
+        )
+
+    def create_slot_values(
+        self,
+        json_object: dict,
+    ) -> list[dict] | None:
+        """Create the slot value rows of the indexed slots of a record"""
+        if not self.indexed_slots:
+            return None
+        return create_slot_value_rows(json_object, self.indexed_slots)
 
     def add_iri_info(
         self,
@@ -96,14 +227,24 @@ class RecordDirIndex:
         class_name: str,
         path: str,
         sort_key: str,
+        content_hash: str | None = None,
+        pid: str | None = None,
+        summary: str | None = None,
+        slot_values: list[dict] | None = None,
+        references: list[tuple[str, str]] | None = None,
     ):
-        with Session(self.engine) as session, session.begin():
+        with Session(self.write_engine) as session, session.begin():
             self.add_iri_info_with_session(
                 session,
                 iri=iri,
                 class_name=class_name,
                 path=path,
                 sort_key=sort_key,
+                content_hash=content_hash,
+                pid=pid,
+                summary=summary,
+                slot_values=slot_values,
+                references=references,
             )
 
     def add_iri_info_with_session(
@@ -113,6 +254,11 @@ class RecordDirIndex:
         class_name: str,
         path: str,
         sort_key: str,
+        content_hash: str | None = None,
+        pid: str | None = None,
+        summary: str | None = None,
+        slot_values: list[dict] | None = None,
+        references: list[tuple[str, str]] | None = None,
     ):
         existing_record = session.query(IndexEntry).filter_by(iri=iri).first()
         if existing_record:
@@ -120,14 +266,62 @@ class RecordDirIndex:
                 msg = f'Duplicated IRI ({iri}): already indexed record {existing_record.path} has the same IRI as new record at {path}.'
                 raise ValueError(msg)
             existing_record.sort_key = sort_key
+            existing_record.content_hash = content_hash
+            existing_record.pid = pid
+            existing_record.summary = summary
+            entry = existing_record
         else:
-            session.add(
-                IndexEntry(
-                    iri=iri,
-                    class_name=class_name,
-                    path=path,
-                    sort_key=sort_key,
-                )
+            entry = IndexEntry(
+                iri=iri,
+                class_name=class_name,
+                path=path,
+                sort_key=sort_key,
+                content_hash=content_hash,
+                pid=pid,
+                summary=summary,
+            )
+            session.add(entry)
+        if slot_values is not None:
+            self._set_slot_values_with_session(session, entry, slot_values)
+        if references is not None:
+            self._set_references_with_session(session, entry, references)
+        change_log.add_change(session, Change, iri, class_name, ChangeOperation.add)
+
+    def _set_slot_values_with_session(
+        self,
+        session: Session,
+        entry: IndexEntry,
+        slot_values: list[dict],
+    ):
+        if entry.id is None:
+            # Assign an id to a new entry
+            session.flush()
+        else:
+            session.execute(delete(SlotValue).where(SlotValue.entry_id == entry.id))
+        if slot_values:
+            session.execute(
+                insert(SlotValue),
+                [{'entry_id': entry.id, **row} for row in slot_values],
+            )
+
+    def _set_references_with_session(
+        self,
+        session: Session,
+        entry: IndexEntry,
+        references: list[tuple[str, str]],
+    ):
+        if entry.id is None:
+            # Assign an id to a new entry
+            session.flush()
+        else:
+            session.execute(delete(Reference).where(Reference.entry_id == entry.id))
+        if references:
+            session.execute(
+                insert(Reference),
+                [
+                    {'entry_id': entry.id, 'slot': slot, 'target': target}
+                    for slot, target in references
+                ],
             )
 
     def get_info_for_iri(
@@ -141,6 +335,161 @@ class RecordDirIndex:
                 return entry.class_name, entry.path, entry.sort_key
             return None
 
+    def get_infos_for_iris(
+        self,
+        iris: list[str],
+    ) -> dict[str, tuple[str, str, str]]:
+        """Get class name, path, and sort key of multiple records
+
+        :return: A mapping from IRI to a tuple of class name, path, and sort
+            key, IRIs of non-indexed records are not included.
+        """
+        result = {}
+        with Session(self.engine) as session, session.begin():
+            for start in range(0, len(iris), lookup_batch_size):
+                statement = select(
+                    IndexEntry.iri,
+                    IndexEntry.class_name,
+                    IndexEntry.path,
+                    IndexEntry.sort_key,
+                ).where(IndexEntry.iri.in_(iris[start:start + lookup_batch_size]))
+                for row in session.execute(statement):
+                    result[row.iri] = row.class_name, row.path, row.sort_key
+        return result
+
+    def get_referrers(
+        self,
+        targets: Iterable[str],
+    ) -> list[tuple[str, str | None, str, str, str]]:
+        """Get IRI, pid, and class name of referencing records, slot, and target"""
+        statement = (
+            select(
+                IndexEntry.iri,
+                IndexEntry.pid,
+                IndexEntry.class_name,
+                Reference.slot,
+                Reference.target,
+            )
+            .join(Reference, Reference.entry_id == IndexEntry.id)
+            .where(Reference.target.in_(list(targets)))
+            .order_by(IndexEntry.sort_key, IndexEntry.id)
+        )
+        with Session(self.engine) as session, session.begin():
+            return session.execute(statement).all()
+
+    def get_content_hash_for_iri(
+        self,
+        iri: str,
+    ) -> tuple[str | None, str] | None:
+        """Get the content hash and the path of the record with IRI `iri`
+
+        :return: `None` if `iri` is not indexed, otherwise a tuple of the
+            content hash, which is `None` if the hash was not yet determined,
+            and the path of the record.
+        """
+        with Session(self.engine) as session, session.begin():
+            statement = select(
+                IndexEntry.content_hash,
+                IndexEntry.path,
+            ).filter_by(iri=iri)
+            row = session.execute(statement).first()
+            if row:
+                return row.content_hash, row.path
+            return None
+
+    def get_content_hashes_for_iris(
+        self,
+        iris: list[str],
+    ) -> dict[str, tuple[str | None, str]]:
+        """Get content hashes and paths of multiple records, see `get_content_hash_for_iri`"""
+        result = {}
+        with Session(self.engine) as session, session.begin():
+            for start in range(0, len(iris), lookup_batch_size):
+                statement = select(
+                    IndexEntry.iri,
+                    IndexEntry.content_hash,
+                    IndexEntry.path,
+                ).where(IndexEntry.iri.in_(iris[start:start + lookup_batch_size]))
+                for row in session.execute(statement):
+                    result[row.iri] = row.content_hash, row.path
+        return result
+
+    def set_content_hash(
+        self,
+        iri: str,
+        content_hash: str,
+    ):
+        statement = (
+            update(IndexEntry)
+            .where(IndexEntry.iri == iri)
+            .values(content_hash=content_hash)
+        )
+        with Session(self.write_engine) as session, session.begin():
+            session.execute(statement)
+
+    def get_pid_infos(
+        self,
+    ) -> Generator[tuple[str, str | None, str, str]]:
+        """Get IRI, pid, class name, and path of all indexed records
+
+        The pid is `None` if it was not yet determined.
+        """
+        statement = select(
+            IndexEntry.iri,
+            IndexEntry.pid,
+            IndexEntry.class_name,
+            IndexEntry.path,
+        ).order_by(IndexEntry.id)
+        with Session(self.engine) as session, session.begin():
+            yield from session.execute(statement)
+
+    def get_paths_without_pid(
+        self,
+    ) -> list[tuple[str, str]]:
+        """Get IRI and path of all records whose pid was not yet determined"""
+        statement = select(IndexEntry.iri, IndexEntry.path).where(
+            IndexEntry.pid.is_(None)
+        )
+        with Session(self.engine) as session, session.begin():
+            return session.execute(statement).all()
+
+    def get_summaries(
+        self,
+        iris: list[str],
+    ) -> dict[str, tuple[str | None, str | None]]:
+        """Get pid and summary of multiple records
+
+        :return: A mapping from IRI to a tuple of pid and summary, IRIs of
+            non-indexed records are not included.
+        """
+        result = {}
+        with Session(self.engine) as session, session.begin():
+            for start in range(0, len(iris), lookup_batch_size):
+                statement = select(
+                    IndexEntry.iri,
+                    IndexEntry.pid,
+                    IndexEntry.summary,
+                ).where(IndexEntry.iri.in_(iris[start:start + lookup_batch_size]))
+                for row in session.execute(statement):
+                    result[row.iri] = row.pid, row.summary
+        return result
+
+    def set_pids(
+        self,
+        pids: dict[str, str],
+    ):
+        """Store the pids of the records with the given IRIs"""
+        statement = (
+            update(IndexEntry.__table__)
+            .where(IndexEntry.iri == bindparam('b_iri'))
+            .values(pid=bindparam('b_pid'))
+        )
+        with self.write_engine.begin() as connection:
+            connection.execute(
+                statement,
+                [{'b_iri': iri, 'b_pid': pid} for iri, pid in pids.items()],
+            )
+
     def get_info_for_class(
         self,
         class_name: str,
@@ -151,74 +500,410 @@ class RecordDirIndex:
             for row in result:
                 yield row[0]
 
+    def get_info_for_classes(
+        self,
+        class_names: Iterable[str],
+        filters: Iterable[Filter] = (),
+    ) -> Generator[IndexEntry]:
+        """Get index entries of all given classes, ordered by their sort key
+
+        :param filters: Filters on indexed slots.
+        """
+        with Session(self.engine) as session, session.begin():
+            statement = self._add_filter_conditions(
+                select(IndexEntry)
+                .where(IndexEntry.class_name.in_(list(class_names)))
+                .order_by(IndexEntry.sort_key),
+                filters,
+            )
+            result = session.execute(statement)
+            for row in result:
+                yield row[0]
+
     def get_info_for_all_classes(
         self,
+        filters: Iterable[Filter] = (),
     ) -> Generator[IndexEntry]:
-        statement = select(IndexEntry)
+        """Get all index entries
+
+        :param filters: Filters on indexed slots.
+        """
+        statement = self._add_filter_conditions(select(IndexEntry), filters)
         with Session(self.engine) as session, session.begin():
             result = session.execute(statement)
             for row in result:
                 yield row[0]
 
+    def _add_filter_conditions(
+        self,
+        statement,
+        filters: Iterable[Filter],
+    ):
+        for index, filter_ in enumerate(filters):
+            if filter_.slot not in self.indexed_slots:
+                msg = f'slot {filter_.slot!r} is not indexed'
+                raise ValueError(msg)
+            condition, parameters = create_slot_value_condition(
+                filter_,
+                'index_entry.id',
+                'slot_value',
+                'entry_id',
+                f'filter_{index}',
+            )
+            statement = statement.where(text(condition).bindparams(**parameters))
+        return statement
+
     def remove_iri_info(
         self,
         iri: str,
     ) -> bool:
-        statement = delete(IndexEntry).where(IndexEntry.iri == iri)
-        with Session(self.engine) as session, session.begin():
-            result = session.execute(statement)
-            return result.rowcount == 1
+        with Session(self.write_engine) as session, session.begin():
+            row = session.execute(
+                select(IndexEntry.id, IndexEntry.class_name).filter_by(iri=iri)
+            ).first()
+            if row is None:
+                return False
+            entry_id, class_name = row
+            self._remove_entry_with_session(session, entry_id, iri, class_name)
+            return True
+
+    def _remove_entry_with_session(
+        self,
+        session: Session,
+        entry_id: int,
+        iri: str,
+        class_name: str,
+    ):
+        session.execute(delete(IndexEntry).where(IndexEntry.id == entry_id))
+        session.execute(delete(SlotValue).where(SlotValue.entry_id == entry_id))
+        session.execute(delete(Reference).where(Reference.entry_id == entry_id))
+        change_log.add_change(
+            session,
+            Change,
+            iri,
+            class_name,
+            ChangeOperation.remove,
+        )
+
+    def get_changes(
+        self,
+        since: int,
+        limit: int,
+    ) -> list[ChangeInfo]:
+        return change_log.get_changes(self.engine, Change, since, limit)
+
+    def _create_change_log_if_missing(self):
+        # Indices that were created before change logs were introduced, get
+        # a change log that contains all indexed records.
+        with Session(self.write_engine) as session, session.begin():
+            if change_log.is_empty(session, Change):
+                change_log.reset_changes(
+                    session,
+                    Change,
+                    session.execute(
+                        select(IndexEntry.iri, IndexEntry.class_name)
+                        .order_by(IndexEntry.id)
+                    ).all(),
+                )
+
+    def _update_indexed_slots(self):
+        # Read the values of newly configured indexed slots from the record
+        # files, and remove the values of slots that are no longer indexed.
+        with Session(self.write_engine) as session, session.begin():
+            stored_slots = set(session.scalars(select(IndexedSlot.slot)))
+            removed_slots = stored_slots - set(self.indexed_slots)
+            if removed_slots:
+                session.execute(
+                    delete(SlotValue).where(SlotValue.slot.in_(removed_slots))
+                )
+                session.execute(
+                    delete(IndexedSlot).where(IndexedSlot.slot.in_(removed_slots))
+                )
+            new_slots = [
+                slot for slot in self.indexed_slots if slot not in stored_slots
+            ]
+            if not new_slots:
+                return
+
+            lgr.info('Indexing values of slots %s in %s', new_slots, self.store_dir)
+            entries = session.execute(select(IndexEntry.id, IndexEntry.path)).all()
+            for entry_id, path in entries:
+                try:
+                    record = yaml.load(Path(path).read_text(), Loader=yaml.SafeLoader)
+                except Exception as e:  # noqa: BLE001
+                    lgr.error('Error: reading YAML record from %s: %s', path, e)
+                    continue
+                rows = create_slot_value_rows(record, new_slots)
+                if rows:
+                    session.execute(
+                        insert(SlotValue),
+                        [{'entry_id': entry_id, **row} for row in rows],
+                    )
+            session.add_all(IndexedSlot(slot=slot) for slot in new_slots)
+
+    def _fill_references(self):
+        # Indices that were created before references were indexed get the
+        # references of all records from the record files.
+        lgr.info('Indexing references of records in %s', self.store_dir)
+        with Session(self.write_engine) as session, session.begin():
+            entries = session.execute(select(IndexEntry.id, IndexEntry.path)).all()
+            references = []
+            for entry_id, path in entries:
+                try:
+                    record = yaml.load(Path(path).read_text(), Loader=yaml.SafeLoader)
+                except Exception as e:  # noqa: BLE001
+                    lgr.error('Error: reading YAML record from %s: %s', path, e)
+                    continue
+                references.extend(
+                    {'entry_id': entry_id, 'slot': slot, 'target': target}
+                    for slot, target in get_references(record)
+                )
+            if references:
+                session.execute(insert(Reference), references)
+
+    def is_record_path(
+        self,
+        path: Path,
+    ) -> bool:
+        """Check whether `path` is the path of a record file of this store"""
+        return (
+            path.suffix == f'.{self.suffix}'
+            and path.name not in ignored_files
+            and path.is_relative_to(self.store_dir)
+        )
+
+    def _read_entry(
+        self,
+        path: Path,
+        model: ModuleType,
+        order_by: Iterable[str],
+    ) -> tuple[IndexEntry, list[dict], list[tuple[str, str]]] | None:
+        """Read a record file and create its index entry
+
+        :return: The index entry, the rows of indexed slot values, and the
+            references of the record. `None` if the file does not contain
+            a valid record, errors are logged.
+        """
+        try:
+            # Catch YAML structure errors
+            record = yaml.load(path.read_text(), Loader=yaml.SafeLoader)
+        except Exception as e:  # noqa: BLE001
+            lgr.error('Error: reading YAML record from %s: %s', path, e)
+            return None
+
+        try:
+            # Catch YAML payload errors
+            pid = record['pid']
+        except (TypeError, KeyError):
+            lgr.error(
+                'Error: record at %s does not contain a mapping with `pid`',
+                path,
+            )
+            return None
+
+        # Log errors of individual records and continue building the index
+        try:
+            entry = IndexEntry(
+                iri=resolve_curie(model, pid),
+                path=str(path),
+                class_name=self._get_class_name(path),
+                sort_key=create_sort_key(record, order_by),
+                content_hash=create_content_hash(record),
+                pid=pid,
+                summary=self.create_summary(record),
+            )
+            return (
+                entry,
+                create_slot_value_rows(record, self.indexed_slots),
+                get_references(record),
+            )
+        except Exception as e:  # noqa: BLE001
+            lgr.error('Error: creating the index entry of %s: %s', path, e)
+            return None
+
+    def update_paths(
+        self,
+        schema: str,
+        paths: Iterable[Path],
+        order_by: Iterable[str] | None = None,
+    ) -> int:
+        """Update the index entries of record files that were modified externally
+
+        Entries of existing files are added or updated, entries of missing
+        files are removed. Files whose content did not change, e.g., files
+        that were written by the store itself, are skipped.
+
+        Files are read in the write transaction. The store updates the index
+        after it wrote a file, i.e., an entry is never replaced by an entry
+        of an older version of the file.
+
+        :return: The number of added, updated, or removed entries.
+        """
+        paths = sorted({path for path in paths if self.is_record_path(path)})
+        if not paths:
+            return 0
+
+        order_by = order_by or ['pid']
+        model = get_model_for_schema(schema)[0]
+        count = 0
+        with Session(self.write_engine) as session, session.begin():
+            for path in paths:
+                # Every file is updated in a savepoint, an error in one file
+                # does not discard the updates of the other files.
+                try:
+                    with session.begin_nested():
+                        count += self._update_path_with_session(
+                            session,
+                            path,
+                            model,
+                            order_by,
+                        )
+                except Exception as e:  # noqa: BLE001
+                    lgr.error('Error: updating the index entry of %s: %s', path, e)
+        return count
+
+    def _update_path_with_session(
+        self,
+        session: Session,
+        path: Path,
+        model: ModuleType,
+        order_by: Iterable[str],
+    ) -> int:
+        existing_entry = session.scalars(
+            select(IndexEntry).filter_by(path=str(path))
+        ).first()
+        new_entry = (
+            self._read_entry(path, model, order_by)
+            if path.is_file()
+            else None
+        )
+        count = 0
+        if existing_entry and (
+            new_entry is None or new_entry[0].iri != existing_entry.iri
+        ):
+            self._remove_entry_with_session(
+                session,
+                existing_entry.id,
+                existing_entry.iri,
+                existing_entry.class_name,
+            )
+            existing_entry = None
+            count += 1
+        if new_entry is None:
+            return count
+
+        entry, slot_values, references = new_entry
+        if existing_entry and existing_entry.content_hash == entry.content_hash:
+            return count
+        self.add_iri_info_with_session(
+            session,
+            iri=entry.iri,
+            class_name=entry.class_name,
+            path=entry.path,
+            sort_key=entry.sort_key,
+            content_hash=entry.content_hash,
+            pid=entry.pid,
+            summary=entry.summary,
+            slot_values=slot_values,
+            references=references,
+        )
+        return count + 1
 
     def rebuild_index(
         self,
         schema: str,
         order_by: Iterable[str] | None = None,
     ):
-        """Rebuild the index from the records in the directory."""
+        """Rebuild the index from the records in the directory.
+
+        Record files are read without locking the index, i.e., other
+        processes can use and modify the index in the meantime. The index is
+        then replaced in a single transaction. Index entries of records that
+        were modified by other processes while the files were read, are kept.
+        If the index was rebuilt by another process in the meantime, the
+        result of this rebuild is discarded.
+        """
         lgr.info('Building IRI index for records in %s', self.store_dir)
 
         order_by = order_by or ['pid']
 
         model = get_model_for_schema(schema)[0]
         with Session(self.engine) as session, session.begin():
-            statement = delete(IndexEntry)
-            session.execute(statement)
-
-            for path in self.store_dir.rglob(f'*.{self.suffix}'):
-                if path.is_file() and path.name not in ignored_files:
-                    try:
-                        # Catch YAML structure errors
-                        record = yaml.load(path.read_text(), Loader=yaml.SafeLoader)
-                    except Exception as e:  # noqa: BLE001
-                        lgr.error('Error: reading YAML record from %s: %s', path, e)
-                        continue
-
-                    try:
-                        # Catch YAML payload errors
-                        pid = record['pid']
-                    except (TypeError, KeyError):
-                        lgr.error(
-                            'Error: record at %s does not contain a mapping with `pid`',
-                            path,
-                        )
-                        continue
-
-                    iri = resolve_curie(model, pid)
-                    class_name = self._get_class_name(path)
-                    sort_key = create_sort_key(record, order_by)
-
-                    # Log errors and continue building the index
-                    try:
-                        session.add(
-                            IndexEntry(
-                                iri=iri,
-                                path=str(path),
-                                class_name=class_name,
-                                sort_key=sort_key,
-                            )
-                        )
-                    except ValueError as e:
-                        lgr.error('Error during index creation: %s', e)
+            start_seq = session.scalar(select(func.max(Change.seq))) or 0
+
+        new_entries = []
+        for path in self.store_dir.rglob(f'*.{self.suffix}'):
+            if path.is_file() and path.name not in ignored_files:
+                new_entry = self._read_entry(path, model, order_by)
+                if new_entry is not None:
+                    new_entries.append(new_entry)
+
+        with Session(self.write_engine) as session, session.begin():
+            changes = session.execute(
+                select(Change.iri, Change.operation).where(Change.seq > start_seq)
+            ).all()
+            if any(
+                operation == ChangeOperation.reset.value
+                for _, operation in changes
+            ):
+                lgr.info(
+                    'Index of %s was rebuilt by another process, discarding '
+                    'this rebuild',
+                    self.store_dir,
+                )
+                self.needs_rebuild = False
+                return
+
+            # Keep the entries of records that were modified in the meantime
+            modified_iris = {iri for iri, _ in changes}
+            # Records are removed from the index before their files are
+            # deleted. Files of records that are not indexed might have been
+            # deleted after they were read.
+            indexed_iris = set(session.scalars(select(IndexEntry.iri)))
+            replaced_ids = select(IndexEntry.id).where(
+                IndexEntry.iri.not_in(modified_iris)
+            )
+            session.execute(delete(SlotValue).where(SlotValue.entry_id.in_(replaced_ids)))
+            session.execute(delete(Reference).where(Reference.entry_id.in_(replaced_ids)))
+            session.execute(delete(IndexEntry).where(IndexEntry.iri.not_in(modified_iris)))
+            session.execute(delete(IndexedSlot))
+
+            new_entries = [
+                (entry, entry_rows, entry_references)
+                for entry, entry_rows, entry_references in new_entries
+                if entry.iri not in modified_iris
+                and (entry.iri in indexed_iris or Path(entry.path).exists())
+            ]
+            session.add_all(entry for entry, _, _ in new_entries)
+
+            # Entries get their ids when the session is flushed
+            session.flush()
+            rows = [
+                {'entry_id': entry.id, **row}
+                for entry, entry_rows, _ in new_entries
+                for row in entry_rows
+            ]
+            if rows:
+                session.execute(insert(SlotValue), rows)
+            session.add_all(IndexedSlot(slot=slot) for slot in self.indexed_slots)
+            rows = [
+                {'entry_id': entry.id, 'slot': slot, 'target': target}
+                for entry, _, entry_references in new_entries
+                for slot, target in entry_references
+            ]
+            if rows:
+                session.execute(insert(Reference), rows)
+
+            # Records might have been modified while the index did not exist,
+            # consumers of the change log have to start over.
+            change_log.reset_changes(
+                session,
+                Change,
+                session.execute(
+                    select(IndexEntry.iri, IndexEntry.class_name)
+                    .order_by(IndexEntry.id)
+                ).all(),
+            )
         lgr.info('Index built')
         self.needs_rebuild = False
 
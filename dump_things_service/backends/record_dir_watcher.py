@@ -0,0 +1,168 @@
+"""
+Watch `record_dir`-stores for modifications by other programs
+
+Record files might be modified outside the service, e.g., by editing files
+or by pulling a git repository into the store directory. A watcher receives
+the paths of modified record files and updates the index of the store
+incrementally, see `RecordDirIndex.update_paths`.
+
+Changes are collected until no further changes occur for a short time, or
+until the debounce interval has passed, and are then applied in a single
+index transaction. Modifications are detected with file change notifications
+of the operating system, e.g., inotify. If notifications are not available,
+e.g., because the inotify watch limit is reached, or if polling is
+configured, the store directory is polled.
+
+Watching uses the package `watchfiles`, which is installed with
+`fastapi[standard]`.
+"""
+
+from __future__ import annotations
+
+import enum
+import logging
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from dump_things_service.backends.record_dir import _RecordDirStore
+
+
+__all__ = [
+    'RecordDirWatcher',
+    'WatchMode',
+]
+
+lgr = logging.getLogger('dump_things_service')
+
+# Default maximum time in milliseconds that changes are collected
+default_debounce = 1000
+
+
+class WatchMode(str, enum.Enum):
+    """How modifications of record files are detected
+
+    - `none`: record files are not watched.
+    - `notify`: file change notifications of the operating system are used,
+      the store directory is polled if notifications are not available.
+    - `poll`: the store directory is polled, e.g., for network file systems.
+    """
+    none = 'none'
+    notify = 'notify'
+    poll = 'poll'
+
+
+class RecordDirWatcher:
+    """Update the index of a `record_dir`-store when record files change"""
+
+    def __init__(
+        self,
+        store: _RecordDirStore,
+        schema: str,
+        mode: WatchMode = WatchMode.notify,
+        debounce: int = default_debounce,
+    ):
+        """
+        Create a watcher, the watcher is started with `start`.
+
+        :param store: The store whose directory is watched.
+        :param schema: The schema that is used to resolve pids.
+        :param mode: How modifications are detected, must not be `none`.
+        :param debounce: The maximum time in milliseconds that changes are
+            collected before the index is updated.
+        """
+        if WatchMode(mode) == WatchMode.none:
+            msg = 'cannot create a watcher with watch mode `none`'
+            raise ValueError(msg)
+        self.store = store
+        self.schema = schema
+        self.mode = WatchMode(mode)
+        self.debounce = debounce
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching in a background thread
+
+        :raise ValueError: If `watchfiles` is not installed.
+        """
+        try:
+            import watchfiles  # noqa: F401
+        except ImportError as e:
+            msg = 'watching `record_dir`-stores requires the package `watchfiles`'
+            raise ValueError(msg) from e
+
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='record-dir-watcher',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching and wait for the background thread to finish"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        from watchfiles import watch
+
+        force_polling = self.mode == WatchMode.poll
+        while not self._stop_event.is_set():
+            try:
+                for changes in watch(
+                    self.store.root,
+                    watch_filter=self._is_record_path,
+                    debounce=self.debounce,
+                    stop_event=self._stop_event,
+                    force_polling=force_polling,
+                    raise_interrupt=False,
+                ):
+                    self.update({Path(path) for _, path in changes})
+            except OSError as e:
+                if force_polling:
+                    lgr.error('Error: watching %s failed: %s', self.store.root, e)
+                    return
+                lgr.warning(
+                    'File change notifications are not available for %s (%s), '
+                    'polling instead',
+                    self.store.root,
+                    e,
+                )
+                force_polling = True
+
+    def _is_record_path(self, _, path: str) -> bool:
+        return self.store.index.is_record_path(Path(path))
+
+    def update(self, paths: set[Path]) -> int:
+        """Update the index entries of `paths`
+
+        :return: The number of added, updated, or removed index entries.
+        """
+        try:
+            count = self.store.index.update_paths(
+                self.schema,
+                paths,
+                self.store.order_by,
+            )
+        except Exception:
+            # Errors of individual files are logged by `update_paths`. If
+            # the whole update failed, e.g., because the index is not
+            # accessible, keep watching, the next modification of the files
+            # will be picked up.
+            lgr.exception('Error: updating the index of %s', self.store.root)
+            return 0
+        if count:
+            lgr.info(
+                'Updated %d index entries of externally modified records in %s',
+                count,
+                self.store.root,
+            )
+        return count
@@ -13,6 +13,9 @@ When a record is read from the backend, the `schema_type` attribute is added in
 all cases (because we don't keep track of whether the initial record had a
 `schema_type`-attribute or not). So every record read from this backend
 will contain a `schema_type` attribute.
+
+Filters on `schema_type` are evaluated by the layer, based on the class names
+of the records. All other filters are evaluated by the underlying backend.
 """
 
 from __future__ import annotations
@@ -24,14 +27,24 @@ from typing import (
 
 from dump_things_service.backends import (
     BackendResultList,
+    ChangeInfo,
+    PidInfo,
     RecordInfo,
+    ReferenceInfo,
+    ResultListInfo,
     StorageBackend,
 )
 from dump_things_service.model import get_schema_model_for_schema
 
 if TYPE_CHECKING:
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
     from types import ModuleType
 
+    from dump_things_service.backends.filters import Filter
+
 
 __all__ = [
     'SchemaTypeLayer',
@@ -49,6 +62,23 @@ class SchemaTypeLayerResultList(BackendResultList):
         self.origin_list = origin_list
         self.list_info = self.origin_list.list_info
 
+    def select_fields(
+        self,
+        fields: Iterable[str] | None,
+    ) -> BackendResultList:
+        super().select_fields(fields)
+        # `schema_type` is determined by the layer, the origin list does not
+        # have to read it.
+        self.origin_list.select_fields(
+            None
+            if self.fields is None
+            else [field for field in self.fields if field != 'schema_type']
+        )
+        return self
+
+    def _adds_schema_type(self) -> bool:
+        return self.fields is None or 'schema_type' in self.fields
+
     def generate_result(
         self,
         index: int,
@@ -60,13 +90,32 @@ class SchemaTypeLayerResultList(BackendResultList):
         origin_element = self.origin_list.generate_result(
             index, iri, class_name, sort_key, private
         )
-        if 'schema_type' not in origin_element.json_object:
+        if (
+            self._adds_schema_type()
+            and 'schema_type' not in origin_element.json_object
+        ):
             origin_element.json_object['schema_type'] = _get_schema_type(
                 class_name,
                 self.schema_model,
             )
         return origin_element
 
+    def generate_results(
+        self,
+        start: int,
+        infos: list[ResultListInfo],
+    ) -> list[RecordInfo]:
+        origin_elements = self.origin_list.generate_results(start, infos)
+        if not self._adds_schema_type():
+            return origin_elements
+        for origin_element in origin_elements:
+            if 'schema_type' not in origin_element.json_object:
+                origin_element.json_object['schema_type'] = _get_schema_type(
+                    origin_element.class_name,
+                    self.schema_model,
+                )
+        return origin_elements
+
 
 class _SchemaTypeLayer(StorageBackend):
     """Proxy backend that removes `schema_type` from stored records"""
@@ -121,33 +170,120 @@ class _SchemaTypeLayer(StorageBackend):
             )
         return origin_result
 
+    def get_records_by_iris(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, RecordInfo]:
+        record_infos = self.backend.get_records_by_iris(iris)
+        for record_info in record_infos.values():
+            if 'schema_type' not in record_info.json_object:
+                record_info.json_object['schema_type'] = _get_schema_type(
+                    record_info.class_name,
+                    self.schema_model,
+                )
+        return record_infos
+
+    def get_content_hash(
+        self,
+        iri: str,
+    ) -> str | None:
+        # The hash of the stored record, i.e., without `schema_type`
+        return self.backend.get_content_hash(iri)
+
+    def get_content_hashes(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, str]:
+        return self.backend.get_content_hashes(iris)
+
     def get_records_of_classes(
         self,
         class_names: list[str],
         pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
     ) -> BackendResultList:
-        return SchemaTypeLayerResultList(
-            origin_list=self.backend.get_records_of_classes(
+        schema_type_filters, other_filters = _split_filters(filters)
+        return self._create_result_list(
+            self.backend.get_records_of_classes(
                 class_names,
                 pattern,
+                other_filters,
             ),
-            schema_model=self.schema_model,
+            schema_type_filters,
         )
 
     def get_all_records(
         self,
         pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
+    ) -> BackendResultList:
+        schema_type_filters, other_filters = _split_filters(filters)
+        return self._create_result_list(
+            self.backend.get_all_records(pattern, other_filters),
+            schema_type_filters,
+        )
+
+    def _create_result_list(
+        self,
+        origin_list: BackendResultList,
+        schema_type_filters: list[Filter],
     ) -> BackendResultList:
+        if schema_type_filters:
+            origin_list.list_info = [
+                info
+                for info in origin_list.list_info
+                if all(
+                    filter_.matches({
+                        'schema_type': _get_schema_type(
+                            info.class_name,
+                            self.schema_model,
+                        ),
+                    })
+                    for filter_ in schema_type_filters
+                )
+            ]
         return SchemaTypeLayerResultList(
-            origin_list=self.backend.get_all_records(pattern),
+            origin_list=origin_list,
             schema_model=self.schema_model,
         )
 
+    def get_pid_infos(
+        self,
+    ) -> Iterator[PidInfo]:
+        # The layer does not modify pids
+        return self.backend.get_pid_infos()
+
+    def get_referrers(
+        self,
+        targets: Iterable[str],
+    ) -> list[ReferenceInfo]:
+        return self.backend.get_referrers(targets)
+
+    def get_changes(
+        self,
+        since: int = 0,
+        limit: int = 1000,
+    ) -> list[ChangeInfo]:
+        return self.backend.get_changes(since, limit)
+
     def __getattr__(self, name: str) -> Any:
         """Delegate all other attributes to the underlying backend."""
         return getattr(self.backend, name)
 
 
+def _split_filters(
+    filters: Iterable[Filter] | None,
+) -> tuple[list[Filter], list[Filter]]:
+    """Split filters into filters on `schema_type` and other filters"""
+    schema_type_filters, other_filters = [], []
+    for filter_ in filters or ():
+        if filter_.slot == 'schema_type':
+            schema_type_filters.append(filter_)
+        else:
+            other_filters.append(filter_)
+    return schema_type_filters, other_filters
+
+
 def _get_schema_type(
     class_name: str,
     schema_module: ModuleType,
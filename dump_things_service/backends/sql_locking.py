@@ -0,0 +1,70 @@
+"""
+Access to SQLite databases from multiple processes
+
+Multiple service processes, or a service process and a command like
+`dump-things-rebuild-index`, might use the same database. SQLite serializes
+writers with file locks. Without further configuration, this leads to
+`database is locked`-errors:
+
+- In the default rollback-journal mode, readers block writers and vice versa.
+- A transaction that starts as reader and then writes cannot wait for other
+  writers, because its snapshot might be outdated. SQLite reports an error
+  immediately, independent of the busy timeout.
+
+`configure_locking` enables write-ahead logging, i.e., readers and the
+writer do not block each other, and sets a busy timeout, i.e., SQLite retries
+to acquire locks with increasing delays. It returns an engine for write
+transactions, which acquire the write lock when they begin (`BEGIN
+IMMEDIATE`). These transactions wait for other writers instead of failing.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+
+__all__ = [
+    'configure_locking',
+]
+
+# Default time in milliseconds that a transaction waits for a lock
+default_busy_timeout = 30_000
+
+
+def configure_locking(
+    engine: Engine,
+    busy_timeout: int = default_busy_timeout,
+) -> Engine:
+    """Configure `engine` for concurrent access from multiple processes
+
+    :param engine: An engine for an SQLite database file.
+    :param busy_timeout: The time in milliseconds that transactions wait for
+        locks.
+    :return: An engine that shares the connection pool of `engine` and
+        begins transactions with the write lock. Use it for all transactions
+        that modify the database.
+    """
+
+    def on_connect(dbapi_connection, _):
+        # Disable the transaction handling of `sqlite3`, transactions are
+        # begun in `on_begin`.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout = {int(busy_timeout)}')
+        cursor.execute('PRAGMA journal_mode = WAL')
+        cursor.close()
+
+    def on_begin(connection):
+        if connection.get_execution_options().get('sqlite_immediate'):
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+        else:
+            connection.exec_driver_sql('BEGIN')
+
+    event.listen(engine, 'connect', on_connect)
+    event.listen(engine, 'begin', on_begin)
+    return engine.execution_options(sqlite_immediate=True)
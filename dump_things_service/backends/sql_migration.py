@@ -0,0 +1,71 @@
+"""
+Schema migration for SQLAlchemy-based databases
+
+`Base.metadata.create_all` creates missing tables, but it does not add
+columns to existing tables. Databases that were created by earlier versions
+of the service lack columns that were added later. `add_missing_columns`
+adds them, and creates the indices of added columns. Added columns must be
+nullable, existing rows get `NULL`-values, which the backends fill in.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    inspect,
+    text,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy import (
+        Engine,
+        MetaData,
+    )
+
+
+__all__ = [
+    'add_missing_columns',
+]
+
+logger = logging.getLogger('dump_things_service')
+
+
+def add_missing_columns(
+    engine: Engine,
+    metadata: MetaData,
+) -> list[str]:
+    """Add columns of the tables in `metadata` that are missing in the database
+
+    Indices of the tables that are missing in the database are created.
+
+    :return: A list of the added columns as `<table>.<column>`.
+    """
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    msg = f'cannot add non-nullable column {table.name}.{column.name}'
+                    raise ValueError(msg)
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                ))
+                logger.info(
+                    'added column %s.%s to %s',
+                    table.name,
+                    column.name,
+                    engine.url,
+                )
+                added.append(f'{table.name}.{column.name}')
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+    return added
@@ -22,24 +22,46 @@ roughly 400 bytes per record
 
 Presumably, 180 bytes + JSON string size per record.
 
+
+Records can be compressed with a zstd-dictionary that is trained on a sample
+of the stored records (see `sqlite_compression.py` and the command
+`dump-things-train-dictionary`). Measured with
+`benchmarks/bench_sqlite_compression.py`, 20.000 records with about 3.300
+characters of JSON text per record, compression level 3, median of four
+runs:
+
+               bytes/record   writes/s   batch reads/s   single reads/s
+uncompressed   4.300          5.500      33.000          2.800
+compressed     900            4.500      23.000          2.500
+
 """
 
 from __future__ import annotations
 
+import json
 import logging
 import shutil
+import time
+from itertools import islice
 from typing import (
     TYPE_CHECKING,
     Any,
 )
 
 from sqlalchemy import (
-    JSON,
+    Index,
+    LargeBinary,
     String,
+    bindparam,
     create_engine,
     delete,
+    event,
+    func,
+    insert,
+    inspect,
     select,
     text,
+    update,
 )
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -47,17 +69,40 @@ from sqlalchemy.orm import (
     Session,
     mapped_column,
 )
+from sqlalchemy.types import UserDefinedType
 
 from dump_things_service.backends import (
     BackendResultList,
+    ChangeInfo,
+    ChangeOperation,
+    PidInfo,
     RecordInfo,
+    ReferenceInfo,
     ResultListInfo,
     StorageBackend,
+    create_content_hash,
     create_sort_key,
+    get_references,
+)
+from dump_things_service.backends import change_log
+from dump_things_service.backends.filters import (
+    Filter,
+    create_json_condition,
+    create_slot_value_condition,
+    create_slot_value_rows,
+)
+from dump_things_service.backends.sql_migration import add_missing_columns
+from dump_things_service.backends.sqlite_compression import (
+    RecordCodec,
+    default_compression_level,
+    get_dictionary_id,
 )
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
     from pathlib import Path
 
 logger = logging.getLogger('dump_things_service')
@@ -65,28 +110,104 @@ logger = logging.getLogger('dump_things_service')
 old_record_file_name = '.sqlite-records.db'
 record_file_name = '__sqlite-records.db'
 
+# Number of IRIs that `add_records_bulk` looks up in a single query
+bulk_lookup_size = 500
+
 
 class Base(DeclarativeBase):
     pass
 
 
+class StoredObject(UserDefinedType):
+    """A JSON-column whose values are not converted by SQLAlchemy
+
+    Values are JSON text or compressed JSON text, `RecordCodec` converts
+    them.
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self, **_):
+        return 'JSON'
+
+
 class Thing(Base):
     __tablename__ = 'thing'
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     iri: Mapped[str] = mapped_column(nullable=False, unique=True, index=True)
     class_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
-    object: Mapped[dict] = mapped_column(JSON, nullable=False)
+    object: Mapped[str | bytes] = mapped_column(StoredObject, nullable=False)
     sort_key: Mapped[str] = mapped_column(nullable=False)
+    # Hash of `object`, `None` in databases that were created before content
+    # hashes were introduced. Those are filled in on first access.
+    content_hash: Mapped[str | None] = mapped_column(nullable=True)
+    # The `pid` of `object`, `None` only while a database that was created
+    # before pids were stored is migrated.
+    pid: Mapped[str | None] = mapped_column(nullable=True, index=True)
+
+
+class Change(change_log.ChangeMixin, Base):
+    pass
+
+
+class SlotValue(Base):
+    """The values of indexed slots, used to evaluate filters"""
+
+    __tablename__ = 'slot_value'
+    __table_args__ = (
+        Index('ix_slot_value_text', 'slot', 'text_value'),
+        Index('ix_slot_value_number', 'slot', 'number_value'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    thing_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    slot: Mapped[str] = mapped_column(nullable=False)
+    text_value: Mapped[str | None] = mapped_column(nullable=True)
+    number_value: Mapped[float | None] = mapped_column(nullable=True)
+
+
+class Reference(Base):
+    """References between records, see `get_references`"""
+
+    __tablename__ = 'reference'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    thing_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    slot: Mapped[str] = mapped_column(nullable=False)
+    target: Mapped[str] = mapped_column(nullable=False, index=True)
+
+
+class IndexedSlot(Base):
+    """The slots whose values are stored in `slot_value`"""
+
+    __tablename__ = 'indexed_slot'
+
+    slot: Mapped[str] = mapped_column(primary_key=True)
+
+
+class CompressionDictionary(Base):
+    __tablename__ = 'compression_dictionary'
+
+    # The id that zstd stores in the dictionary and in every compressed frame
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    level: Mapped[int] = mapped_column(nullable=False)
+    # New records are compressed with the active dictionary, at most one
+    # dictionary is active.
+    active: Mapped[bool] = mapped_column(nullable=False)
+    created: Mapped[float] = mapped_column(nullable=False)
 
 
 class SQLResultList(BackendResultList):
     def __init__(
         self,
         engine: Any,
+        codec: RecordCodec,
     ):
         super().__init__()
         self.engine = engine
+        self.codec = codec
 
     def generate_result(
         self,
@@ -106,15 +227,104 @@ class SQLResultList(BackendResultList):
         :param db_id: The id of the record in the database
         :return: A RecordInfo object.
         """
+        if self.fields is not None:
+            return RecordInfo(
+                iri=iri,
+                class_name=class_name,
+                json_object=self._read_fields([db_id])[db_id],
+                sort_key=sort_key,
+            )
         with Session(self.engine) as session, session.begin():
             thing = session.get(Thing, db_id)
             return RecordInfo(
                 iri=iri,
                 class_name=class_name,
-                json_object=thing.object,
+                json_object=self.codec.decode(thing.object),
                 sort_key=sort_key,
             )
 
+    def generate_results(
+        self,
+        start: int,
+        infos: list[ResultListInfo],
+    ) -> list[RecordInfo]:
+        if self.fields is not None:
+            projections = self._read_fields([info.private for info in infos])
+            return [
+                RecordInfo(
+                    iri=info.iri,
+                    class_name=info.class_name,
+                    json_object=projections[info.private],
+                    sort_key=info.sort_key,
+                )
+                for info in infos
+            ]
+
+        # Read the objects of all elements in a single query
+        objects = {}
+        with Session(self.engine) as session, session.begin():
+            for batch_start in range(0, len(infos), bulk_lookup_size):
+                statement = select(Thing.id, Thing.object).where(
+                    Thing.id.in_([
+                        info.private
+                        for info in infos[batch_start:batch_start + bulk_lookup_size]
+                    ])
+                )
+                objects.update(session.execute(statement).all())
+        return [
+            RecordInfo(
+                iri=info.iri,
+                class_name=info.class_name,
+                json_object=self.codec.decode(objects[info.private]),
+                sort_key=info.sort_key,
+            )
+            for info in infos
+        ]
+
+    def _read_fields(self, db_ids: list[int]) -> dict[int, dict]:
+        # SQLite extracts the selected slots, i.e., only the projections are
+        # converted into Python objects.
+        expression = get_object_expression(self.codec)
+        arguments = ', '.join(
+            f':name_{index}, json_extract({expression}, :path_{index})'
+            for index in range(len(self.fields))
+        )
+        statement = text(
+            f'select thing.id, json_object({arguments}) from thing '
+            'where thing.id in :db_ids'
+        ).bindparams(bindparam('db_ids', expanding=True))
+        parameters = {}
+        for index, field in enumerate(self.fields):
+            parameters[f'name_{index}'] = field
+            parameters[f'path_{index}'] = f'$.{field}'
+
+        projections = {}
+        with self.engine.connect() as connection:
+            for batch_start in range(0, len(db_ids), bulk_lookup_size):
+                rows = connection.execute(
+                    statement,
+                    {
+                        **parameters,
+                        'db_ids': db_ids[batch_start:batch_start + bulk_lookup_size],
+                    },
+                )
+                for db_id, projection in rows:
+                    projections[db_id] = {
+                        key: value
+                        for key, value in json.loads(projection).items()
+                        if value is not None
+                    }
+        return projections
+
+
+def get_object_expression(codec: RecordCodec) -> str:
+    """Get the SQL expression that yields the JSON text of `thing.object`"""
+    # Compressed records are converted into JSON text by a function. The
+    # function is only used if the database contains compressed records.
+    if codec.dictionaries:
+        return 'dump_things_object(thing.object)'
+    return 'thing.object'
+
 
 class _SQLiteBackend(StorageBackend):
     def __init__(
@@ -122,13 +332,119 @@ class _SQLiteBackend(StorageBackend):
         db_path: Path,
         *,
         order_by: Iterable[str] | None = None,
+        indexed_slots: Iterable[str] = (),
         echo: bool = False,
     ) -> None:
         super().__init__(order_by=order_by)
         self.db_path = db_path
+        self.indexed_slots = tuple(indexed_slots)
         self.perform_file_name_conversion()
         self.engine = create_engine('sqlite:///' + str(db_path), echo=echo)
+        event.listen(self.engine, 'connect', self._register_functions)
+        has_references = inspect(self.engine).has_table(Reference.__tablename__)
         Base.metadata.create_all(self.engine)
+        add_missing_columns(self.engine, Base.metadata)
+        self.codec = RecordCodec(self._load_dictionaries)
+        self._create_change_log_if_missing()
+        self._fill_missing_pids()
+        self._update_indexed_slots()
+        if not has_references:
+            self._fill_references()
+
+    def _register_functions(self, dbapi_connection, _):
+        # Pattern searches use `json_tree`, which requires JSON text.
+        dbapi_connection.create_function(
+            'dump_things_object',
+            1,
+            self._object_to_json_text,
+            deterministic=True,
+        )
+
+    def _object_to_json_text(self, stored_object: str | bytes) -> str:
+        return self.codec.to_json_text(stored_object)
+
+    def _load_dictionaries(self) -> list[tuple[bytes, int, bool]]:
+        statement = select(
+            CompressionDictionary.data,
+            CompressionDictionary.level,
+            CompressionDictionary.active,
+        ).order_by(CompressionDictionary.created)
+        with Session(self.engine) as session, session.begin():
+            return session.execute(statement).all()
+
+    def get_compression_dictionary(self) -> tuple[bytes, int] | None:
+        """Get content and compression level of the active dictionary"""
+        statement = select(
+            CompressionDictionary.data,
+            CompressionDictionary.level,
+        ).filter_by(active=True)
+        with Session(self.engine) as session, session.begin():
+            row = session.execute(statement).first()
+            return None if row is None else tuple(row)
+
+    def set_compression_dictionary(
+        self,
+        data: bytes | None,
+        level: int = default_compression_level,
+    ):
+        """Compress new records with the dictionary `data`
+
+        Existing records are not modified, use `recompress_records` to
+        compress them with the new dictionary. If `data` is `None`, new
+        records are not compressed.
+        """
+        with Session(self.engine) as session, session.begin():
+            session.execute(update(CompressionDictionary).values(active=False))
+            if data is not None:
+                dictionary_id = get_dictionary_id(data)
+                dictionary = session.get(CompressionDictionary, dictionary_id)
+                if dictionary is None:
+                    session.add(CompressionDictionary(
+                        id=dictionary_id,
+                        data=data,
+                        level=level,
+                        active=True,
+                        created=time.time(),
+                    ))
+                else:
+                    dictionary.level = level
+                    dictionary.active = True
+        self.codec.reload()
+
+    def sample_records(self, count: int) -> list[bytes]:
+        """Get the JSON text of `count` randomly chosen records"""
+        statement = select(Thing.object).order_by(func.random()).limit(count)
+        with Session(self.engine) as session, session.begin():
+            return [
+                self.codec.to_json_text(stored_object).encode('utf-8')
+                for stored_object in session.scalars(statement)
+            ]
+
+    def recompress_records(self, batch_size: int = 1000) -> int:
+        """Store all records with the active dictionary, or uncompressed
+
+        :return: The number of records whose stored representation changed.
+        """
+        changed, last_id = 0, 0
+        while True:
+            with Session(self.engine) as session, session.begin():
+                rows = session.execute(
+                    select(Thing.id, Thing.object)
+                    .where(Thing.id > last_id)
+                    .order_by(Thing.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    return changed
+                last_id = rows[-1].id
+                updates = []
+                for row in rows:
+                    stored_object = self.codec.encode(self.codec.decode(row.object))
+                    if stored_object != row.object:
+                        updates.append({'id': row.id, 'object': stored_object})
+                if updates:
+                    session.execute(update(Thing), updates)
+                changed += len(updates)
 
     def get_uri(
             self
@@ -169,23 +485,144 @@ class _SQLiteBackend(StorageBackend):
         self,
         record_infos: Iterable[RecordInfo],
     ):
+        record_infos = iter(record_infos)
         with Session(self.engine) as session, session.begin():
-            for record_info in record_infos:
-                self._add_record_with_session(
-                    session=session,
-                    iri=record_info.iri,
-                    class_name=record_info.class_name,
-                    json_object=record_info.json_object,
+            # Look up existing records of a batch in a single query. A query
+            # per record would also flush the session for every record.
+            while batch := list(islice(record_infos, bulk_lookup_size)):
+                existing_records = {
+                    thing.iri: thing
+                    for thing in session.scalars(
+                        select(Thing).where(
+                            Thing.iri.in_([info.iri for info in batch])
+                        )
+                    )
+                }
+                # The last version of each record determines its slot values
+                # and references
+                stored_records = {}
+                for record_info in batch:
+                    existing_records[record_info.iri] = self._store_record_with_session(
+                        session=session,
+                        existing_record=existing_records.get(record_info.iri),
+                        iri=record_info.iri,
+                        class_name=record_info.class_name,
+                        json_object=record_info.json_object,
+                    )
+                    stored_records[record_info.iri] = (
+                        existing_records[record_info.iri],
+                        record_info.json_object,
+                    )
+                self._store_extracted_values_with_session(
+                    session,
+                    list(stored_records.values()),
                 )
 
     def remove_record(
         self,
         iri: str,
     ) -> bool:
-        statement = delete(Thing).where(Thing.iri == iri)
         with Session(self.engine) as session, session.begin():
-            result = session.execute(statement)
-            return result.rowcount == 1
+            row = session.execute(
+                select(Thing.id, Thing.class_name).filter_by(iri=iri)
+            ).first()
+            if row is None:
+                return False
+            thing_id, class_name = row
+            session.execute(delete(Thing).where(Thing.id == thing_id))
+            session.execute(delete(SlotValue).where(SlotValue.thing_id == thing_id))
+            session.execute(delete(Reference).where(Reference.thing_id == thing_id))
+            change_log.add_change(
+                session,
+                Change,
+                iri,
+                class_name,
+                ChangeOperation.remove,
+            )
+            return True
+
+    def get_changes(
+        self,
+        since: int = 0,
+        limit: int = 1000,
+    ) -> list[ChangeInfo]:
+        return change_log.get_changes(self.engine, Change, since, limit)
+
+    def _create_change_log_if_missing(self):
+        # Databases that were created before change logs were introduced, get
+        # a change log that contains all stored records.
+        with Session(self.engine) as session, session.begin():
+            if change_log.is_empty(session, Change):
+                change_log.reset_changes(
+                    session,
+                    Change,
+                    session.execute(
+                        select(Thing.iri, Thing.class_name).order_by(Thing.id)
+                    ).all(),
+                )
+
+    def _fill_missing_pids(self):
+        # Databases that were created before pids were stored get the pids
+        # of all records.
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                f"update thing set pid = json_extract({self._object_expression()}, '$.pid') "
+                'where thing.pid is null'
+            ))
+
+    def _update_indexed_slots(self):
+        # Extract the values of newly configured indexed slots from the
+        # stored records, and remove the values of slots that are no longer
+        # indexed.
+        with Session(self.engine) as session, session.begin():
+            stored_slots = set(session.scalars(select(IndexedSlot.slot)))
+            removed_slots = stored_slots - set(self.indexed_slots)
+            if removed_slots:
+                session.execute(
+                    delete(SlotValue).where(SlotValue.slot.in_(removed_slots))
+                )
+                session.execute(
+                    delete(IndexedSlot).where(IndexedSlot.slot.in_(removed_slots))
+                )
+            for slot in self.indexed_slots:
+                if slot in stored_slots:
+                    continue
+                logger.info('indexing values of slot %s in %s', slot, self.db_path)
+                session.execute(
+                    text(
+                        'insert into slot_value (thing_id, slot, text_value, number_value) '
+                        'select thing.id, :slot, '
+                        "case when e.type = 'text' then e.value end, "
+                        "case when e.type in ('integer', 'real') then e.value end "
+                        f'from thing, json_each({self._object_expression()}, :path) as e '
+                        "where e.type in ('text', 'integer', 'real')"
+                    ),
+                    {'slot': slot, 'path': f'$.{slot}'},
+                )
+                session.add(IndexedSlot(slot=slot))
+
+    def _fill_references(self, batch_size: int = 1000):
+        # Databases that were created before references were stored get the
+        # references of all records.
+        last_id = 0
+        while True:
+            with Session(self.engine) as session, session.begin():
+                rows = session.execute(
+                    select(Thing.id, Thing.object)
+                    .where(Thing.id > last_id)
+                    .order_by(Thing.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    return
+                last_id = rows[-1].id
+                references = [
+                    {'thing_id': row.id, 'slot': slot, 'target': target}
+                    for row in rows
+                    for slot, target in get_references(self.codec.decode(row.object))
+                ]
+                if references:
+                    session.execute(insert(Reference), references)
 
     def _add_record_with_session(
         self,
@@ -194,21 +631,73 @@ class _SQLiteBackend(StorageBackend):
         class_name: str,
         json_object: dict,
     ):
+        thing = self._store_record_with_session(
+            session=session,
+            existing_record=session.query(Thing).filter_by(iri=iri).first(),
+            iri=iri,
+            class_name=class_name,
+            json_object=json_object,
+        )
+        self._store_extracted_values_with_session(session, [(thing, json_object)])
+
+    def _store_record_with_session(
+        self,
+        session: Session,
+        existing_record: Thing | None,
+        iri: str,
+        class_name: str,
+        json_object: dict,
+    ) -> Thing:
         sort_key = create_sort_key(json_object, self.order_by)
-        existing_record = session.query(Thing).filter_by(iri=iri).first()
+        content_hash = create_content_hash(json_object)
         if existing_record:
-            existing_record.class_name = class_name
-            existing_record.object = json_object
-            existing_record.sort_key = sort_key
+            thing = existing_record
+            thing.class_name = class_name
+            thing.object = self.codec.encode(json_object)
+            thing.sort_key = sort_key
+            thing.content_hash = content_hash
+            thing.pid = json_object['pid']
         else:
-            session.add(
-                Thing(
-                    iri=iri,
-                    class_name=class_name,
-                    object=json_object,
-                    sort_key=sort_key,
-                )
+            thing = Thing(
+                iri=iri,
+                class_name=class_name,
+                object=self.codec.encode(json_object),
+                sort_key=sort_key,
+                content_hash=content_hash,
+                pid=json_object['pid'],
             )
+            session.add(thing)
+        change_log.add_change(session, Change, iri, class_name, ChangeOperation.add)
+        return thing
+
+    def _store_extracted_values_with_session(
+        self,
+        session: Session,
+        stored_records: list[tuple[Thing, dict]],
+    ):
+        """Replace indexed slot values and references of the stored records"""
+        # Assign ids to new records, a single flush for all records
+        session.flush()
+        thing_ids = [thing.id for thing, _ in stored_records]
+        session.execute(delete(Reference).where(Reference.thing_id.in_(thing_ids)))
+        references = [
+            {'thing_id': thing.id, 'slot': slot, 'target': target}
+            for thing, json_object in stored_records
+            for slot, target in get_references(json_object)
+        ]
+        if references:
+            session.execute(insert(Reference), references)
+
+        if not self.indexed_slots:
+            return
+        session.execute(delete(SlotValue).where(SlotValue.thing_id.in_(thing_ids)))
+        rows = [
+            {'thing_id': thing.id, **row}
+            for thing, json_object in stored_records
+            for row in create_slot_value_rows(json_object, self.indexed_slots)
+        ]
+        if rows:
+            session.execute(insert(SlotValue), rows)
 
     def get_record_by_iri(
         self,
@@ -221,67 +710,174 @@ class _SQLiteBackend(StorageBackend):
                 return RecordInfo(
                     iri=thing.iri,
                     class_name=thing.class_name,
-                    json_object=thing.object,
+                    json_object=self.codec.decode(thing.object),
                     sort_key=thing.sort_key,
                 )
         return None
 
+    def get_records_by_iris(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, RecordInfo]:
+        iris = list(iris)
+        result = {}
+        with Session(self.engine) as session, session.begin():
+            for batch_start in range(0, len(iris), bulk_lookup_size):
+                statement = select(Thing).where(
+                    Thing.iri.in_(iris[batch_start:batch_start + bulk_lookup_size])
+                )
+                for thing in session.scalars(statement):
+                    result[thing.iri] = RecordInfo(
+                        iri=thing.iri,
+                        class_name=thing.class_name,
+                        json_object=self.codec.decode(thing.object),
+                        sort_key=thing.sort_key,
+                    )
+        return result
+
+    def get_content_hashes(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, str]:
+        iris = list(iris)
+        result = {}
+        with Session(self.engine) as session, session.begin():
+            for batch_start in range(0, len(iris), bulk_lookup_size):
+                statement = select(Thing.iri, Thing.content_hash).where(
+                    Thing.iri.in_(iris[batch_start:batch_start + bulk_lookup_size])
+                )
+                result.update(session.execute(statement).all())
+        # Determine missing hashes of records that were stored before content
+        # hashes were introduced.
+        for iri, content_hash in result.items():
+            if content_hash is None:
+                result[iri] = self.get_content_hash(iri)
+        return result
+
+    def get_content_hash(
+        self,
+        iri: str,
+    ) -> str | None:
+        # Select only the hash column, the JSON object is not read.
+        statement = select(Thing.id, Thing.content_hash).filter_by(iri=iri)
+        with Session(self.engine) as session, session.begin():
+            row = session.execute(statement).first()
+            if row is None:
+                return None
+            if row.content_hash is not None:
+                return row.content_hash
+
+            # The record was stored before content hashes were introduced,
+            # determine the hash once and store it.
+            content_hash = create_content_hash(
+                self.codec.decode(session.get(Thing, row.id).object)
+            )
+            session.execute(
+                update(Thing)
+                .where(Thing.id == row.id)
+                .values(content_hash=content_hash)
+            )
+            return content_hash
+
     def get_records_of_classes(
         self,
         class_names: Iterable[str],
         pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
     ) -> SQLResultList:
-
         class_list = ', '.join(f"'{cn}'" for cn in class_names)
-        if pattern is None:
-            statement = text(
-                'select distinct thing.iri, thing.class_name, thing.sort_key, thing.id '
-                'from thing '
-                f"where thing.class_name in ({class_list}) "
-                "ORDER BY thing.sort_key"
-            )
-        else:
-            statement = text(
-                'select distinct thing.iri, thing.class_name, thing.sort_key, thing.id '
-                'from thing, json_tree(thing.object) '
-                'where lower(json_tree.value) like lower(:pattern) '
-                f"and thing.class_name in ({class_list}) "
-                "and json_tree.type = 'text' ORDER BY thing.sort_key"
-            )
+        return self._get_records(
+            [f'thing.class_name in ({class_list})'],
+            pattern,
+            filters,
+        )
 
+    def get_pid_infos(
+        self,
+    ) -> Iterator[PidInfo]:
+        # Only the columns are read, records are not decoded.
+        statement = select(Thing.iri, Thing.pid, Thing.class_name).order_by(Thing.id)
         with self.engine.connect() as connection:
-            rs = connection.execute(statement, parameters={'pattern': pattern})
-            return SQLResultList(self.engine).add_info(
-                ResultListInfo(
-                    iri=thing.iri,
-                    class_name=thing.class_name,
-                    sort_key=thing.sort_key,
-                    private=thing.id,
-                )
-                for thing in rs
+            for row in connection.execution_options(yield_per=1000).execute(statement):
+                yield PidInfo(*row)
+
+    def get_referrers(
+        self,
+        targets: Iterable[str],
+    ) -> list[ReferenceInfo]:
+        # Only the index of the reference table is used, records are not
+        # decoded.
+        statement = (
+            select(
+                Thing.iri,
+                Thing.pid,
+                Thing.class_name,
+                Reference.slot,
+                Reference.target,
             )
+            .join(Reference, Reference.thing_id == Thing.id)
+            .where(Reference.target.in_(list(targets)))
+            .order_by(Thing.sort_key, Thing.id)
+        )
+        with self.engine.connect() as connection:
+            return [ReferenceInfo(*row) for row in connection.execute(statement)]
+
+    def _object_expression(self) -> str:
+        return get_object_expression(self.codec)
 
     def get_all_records(
         self,
         pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
     ) -> SQLResultList:
-        if pattern is None:
-            statement = text(
-                'select distinct thing.iri, thing.class_name, thing.sort_key, thing.id '
-                'from thing '
-                "ORDER BY thing.sort_key"
-            )
-        else:
-            statement = text(
-                'select distinct thing.iri, thing.class_name, thing.sort_key, thing.id '
-                'from thing, json_tree(thing.object) '
-                'where lower(json_tree.value) like lower(:pattern) '
-                "and json_tree.type = 'text' ORDER BY thing.sort_key"
-            )
+        return self._get_records([], pattern, filters)
+
+    def _get_records(
+        self,
+        conditions: list[str],
+        pattern: str | None,
+        filters: Iterable[Filter] | None,
+    ) -> SQLResultList:
+        tables = 'thing'
+        parameters = {}
+        if pattern is not None:
+            tables += f', json_tree({self._object_expression()})'
+            conditions = [
+                'lower(json_tree.value) like lower(:pattern)',
+                "json_tree.type = 'text'",
+                *conditions,
+            ]
+            parameters['pattern'] = pattern
+        for index, filter_ in enumerate(filters or ()):
+            # Filters on indexed slots use the indices of `slot_value`, all
+            # other filters are evaluated on the JSON text of the records.
+            if filter_.slot in self.indexed_slots:
+                condition, filter_parameters = create_slot_value_condition(
+                    filter_,
+                    'thing.id',
+                    'slot_value',
+                    'thing_id',
+                    f'filter_{index}',
+                )
+            else:
+                condition, filter_parameters = create_json_condition(
+                    filter_,
+                    self._object_expression(),
+                    f'filter_{index}',
+                )
+            conditions.append(condition)
+            parameters.update(filter_parameters)
+
+        where_clause = f'where {" and ".join(conditions)} ' if conditions else ''
+        statement = text(
+            'select distinct thing.iri, thing.class_name, thing.sort_key, thing.id '
+            f'from {tables} {where_clause}'
+            'ORDER BY thing.sort_key'
+        )
 
         with self.engine.connect() as connection:
-            rs = connection.execute(statement, parameters={'pattern': pattern})
-            return SQLResultList(self.engine).add_info(
+            rs = connection.execute(statement, parameters=parameters)
+            return SQLResultList(self.engine, self.codec).add_info(
                 ResultListInfo(
                     iri=thing.iri,
                     class_name=thing.class_name,
@@ -297,13 +893,18 @@ _existing_sqlite_backends = {}
 
 
 def SQLiteBackend(  # noqa: N802
-    db_path: Path, *, order_by: Iterable[str] | None = None, echo: bool = False
+    db_path: Path,
+    *,
+    order_by: Iterable[str] | None = None,
+    indexed_slots: Iterable[str] = (),
+    echo: bool = False,
 ) -> _SQLiteBackend:
     existing_backend = _existing_sqlite_backends.get(db_path)
     if not existing_backend:
         existing_backend = _SQLiteBackend(
             db_path=db_path,
             order_by=order_by,
+            indexed_slots=indexed_slots,
             echo=echo,
         )
         _existing_sqlite_backends[db_path] = existing_backend
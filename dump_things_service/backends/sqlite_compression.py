@@ -0,0 +1,142 @@
+"""
+Record compression for the SQLite backend
+
+Records are stored as JSON text in the `object`-column. If a compression
+dictionary is active, records are stored as zstd frames that are compressed
+with the dictionary. Records of a collection share keys, prefixes, and
+values, a dictionary that is trained on a sample of the records allows to
+compress even small records efficiently.
+
+Compressed and uncompressed records can be mixed: `str`-values are JSON
+text, `bytes`-values are zstd frames. Every frame contains the id of its
+dictionary. Dictionaries are never removed from a database, i.e., records
+remain readable after a new dictionary was activated.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+)
+
+from dump_things_service.compression import get_zstd_module
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+__all__ = [
+    'RecordCodec',
+    'get_dictionary_id',
+    'train_dictionary',
+]
+
+
+# Default size of trained dictionaries, the default of the zstd-CLI.
+default_dictionary_size = 112640
+default_compression_level = 3
+
+
+class RecordCodec:
+    """Convert JSON objects to and from their stored representation
+
+    :param load_dictionaries: A callable that returns `(data, level,
+        active)`-tuples of all dictionaries of the database. It is called
+        on creation and whenever a frame refers to an unknown dictionary,
+        e.g., because another process activated a new dictionary.
+    """
+
+    def __init__(
+        self,
+        load_dictionaries: Callable[[], Iterable[tuple[bytes, int, bool]]],
+    ):
+        self.load_dictionaries = load_dictionaries
+        self.lock = threading.Lock()
+        self.dictionaries = {}
+        self.compressor = None
+        self.reload()
+
+    def reload(self):
+        with self.lock:
+            dictionary_infos = list(self.load_dictionaries())
+            if not dictionary_infos:
+                self.dictionaries, self.compressor = {}, None
+                return
+
+            zstd = get_zstd_module()
+            dictionaries, compressor = {}, None
+            for data, level, active in dictionary_infos:
+                zstd_dict = zstd.ZstdDict(data)
+                dictionaries[zstd_dict.dict_id] = zstd_dict
+                if active:
+                    compressor = zstd.ZstdCompressor(
+                        level=level,
+                        zstd_dict=zstd_dict,
+                    )
+            self.dictionaries, self.compressor = dictionaries, compressor
+
+    def encode(
+        self,
+        json_object: dict,
+    ) -> str | bytes:
+        json_text = json.dumps(json_object)
+        compressor = self.compressor
+        if compressor is None:
+            return json_text
+
+        data = json_text.encode('utf-8')
+        frame = compressor.compress(data, mode=compressor.FLUSH_FRAME)
+        # Keep records that do not benefit from compression as JSON text
+        return frame if len(frame) < len(data) else json_text
+
+    def decode(
+        self,
+        stored_object: str | bytes,
+    ) -> dict:
+        if isinstance(stored_object, bytes):
+            stored_object = self._decompress(stored_object)
+        return json.loads(stored_object)
+
+    def to_json_text(
+        self,
+        stored_object: str | bytes,
+    ) -> str:
+        """Get the JSON text of a stored object, used as SQL-function"""
+        if isinstance(stored_object, bytes):
+            return self._decompress(stored_object).decode('utf-8')
+        return stored_object
+
+    def _decompress(
+        self,
+        frame: bytes,
+    ) -> bytes:
+        zstd = get_zstd_module()
+        dictionary_id = zstd.get_frame_info(frame).dictionary_id
+        zstd_dict = self.dictionaries.get(dictionary_id)
+        if zstd_dict is None:
+            self.reload()
+            zstd_dict = self.dictionaries.get(dictionary_id)
+            if zstd_dict is None:
+                msg = f'unknown compression dictionary: {dictionary_id}'
+                raise ValueError(msg)
+        return zstd.decompress(frame, zstd_dict=zstd_dict.as_digested_dict)
+
+
+def train_dictionary(
+    samples: list[bytes],
+    size: int = default_dictionary_size,
+) -> bytes:
+    """Train a zstd-dictionary on `samples`, return its content"""
+    zstd = get_zstd_module()
+    try:
+        return zstd.train_dict(samples, size).dict_content
+    except zstd.ZstdError as e:
+        msg = f'cannot train a dictionary on {len(samples)} samples: {e}'
+        raise ValueError(msg) from e
+
+
+def get_dictionary_id(data: bytes) -> int:
+    return get_zstd_module().ZstdDict(data).dict_id
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+from dump_things_service.backends.filters import (
+    Filter,
+    FilterOperator,
+    parse_filter,
+)
+
+
+@pytest.mark.parametrize(
+    ('text', 'expected'),
+    (
+        ('given_name:eq:Alice', Filter('given_name', FilterOperator.eq, 'Alice')),
+        ('age:ge:42', Filter('age', FilterOperator.ge, 42)),
+        ('age:lt:1.5', Filter('age', FilterOperator.lt, 1.5)),
+        ('age:eq:"42"', Filter('age', FilterOperator.eq, '42')),
+        ('pid:eq:abc:1', Filter('pid', FilterOperator.eq, 'abc:1')),
+        ('pid:contains:42', Filter('pid', FilterOperator.contains, '42')),
+        ('given_name:ne:', Filter('given_name', FilterOperator.ne, '')),
+    ),
+)
+def test_parse_filter(text, expected):
+    assert parse_filter(text) == expected
+
+
+@pytest.mark.parametrize(
+    'text',
+    ('given_name', 'given_name:eq', 'given-name:eq:x', 'given_name:like:x'),
+)
+def test_parse_invalid_filter(text):
+    with pytest.raises(ValueError):
+        parse_filter(text)
+
+
+@pytest.mark.parametrize(
+    ('text', 'matches'),
+    (
+        ('given_name:eq:Alice', True),
+        ('given_name:ne:Alice', False),
+        ('given_name:contains:lic', True),
+        ('age:gt:41', True),
+        ('age:gt:42', False),
+        # Numbers are not compared to text and vice versa
+        ('age:eq:"42"', False),
+        ('pid:eq:1', False),
+        # Values of multivalued slots and inlined dictionaries
+        ('tags:eq:b', True),
+        ('tags:ne:b', False),
+        ('annotations:eq:x', True),
+        # Records without values
+        ('family_name:eq:x', False),
+        ('family_name:ne:x', True),
+    ),
+)
+def test_filter_matches(text, matches):
+    json_object = {
+        'pid': '1',
+        'given_name': 'Alice',
+        'age': 42,
+        'tags': ['a', 'b'],
+        'annotations': {'abc:tag': 'x'},
+    }
+    assert parse_filter(text).matches(json_object) is matches
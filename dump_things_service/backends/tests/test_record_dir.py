@@ -1,8 +1,41 @@
 from __future__ import annotations
 
+import os
+import sqlite3
+import time
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from multiprocessing import get_context
 from pathlib import Path
 
-from dump_things_service.backends.record_dir import _RecordDirStore
+import pytest
+
+from dump_things_service.backends import (
+    ChangeOperation,
+    ReferenceInfo,
+    create_content_hash,
+    record_dir,
+)
+from dump_things_service.backends.filters import parse_filter
+from dump_things_service.backends.record_dir import (
+    Durability,
+    _RecordDirStore,
+)
+from dump_things_service.backends.record_dir_index import (
+    RecordDirIndex,
+    index_file_name,
+)
+from dump_things_service.backends.record_dir_watcher import (
+    RecordDirWatcher,
+    WatchMode,
+)
+from dump_things_service.backends.tests.test_sqlite import (
+    filter_cases,
+    filter_records,
+)
+from dump_things_service.config import get_mapping_function_by_name
 
 # Path to a local simple test schema
 schema_path = Path(__file__).parent.parent.parent / 'tests' / 'testschema.yaml'
@@ -33,3 +66,654 @@ def test_add_and_delete_record(tmp_path):
 
     record = record_dir_store.get_record_by_iri(iri=iri)
     assert record is None
+
+
+@pytest.mark.parametrize('durability', list(Durability))
+def test_durability_modes(tmp_path, durability):
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+        durability=durability,
+    )
+    record_dir_store.build_index(str(schema_path))
+
+    for i in range(3):
+        record_dir_store.add_record(
+            iri=f'abc:{i}',
+            class_name='Object',
+            json_object={'pid': f'pid-{i}'},
+        )
+    if record_dir_store.group_committer:
+        assert record_dir_store.group_committer.group.directories == set()
+
+    assert len(record_dir_store.get_all_records()) == 3
+    assert list(tmp_path.rglob('*.tmp')) == []
+
+
+def test_group_commit_waits_for_sync(tmp_path, monkeypatch):
+    synced_paths = []
+
+    def fsync_path(path):
+        time.sleep(0.01)
+        synced_paths.append(path)
+
+    monkeypatch.setattr(record_dir, '_fsync_path', fsync_path)
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+        durability=Durability.group,
+    )
+    record_dir_store.build_index(str(schema_path))
+
+    def write(i):
+        record_dir_store.add_record(
+            iri=f'abc:{i}',
+            class_name='Object',
+            json_object={'pid': f'pid-{i}'},
+        )
+        # The directory of the record is synced when the write returns
+        assert tmp_path / 'Object' in synced_paths
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(write, range(32)))
+
+    # Concurrent writes share the synchronization of their directory
+    assert synced_paths.count(tmp_path / 'Object') < 32
+
+
+@pytest.mark.parametrize('durability', list(Durability))
+def test_sync_before_rename(tmp_path, monkeypatch, durability):
+    events = []
+    fsync = os.fsync
+    replace = Path.replace
+
+    def record_fsync(fd):
+        events.append('fsync')
+        fsync(fd)
+
+    def record_replace(self, target):
+        events.append('replace')
+        return replace(self, target)
+
+    def fsync_path(path):
+        events.append(path)
+
+    monkeypatch.setattr(record_dir.os, 'fsync', record_fsync)
+    monkeypatch.setattr(Path, 'replace', record_replace)
+    monkeypatch.setattr(record_dir, '_fsync_path', fsync_path)
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'a/b/{pid}.{suffix}',
+        suffix='yaml',
+        durability=durability,
+    )
+    record_dir_store.add_record(
+        iri='abc:1',
+        class_name='Object',
+        json_object={'pid': 'pid-1'},
+    )
+    if durability == Durability.none:
+        assert events == ['replace']
+        return
+
+    # The record file is synced before it replaces an existing record, the
+    # record directory and the parents of new directories are synced
+    # afterwards.
+    assert events[:2] == ['fsync', 'replace']
+    assert set(events[2:]) == {
+        tmp_path,
+        tmp_path / 'Object',
+        tmp_path / 'Object' / 'a',
+        tmp_path / 'Object' / 'a' / 'b',
+    }
+
+    # Existing directories are not synced again
+    events.clear()
+    record_dir_store.add_record(
+        iri='abc:2',
+        class_name='Object',
+        json_object={'pid': 'pid-2'},
+    )
+    assert events == ['fsync', 'replace', tmp_path / 'Object' / 'a' / 'b']
+
+
+def test_group_commit_error(tmp_path, monkeypatch):
+    def fsync_path(path):
+        msg = 'device failure'
+        raise OSError(msg)
+
+    monkeypatch.setattr(record_dir, '_fsync_path', fsync_path)
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+        durability=Durability.group,
+    )
+    record_dir_store.build_index(str(schema_path))
+    with pytest.raises(OSError, match='device failure'):
+        record_dir_store.add_record(
+            iri='abc:1',
+            class_name='Object',
+            json_object={'pid': 'pid-1'},
+        )
+
+
+def test_failed_write_keeps_existing_record(tmp_path, monkeypatch):
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+    )
+    record_dir_store.build_index(str(schema_path))
+    record_dir_store.add_record(
+        iri='abc:1',
+        class_name='Object',
+        json_object={'pid': 'pid-1', 'description': 'old'},
+    )
+
+    def fail(*_):
+        raise OSError('simulated failure')
+
+    monkeypatch.setattr(Path, 'replace', fail)
+    with pytest.raises(OSError, match='simulated failure'):
+        record_dir_store.add_record(
+            iri='abc:1',
+            class_name='Object',
+            json_object={'pid': 'pid-1', 'description': 'new'},
+        )
+    monkeypatch.undo()
+
+    record_info = record_dir_store.get_record_by_iri('abc:1')
+    assert record_info.json_object['description'] == 'old'
+    assert list(tmp_path.rglob('*.tmp')) == []
+
+
+def test_content_hash_from_index(tmp_path):
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+    )
+    record_dir_store.build_index(str(schema_path))
+
+    assert record_dir_store.get_content_hash('pid-1') is None
+
+    record_dir_store.add_record(
+        iri='pid-1',
+        class_name='Object',
+        json_object={'pid': 'pid-1', 'description': 'first'},
+    )
+    first_hash = record_dir_store.get_content_hash('pid-1')
+    assert first_hash == create_content_hash(
+        {'description': 'first', 'pid': 'pid-1'}
+    )
+
+    # The hash is read from the index, the record file is not accessed
+    (tmp_path / 'Object' / 'pid-1.yaml').unlink()
+    assert record_dir_store.get_content_hash('pid-1') == first_hash
+
+    record_dir_store.add_record(
+        iri='pid-1',
+        class_name='Object',
+        json_object={'pid': 'pid-1', 'description': 'second'},
+    )
+    assert record_dir_store.get_content_hash('pid-1') != first_hash
+
+    # Rebuilding the index yields the same hash
+    second_hash = record_dir_store.get_content_hash('pid-1')
+    record_dir_store.build_index(str(schema_path))
+    assert record_dir_store.get_content_hash('pid-1') == second_hash
+
+
+def test_content_hash_migration(tmp_path):
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+    )
+    record_dir_store.build_index(str(schema_path))
+    record_dir_store.add_record(
+        iri='abc:1',
+        class_name='Object',
+        json_object={'pid': 'pid-1'},
+    )
+    expected_hash = record_dir_store.get_content_hash('abc:1')
+
+    # Simulate an index that was created before content hashes existed
+    index_path = tmp_path / index_file_name
+    with sqlite3.connect(index_path) as connection:
+        connection.execute('ALTER TABLE index_entry DROP COLUMN content_hash')
+    connection.close()
+
+    index = RecordDirIndex(tmp_path, 'yaml')
+    with sqlite3.connect(index_path) as connection:
+        assert connection.execute(
+            'SELECT content_hash FROM index_entry'
+        ).fetchall() == [(None,)]
+    connection.close()
+
+    record_dir_store.index = index
+    assert record_dir_store.get_content_hash('abc:1') == expected_hash
+    assert index.get_content_hash_for_iri('abc:1')[0] == expected_hash
+
+
+def test_change_log(tmp_path):
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+    )
+    record_dir_store.build_index(str(schema_path))
+    reset_seq = record_dir_store.get_changes()[-1].seq
+
+    for i in range(3):
+        record_dir_store.add_record(
+            iri=f'pid-{i}',
+            class_name='Object',
+            json_object={'pid': f'pid-{i}'},
+        )
+    record_dir_store.remove_record('pid-1')
+
+    changes = record_dir_store.get_changes(since=reset_seq)
+    assert [(c.iri, c.operation) for c in changes] == [
+        ('pid-0', ChangeOperation.add),
+        ('pid-1', ChangeOperation.add),
+        ('pid-2', ChangeOperation.add),
+        ('pid-1', ChangeOperation.remove),
+    ]
+    assert [c.seq for c in changes] == sorted(c.seq for c in changes)
+    assert record_dir_store.get_changes(since=changes[1].seq, limit=1) == [changes[2]]
+
+    # A rebuild resets the change log and lists all existing records
+    record_dir_store.build_index(str(schema_path))
+    changes = record_dir_store.get_changes(since=changes[-1].seq)
+    assert changes[0].operation == ChangeOperation.reset
+    assert sorted((c.iri, c.operation) for c in changes[1:]) == [
+        ('pid-0', ChangeOperation.add),
+        ('pid-2', ChangeOperation.add),
+    ]
+
+
+def test_pid_infos(tmp_path):
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+    )
+    record_dir_store.build_index(str(schema_path))
+    for i in range(3):
+        record_dir_store.add_record(
+            iri=f'pid-{i}',
+            class_name='Object',
+            json_object={'pid': f'pid-{i}'},
+        )
+    expected = [(f'pid-{i}', f'pid-{i}', 'Object') for i in range(3)]
+    assert list(record_dir_store.get_pid_infos()) == expected
+
+    # Rebuilding the index yields the same pids
+    record_dir_store.build_index(str(schema_path))
+    assert sorted(record_dir_store.get_pid_infos()) == expected
+
+    # Simulate an index that was created before pids were indexed
+    index_path = tmp_path / index_file_name
+    with sqlite3.connect(index_path) as connection:
+        connection.execute('DROP INDEX ix_index_entry_pid')
+        connection.execute('ALTER TABLE index_entry DROP COLUMN pid')
+    connection.close()
+
+    record_dir_store.index = RecordDirIndex(tmp_path, 'yaml')
+    assert record_dir_store.index.get_paths_without_pid() != []
+    assert sorted(record_dir_store.get_pid_infos()) == expected
+    assert record_dir_store.index.get_paths_without_pid() == []
+    with sqlite3.connect(index_path) as connection:
+        assert connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND name = 'ix_index_entry_pid'"
+        ).fetchall() == [('ix_index_entry_pid',)]
+    connection.close()
+
+
+def test_summary_fields(tmp_path):
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+        summary_fields=['given_name'],
+    )
+    record_dir_store.build_index(str(schema_path))
+    for i in range(3):
+        record_dir_store.add_record(
+            iri=f'pid-{i}',
+            class_name='Object',
+            json_object={'pid': f'pid-{i}', 'given_name': f'Name {i}', 'age': i},
+        )
+
+    # Selections that are covered by the summary are read from the index
+    (tmp_path / 'Object' / 'pid-1.yaml').unlink()
+    result_list = record_dir_store.get_all_records().select_fields(['pid', 'given_name'])
+    assert [record.json_object for record in result_list] == [
+        {'pid': f'pid-{i}', 'given_name': f'Name {i}'} for i in range(3)
+    ]
+    assert [
+        record.json_object
+        for record in result_list.generate_elements(0, result_list.list_info)
+    ] == [{'pid': f'pid-{i}', 'given_name': f'Name {i}'} for i in range(3)]
+
+    # Other selections read the record files
+    result_list = record_dir_store.get_all_records().select_fields(['pid', 'age'])
+    assert result_list[0].json_object == {'pid': 'pid-0', 'age': 0}
+    with pytest.raises(FileNotFoundError):
+        result_list.generate_elements(0, result_list.list_info)
+
+
+@pytest.mark.parametrize('indexed_slots', ((), ('given_name', 'age', 'tags')))
+@pytest.mark.parametrize(('filters', 'pids'), filter_cases)
+def test_filters(tmp_path, indexed_slots, filters, pids):
+    record_dir_store = _RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+        indexed_slots=indexed_slots,
+    )
+    record_dir_store.build_index(str(schema_path))
+    for record in filter_records:
+        record_dir_store.add_record(record['pid'], 'Person', record)
+
+    filters = [parse_filter(text) for text in filters]
+    result_list = record_dir_store.get_all_records(filters=filters)
+    assert [info.iri for info in result_list.list_info] == pids
+    result_list = record_dir_store.get_records_of_classes(['Person'], filters=filters)
+    assert [info.iri for info in result_list.list_info] == pids
+
+
+def test_indexed_slots(tmp_path):
+    def create_store(indexed_slots):
+        return _RecordDirStore(
+            root=tmp_path,
+            pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+            suffix='yaml',
+            indexed_slots=indexed_slots,
+        )
+
+    def get_pids(store, text):
+        result_list = store.get_all_records(filters=[parse_filter(text)])
+        return [info.iri for info in result_list.list_info]
+
+    record_dir_store = create_store(())
+    record_dir_store.build_index(str(schema_path))
+    for record in filter_records:
+        record_dir_store.add_record(record['pid'], 'Person', record)
+
+    # Values of newly indexed slots are read from the record files
+    record_dir_store = create_store(['tags'])
+    record_dir_store.add_record('pid-0', 'Person', {'pid': 'pid-0', 'tags': ['c']})
+    record_dir_store.remove_record('pid-1')
+    (tmp_path / 'Person' / 'pid-3.yaml').unlink()
+    # Filters on indexed slots do not read record files
+    assert get_pids(record_dir_store, 'tags:eq:c') == ['pid-0', 'pid-3']
+    assert get_pids(record_dir_store, 'tags:eq:b') == []
+
+    # A rebuilt index contains the values of indexed slots
+    record_dir_store.build_index(str(schema_path))
+    assert get_pids(record_dir_store, 'tags:ne:c') == ['pid-2']
+
+
+def test_referrers(tmp_path):
+    def create_store():
+        return _RecordDirStore(
+            root=tmp_path,
+            pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+            suffix='yaml',
+        )
+
+    record_dir_store = create_store()
+    record_dir_store.build_index(str(schema_path))
+    record_dir_store.add_record('pid-0', 'Person', {'pid': 'pid-0', 'relations': {
+        'pid-1': {'pid': 'pid-1'},
+        'pid-2': {'pid': 'pid-2'},
+    }})
+    record_dir_store.add_record('pid-1', 'Person', {'pid': 'pid-1', 'relations': {
+        'pid-2': {'pid': 'pid-2'},
+    }})
+    record_dir_store.add_record('pid-2', 'Person', {'pid': 'pid-2'})
+
+    expected = [
+        ReferenceInfo('pid-0', 'pid-0', 'Person', 'relations', 'pid-2'),
+        ReferenceInfo('pid-1', 'pid-1', 'Person', 'relations', 'pid-2'),
+    ]
+    assert record_dir_store.get_referrers(['pid-2']) == expected
+    records = record_dir_store.get_records_by_iris(['pid-1', 'pid-3'])
+    assert records.keys() == {'pid-1'}
+    assert records['pid-1'].json_object['relations'] == {'pid-2': {'pid': 'pid-2'}}
+
+    # Rebuilt indices and indices that were created before references were
+    # indexed contain all references.
+    record_dir_store.build_index(str(schema_path))
+    assert record_dir_store.get_referrers(['pid-2']) == expected
+    record_dir_store.index.engine.dispose()
+    with sqlite3.connect(tmp_path / index_file_name) as connection:
+        connection.execute('DROP TABLE reference')
+    connection.close()
+    record_dir_store = create_store()
+    assert record_dir_store.get_referrers(['pid-2']) == expected
+
+    # Replaced records replace their references, removed records remove them
+    record_dir_store.add_record('pid-0', 'Person', {'pid': 'pid-0'})
+    record_dir_store.remove_record('pid-1')
+    assert record_dir_store.get_referrers(['pid-1', 'pid-2']) == []
+
+
+def _create_store(root: Path) -> _RecordDirStore:
+    return _RecordDirStore(
+        root=root,
+        pid_mapping_function=get_mapping_function_by_name('digest-md5'),
+        suffix='yaml',
+    )
+
+
+def _add_person(store: _RecordDirStore, name: str):
+    store.add_record(
+        iri=f'http://example.org/person-schema/abc/{name}',
+        class_name='Person',
+        json_object={'pid': f'abc:{name}'},
+    )
+
+
+def test_rebuild_keeps_concurrent_modifications(tmp_path, monkeypatch):
+    store = _create_store(tmp_path)
+    store.build_index(str(schema_path))
+    for name in ('a', 'b'):
+        _add_person(store, name)
+
+    # Another process modifies the store while the rebuild reads the files
+    other_store = _create_store(tmp_path)
+    get_class_name = RecordDirIndex._get_class_name
+
+    def modify_store(self, path):
+        if not (tmp_path / 'Person' / 'modified').exists():
+            (tmp_path / 'Person' / 'modified').touch()
+            _add_person(other_store, 'c')
+            other_store.remove_record('http://example.org/person-schema/abc/a')
+        return get_class_name(self, path)
+
+    monkeypatch.setattr(RecordDirIndex, '_get_class_name', modify_store)
+    store.build_index(str(schema_path))
+    assert sorted(info.pid for info in store.get_pid_infos()) == ['abc:b', 'abc:c']
+    changes = store.get_changes()
+    assert changes[0].operation == ChangeOperation.reset
+    assert sorted(change.iri for change in changes[1:]) == [
+        'http://example.org/person-schema/abc/b',
+        'http://example.org/person-schema/abc/c',
+    ]
+
+
+def test_rebuild_with_yaml_values(tmp_path):
+    store = _create_store(tmp_path)
+    (tmp_path / 'Person').mkdir()
+    # Unquoted dates and timestamps are loaded as `date` and `datetime`
+    (tmp_path / 'Person' / 'dated.yaml').write_text(
+        'pid: abc:dated\ngiven_name: 2024-01-01\ndescription: 2024-01-01 12:00:00\n'
+    )
+    (tmp_path / 'Person' / 'no-pid.yaml').write_text('given_name: Alice\n')
+    (tmp_path / 'Person' / 'invalid.yaml').write_text('pid: [abc:invalid\n')
+    store.build_index(str(schema_path))
+
+    # Invalid records are skipped, valid records are indexed
+    assert [info.pid for info in store.get_pid_infos()] == ['abc:dated']
+    assert store.get_content_hash(
+        'http://example.org/person-schema/abc/dated'
+    ) == create_content_hash({
+        'pid': 'abc:dated',
+        'given_name': '2024-01-01',
+        'description': '2024-01-01 12:00:00',
+    })
+
+
+def _write_records(root: str, writer: int, count: int):
+    store = _create_store(Path(root))
+    for index in range(count):
+        _add_person(store, f'{writer}-{index}')
+    for index in range(0, count, 3):
+        store.remove_record(f'http://example.org/person-schema/abc/{writer}-{index}')
+
+
+def _rebuild_index(root: str, count: int):
+    index = RecordDirIndex(Path(root), 'yaml')
+    for _ in range(count):
+        index.rebuild_index(str(schema_path))
+
+
+def test_concurrent_writers(tmp_path):
+    _create_store(tmp_path).build_index(str(schema_path))
+
+    writers, count = 4, 30
+    with ProcessPoolExecutor(
+        max_workers=writers + 1,
+        mp_context=get_context('spawn'),
+    ) as executor:
+        futures = [
+            executor.submit(_write_records, str(tmp_path), writer, count)
+            for writer in range(writers)
+        ]
+        futures.append(executor.submit(_rebuild_index, str(tmp_path), 3))
+        for future in futures:
+            future.result()
+
+    expected = sorted(
+        f'abc:{writer}-{index}'
+        for writer in range(writers)
+        for index in range(count)
+        if index % 3
+    )
+    store = _create_store(tmp_path)
+    assert sorted(info.pid for info in store.get_pid_infos()) == expected
+    assert sorted(
+        record_info.json_object['pid'] for record_info in store.get_all_records()
+    ) == expected
+
+
+def test_update_paths(tmp_path):
+    store = _create_store(tmp_path)
+    store.build_index(str(schema_path))
+    for name in ('a', 'b', 'c'):
+        _add_person(store, name)
+    paths = {
+        info.pid: Path(store.index.get_info_for_iri(info.iri)[1])
+        for info in store.get_pid_infos()
+    }
+    last_seq = store.get_changes()[-1].seq
+
+    # Files that were written by the store are not updated
+    assert store.index.update_paths(str(schema_path), paths.values()) == 0
+    assert store.get_changes(since=last_seq) == []
+
+    # Modify, re-identify, and delete files, add a new file, and a file
+    # that is not a record file.
+    paths['abc:a'].write_text('pid: abc:a\ngiven_name: Alice\n')
+    paths['abc:b'].write_text('pid: abc:d\n')
+    paths['abc:c'].unlink()
+    new_path = tmp_path / 'Person' / 'external.yaml'
+    new_path.write_text('pid: abc:e\n')
+    ignored_path = tmp_path / 'Person' / 'external.yaml.tmp'
+    ignored_path.write_text('pid: abc:f\n')
+
+    assert store.index.update_paths(
+        str(schema_path),
+        [*paths.values(), new_path, ignored_path],
+    ) == 5
+    assert sorted(info.pid for info in store.get_pid_infos()) == [
+        'abc:a', 'abc:d', 'abc:e',
+    ]
+    record = store.get_record_by_iri('http://example.org/person-schema/abc/a')
+    assert record.json_object['given_name'] == 'Alice'
+    assert sorted(
+        (change.iri.rsplit('/', 1)[-1], change.operation)
+        for change in store.get_changes(since=last_seq)
+    ) == [
+        ('a', ChangeOperation.add),
+        ('b', ChangeOperation.remove),
+        ('c', ChangeOperation.remove),
+        ('d', ChangeOperation.add),
+        ('e', ChangeOperation.add),
+    ]
+
+
+def test_update_paths_skips_failing_files(tmp_path, monkeypatch):
+    store = _create_store(tmp_path)
+    store.build_index(str(schema_path))
+    (tmp_path / 'Person').mkdir()
+    paths = [
+        tmp_path / 'Person' / f'{name}.yaml'
+        for name in ('a', 'b', 'c')
+    ]
+    for path in paths:
+        path.write_text(f'pid: abc:{path.stem}\ngiven_name: 2024-01-01\n')
+
+    add_iri_info_with_session = RecordDirIndex.add_iri_info_with_session
+
+    def fail_for_b(self, session, iri, **kwargs):
+        add_iri_info_with_session(self, session, iri, **kwargs)
+        if iri.endswith('/b'):
+            msg = 'cannot index b'
+            raise RuntimeError(msg)
+
+    monkeypatch.setattr(RecordDirIndex, 'add_iri_info_with_session', fail_for_b)
+
+    # The partial update of the failing file is rolled back, the updates of
+    # the other files are kept.
+    assert store.index.update_paths(str(schema_path), paths) == 2
+    assert sorted(info.pid for info in store.get_pid_infos()) == [
+        'abc:a', 'abc:c',
+    ]
+
+
+def _wait_for_pids(store: _RecordDirStore, pids: list[str]):
+    deadline = time.monotonic() + 10
+    while sorted(info.pid for info in store.get_pid_infos()) != pids:
+        assert time.monotonic() < deadline, 'index was not updated'
+        time.sleep(0.05)
+
+
+@pytest.mark.parametrize('mode', (WatchMode.notify, WatchMode.poll))
+def test_watcher(tmp_path, mode):
+    store = _create_store(tmp_path)
+    store.build_index(str(schema_path))
+    _add_person(store, 'a')
+
+    watcher = RecordDirWatcher(store, str(schema_path), mode, debounce=200)
+    watcher.start()
+    try:
+        path = tmp_path / 'Person' / 'external.yaml'
+        path.write_text('pid: abc:b\n')
+        _wait_for_pids(store, ['abc:a', 'abc:b'])
+        path.unlink()
+        _wait_for_pids(store, ['abc:a'])
+    finally:
+        watcher.stop()
+
+
+def test_watch_mode_none(tmp_path):
+    with pytest.raises(ValueError, match='watch mode `none`'):
+        RecordDirWatcher(_create_store(tmp_path), str(schema_path), WatchMode.none)
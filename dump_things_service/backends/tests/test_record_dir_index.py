@@ -24,3 +24,20 @@ def test_add_and_delete_entry(tmp_path):
 
     result = record_dir_index.remove_iri_info(iri)
     assert result is False
+
+
+def test_get_info_for_classes(tmp_path):
+    record_dir_index = RecordDirIndex(tmp_path, 'yaml')
+    for iri, class_name, sort_key in (
+        ('abc:1', 'Person', 'c'),
+        ('abc:2', 'Agent', 'a'),
+        ('abc:3', 'InstantaneousEvent', 'b'),
+        ('abc:4', 'Person', 'b'),
+    ):
+        record_dir_index.add_iri_info(iri, class_name, f'/data/{iri}', sort_key)
+
+    iris = [
+        entry.iri
+        for entry in record_dir_index.get_info_for_classes(['Person', 'Agent'])
+    ]
+    assert iris == ['abc:2', 'abc:4', 'abc:1']
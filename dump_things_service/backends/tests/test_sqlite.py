@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from dump_things_service.backends import (
+    RecordInfo,
+    ReferenceInfo,
+)
+from dump_things_service.backends.filters import parse_filter
+from dump_things_service.backends.sqlite import _SQLiteBackend
+
+filter_records = [
+    {'pid': 'pid-0', 'given_name': 'Alice', 'age': 30, 'tags': ['a', 'b']},
+    {'pid': 'pid-1', 'given_name': 'Bob', 'age': 40, 'tags': ['b']},
+    {'pid': 'pid-2', 'given_name': 'Carol', 'age': 25.5},
+    {'pid': 'pid-3', 'given_name': 'Dave', 'tags': ['c']},
+]
+
+filter_cases = (
+    (['age:gt:28'], ['pid-0', 'pid-1']),
+    (['age:le:30'], ['pid-0', 'pid-2']),
+    (['given_name:eq:Bob'], ['pid-1']),
+    (['given_name:ge:"C"'], ['pid-2', 'pid-3']),
+    (['given_name:contains:o'], ['pid-1', 'pid-2']),
+    (['tags:eq:b'], ['pid-0', 'pid-1']),
+    (['tags:ne:b'], ['pid-2', 'pid-3']),
+    (['tags:eq:b', 'age:lt:35'], ['pid-0']),
+)
+
+
+def test_pid_infos(tmp_path):
+    db_path = tmp_path / 'records.db'
+    backend = _SQLiteBackend(db_path=db_path)
+    for i in range(3):
+        backend.add_record(f'iri-{i}', 'Person', {'pid': f'pid-{i}'})
+    # Replacing a record updates the pid
+    backend.add_record('iri-2', 'Person', {'pid': 'pid-2b'})
+
+    expected = [
+        ('iri-0', 'pid-0', 'Person'),
+        ('iri-1', 'pid-1', 'Person'),
+        ('iri-2', 'pid-2b', 'Person'),
+    ]
+    assert list(backend.get_pid_infos()) == expected
+    backend.engine.dispose()
+
+    # Simulate a database that was created before pids were stored
+    with sqlite3.connect(db_path) as connection:
+        connection.execute('DROP INDEX ix_thing_pid')
+        connection.execute('ALTER TABLE thing DROP COLUMN pid')
+    connection.close()
+
+    assert list(_SQLiteBackend(db_path=db_path).get_pid_infos()) == expected
+    with sqlite3.connect(db_path) as connection:
+        assert connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND name = 'ix_thing_pid'"
+        ).fetchall() == [('ix_thing_pid',)]
+    connection.close()
+
+
+@pytest.mark.parametrize('indexed_slots', ((), ('given_name', 'age', 'tags')))
+@pytest.mark.parametrize(('filters', 'pids'), filter_cases)
+def test_filters(tmp_path, indexed_slots, filters, pids):
+    backend = _SQLiteBackend(
+        db_path=tmp_path / 'records.db',
+        indexed_slots=indexed_slots,
+    )
+    for record in filter_records:
+        backend.add_record(record['pid'], 'Person', record)
+
+    filters = [parse_filter(text) for text in filters]
+    result_list = backend.get_all_records(filters=filters)
+    assert [info.iri for info in result_list.list_info] == pids
+    result_list = backend.get_records_of_classes(['Person'], filters=filters)
+    assert [info.iri for info in result_list.list_info] == pids
+    assert backend.get_records_of_classes(['Thing'], filters=filters) == []
+
+
+def test_indexed_slot_values(tmp_path):
+    db_path = tmp_path / 'records.db'
+    backend = _SQLiteBackend(db_path=db_path)
+    for record in filter_records:
+        backend.add_record(record['pid'], 'Person', record)
+    backend.engine.dispose()
+
+    def get_pids(backend, text):
+        result_list = backend.get_all_records(filters=[parse_filter(text)])
+        return [info.iri for info in result_list.list_info]
+
+    def get_slot_values(slot):
+        with sqlite3.connect(db_path) as connection:
+            result = connection.execute(
+                'SELECT count(*) FROM slot_value WHERE slot = ?', (slot,),
+            ).fetchone()[0]
+        connection.close()
+        return result
+
+    # Values of newly indexed slots are extracted from existing records
+    backend = _SQLiteBackend(db_path=db_path, indexed_slots=['tags'])
+    assert get_slot_values('tags') == 4
+    assert get_pids(backend, 'tags:eq:b') == ['pid-0', 'pid-1']
+
+    # Replaced records replace their values, removed records remove them
+    backend.add_records_bulk([
+        RecordInfo('pid-0', 'Person', {'pid': 'pid-0', 'tags': ['a']}, ''),
+        RecordInfo('pid-0', 'Person', {'pid': 'pid-0', 'tags': ['c']}, ''),
+    ])
+    backend.remove_record('pid-1')
+    assert get_slot_values('tags') == 2
+    assert get_pids(backend, 'tags:eq:b') == []
+    assert get_pids(backend, 'tags:eq:c') == ['pid-0', 'pid-3']
+    backend.engine.dispose()
+
+    # Values of slots that are no longer indexed are removed
+    backend = _SQLiteBackend(db_path=db_path, indexed_slots=['age'])
+    assert get_slot_values('tags') == 0
+    assert get_slot_values('age') == 1
+    assert get_pids(backend, 'tags:eq:c') == ['pid-0', 'pid-3']
+    backend.engine.dispose()
+
+
+def test_referrers(tmp_path):
+    db_path = tmp_path / 'records.db'
+    backend = _SQLiteBackend(db_path=db_path)
+    backend.add_record('iri-0', 'Person', {'pid': 'pid-0', 'relations': {
+        'pid-1': {'pid': 'pid-1'},
+        'pid-2': {'pid': 'pid-2'},
+    }})
+    backend.add_record('iri-1', 'Person', {'pid': 'pid-1', 'relations': {
+        'pid-2': {'pid': 'pid-2'},
+    }})
+    backend.add_record('iri-2', 'Person', {'pid': 'pid-2'})
+
+    assert backend.get_referrers(['pid-2']) == [
+        ReferenceInfo('iri-0', 'pid-0', 'Person', 'relations', 'pid-2'),
+        ReferenceInfo('iri-1', 'pid-1', 'Person', 'relations', 'pid-2'),
+    ]
+    assert backend.get_records_by_iris(['iri-1', 'iri-2', 'iri-3']).keys() == {
+        'iri-1',
+        'iri-2',
+    }
+
+    # Replaced records replace their references, removed records remove them
+    backend.add_record('iri-0', 'Person', {'pid': 'pid-0'})
+    backend.remove_record('iri-1')
+    assert backend.get_referrers(['pid-1', 'pid-2']) == []
+    backend.add_record('iri-1', 'Person', {'pid': 'pid-1', 'relations': {
+        'pid-2': {'pid': 'pid-2'},
+    }})
+    backend.engine.dispose()
+
+    # Simulate a database that was created before references were stored
+    with sqlite3.connect(db_path) as connection:
+        connection.execute('DROP TABLE reference')
+    connection.close()
+    assert _SQLiteBackend(db_path=db_path).get_referrers(['pid-2']) == [
+        ReferenceInfo('iri-1', 'pid-1', 'Person', 'relations', 'pid-2'),
+    ]
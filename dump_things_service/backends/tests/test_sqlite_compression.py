@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from dump_things_service.backends.sqlite import _SQLiteBackend
+from dump_things_service.backends.sqlite_compression import train_dictionary
+
+
+def create_record(index: int) -> dict:
+    return {
+        'pid': f'abc:{index}',
+        'given_name': f'Given name {index % 7}',
+        'annotations': {
+            'http://example.org/annotation/submitter': f'user-{index % 5}@example.org',
+        },
+    }
+
+
+def get_stored_types(db_path) -> dict[str, int]:
+    with sqlite3.connect(db_path) as connection:
+        return dict(connection.execute(
+            'select typeof(object), count(*) from thing group by 1'
+        ).fetchall())
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = _SQLiteBackend(db_path=tmp_path / 'records.db')
+    for index in range(200):
+        backend.add_record(f'abc:{index}', 'Person', create_record(index))
+    return backend
+
+
+def test_compression(tmp_path, backend):
+    assert backend.get_compression_dictionary() is None
+    dictionary = train_dictionary(backend.sample_records(200), 4096)
+    backend.set_compression_dictionary(dictionary, 5)
+    assert backend.get_compression_dictionary() == (dictionary, 5)
+
+    # New records are compressed, existing records are not modified
+    backend.add_record('abc:new', 'Person', create_record(1000))
+    assert get_stored_types(tmp_path / 'records.db') == {'text': 200, 'blob': 1}
+
+    assert backend.recompress_records(batch_size=30) == 200
+    assert get_stored_types(tmp_path / 'records.db') == {'blob': 201}
+
+    # Reading, searching, and content hashes are not affected by compression
+    assert backend.get_record_by_iri('abc:new').json_object == create_record(1000)
+    result_list = backend.get_all_records()
+    records = result_list.generate_elements(0, result_list.list_info)
+    assert {record.iri: record.json_object for record in records} == {
+        f'abc:{index}': create_record(index) for index in range(200)
+    } | {'abc:new': create_record(1000)}
+    assert len(backend.get_records_of_classes(['Person'], '%name 3%')) == 29
+    assert backend.get_content_hash('abc:7') == backend.get_content_hashes(
+        ['abc:7']
+    )['abc:7']
+
+    # A new backend on the same database reads the compressed records
+    assert _SQLiteBackend(
+        db_path=tmp_path / 'records.db',
+    ).get_record_by_iri('abc:7').json_object == create_record(7)
+
+    # Records remain readable after compression was disabled
+    backend.set_compression_dictionary(None)
+    assert backend.get_compression_dictionary() is None
+    assert backend.get_record_by_iri('abc:7').json_object == create_record(7)
+    assert backend.recompress_records() == 201
+    assert get_stored_types(tmp_path / 'records.db') == {'text': 201}
+
+
+def test_unknown_dictionary_is_loaded(tmp_path, backend):
+    # Another process activates a dictionary and stores compressed records
+    other_backend = _SQLiteBackend(db_path=tmp_path / 'records.db')
+    other_backend.set_compression_dictionary(
+        train_dictionary(other_backend.sample_records(200), 4096)
+    )
+    other_backend.add_record('abc:other', 'Person', create_record(2000))
+
+    assert backend.get_record_by_iri('abc:other').json_object == create_record(2000)
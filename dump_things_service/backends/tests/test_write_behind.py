@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import json
+import time
+
+from dump_things_service.backends import (
+    ChangeOperation,
+    PidInfo,
+    RecordInfo,
+)
+from dump_things_service.backends.filters import parse_filter
+from dump_things_service.backends.sqlite import _SQLiteBackend
+from dump_things_service.backends.write_behind import (
+    _WriteBehindBackend,
+    journal_file_name,
+)
+from dump_things_service.lazy_list import PriorityList
+
+
+def create_backends(tmp_path, **kwargs):
+    backend = _SQLiteBackend(db_path=tmp_path / 'records.db')
+    write_behind_backend = _WriteBehindBackend(
+        backend,
+        tmp_path,
+        # Prevent the worker from applying records during the test
+        flush_interval=kwargs.pop('flush_interval', 3600),
+        **kwargs,
+    )
+    return backend, write_behind_backend
+
+
+def test_read_your_writes(tmp_path):
+    backend, write_behind_backend = create_backends(tmp_path)
+
+    write_behind_backend.add_record(
+        iri='abc:1',
+        class_name='Person',
+        json_object={'pid': 'abc:1', 'given_name': 'Ann'},
+    )
+    assert backend.get_record_by_iri('abc:1') is None
+    record_info = write_behind_backend.get_record_by_iri('abc:1')
+    assert record_info.json_object == {'pid': 'abc:1', 'given_name': 'Ann'}
+
+    # Reading multiple records includes pending records, without applying
+    # them.
+    assert [
+        record_info.json_object
+        for record_info in write_behind_backend.get_all_records()
+    ] == [{'pid': 'abc:1', 'given_name': 'Ann'}]
+    assert backend.get_record_by_iri('abc:1') is None
+    write_behind_backend.close()
+
+
+def test_reads_merge_pending_records(tmp_path):
+    backend, write_behind_backend = create_backends(tmp_path)
+    backend.add_record(
+        iri='abc:1',
+        class_name='Person',
+        json_object={'pid': 'abc:1', 'given_name': 'Old'},
+    )
+    backend.add_record(
+        iri='abc:2',
+        class_name='Thing',
+        json_object={'pid': 'abc:2', 'relations': {'abc:1': {'pid': 'abc:1'}}},
+    )
+    # A pending update of an applied record and a pending new record
+    write_behind_backend.add_record(
+        iri='abc:1',
+        class_name='Person',
+        json_object={'pid': 'abc:1', 'given_name': 'New'},
+    )
+    write_behind_backend.add_record(
+        iri='abc:3',
+        class_name='Person',
+        json_object={
+            'pid': 'abc:3',
+            'given_name': 'Bea',
+            'relations': {'abc:1': {'pid': 'abc:1'}},
+        },
+    )
+
+    assert [
+        record_info.json_object
+        for record_info in write_behind_backend.get_all_records()
+    ] == [
+        {'pid': 'abc:1', 'given_name': 'New'},
+        {'pid': 'abc:2', 'relations': {'abc:1': {'pid': 'abc:1'}}},
+        {
+            'pid': 'abc:3',
+            'given_name': 'Bea',
+            'relations': {'abc:1': {'pid': 'abc:1'}},
+        },
+    ]
+    assert [
+        record_info.json_object
+        for record_info in write_behind_backend.get_records_of_classes(
+            ['Person'],
+            filters=[parse_filter('given_name:eq:Bea')],
+        ).select_fields(['pid'])
+    ] == [{'pid': 'abc:3'}]
+    assert sorted(write_behind_backend.get_records_by_iris(['abc:1', 'abc:2'])) == [
+        'abc:1', 'abc:2',
+    ]
+    assert write_behind_backend.get_records_by_iris(['abc:1'])[
+        'abc:1'
+    ].json_object['given_name'] == 'New'
+    assert sorted(write_behind_backend.get_pid_infos()) == [
+        PidInfo('abc:1', 'abc:1', 'Person'),
+        PidInfo('abc:2', 'abc:2', 'Thing'),
+        PidInfo('abc:3', 'abc:3', 'Person'),
+    ]
+    assert sorted(
+        reference_info.iri
+        for reference_info in write_behind_backend.get_referrers(['abc:1'])
+    ) == ['abc:2', 'abc:3']
+
+    # The change feed contains only applied records
+    assert [
+        change.iri
+        for change in write_behind_backend.get_changes()
+        if change.operation == ChangeOperation.add
+    ] == ['abc:1', 'abc:2']
+
+    # None of the reads applied the pending records
+    assert sorted(write_behind_backend.pending) == ['abc:1', 'abc:3']
+    write_behind_backend.close()
+
+
+def test_batches_are_applied_in_background(tmp_path):
+    backend, write_behind_backend = create_backends(tmp_path, batch_size=10)
+
+    for i in range(10):
+        write_behind_backend.add_record(
+            iri=f'abc:{i}',
+            class_name='Person',
+            json_object={'pid': f'abc:{i}'},
+        )
+    # The batch size is reached, the worker applies the records
+    for _ in range(100):
+        if not write_behind_backend.pending:
+            break
+        time.sleep(0.05)
+    assert len(backend.get_all_records()) == 10
+    write_behind_backend.close()
+
+
+def test_merged_results_combine_with_other_backends(tmp_path):
+    (tmp_path / 'incoming').mkdir()
+    backend, write_behind_backend = create_backends(tmp_path / 'incoming')
+    other_backend = _SQLiteBackend(db_path=tmp_path / 'curated.db')
+    other_backend.add_record(
+        iri='abc:1',
+        class_name='Person',
+        json_object={'pid': 'abc:1', 'given_name': 'Curated'},
+    )
+    write_behind_backend.add_record(
+        iri='abc:1',
+        class_name='Person',
+        json_object={'pid': 'abc:1', 'given_name': 'Incoming'},
+    )
+    result = (
+        PriorityList()
+        .add_list(write_behind_backend.get_all_records())
+        .add_list(other_backend.get_all_records())
+    )
+    assert [record_info.json_object['given_name'] for record_info in result] == [
+        'Incoming',
+    ]
+    write_behind_backend.close()
+
+
+def test_batches_are_bounded(tmp_path, monkeypatch):
+    backend, write_behind_backend = create_backends(tmp_path, batch_size=3)
+    batch_sizes = []
+    add_records_bulk = backend.add_records_bulk
+
+    def record_batch_size(object_info):
+        object_info = list(object_info)
+        batch_sizes.append(len(object_info))
+        add_records_bulk(object_info)
+
+    monkeypatch.setattr(backend, 'add_records_bulk', record_batch_size)
+    write_behind_backend.flush_interval = 3600
+    for i in range(10):
+        write_behind_backend.add_records_bulk([
+            RecordInfo(
+                iri=f'abc:{i}',
+                class_name='Person',
+                json_object={'pid': f'abc:{i}'},
+                sort_key=f'abc:{i}',
+            )
+        ])
+    write_behind_backend.flush()
+    assert sum(batch_sizes) == 10
+    assert max(batch_sizes) <= 3
+    assert len(backend.get_all_records()) == 10
+    write_behind_backend.close()
+
+
+def test_remove_applies_pending_records(tmp_path):
+    backend, write_behind_backend = create_backends(tmp_path)
+
+    write_behind_backend.add_record(
+        iri='abc:1',
+        class_name='Person',
+        json_object={'pid': 'abc:1'},
+    )
+    assert write_behind_backend.remove_record('abc:1') is True
+    assert backend.get_record_by_iri('abc:1') is None
+    write_behind_backend.close()
+
+
+def test_crash_recovery(tmp_path):
+    # Simulate a journal that was left behind by a terminated process. The
+    # last line was only partially written.
+    with (tmp_path / journal_file_name).open('wt') as f:
+        for i in range(3):
+            f.write(json.dumps({
+                'iri': f'abc:{i}',
+                'class_name': 'Person',
+                'json_object': {'pid': f'abc:{i}'},
+            }) + '\n')
+        f.write('{"iri": "abc:3", "class_')
+
+    backend, write_behind_backend = create_backends(tmp_path)
+    assert len(backend.get_all_records()) == 3
+    assert (tmp_path / journal_file_name).stat().st_size == 0
+    write_behind_backend.close()
@@ -0,0 +1,567 @@
+"""
+This is a proxy-backend that stores records asynchronously in an underlying
+backend.
+
+`add_record` appends the record to a journal file, which is synced to disk,
+and returns. A background worker applies journaled records to the underlying
+backend in batches, via `add_records_bulk`. This decouples the latency of
+submissions from the cost of the underlying backend, e.g., YAML serialization,
+file writes, and index transactions.
+
+Records that are not yet applied are kept in memory. Read operations merge
+them with the results of the underlying backend, i.e., reads do not wait for
+the application of batches. This provides read-your-writes consistency for
+all users of the store. Reads with a `pattern` and removals of pending
+records apply pending records first, because pattern semantics are defined
+by the underlying backend, and because a removal must follow the application
+of the record. The change feed contains only applied records, records get
+their sequence numbers when they are applied.
+
+Batches contain at most `batch_size` records, i.e., a backlog of pending
+records is applied in multiple, bounded backend transactions.
+
+The journal consists of the file `.write-behind.journal`, which receives new
+records, and the file `.write-behind.applying`, which holds the batch that is
+currently applied. If the service terminates before a batch is applied, the
+journal files are replayed when the store is created.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+)
+
+from dump_things_service.backends import (
+    BackendResultList,
+    ChangeInfo,
+    PidInfo,
+    RecordInfo,
+    ReferenceInfo,
+    ResultListInfo,
+    StorageBackend,
+    create_content_hash,
+    create_sort_key,
+    get_references,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
+    from pathlib import Path
+
+    from dump_things_service.backends.filters import Filter
+
+
+__all__ = [
+    'WriteBehindBackend',
+    'WriteBehindResultList',
+]
+
+logger = logging.getLogger('dump_things_service')
+
+journal_file_name = '.write-behind.journal'
+applying_file_name = '.write-behind.applying'
+
+# Maximum number of records that are applied in one batch
+default_batch_size = 500
+
+# Maximum time in seconds between the journaling and the application of a
+# record.
+default_flush_interval = 0.2
+
+
+class _PendingRecord:
+    """Marks result list entries of pending records"""
+
+    def __init__(self, record_info: RecordInfo):
+        self.record_info = record_info
+
+
+class WriteBehindResultList(BackendResultList):
+    """Result list that merges pending records with backend results
+
+    Entries of pending records replace the entries of the same IRI in the
+    result list of the underlying backend.
+    """
+
+    def __init__(
+        self,
+        origin_list: BackendResultList,
+        pending: dict[str, RecordInfo],
+    ):
+        super().__init__()
+        self.origin_list = origin_list
+        self.list_info = sorted(
+            [
+                *(
+                    info
+                    for info in origin_list.list_info
+                    if info.iri not in pending
+                ),
+                *(
+                    ResultListInfo(
+                        iri=info.iri,
+                        class_name=info.class_name,
+                        sort_key=info.sort_key,
+                        private=_PendingRecord(info),
+                    )
+                    for info in pending.values()
+                ),
+            ],
+            key=lambda info: info.sort_key,
+        )
+
+    def select_fields(
+        self,
+        fields: Iterable[str] | None,
+    ) -> BackendResultList:
+        super().select_fields(fields)
+        self.origin_list.select_fields(self.fields)
+        return self
+
+    def generate_result(
+        self,
+        index: int,
+        iri: str,
+        class_name: str,
+        sort_key: str,
+        private: Any,
+    ) -> RecordInfo:
+        if isinstance(private, _PendingRecord):
+            return _copy_record_info(private.record_info)
+        return self.origin_list.generate_result(
+            index, iri, class_name, sort_key, private
+        )
+
+    def generate_results(
+        self,
+        start: int,
+        infos: list[ResultListInfo],
+    ) -> list[RecordInfo]:
+        origin_infos = [
+            info
+            for info in infos
+            if not isinstance(info.private, _PendingRecord)
+        ]
+        origin_results = iter(
+            self.origin_list.generate_results(start, origin_infos)
+            if origin_infos
+            else []
+        )
+        return [
+            _copy_record_info(info.private.record_info)
+            if isinstance(info.private, _PendingRecord)
+            else next(origin_results)
+            for info in infos
+        ]
+
+
+class _WriteBehindBackend(StorageBackend):
+    """Proxy backend that journals records and stores them asynchronously"""
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        journal_dir: Path,
+        *,
+        batch_size: int = default_batch_size,
+        flush_interval: float = default_flush_interval,
+    ):
+        super().__init__(order_by=backend.order_by)
+        self.backend = backend
+        self.journal_path = journal_dir / journal_file_name
+        self.applying_path = journal_dir / applying_file_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # Records that are journaled but not yet applied, in journal order
+        self.pending: dict[str, RecordInfo] = {}
+        self._lock = threading.Lock()
+        # Serializes the application of batches
+        self._apply_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+        self._replay()
+        self._journal = self.journal_path.open('ab')
+        self._worker = threading.Thread(
+            target=self._work,
+            name=f'write-behind-{journal_dir.name}',
+            daemon=True,
+        )
+        self._worker.start()
+        atexit.register(self.close)
+
+    def get_uri(
+        self
+    ) -> str:
+        return self.backend.get_uri()
+
+    def add_record(
+        self,
+        iri: str,
+        class_name: str,
+        json_object: dict,
+    ):
+        self.add_records_bulk([
+            RecordInfo(
+                iri=iri,
+                class_name=class_name,
+                json_object=json_object,
+                sort_key=create_sort_key(json_object, self.order_by),
+            )
+        ])
+
+    def add_records_bulk(
+        self,
+        object_info: Iterable[RecordInfo],
+    ):
+        lines = [
+            json.dumps({
+                'iri': info.iri,
+                'class_name': info.class_name,
+                'json_object': info.json_object,
+            })
+            for info in object_info
+        ]
+        data = ''.join(line + '\n' for line in lines).encode()
+        with self._lock:
+            if self._stopped:
+                msg = f'write-behind store {self.journal_path.parent} is closed'
+                raise RuntimeError(msg)
+            self._journal.write(data)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            for line in lines:
+                # Keep copies of the journaled records, the caller might
+                # modify the original records. Re-insert records to keep the
+                # journal order in `pending`.
+                info = _create_record_info(json.loads(line), self.order_by)
+                self.pending.pop(info.iri, None)
+                self.pending[info.iri] = info
+            pending_count = len(self.pending)
+        if pending_count >= self.batch_size:
+            self._wakeup.set()
+
+    def remove_record(
+        self,
+        iri: str,
+    ) -> bool:
+        with self._lock:
+            is_pending = iri in self.pending
+        if is_pending:
+            # The record has to be applied before it can be removed
+            self.flush()
+        return self.backend.remove_record(iri=iri)
+
+    def get_record_by_iri(
+        self,
+        iri: str,
+    ) -> RecordInfo | None:
+        with self._lock:
+            info = self.pending.get(iri)
+        if info is not None:
+            # Return a copy, because callers might modify the record
+            return _copy_record_info(info)
+        return self.backend.get_record_by_iri(iri)
+
+    def get_records_by_iris(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, RecordInfo]:
+        iris = list(iris)
+        pending = self._get_pending()
+        return {
+            **self.backend.get_records_by_iris(
+                iri for iri in iris if iri not in pending
+            ),
+            **{
+                iri: _copy_record_info(pending[iri])
+                for iri in iris
+                if iri in pending
+            },
+        }
+
+    def get_content_hash(
+        self,
+        iri: str,
+    ) -> str | None:
+        with self._lock:
+            info = self.pending.get(iri)
+        if info is not None:
+            return create_content_hash(info.json_object)
+        return self.backend.get_content_hash(iri)
+
+    def get_content_hashes(
+        self,
+        iris: Iterable[str],
+    ) -> dict[str, str]:
+        iris = list(iris)
+        with self._lock:
+            pending = {
+                iri: create_content_hash(self.pending[iri].json_object)
+                for iri in iris
+                if iri in self.pending
+            }
+        return {
+            **self.backend.get_content_hashes(
+                iri for iri in iris if iri not in pending
+            ),
+            **pending,
+        }
+
+    def get_records_of_classes(
+        self,
+        class_names: Iterable[str],
+        pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
+    ) -> BackendResultList:
+        class_names = list(class_names)
+        if pattern is not None:
+            self.flush()
+            return self.backend.get_records_of_classes(class_names, pattern, filters)
+        pending = self._get_pending(class_names, filters)
+        return WriteBehindResultList(
+            self.backend.get_records_of_classes(class_names, pattern, filters),
+            pending,
+        )
+
+    def get_all_records(
+        self,
+        pattern: str | None = None,
+        filters: Iterable[Filter] | None = None,
+    ) -> BackendResultList:
+        if pattern is not None:
+            self.flush()
+            return self.backend.get_all_records(pattern, filters)
+        pending = self._get_pending(filters=filters)
+        return WriteBehindResultList(
+            self.backend.get_all_records(pattern, filters),
+            pending,
+        )
+
+    def get_pid_infos(
+        self,
+    ) -> Iterator[PidInfo]:
+        pending = self._get_pending()
+        for pid_info in self.backend.get_pid_infos():
+            if pid_info.iri not in pending:
+                yield pid_info
+        for info in pending.values():
+            yield PidInfo(info.iri, info.json_object['pid'], info.class_name)
+
+    def get_referrers(
+        self,
+        targets: Iterable[str],
+    ) -> list[ReferenceInfo]:
+        targets = set(targets)
+        pending = self._get_pending()
+        return [
+            *(
+                reference_info
+                for reference_info in self.backend.get_referrers(targets)
+                if reference_info.iri not in pending
+            ),
+            *(
+                ReferenceInfo(
+                    info.iri,
+                    info.json_object.get('pid'),
+                    info.class_name,
+                    slot,
+                    target,
+                )
+                for info in pending.values()
+                for slot, target in get_references(info.json_object)
+                if target in targets
+            ),
+        ]
+
+    def get_changes(
+        self,
+        since: int = 0,
+        limit: int = 1000,
+    ) -> list[ChangeInfo]:
+        # Pending records get their sequence numbers when they are applied,
+        # the change feed contains only applied records.
+        return self.backend.get_changes(since, limit)
+
+    def _get_pending(
+        self,
+        class_names: Iterable[str] | None = None,
+        filters: Iterable[Filter] | None = None,
+    ) -> dict[str, RecordInfo]:
+        """Get a snapshot of the pending records that match the arguments
+
+        Take the snapshot before the underlying backend is read. Records
+        that are applied in the meantime are then contained in the snapshot
+        or in the backend result.
+        """
+        class_names = None if class_names is None else set(class_names)
+        filters = list(filters or ())
+        with self._lock:
+            return {
+                iri: info
+                for iri, info in self.pending.items()
+                if (class_names is None or info.class_name in class_names)
+                and all(filter_.matches(info.json_object) for filter_ in filters)
+            }
+
+    def flush(self):
+        """Apply all pending records to the underlying backend"""
+        while True:
+            with self._lock:
+                if not self.pending:
+                    return
+            self._apply_batch()
+
+    def close(self):
+        """Stop the worker and apply all pending records"""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+        self._wakeup.set()
+        self._worker.join()
+        self.flush()
+        self._journal.close()
+
+    def _work(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # The batch is kept in the applying file and in `pending`, it
+                # is retried in the next iteration.
+                logger.exception(
+                    'write-behind: could not apply records to %s',
+                    self.backend.get_uri(),
+                )
+
+    def _apply_batch(self):
+        with self._apply_lock:
+            if not self.applying_path.exists():
+                with self._lock:
+                    if not self.pending:
+                        return
+                    # Move the journal aside and start a new one. Records
+                    # that are added while the batch is applied go into the
+                    # new journal.
+                    self._journal.close()
+                    self.journal_path.replace(self.applying_path)
+                    self._journal = self.journal_path.open('ab')
+            batch = list(_read_journal(self.applying_path, self.order_by).values())
+            # Apply the journal in bounded backend transactions. Applied
+            # records are removed from `pending` after every slice. If the
+            # service terminates, the applying file is replayed completely,
+            # applying records again is idempotent.
+            for start in range(0, len(batch), self.batch_size):
+                batch_slice = batch[start:start + self.batch_size]
+                self.backend.add_records_bulk(batch_slice)
+                with self._lock:
+                    for info in batch_slice:
+                        pending_info = self.pending.get(info.iri)
+                        # Keep records that were updated while the batch was
+                        # applied.
+                        if (
+                            pending_info is not None
+                            and pending_info.json_object == info.json_object
+                            and pending_info.class_name == info.class_name
+                        ):
+                            del self.pending[info.iri]
+            self.applying_path.unlink()
+
+    def _replay(self):
+        """Apply the journal files of a previous run"""
+        for path in (self.applying_path, self.journal_path):
+            if not path.exists():
+                continue
+            batch = _read_journal(path, self.order_by)
+            if batch:
+                logger.info(
+                    'write-behind: replaying %d records from %s',
+                    len(batch),
+                    path,
+                )
+                self.backend.add_records_bulk(batch.values())
+            path.unlink()
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate all other attributes to the underlying backend."""
+        return getattr(self.backend, name)
+
+
+def _read_journal(
+    path: Path,
+    order_by: Iterable[str],
+) -> dict[str, RecordInfo]:
+    result = {}
+    with path.open('rb') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A partially written last line, the record was never
+                # acknowledged.
+                logger.warning('write-behind: ignoring corrupt entry in %s', path)
+                continue
+            result.pop(entry['iri'], None)
+            result[entry['iri']] = _create_record_info(entry, order_by)
+    return result
+
+
+def _copy_record_info(
+    info: RecordInfo,
+) -> RecordInfo:
+    # Callers might modify the returned record
+    return RecordInfo(
+        iri=info.iri,
+        class_name=info.class_name,
+        json_object=json.loads(json.dumps(info.json_object)),
+        sort_key=info.sort_key,
+    )
+
+
+def _create_record_info(
+    entry: dict[str, Any],
+    order_by: Iterable[str],
+) -> RecordInfo:
+    return RecordInfo(
+        iri=entry['iri'],
+        class_name=entry['class_name'],
+        json_object=entry['json_object'],
+        sort_key=create_sort_key(entry['json_object'], order_by),
+    )
+
+
+# Ensure that there is only one write-behind layer per backend.
+_existing_layers = {}
+
+
+def WriteBehindBackend(  # noqa: N802
+    backend: StorageBackend,
+    journal_dir: Path,
+    *,
+    batch_size: int = default_batch_size,
+    flush_interval: float = default_flush_interval,
+) -> _WriteBehindBackend:
+    existing_layer, _ = _existing_layers.get(id(backend), (None, None))
+    if not existing_layer:
+        existing_layer = _WriteBehindBackend(
+            backend,
+            journal_dir,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+        _existing_layers[id(backend)] = (existing_layer, backend)
+    return existing_layer
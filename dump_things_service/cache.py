@@ -0,0 +1,422 @@
+"""A thread-safe, bounded cache with time-to-live entries
+
+`TTLCache` is a shared cache utility that can be used by all subsystems of
+the service, e.g., by authentication sources. It provides:
+
+- a maximum number of entries, the least recently used entries are evicted,
+- per-entry time-to-live, expired entries are swept regularly,
+- stale-while-revalidate: an expired entry may be returned for a configurable
+  time while a single background task recomputes it,
+- per-key locking: concurrent misses for the same key compute the value only
+  once, which prevents a thundering herd on expiration,
+- statistics, which are available via `get_cache_statistics`.
+
+The decorator `cached` applies a cache to functions and coroutine functions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        Awaitable,
+        Hashable,
+    )
+
+
+__all__ = [
+    'CacheStatistics',
+    'TTLCache',
+    'cached',
+    'get_cache_statistics',
+]
+
+logger = logging.getLogger('dump_things_service')
+
+_missing = object()
+
+# All named caches, used to report statistics
+_caches = {}
+
+
+@dataclasses.dataclass
+class CacheStatistics:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
+
+
+@dataclasses.dataclass
+class _Entry:
+    value: Any
+    expires: float
+    stale_until: float
+
+
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl: float = 300,
+        stale_ttl: float = 0,
+        max_size: int = 1024,
+        sweep_interval: float = 60,
+    ):
+        """
+        Create a cache.
+
+        :param name: The name of the cache, used in statistics.
+        :param ttl: Default time in seconds for which an entry is fresh.
+        :param stale_ttl: Default time in seconds after expiration, for which
+            an expired entry is returned while it is recomputed in the
+            background.
+        :param max_size: Maximum number of entries in the cache.
+        :param sweep_interval: Minimal time in seconds between two sweeps
+            that remove expired entries.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.sweep_interval = sweep_interval
+        self.statistics = CacheStatistics()
+
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: dict[Hashable, list] = {}
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._revalidating: set[Hashable] = set()
+        self._last_sweep = time.monotonic()
+        _caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        key: Hashable,
+        default: Any = None,
+    ) -> Any:
+        """Get a fresh value for `key`, or `default`"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires < time.monotonic():
+                return default
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        ttl: float | None = None,
+        stale_ttl: float | None = None,
+    ):
+        now = time.monotonic()
+        expires = now + (self.ttl if ttl is None else ttl)
+        stale_until = expires + (self.stale_ttl if stale_ttl is None else stale_ttl)
+        with self._lock:
+            self._entries[key] = _Entry(value, expires, stale_until)
+            self._entries.move_to_end(key)
+            if now - self._last_sweep > self.sweep_interval:
+                self._sweep(now)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.statistics.evictions += 1
+
+    def delete(
+        self,
+        key: Hashable,
+    ):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def sweep(self) -> int:
+        """Remove all expired entries, return the number of removed entries"""
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def _sweep(
+        self,
+        now: float,
+    ) -> int:
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if entry.stale_until < now
+        ]
+        for key in expired:
+            del self._entries[key]
+        self._last_sweep = now
+        self.statistics.expirations += len(expired)
+        return len(expired)
+
+    def _lookup(
+        self,
+        key: Hashable,
+    ) -> tuple[Any, bool]:
+        """Return `(value, is_stale)` or `(_missing, False)`"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                now = time.monotonic()
+                if entry.expires >= now:
+                    self._entries.move_to_end(key)
+                    self.statistics.hits += 1
+                    return entry.value, False
+                if entry.stale_until >= now:
+                    self._entries.move_to_end(key)
+                    self.statistics.stale_hits += 1
+                    return entry.value, True
+                del self._entries[key]
+                self.statistics.expirations += 1
+            self.statistics.misses += 1
+            return _missing, False
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        *,
+        ttl: float | None = None,
+        stale_ttl: float | None = None,
+    ) -> Any:
+        """
+        Get the value for `key`, compute and store it if necessary
+
+        Concurrent callers with the same key wait for a single computation.
+        Exceptions raised by `compute` are not cached.
+        """
+        value, is_stale = self._lookup(key)
+        if value is not _missing:
+            if is_stale:
+                self._revalidate_in_thread(key, compute, ttl, stale_ttl)
+            return value
+
+        key_lock = self._acquire_key_lock(key)
+        try:
+            with key_lock:
+                # Another thread might have computed the value while we were
+                # waiting for the lock.
+                value = self.get(key, _missing)
+                if value is _missing:
+                    value = compute()
+                    self.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+                return value
+        finally:
+            self._release_key_lock(key)
+
+    async def get_or_compute_async(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        ttl: float | None = None,
+        stale_ttl: float | None = None,
+    ) -> Any:
+        """
+        Get the value for `key`, compute and store it if necessary
+
+        Concurrent callers in the same event loop with the same key wait for
+        a single computation. Exceptions raised by `compute` are not cached.
+        """
+        value, is_stale = self._lookup(key)
+        if value is not _missing:
+            if is_stale and self._start_revalidation(key):
+                asyncio.ensure_future(
+                    self._revalidate_async(key, compute, ttl, stale_ttl)
+                )
+            return value
+
+        # Futures are bound to an event loop, therefore in-flight
+        # computations are tracked per loop.
+        loop = asyncio.get_running_loop()
+        in_flight_key = id(loop), key
+        in_flight = self._in_flight.get(in_flight_key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        future = loop.create_future()
+        self._in_flight[in_flight_key] = future
+        try:
+            value = await compute()
+            self.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved, waiters get it via `await`.
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[in_flight_key]
+        return value
+
+    async def _revalidate_async(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float | None,
+        stale_ttl: float | None,
+    ):
+        try:
+            self.set(key, await compute(), ttl=ttl, stale_ttl=stale_ttl)
+        except Exception as e:  # noqa: BLE001
+            logger.debug('cache %s: revalidation failed: %s', self.name, e)
+            self.delete(key)
+        finally:
+            self._finish_revalidation(key)
+
+    def _revalidate_in_thread(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        ttl: float | None,
+        stale_ttl: float | None,
+    ):
+        if not self._start_revalidation(key):
+            return
+
+        def revalidate():
+            try:
+                self.set(key, compute(), ttl=ttl, stale_ttl=stale_ttl)
+            except Exception as e:  # noqa: BLE001
+                logger.debug('cache %s: revalidation failed: %s', self.name, e)
+                self.delete(key)
+            finally:
+                self._finish_revalidation(key)
+
+        threading.Thread(target=revalidate, daemon=True).start()
+
+    def _start_revalidation(
+        self,
+        key: Hashable,
+    ) -> bool:
+        """Mark `key` as revalidating
+
+        Revalidations run in threads and in event loops, the set of
+        revalidating keys is therefore guarded by the cache lock.
+
+        :return: `False` if `key` is already revalidating.
+        """
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def _finish_revalidation(
+        self,
+        key: Hashable,
+    ):
+        with self._lock:
+            self._revalidating.discard(key)
+
+    def _acquire_key_lock(
+        self,
+        key: Hashable,
+    ) -> threading.Lock:
+        # Key locks are reference counted and removed when they are not used
+        # anymore, to keep the number of locks bounded.
+        with self._lock:
+            lock_info = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            lock_info[1] += 1
+            return lock_info[0]
+
+    def _release_key_lock(
+        self,
+        key: Hashable,
+    ):
+        with self._lock:
+            lock_info = self._key_locks[key]
+            lock_info[1] -= 1
+            if lock_info[1] == 0:
+                del self._key_locks[key]
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **dataclasses.asdict(self.statistics),
+                'hit_ratio': self.statistics.hit_ratio,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
+
+
+def cached(
+    cache: TTLCache,
+    *,
+    ttl: float | None = None,
+    stale_ttl: float | None = None,
+    key: Callable[..., Hashable] | None = None,
+) -> Callable:
+    """
+    Cache the results of a function or coroutine function in `cache`
+
+    :param cache: The cache that stores the results.
+    :param ttl: Time-to-live of the results, defaults to the cache default.
+    :param stale_ttl: Stale time of the results, defaults to the cache default.
+    :param key: A callable that is called with the arguments of the decorated
+        function and returns a hashable key for the result. The default key
+        is built from all arguments.
+    """
+    def decorator(func: Callable) -> Callable:
+        def get_key(args, kwargs) -> Hashable:
+            if key is not None:
+                return func.__qualname__, key(*args, **kwargs)
+            return func.__qualname__, args, tuple(sorted(kwargs.items()))
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await cache.get_or_compute_async(
+                    get_key(args, kwargs),
+                    lambda: func(*args, **kwargs),
+                    ttl=ttl,
+                    stale_ttl=stale_ttl,
+                )
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache.get_or_compute(
+                get_key(args, kwargs),
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+            )
+        return wrapper
+    return decorator
+
+
+def get_cache_statistics() -> dict[str, dict[str, Any]]:
+    """Get the statistics of all caches"""
+    return {
+        name: cache.get_statistics()
+        for name, cache in _caches.items()
+    }
@@ -1,21 +1,52 @@
+"""Check the pids of all records of a store for resolvability
+
+Pids are read from the `pid`-columns of the backends, records are not
+loaded. Record-dir indices that were created before pids were indexed are
+completed first: the record files are located via the index, and only the
+`pid`-entry of each file is read, in a pool of worker processes. Record
+files whose pid cannot be read are reported as errors, they do not abort the
+check. All stores are scanned concurrently.
+"""
+
 from __future__ import annotations
 
 import sys
+import time
 from argparse import ArgumentParser
-from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import (
+    dataclass,
+    field,
+)
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+import yaml
 
 from dump_things_service import config_file_name
+from dump_things_service.backends.record_dir import _RecordDirStore
 from dump_things_service.backends.schema_type_layer import _SchemaTypeLayer
 from dump_things_service.backends.sqlite import _SQLiteBackend
+from dump_things_service.backends.write_behind import _WriteBehindBackend
 from dump_things_service.config import get_config, process_config
 from dump_things_service.exceptions import CurieResolutionError
-from dump_things_service.store.model_store import _ModelStore
-from dump_things_service.utils import (
-    create_token_store,
-    get_config_labels,
-    get_on_disk_labels,
+from dump_things_service.export.common import (
+    create_executor,
+    default_batch_size,
+    default_jobs,
+    map_ordered,
 )
+from dump_things_service.store.model_store import _ModelStore
+from dump_things_service.utils import get_incoming_stores
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
+    from concurrent.futures import Executor
+
+    from dump_things_service.backends import StorageBackend
 
 parser = ArgumentParser(
     prog='Check pids for resolvability',
@@ -33,6 +64,24 @@ parser.add_argument(
     help="Read the configuration from 'CONFIG_FILE' instead of looking for "
          'it in the root directory of the store.',
 )
+parser.add_argument(
+    '-j',
+    '--jobs',
+    type=int,
+    default=default_jobs,
+    help='Number of worker processes that read record files '
+         f'(default: {default_jobs}).',
+)
+
+
+@dataclass
+class StoreResult:
+    uri: str
+    count: int = 0
+    seconds: float = 0.0
+    unresolvable: list[str] = field(default_factory=list)
+    # Paths and error messages of record files whose pid cannot be read
+    errors: list[tuple[str, str]] = field(default_factory=list)
 
 
 def show_backend(model_store: _ModelStore):
@@ -45,55 +94,176 @@ def show_backend(model_store: _ModelStore):
         print(f'Checking: {backend.root}', file=sys.stderr)
 
 
-def check_pids_in_stores(
-    stores: Iterable[_ModelStore]
-) -> int:
-    result = 0
-    for store in stores:
-        print('checking', store.get_uri(), file=sys.stderr)
-        for record_info in store.get_all_objects():
-            pid = record_info.json_object['pid']
-            try:
-                store.pid_to_iri(pid)
-            except CurieResolutionError:
-                result += 1
-                print(pid, store.get_uri())
+def _extract_pid(text: str) -> str:
+    """Get the pid from the YAML text of a record
 
-    return result
+    Only the top-level `pid`-entry is parsed. If there is no such entry, the
+    complete record is parsed.
+    """
+    lines = iter(text.splitlines())
+    for line in lines:
+        if line.startswith('pid:'):
+            block = [line]
+            for continuation in lines:
+                if not continuation.startswith((' ', '\t')):
+                    break
+                block.append(continuation)
+            return yaml.safe_load('\n'.join(block))['pid']
+    return yaml.safe_load(text)['pid']
 
 
-def check_pids():
+def _read_pid(path: str) -> tuple[str | None, str | None]:
+    """Read the pid of the record file `path`
 
-    instance_config = get_config()
+    :return: A tuple of the pid and `None`, or of `None` and an error
+        message, if the pid cannot be read.
+    """
+    try:
+        return _extract_pid(Path(path).read_text(encoding='utf-8')), None
+    except (KeyError, TypeError):
+        return None, 'no top-level pid-entry'
+    except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+        return None, str(e)
 
-    result = 0
 
-    # Check pids in curated stores
-    result += check_pids_in_stores(instance_config.curated_stores.values())
+def _read_pids(paths: list[str]) -> list[tuple[str | None, str | None]]:
+    return [_read_pid(path) for path in paths]
 
-    # Check pids in incoming stores. Incoming stores can be defined in the
-    # configuration, or can be generated by external authentication sources.
-    # In the latter case, they are manifest as directories in the incoming area
-    # of a collection.
-    for collection, collection_info in instance_config.collections.items():
 
-        configured_labels = get_config_labels(instance_config, collection)
-        on_disk_labels = get_on_disk_labels(instance_config, collection)
-        all_labels = configured_labels.union(on_disk_labels)
+def _get_base_backend(store: _ModelStore) -> StorageBackend:
+    backend = store.backend
+    while isinstance(backend, (_SchemaTypeLayer, _WriteBehindBackend)):
+        backend = backend.backend
+    return backend
 
-        token_stores = [
-            create_token_store(
-                instance_config,
-                collection,
-                instance_config.store_path / collection_info.incoming / label
-            )
-            for label in all_labels
+
+def fill_missing_pids(
+    backend: _RecordDirStore,
+    executor: Executor | None,
+    jobs: int = 1,
+    batch_size: int = default_batch_size,
+) -> list[tuple[str, str]]:
+    """Add missing pids to the index of `backend`
+
+    :return: Paths and error messages of the record files whose pid cannot
+        be read.
+    """
+    entries = backend.index.get_paths_without_pid()
+    batches = [
+        entries[start:start + batch_size]
+        for start in range(0, len(entries), batch_size)
+    ]
+    path_batches = ([path for _, path in batch] for batch in batches)
+    errors = []
+    for batch, results in zip(
+        batches,
+        map_ordered(_read_pids, path_batches, executor, 2 * jobs),
+    ):
+        pids = {}
+        for (iri, path), (pid, error) in zip(batch, results):
+            if error is None:
+                pids[iri] = pid
+            else:
+                errors.append((path, error))
+        if pids:
+            backend.index.set_pids(pids)
+    return errors
+
+
+def read_pids(
+    store: _ModelStore,
+    executor: Executor | None,
+    jobs: int = 1,
+    errors: list[tuple[str, str]] | None = None,
+) -> Iterator[str]:
+    """Yield the pids of all records in `store`
+
+    Records whose pid cannot be read are skipped, their paths and error
+    messages are appended to `errors`.
+    """
+    backend = _get_base_backend(store)
+    if isinstance(backend, _RecordDirStore):
+        read_errors = fill_missing_pids(backend, executor, jobs)
+        if errors is not None:
+            errors.extend(read_errors)
+    for pid_info in store.backend.get_pid_infos():
+        yield pid_info.pid
+
+
+def check_store(
+    store: _ModelStore,
+    executor: Executor | None,
+    jobs: int = 1,
+) -> StoreResult:
+    result = StoreResult(uri=store.get_uri())
+    start = time.perf_counter()
+    for pid in read_pids(store, executor, jobs, result.errors):
+        result.count += 1
+        try:
+            store.pid_to_iri(pid)
+        except CurieResolutionError:
+            result.unresolvable.append(pid)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def check_pids_in_stores(
+    stores: Iterable[_ModelStore],
+    jobs: int = 1,
+) -> int:
+    """Check the pids of `stores` concurrently, report unresolvable pids
+
+    Unresolvable pids are written to stdout, timings and record files whose
+    pid cannot be read are written to stderr.
+
+    :return: The number of unresolvable pids and unreadable record files.
+    """
+    stores = list(stores)
+    result = 0
+    count = 0
+    start = time.perf_counter()
+    with (
+        create_executor(jobs) as executor,
+        ThreadPoolExecutor(max_workers=max(1, min(len(stores), 8))) as threads,
+    ):
+        futures = [
+            threads.submit(check_store, store, executor, jobs)
+            for store in stores
         ]
-        result += check_pids_in_stores(token_stores)
+        for future in futures:
+            store_result = future.result()
+            for pid in store_result.unresolvable:
+                print(pid, store_result.uri)
+            for path, error in store_result.errors:
+                print(f'error: {path}: {error}', file=sys.stderr)
+            result += len(store_result.unresolvable) + len(store_result.errors)
+            count += store_result.count
+            print(
+                f'checked {store_result.count} pids in {store_result.uri} '
+                f'({store_result.seconds:.2f} s)',
+                file=sys.stderr,
+            )
 
+    seconds = time.perf_counter() - start
+    print(
+        f'checked {count} pids in {len(stores)} stores in {seconds:.2f} s '
+        f'({count / seconds if seconds else 0:,.0f} pids/s)',
+        file=sys.stderr,
+    )
     return result
 
 
+def check_pids(jobs: int = 1) -> int:
+
+    instance_config = get_config()
+
+    stores = list(instance_config.curated_stores.values())
+    for collection in instance_config.collections:
+        stores.extend(get_incoming_stores(instance_config, collection).values())
+
+    return check_pids_in_stores(stores, jobs)
+
+
 def main():
     arguments = parser.parse_args()
 
@@ -105,9 +275,12 @@ def main():
         globals_dict=globals(),
     )
 
-    result = check_pids()
+    result = check_pids(arguments.jobs)
     if result > 0:
-        print(f'found {result} unresolvable pids', file=sys.stderr)
+        print(
+            f'found {result} unresolvable pids or unreadable records',
+            file=sys.stderr,
+        )
         return 1
     return 0
 
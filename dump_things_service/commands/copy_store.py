@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import json
+import os
 import sys
+import time
 from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+)
 
 from dump_things_service.backends.record_dir import (
     RecordDirStore,
@@ -20,7 +28,18 @@ from dump_things_service.backends.sqlite import (
 from dump_things_service.config import get_backend_and_extension
 
 if TYPE_CHECKING:
-    from dump_things_service.backends import StorageBackend
+    from concurrent.futures import Future
+
+    from dump_things_service.backends import (
+        BackendResultList,
+        RecordInfo,
+        ResultListInfo,
+        StorageBackend,
+    )
+
+
+default_chunk_size = 1000
+default_jobs = 4
 
 
 parser = ArgumentParser(
@@ -57,6 +76,44 @@ parser.add_argument(
     '`SCHEMA` to determine the correct class-URI for added '
     '`schema_type`-attributes.',
 )
+parser.add_argument(
+    '--chunk-size',
+    metavar='N',
+    type=int,
+    default=default_chunk_size,
+    help='Write records in chunks of `N` records. Each chunk is written in '
+    f'its own transaction. Default: {default_chunk_size}.',
+)
+parser.add_argument(
+    '-j',
+    '--jobs',
+    metavar='N',
+    type=int,
+    default=default_jobs,
+    help='Read source records with `N` threads. The next chunk is read '
+    f'while the current chunk is written. Default: {default_jobs}.',
+)
+parser.add_argument(
+    '--checkpoint',
+    metavar='CHECKPOINT_FILE',
+    help='Record the progress of the copy operation in `CHECKPOINT_FILE`. If '
+    'the file exists, the copy operation is resumed after the last written '
+    'chunk. The file is removed when the copy operation is complete.',
+)
+parser.add_argument(
+    '--only-changed',
+    action='store_true',
+    help='Copy only records that do not exist in the destination store, or '
+    'whose content differs from the content in the destination store. '
+    'Records are compared by the content hashes in the store indices, i.e., '
+    'unchanged records are not read.',
+)
+parser.add_argument(
+    '-q',
+    '--quiet',
+    action='store_true',
+    help='Do not report progress.',
+)
 
 
 def get_backend(
@@ -109,11 +166,193 @@ def get_backend(
     return backend
 
 
+@dataclass
+class CopyProgress:
+    total: int
+    processed: int = 0
+    copied: int = 0
+    skipped: int = 0
+
+
 def copy_records(
     source: StorageBackend,
     destination: StorageBackend,
+    *,
+    chunk_size: int = default_chunk_size,
+    jobs: int = default_jobs,
+    checkpoint: Path | None = None,
+    only_changed: bool = False,
+    report: Callable[[CopyProgress], None] | None = None,
+) -> CopyProgress:
+    """Copy all records from `source` to `destination`
+
+    Records are written in chunks of `chunk_size` records, via
+    `add_records_bulk`, i.e., in one transaction per chunk for backends that
+    support transactions. Records of the next chunk are read by `jobs`
+    threads while the current chunk is written.
+
+    :param checkpoint: A file that records the number of copied source
+        records after every chunk. If the file exists, copying resumes after
+        the recorded position. The file is removed after all records were
+        copied.
+    :param only_changed: Skip records whose content hash in `source` equals
+        their content hash in `destination`.
+    :param report: Called with the progress after every chunk.
+    :return: The final progress.
+    """
+    result_list = source.get_all_records()
+    progress = CopyProgress(total=len(result_list))
+    if checkpoint is not None:
+        progress.processed = _read_checkpoint(
+            checkpoint,
+            source,
+            destination,
+            result_list,
+        )
+
+    def read_chunk(start: int) -> list[Future]:
+        # Split the chunk into one batch per reader thread
+        infos = result_list.list_info[start:start + chunk_size]
+        batch_size = max(1, -(-len(infos) // jobs))
+        return [
+            executor.submit(
+                _read_records,
+                result_list,
+                source,
+                destination if only_changed else None,
+                start + offset,
+                infos[offset:offset + batch_size],
+            )
+            for offset in range(0, len(infos), batch_size)
+        ]
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = read_chunk(progress.processed)
+        while pending:
+            results = [future.result() for future in pending]
+            read_count = sum(count for _, count in results)
+            # Read the next chunk while the current chunk is written
+            pending = read_chunk(progress.processed + read_count)
+
+            records = [record for batch, _ in results for record in batch]
+            destination.add_records_bulk(records)
+
+            progress.processed += read_count
+            progress.copied += len(records)
+            progress.skipped += read_count - len(records)
+            if checkpoint is not None:
+                _write_checkpoint(
+                    checkpoint,
+                    source,
+                    destination,
+                    result_list,
+                    progress.processed,
+                )
+            if report:
+                report(progress)
+
+    if checkpoint is not None:
+        checkpoint.unlink(missing_ok=True)
+    return progress
+
+
+def _read_records(
+    result_list: BackendResultList,
+    source: StorageBackend,
+    destination: StorageBackend | None,
+    start: int,
+    infos: list[ResultListInfo],
+) -> tuple[list[RecordInfo], int]:
+    """Read the records of `infos`
+
+    If `destination` is given, records with equal content hashes in `source`
+    and `destination` are skipped, without reading them.
+
+    :return: The read records and the number of processed infos.
+    """
+    if destination is None:
+        return result_list.generate_elements(start, infos), len(infos)
+
+    iris = [info.iri for info in infos]
+    source_hashes = source.get_content_hashes(iris)
+    destination_hashes = destination.get_content_hashes(iris)
+
+    # Read runs of consecutive changed records in one batch
+    records = []
+    run_start = 0
+    for offset, iri in enumerate([*iris, None]):
+        if iri is not None and (
+            iri not in destination_hashes
+            or destination_hashes[iri] != source_hashes.get(iri)
+        ):
+            continue
+        if run_start < offset:
+            records.extend(result_list.generate_elements(
+                start + run_start,
+                infos[run_start:offset],
+            ))
+        run_start = offset + 1
+    return records, len(infos)
+
+
+def _read_checkpoint(
+    checkpoint: Path,
+    source: StorageBackend,
+    destination: StorageBackend,
+    result_list: BackendResultList,
+) -> int:
+    if not checkpoint.exists():
+        return 0
+
+    state = json.loads(checkpoint.read_text())
+    position = state['position']
+    # Only resume if the checkpoint belongs to the same stores, and if the
+    # source records were not changed in a way that shifts positions.
+    if (
+        state['source'] != source.get_uri()
+        or state['destination'] != destination.get_uri()
+        or position > len(result_list)
+        or (position > 0 and result_list.list_info[position - 1].iri != state['last_iri'])
+    ):
+        msg = (
+            f'checkpoint {checkpoint} does not match the source and '
+            'destination store, remove it to start over'
+        )
+        raise ValueError(msg)
+    return position
+
+
+def _write_checkpoint(
+    checkpoint: Path,
+    source: StorageBackend,
+    destination: StorageBackend,
+    result_list: BackendResultList,
+    position: int,
 ):
-    destination.add_records_bulk(source.get_all_records())
+    temporary_path = checkpoint.with_name(f'.{checkpoint.name}.{os.getpid()}.tmp')
+    temporary_path.write_text(json.dumps({
+        'source': source.get_uri(),
+        'destination': destination.get_uri(),
+        'position': position,
+        'last_iri': result_list.list_info[position - 1].iri if position else None,
+    }))
+    temporary_path.replace(checkpoint)
+
+
+def _create_reporter() -> Callable[[CopyProgress], None]:
+    start = time.monotonic()
+
+    def report(progress: CopyProgress):
+        # `copied` and `skipped` count only records of this run
+        rate = (progress.copied + progress.skipped) / max(time.monotonic() - start, 1e-9)
+        print(
+            f'processed {progress.processed}/{progress.total} records '
+            f'(copied: {progress.copied}, skipped: {progress.skipped}, '
+            f'{rate:.0f} records/s)',
+            file=sys.stderr,
+        )
+
+    return report
 
 
 def needs_copy(
@@ -140,7 +379,15 @@ def main():
     )
 
     if needs_copy(source, destination):
-        copy_records(source, destination)
+        copy_records(
+            source,
+            destination,
+            chunk_size=arguments.chunk_size,
+            jobs=arguments.jobs,
+            checkpoint=Path(arguments.checkpoint) if arguments.checkpoint else None,
+            only_changed=arguments.only_changed,
+            report=None if arguments.quiet else _create_reporter(),
+        )
 
     return 0
 
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+from dump_things_service import config_file_name
+from dump_things_service.compression import Compression
+from dump_things_service.config import (
+    get_config,
+    process_config,
+)
+from dump_things_service.export import exporter_info
+from dump_things_service.export.common import (
+    default_batch_size,
+    default_jobs,
+)
+
+parser = ArgumentParser(
+    prog='Export the records of a dump-things store',
+    description='Export the curated and incoming records of all collections '
+    'of a store, either as a single JSON document, or as a tree of record '
+    'directories.',
+)
+parser.add_argument(
+    'store',
+    help='The root directory of the store.',
+)
+parser.add_argument(
+    'destination',
+    help='The destination of the export. For the "json"-format, the output '
+    'file, "-" for stdout. For the "tree"-format, the destination directory, '
+    'or, if compression is enabled, the output tar-file, "-" for stdout.',
+)
+parser.add_argument(
+    '-c',
+    '--config',
+    metavar='CONFIG_FILE',
+    help="Read the configuration from 'CONFIG_FILE' instead of looking for "
+    'it in the root directory of the store.',
+)
+parser.add_argument(
+    '-f',
+    '--format',
+    choices=tuple(exporter_info),
+    default='json',
+    help='The export format. Default: json.',
+)
+parser.add_argument(
+    '--compression',
+    choices=tuple(compression.value for compression in Compression),
+    default=Compression.none.value,
+    help='Compress the output. The "tree"-format is written as a tar-archive '
+    'if compression is enabled. "zstd" requires Python 3.14 or the package '
+    '`backports.zstd`. Default: none.',
+)
+parser.add_argument(
+    '--batch-size',
+    metavar='N',
+    type=int,
+    default=default_batch_size,
+    help='Read and serialize records in batches of `N` records. Default: '
+    f'{default_batch_size}.',
+)
+parser.add_argument(
+    '-j',
+    '--jobs',
+    metavar='N',
+    type=int,
+    default=default_jobs,
+    help='Serialize records in `N` worker processes, while the next batches '
+    f'are read. Use 1 to serialize in the main process. Default: {default_jobs}.',
+)
+
+
+def main():
+    arguments = parser.parse_args()
+
+    store_path = Path(arguments.store).absolute()
+    process_config(
+        store_path=store_path,
+        config_file=Path(arguments.config or (store_path / config_file_name)),
+        order_by=['pid'],
+        globals_dict=globals(),
+    )
+
+    exporter_info[arguments.format](
+        get_config(),
+        arguments.destination,
+        compression=Compression(arguments.compression),
+        batch_size=arguments.batch_size,
+        jobs=arguments.jobs,
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+from dump_things_service import config_file_name
+from dump_things_service.backends.schema_type_layer import _SchemaTypeLayer
+from dump_things_service.backends.sqlite import _SQLiteBackend
+from dump_things_service.backends.sqlite_compression import (
+    default_compression_level,
+    default_dictionary_size,
+    train_dictionary,
+)
+from dump_things_service.backends.write_behind import _WriteBehindBackend
+from dump_things_service.config import (
+    InstanceConfig,
+    get_config,
+    process_config,
+)
+from dump_things_service.store.model_store import _ModelStore
+from dump_things_service.utils import get_incoming_stores
+
+default_sample_count = 2000
+
+
+parser = ArgumentParser(
+    prog='Train compression dictionaries for sqlite stores',
+    description='This command trains a zstd-dictionary on a sample of the '
+    'records of a collection and activates it in the curated store and in '
+    'all incoming stores of the collection. New records are compressed with '
+    'the dictionary. Only collections with a `sqlite`-backend are '
+    'processed. A running service uses the new dictionary after a restart.',
+)
+parser.add_argument(
+    'store',
+    help='The root directory of the store.',
+)
+parser.add_argument(
+    '-c',
+    '--config',
+    metavar='CONFIG_FILE',
+    help="Read the configuration from 'CONFIG_FILE' instead of looking for "
+    'it in the root directory of the store.',
+)
+parser.add_argument(
+    '--collection',
+    action='append',
+    metavar='COLLECTION',
+    help='Process only collection `COLLECTION`. Can be given multiple times. '
+    'Default: all collections with a `sqlite`-backend.',
+)
+parser.add_argument(
+    '--samples',
+    metavar='N',
+    type=int,
+    default=default_sample_count,
+    help='Train the dictionary on `N` randomly chosen records of the '
+    f'collection. Default: {default_sample_count}.',
+)
+parser.add_argument(
+    '--dictionary-size',
+    metavar='BYTES',
+    type=int,
+    default=default_dictionary_size,
+    help=f'The maximum size of the dictionary. Default: {default_dictionary_size}.',
+)
+parser.add_argument(
+    '--level',
+    type=int,
+    default=default_compression_level,
+    help=f'The zstd compression level. Default: {default_compression_level}.',
+)
+parser.add_argument(
+    '--recompress',
+    action='store_true',
+    help='Compress existing records with the new dictionary. If `--disable` '
+    'is given, store existing records uncompressed.',
+)
+parser.add_argument(
+    '--disable',
+    action='store_true',
+    help='Do not train a dictionary, store new records uncompressed. '
+    'Existing records remain readable.',
+)
+
+
+def get_sqlite_backend(store: _ModelStore) -> _SQLiteBackend | None:
+    backend = store.backend
+    while isinstance(backend, (_SchemaTypeLayer, _WriteBehindBackend)):
+        backend = backend.backend
+    return backend if isinstance(backend, _SQLiteBackend) else None
+
+
+def get_collection_backends(
+    instance_config: InstanceConfig,
+    collection: str,
+) -> list[_SQLiteBackend]:
+    """Get the sqlite backends of the curated and all incoming stores"""
+    stores = [
+        instance_config.curated_stores[collection],
+        *get_incoming_stores(instance_config, collection).values(),
+    ]
+    return [
+        backend
+        for backend in map(get_sqlite_backend, stores)
+        if backend is not None
+    ]
+
+
+def process_collection(
+    backends: list[_SQLiteBackend],
+    sample_count: int,
+    dictionary_size: int,
+    level: int,
+    *,
+    recompress: bool,
+    disable: bool,
+):
+    if disable:
+        dictionary = None
+    else:
+        samples = []
+        for backend in backends:
+            samples.extend(backend.sample_records(sample_count - len(samples)))
+            if len(samples) >= sample_count:
+                break
+        dictionary = train_dictionary(samples, dictionary_size)
+        print(
+            f'trained dictionary of {len(dictionary)} bytes on '
+            f'{len(samples)} records',
+            file=sys.stderr,
+        )
+
+    for backend in backends:
+        backend.set_compression_dictionary(dictionary, level)
+        if recompress:
+            changed = backend.recompress_records()
+            print(f'rewrote {changed} records in {backend.get_uri()}', file=sys.stderr)
+
+
+def main():
+    arguments = parser.parse_args()
+
+    store_path = Path(arguments.store).absolute()
+    process_config(
+        store_path=store_path,
+        config_file=Path(arguments.config or (store_path / config_file_name)),
+        order_by=['pid'],
+        globals_dict=globals(),
+    )
+    instance_config = get_config()
+
+    collections = arguments.collection or list(instance_config.collections)
+    for collection in collections:
+        if collection not in instance_config.collections:
+            print(f'no such collection: {collection}', file=sys.stderr)
+            return 1
+        backends = get_collection_backends(instance_config, collection)
+        if not backends:
+            if arguments.collection:
+                print(
+                    f'collection {collection} does not use a sqlite-backend',
+                    file=sys.stderr,
+                )
+                return 1
+            continue
+
+        print(f'processing collection {collection}', file=sys.stderr)
+        try:
+            process_collection(
+                backends,
+                arguments.samples,
+                arguments.dictionary_size,
+                arguments.level,
+                recompress=arguments.recompress,
+                disable=arguments.disable,
+            )
+        except ValueError as e:
+            print(f'error: {e}', file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Access to optional compression libraries
+
+Zstandard support is provided by the standard library module
+`compression.zstd` in Python 3.14 and later, and by the `backports.zstd`
+package for earlier Python versions. It is an optional dependency, install
+`dump-things-service[zstd]` to enable it.
+"""
+
+from __future__ import annotations
+
+import enum
+import functools
+import gzip
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+)
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+
+__all__ = [
+    'Compression',
+    'get_zstd_module',
+    'open_compressed',
+]
+
+
+class Compression(str, enum.Enum):
+    none = 'none'
+    gzip = 'gzip'
+    zstd = 'zstd'
+
+
+@functools.cache
+def get_zstd_module() -> ModuleType:
+    """Get the zstd module, raise `ValueError` if it is not available"""
+    try:
+        from compression import zstd
+    except ImportError:
+        try:
+            from backports import zstd
+        except ImportError as e:
+            msg = (
+                'zstd compression requires Python 3.14 or the package '
+                '`backports.zstd`, install `dump-things-service[zstd]`'
+            )
+            raise ValueError(msg) from e
+    return zstd
+
+
+def open_compressed(
+    output: BinaryIO,
+    compression: Compression,
+    level: int | None = None,
+) -> BinaryIO:
+    """Wrap the binary stream `output` into a compressing stream
+
+    Closing the returned stream finishes the compressed data but does not
+    close `output`.
+    """
+    compression = Compression(compression)
+    if compression == Compression.gzip:
+        return gzip.GzipFile(
+            fileobj=output,
+            mode='wb',
+            compresslevel=9 if level is None else level,
+        )
+    if compression == Compression.zstd:
+        return get_zstd_module().ZstdFile(output, mode='wb', level=level)
+    return output
@@ -19,6 +19,7 @@ from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    TypeAdapter,
     ValidationError,
 )
 from yaml.scanner import ScannerError
@@ -27,17 +28,29 @@ from dump_things_service import (
     HTTP_404_NOT_FOUND,
     Format,
 )
-from dump_things_service.backends.record_dir import RecordDirStore
+from dump_things_service.backends.record_dir import (
+    Durability,
+    RecordDirStore,
+    default_group_commit_interval,
+)
+from dump_things_service.backends.record_dir_watcher import WatchMode
 from dump_things_service.backends.schema_type_layer import SchemaTypeLayer
 from dump_things_service.backends.sqlite import SQLiteBackend
 from dump_things_service.backends.sqlite import (
     record_file_name as sqlite_record_file_name,
 )
-from dump_things_service.converter import FormatConverter, get_conversion_objects
+from dump_things_service.converter import (
+    get_conversion_objects,
+    get_format_converter,
+)
 from dump_things_service.exceptions import (
     ConfigError,
     CurieResolutionError,
 )
+from dump_things_service.initialization import (
+    CollectionInitialization,
+    CollectionInitializer,
+)
 from dump_things_service.model import get_model_for_schema
 from dump_things_service.resolve_curie import resolve_curie
 from dump_things_service.store.model_store import ModelStore
@@ -51,6 +64,8 @@ from dump_things_service.utils import check_collection
 if TYPE_CHECKING:
     import types
 
+    from dump_things_service.store.model_store import _ModelStore
+
 logger = logging.getLogger('dump_things_service')
 
 config_file_name = '.dumpthings.yaml'
@@ -108,11 +123,25 @@ class TokenConfig(StrictModel):
 
 class BackendConfigRecordDir(StrictModel):
     type: Literal['record_dir', 'record_dir+stl']
+    durability: Durability = Durability.none
+    group_commit_interval: int = Field(default=default_group_commit_interval, ge=0)
+    # Top-level slots that are stored in the index, list requests that select
+    # only these slots and `pid` do not read record files.
+    summary_fields: list[str] = dataclasses.field(default_factory=list)
+    # Top-level slots whose values are stored in an indexed table of the
+    # index, filters on these slots do not read record files.
+    indexed_slots: list[str] = dataclasses.field(default_factory=list)
+    # Update the index of the curated store if record files are modified
+    # outside the service.
+    watch: WatchMode = WatchMode.none
 
 
 class BackendConfigSQLite(StrictModel):
     type: Literal['sqlite', 'sqlite+stl']
     schema: str
+    # Top-level slots whose values are stored in an indexed table, filters on
+    # these slots do not scan all records.
+    indexed_slots: list[str] = dataclasses.field(default_factory=list)
 
 
 class ForgejoAuthConfig(StrictModel):
@@ -142,6 +171,7 @@ class CollectionConfig(StrictModel):
     submission_tags: TagConfig = TagConfig()
     use_classes: list[str] = dataclasses.field(default_factory=list)
     ignore_classes: list[str] = dataclasses.field(default_factory=list)
+    write_behind: bool = False
 
 
 class GlobalConfig(StrictModel):
@@ -172,6 +202,8 @@ class InstanceConfig:
     hashed_tokens: dict = dataclasses.field(default_factory=dict)
     validators: dict = dataclasses.field(default_factory=dict)
     use_classes: dict = dataclasses.field(default_factory=dict)
+    type_adapters: dict = dataclasses.field(default_factory=dict)
+    collection_initializer: CollectionInitializer | None = None
 
 
 mode_mapping = {
@@ -308,6 +340,7 @@ def process_config(
     config_file: Path,
     order_by: list[str],
     globals_dict: dict[str, Any],
+    collection_initialization: CollectionInitialization = CollectionInitialization.blocking,
 ) -> InstanceConfig:
     global global_config_instance
 
@@ -317,6 +350,7 @@ def process_config(
         config_object=config_object,
         order_by=order_by,
         globals_dict=globals_dict,
+        collection_initialization=collection_initialization,
     )
     return global_config_instance
 
@@ -330,12 +364,14 @@ def process_config_object(
     config_object: GlobalConfig,
     order_by: list[str],
     globals_dict: dict[str, Any],
+    collection_initialization: CollectionInitialization = CollectionInitialization.blocking,
 ):
     from dump_things_service.auth.config import ConfigAuthenticationSource
     from dump_things_service.auth.forgejo import ForgejoAuthenticationSource
 
     instance_config = InstanceConfig(store_path=store_path)
     instance_config.collections = config_object.collections
+    curated_store_initializers = {}
 
     for collection_name, collection_info in config_object.collections.items():
         # Create the authentication providers
@@ -400,40 +436,19 @@ def process_config_object(
         instance_config.model_info[collection_name] = model, classes, model_var_name
         globals_dict[model_var_name] = model
 
-        # Generate the curated stores
-        if backend_name == 'record_dir':
-            curated_store_backend = RecordDirStore(
-                root=store_path / collection_info.curated,
-                pid_mapping_function=get_mapping_function(collection_config),
-                suffix=collection_config.format,
-                order_by=order_by,
-            )
-            curated_store_backend.build_index_if_needed(schema=schema)
-        elif backend.type == 'sqlite':
-            curated_store_backend = SQLiteBackend(
-                db_path=store_path / collection_info.curated / sqlite_record_file_name,
-            )
-        else:
-            msg = f'Unsupported backend `{collection_info.backend}` for collection `{collection_name}`.'
-            raise ConfigError(msg)
-
-        if extension == 'stl':
-            curated_store_backend = SchemaTypeLayer(
-                backend=curated_store_backend,
-                schema=schema,
-            )
-
-        curated_store = ModelStore(
+        # Curated stores are created by the collection initializer
+        curated_store_initializers[collection_name] = partial(
+            create_curated_store,
+            store_path=store_path,
+            collection_name=collection_name,
+            collection_info=collection_info,
+            collection_config=(
+                collection_config if backend_name == 'record_dir' else None
+            ),
             schema=schema,
-            backend=curated_store_backend,
-            tags={
-                'id': collection_info.submission_tags.submitter_id_tag,
-                'time': collection_info.submission_tags.submission_time_tag,
-            }
+            order_by=order_by,
         )
 
-        instance_config.curated_stores[collection_name] = curated_store
-
         if collection_info.incoming:
             instance_config.incoming[collection_name] = collection_info.incoming
 
@@ -445,13 +460,20 @@ def process_config_object(
         # authentication routine.
         instance_config.token_stores[collection_name] = {}
 
-    # Create validator for each collection
+    # Create validator for each collection. Converters are shared by all
+    # collections with the same schema. We also create the TTL to JSON
+    # converter here, to avoid its creation in the first request.
     for collection_name, _ in config_object.collections.items():
-        instance_config.validators[collection_name] = FormatConverter(
+        instance_config.validators[collection_name] = get_format_converter(
             schema=instance_config.schemas[collection_name],
             input_format=Format.json,
             output_format=Format.ttl,
         )
+        get_format_converter(
+            schema=instance_config.schemas[collection_name],
+            input_format=Format.ttl,
+            output_format=Format.json,
+        )
 
     # Resolve classes-blacklist and -whitelist
     for collection_name, collection_info in config_object.collections.items():
@@ -499,6 +521,24 @@ def process_config_object(
             if name not in collection_info.ignore_classes
         ]
 
+    # Create type adapters for all used classes. Creating a type adapter
+    # builds a pydantic core schema, therefore adapters are shared by all
+    # collections with the same schema.
+    schema_type_adapters = {}
+    for collection_name in config_object.collections:
+        model = instance_config.model_info[collection_name][0]
+        type_adapters = schema_type_adapters.setdefault(
+            instance_config.schemas[collection_name],
+            {},
+        )
+        for class_name in instance_config.use_classes[collection_name]:
+            if class_name not in type_adapters:
+                type_adapters[class_name] = TypeAdapter(getattr(model, class_name))
+        instance_config.type_adapters[collection_name] = {
+            class_name: type_adapters[class_name]
+            for class_name in instance_config.use_classes[collection_name]
+        }
+
     # Read info for tokens from the configuration
     for token_name, token_info in config_object.tokens.items():
         for collection_name, token_collection_info in token_info.collections.items():
@@ -605,9 +645,74 @@ def process_config_object(
         except CurieResolutionError as e:
             raise ConfigError(str(e)) from e
 
+    # Initialize the curated stores of all collections
+    instance_config.collection_initializer = CollectionInitializer(
+        curated_store_initializers,
+        instance_config.curated_stores,
+    )
+    if collection_initialization == CollectionInitialization.blocking:
+        instance_config.collection_initializer.wait()
+    elif collection_initialization == CollectionInitialization.background:
+        instance_config.collection_initializer.start_all()
+
     return instance_config
 
 
+def create_curated_store(
+    store_path: Path,
+    collection_name: str,
+    collection_info: CollectionConfig,
+    collection_config: CollectionDirConfig | None,
+    schema: str,
+    order_by: list[str],
+) -> _ModelStore:
+    """Create the curated store of a collection
+
+    Creating a `record_dir`-store builds its index if it does not exist.
+    """
+    backend = collection_info.backend or BackendConfigRecordDir(
+        type='record_dir+stl'
+    )
+    backend_name, extension = get_backend_and_extension(backend.type)
+    if backend_name == 'record_dir':
+        curated_store_backend = RecordDirStore(
+            root=store_path / collection_info.curated,
+            pid_mapping_function=get_mapping_function(collection_config),
+            suffix=collection_config.format,
+            order_by=order_by,
+            durability=backend.durability,
+            group_commit_interval=backend.group_commit_interval,
+            summary_fields=backend.summary_fields,
+            indexed_slots=backend.indexed_slots,
+        )
+        curated_store_backend.build_index_if_needed(schema=schema)
+        if backend.watch != WatchMode.none:
+            curated_store_backend.watch(schema=schema, mode=backend.watch)
+    elif backend.type == 'sqlite':
+        curated_store_backend = SQLiteBackend(
+            db_path=store_path / collection_info.curated / sqlite_record_file_name,
+            indexed_slots=backend.indexed_slots,
+        )
+    else:
+        msg = f'Unsupported backend `{collection_info.backend}` for collection `{collection_name}`.'
+        raise ConfigError(msg)
+
+    if extension == 'stl':
+        curated_store_backend = SchemaTypeLayer(
+            backend=curated_store_backend,
+            schema=schema,
+        )
+
+    return ModelStore(
+        schema=schema,
+        backend=curated_store_backend,
+        tags={
+            'id': collection_info.submission_tags.submitter_id_tag,
+            'time': collection_info.submission_tags.submission_time_tag,
+        }
+    )
+
+
 def get_backend_and_extension(backend_type: str) -> tuple[str, str]:
     elements = backend_type.split('+')
     return (elements[0], elements[1]) if len(elements) > 1 else (elements[0], '')
@@ -637,7 +742,7 @@ def get_conversion_objects_for_collection(
     collection_name: str,
 ) -> dict:
     """Get the conversion objects for the given collection."""
-    check_collection(instance_config, collection_name)
+    check_collection(instance_config, collection_name, require_ready=False)
     return instance_config.conversion_objects[instance_config.schemas[collection_name]]
 
 
@@ -645,5 +750,5 @@ def get_model_info_for_collection(
     instance_config: InstanceConfig,
     collection_name: str,
 ) -> tuple[types.ModuleType, dict[str, Any], str]:
-    check_collection(instance_config, collection_name)
+    check_collection(instance_config, collection_name, require_ready=False)
     return instance_config.model_info[collection_name]
@@ -1,11 +1,13 @@
 from dump_things_service.tests.fixtures import (
     dump_stores_simple,
+    fake_forgejo,
     fastapi_app_simple,
     fastapi_client_simple,
 )
 
 __all__ = [
     'dump_stores_simple',
+    'fake_forgejo',
     'fastapi_app_simple',
     'fastapi_client_simple',
 ]
@@ -21,6 +21,7 @@ from rdflib.term import (
 
 from dump_things_service import Format
 from dump_things_service.lazy_list import LazyList
+from dump_things_service.metrics import conversion_seconds
 from dump_things_service.model import (
     get_model_for_schema,
     get_schema_model_for_schema,
@@ -36,6 +37,7 @@ if TYPE_CHECKING:
 
 
 _cached_conversion_objects = {}
+_cached_format_converters = {}
 
 
 class TypeValidator:
@@ -97,6 +99,8 @@ class FormatConverter:
         output_format: Format,
     ):
         self.converter = self._check_formats(input_format, output_format)
+        self.input_format = input_format
+        self.output_format = output_format
         self.model = get_model_for_schema(schema)[0]
         self.conversion_objects = get_conversion_objects(schema)
 
@@ -116,13 +120,21 @@ class FormatConverter:
         data: str | dict,
         target_class: str,
     ) -> str | dict:
-        return self.converter(data, target_class, load_only=False)
+        with conversion_seconds.time(
+            input_format=self.input_format.value,
+            output_format=self.output_format.value,
+        ):
+            return self.converter(data, target_class, load_only=False)
 
     def validate(
         self,
         pydantic_object: BaseModel,
     ) -> str | dict:
-        return self._convert_pydantic_to_ttl(pydantic_object, load_only=True)
+        with conversion_seconds.time(
+            input_format=Format.json.value,
+            output_format=Format.ttl.value,
+        ):
+            return self._convert_pydantic_to_ttl(pydantic_object, load_only=True)
 
     def _convert_json_to_ttl(
         self,
@@ -170,6 +182,25 @@ class FormatConverter:
         return cleaned_json(json_loads(json_string))
 
 
+def get_format_converter(
+    schema: str,
+    input_format: Format,
+    output_format: Format,
+) -> FormatConverter:
+    """Get a shared format converter, create it if necessary
+
+    Format converters are stateless, they can be shared by all requests.
+    """
+    key = schema, input_format, output_format
+    if key not in _cached_format_converters:
+        _cached_format_converters[key] = FormatConverter(
+            schema,
+            input_format,
+            output_format,
+        )
+    return _cached_format_converters[key]
+
+
 class ConvertingList(LazyList):
     """
     A lazy list that converts records stored in an "input" lazy list. The
@@ -189,7 +220,7 @@ class ConvertingList(LazyList):
         # We reuse `list_info` from the input list to save time and memory.
         self.list_info = input_list.list_info
         self.exception_handler: Callable | None = exception_handler
-        self.converter = FormatConverter(schema, input_format, output_format)
+        self.converter = get_format_converter(schema, input_format, output_format)
 
     def generate_element(self, index: int, _: Any) -> Any:
         record_info: RecordInfo = self.input_list[index]
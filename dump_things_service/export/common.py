@@ -0,0 +1,111 @@
+"""Streaming pipeline that is shared by the exporters
+
+Exporters read records in batches from the stores of an instance, serialize
+the batches in a pool of worker processes, and write the serialized batches
+in store order. Reading of the next batches and serialization of previous
+batches overlap, i.e., the main process reads while the workers serialize.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    TypeVar,
+)
+
+from dump_things_service.model import get_classes
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
+    from concurrent.futures import (
+        Executor,
+        Future,
+    )
+
+    from dump_things_service.backends import BackendResultList
+    from dump_things_service.store.model_store import ModelStore
+
+
+default_batch_size = 1000
+# Worker processes only pay off if they run on separate CPUs
+default_jobs = min(4, os.cpu_count() or 1)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+@contextmanager
+def create_executor(jobs: int) -> Iterator[Executor | None]:
+    """Create a process pool with `jobs` workers, or `None` if `jobs` is 1"""
+    if jobs < 1:
+        msg = f'number of jobs must be at least 1, got {jobs}'
+        raise ValueError(msg)
+    if jobs == 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield executor
+
+
+def map_ordered(
+    function: Callable[[T], R],
+    arguments: Iterable[T],
+    executor: Executor | None,
+    depth: int,
+) -> Iterator[R]:
+    """Apply `function` to `arguments` in `executor`, yield results in order
+
+    At most `depth` calls are pending. `arguments` is consumed while earlier
+    calls are executed, i.e., producing arguments and executing `function`
+    overlap. If `executor` is `None`, `function` is called directly.
+    """
+    if executor is None:
+        yield from map(function, arguments)
+        return
+
+    pending: deque[Future[R]] = deque()
+    for argument in arguments:
+        pending.append(executor.submit(function, argument))
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def get_exported_classes(store: ModelStore) -> Iterator[tuple[str, BackendResultList]]:
+    """Yield class names and records of all classes that have records in `store`"""
+    for class_name in get_classes(store.model):
+        # We know that pure `Thing` instances are not stored in the store.
+        if class_name == 'Thing':
+            continue
+
+        result_list = store.get_objects_of_class(
+            class_name,
+            None,
+            include_subclasses=False,
+        )
+        if result_list:
+            yield class_name, result_list
+
+
+def read_batches(
+    result_list: BackendResultList,
+    batch_size: int,
+) -> Iterator[list[dict]]:
+    """Read the records of `result_list` as batches of JSON objects"""
+    for start in range(0, len(result_list), batch_size):
+        yield [
+            record_info.json_object
+            for record_info in result_list.generate_elements(
+                start,
+                result_list.list_info[start:start + batch_size],
+            )
+        ]
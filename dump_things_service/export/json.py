@@ -1,15 +1,40 @@
+from __future__ import annotations
+
 import json
 import sys
+from functools import partial
 from pathlib import Path
-from typing import TextIO
-
-from dump_things_service.config import InstanceConfig
-from dump_things_service.lazy_list import LazyList
-from dump_things_service.model import get_classes
-from dump_things_service.store.model_store import ModelStore
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+)
+
+from dump_things_service.compression import (
+    Compression,
+    open_compressed,
+)
+from dump_things_service.export.common import (
+    create_executor,
+    default_batch_size,
+    default_jobs,
+    get_exported_classes,
+    map_ordered,
+    read_batches,
+)
+from dump_things_service.utils import get_incoming_stores
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from dump_things_service.backends import BackendResultList
+    from dump_things_service.config import InstanceConfig
+    from dump_things_service.store.model_store import ModelStore
 
 level_width = 2
 
+# Size of the output buffer, serialized batches are written in one call
+output_buffer_size = 1024 * 1024
+
 
 # The _lookahead function is taken from:
 # https://stackoverflow.com/questions/1630320/what-is-the-pythonic-way-to-detect-the-last-element-in-a-for-loop
@@ -34,105 +59,144 @@ def _lookahead(iterable):
     yield last, True
 
 
+class _JsonWriter:
+    def __init__(
+        self,
+        output: BinaryIO,
+        executor: Executor | None,
+        batch_size: int,
+        depth: int,
+    ):
+        self.output = output
+        self.executor = executor
+        self.batch_size = batch_size
+        self.depth = depth
+
+    def write(self, text: str):
+        self.output.write(text.encode('utf-8'))
+
+
 def export_json(
     instance_config: InstanceConfig,
     destination: str,
+    *,
+    compression: Compression = Compression.none,
+    batch_size: int = default_batch_size,
+    jobs: int = default_jobs,
 ):
+    """Export all collections of `instance_config` into a single JSON document
+
+    :param destination: The path of the output file, `-` for stdout.
+    :param compression: Compress the output with the given method.
+    :param batch_size: The number of records that are read and serialized
+        together.
+    :param jobs: The number of worker processes that serialize records.
+    """
     if destination == '-':
-        output = sys.stdout
+        output = sys.stdout.buffer
     else:
-        output = Path(destination).open('wt', encoding='utf-8')  # noqa: SIM115
+        output = Path(destination).open('wb', buffering=output_buffer_size)  # noqa: SIM115
 
-    output.write('{\n')
+    try:
+        with create_executor(jobs) as executor:
+            compressed_output = open_compressed(output, compression)
+            writer = _JsonWriter(compressed_output, executor, batch_size, 2 * jobs)
+            _write_collections(instance_config, writer)
+            if compressed_output is not output:
+                compressed_output.close()
+    finally:
+        if output is sys.stdout.buffer:
+            output.flush()
+        else:
+            output.close()
+
+
+def _write_collections(
+    instance_config: InstanceConfig,
+    writer: _JsonWriter,
+):
+    writer.write('{\n')
     for collection, is_last in _lookahead(instance_config.collections):
-        output.write(f'{level_width * " "}"{collection}": {{\n')
-        export_collection(instance_config, collection, 2 * level_width, output)
+        writer.write(f'{level_width * " "}"{collection}": {{\n')
+        export_collection(instance_config, collection, 2 * level_width, writer)
         if is_last:
-            output.write(f'\n{level_width * " "}}}\n')
+            writer.write(f'\n{level_width * " "}}}\n')
         else:
-            output.write(f'\n{level_width * " "}}},\n')
-    output.write('}\n')
+            writer.write(f'\n{level_width * " "}}},\n')
+    writer.write('}\n')
 
 
 def export_collection(
     instance_config: InstanceConfig,
     collection: str,
     indent: int,
-    output: TextIO,
+    writer: _JsonWriter,
 ):
-    output.write(f'{indent * " "}"schema": "{instance_config.schemas[collection]}",\n')
-    output.write(f'{indent * " "}"curated": {{\n')
+    writer.write(f'{indent * " "}"schema": "{instance_config.schemas[collection]}",\n')
+    writer.write(f'{indent * " "}"curated": {{\n')
     append_classes(
-        instance_config.curated_stores[collection], indent + level_width, output
+        instance_config.curated_stores[collection], indent + level_width, writer
     )
-    output.write(f'\n{indent * " "}}}')
-
-    # Determine stores for incoming zones
-    zones = {
-        label: instance_config.token_stores[token]['collections']
-        .get(collection, {})
-        .get('store')
-        for token, label in instance_config.zones.get(collection, {}).items()
-        if instance_config.token_stores[token]['collections']
-        .get(collection, {})
-        .get('store')
-        is not None
-    }
+    writer.write(f'\n{indent * " "}}}')
 
+    zones = get_incoming_stores(instance_config, collection)
     if zones:
         # Put a comma between "curated" and "incoming".
-        output.write(f',\n{indent * " "}"incoming": {{\n')
+        writer.write(f',\n{indent * " "}"incoming": {{\n')
         indent_zone = indent + level_width
         indent_classes = indent_zone + level_width
         for (zone, store), is_last in _lookahead(zones.items()):
-            output.write(f'{indent_zone * " "}"{zone}": {{\n')
-            append_classes(store, indent_classes, output)
+            writer.write(f'{indent_zone * " "}"{zone}": {{\n')
+            append_classes(store, indent_classes, writer)
             if is_last:
-                output.write(f'\n{(indent + level_width) * " "}}}')
+                writer.write(f'\n{(indent + level_width) * " "}}}')
             else:
-                output.write(f'\n{(indent + level_width) * " "}}},\n')
+                writer.write(f'\n{(indent + level_width) * " "}}},\n')
 
         # End the "incoming" dictionary
-        output.write(f'\n{indent * " "}}}')
+        writer.write(f'\n{indent * " "}}}')
 
 
 def append_classes(
     store: ModelStore,
     indent: int,
-    output: TextIO,
+    writer: _JsonWriter,
 ):
     """Append instances of all classes to the file"""
-    class_names = get_classes(store.model)
-
     first = True
-    for class_name in class_names:
-        # We know that pure `Thing` instances are not stored in the store.
-        if class_name == 'Thing':
-            continue
-
-        class_instances = store.get_objects_of_class(
-            class_name, include_subclasses=False
-        )
-        if class_instances:
-            if not first:
-                output.write(',\n')
-            first = False
-            output.write(f'{indent * " "}"{class_name}": [\n')
-            append_instances(
-                class_instances,
-                output,
-                indent + level_width,
-            )
-            output.write(f'\n{indent * " "}]')
+    for class_name, result_list in get_exported_classes(store):
+        if not first:
+            writer.write(',\n')
+        first = False
+        writer.write(f'{indent * " "}"{class_name}": [\n')
+        append_instances(result_list, writer, indent + level_width)
+        writer.write(f'\n{indent * " "}]')
 
 
 def append_instances(
-    instances: LazyList,
-    output: TextIO,
+    instances: BackendResultList,
+    writer: _JsonWriter,
     indent: int,
 ):
-    for instance, is_last in _lookahead(instances):
-        json_string = json.dumps(instance.json_object, ensure_ascii=False)
-        output.write(f'{(indent + level_width) * " "}{json_string}')
+    serialized_batches = map_ordered(
+        partial(_dump_json_batch, indent=indent + level_width),
+        read_batches(instances, writer.batch_size),
+        writer.executor,
+        writer.depth,
+    )
+    for serialized_batch, is_last in _lookahead(serialized_batches):
+        writer.output.write(serialized_batch)
         if not is_last:
-            output.write(',\n')
+            writer.write(',\n')
+
+
+def _dump_json_batch(
+    json_objects: list[dict],
+    indent: int,
+) -> bytes:
+    """Serialize a batch of records, this is executed in worker processes"""
+    prefix = indent * ' '
+    return ',\n'.join(
+        prefix + json.dumps(json_object, ensure_ascii=False)
+        for json_object in json_objects
+    ).encode('utf-8')
@@ -1,115 +1,276 @@
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import sys
+import tarfile
+import time
 from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+)
 
 import yaml
 
+from dump_things_service.backends.record_dir import _RecordDirStore
+from dump_things_service.compression import (
+    Compression,
+    open_compressed,
+)
 from dump_things_service.config import (
-    InstanceConfig,
     get_mapping_function_by_name,
+    mapping_functions,
 )
-from dump_things_service.model import get_classes
-from dump_things_service.store.model_store import ModelStore
+from dump_things_service.export.common import (
+    create_executor,
+    default_batch_size,
+    default_jobs,
+    get_exported_classes,
+    map_ordered,
+    read_batches,
+)
+from dump_things_service.utils import get_incoming_stores
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from dump_things_service.config import InstanceConfig
+    from dump_things_service.store.model_store import ModelStore
+
+default_idfx_name = 'digest-md5-p3-p3'
+idfx = get_mapping_function_by_name(default_idfx_name)
+
+
+class _DirectoryWriter:
+    """Write exported files into a directory"""
+
+    def __init__(self, root: Path):
+        if root.exists() and not root.is_dir():
+            msg = 'The export_tree destination path must be a directory.'
+            raise ValueError(msg)
+        self.root = root
+        self.created_directories = set()
+
+    def _prepare(self, path: str) -> Path:
+        destination = self.root / path
+        if destination.parent not in self.created_directories:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            self.created_directories.add(destination.parent)
+        return destination
+
+    def write(self, path: str, data: bytes):
+        self._prepare(path).write_bytes(data)
+
+    def copy(self, path: str, source: Path):
+        # Hardlinks avoid copying of the record content. The record_dir
+        # backends replace records atomically, i.e., later changes in the
+        # store do not affect the linked files.
+        destination = self._prepare(path)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+    def symlink(self, path: str, target: str):
+        self._prepare(path).symlink_to(self.root / target)
+
+    def close(self):
+        pass
+
+
+class _TarWriter:
+    """Write exported files into a, possibly compressed, tar stream"""
+
+    def __init__(
+        self,
+        output: BinaryIO,
+        compression: Compression,
+    ):
+        self.output = output
+        self.compressed_output = open_compressed(output, compression)
+        self.archive = tarfile.open(fileobj=self.compressed_output, mode='w|')  # noqa: SIM115
+        self.mtime = time.time()
+
+    def write(self, path: str, data: bytes):
+        info = tarfile.TarInfo(path)
+        info.size = len(data)
+        info.mtime = self.mtime
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def copy(self, path: str, source: Path):
+        self.archive.add(source, arcname=path, recursive=False)
+
+    def symlink(self, path: str, target: str):
+        info = tarfile.TarInfo(path)
+        info.type = tarfile.SYMTYPE
+        info.linkname = os.path.relpath(target, os.path.dirname(path))
+        info.mtime = self.mtime
+        self.archive.addfile(info)
 
-idfx = get_mapping_function_by_name('digest-md5-p3-p3')
+    def close(self):
+        self.archive.close()
+        if self.compressed_output is not self.output:
+            self.compressed_output.close()
 
 
 def export_tree(
     instance_config: InstanceConfig,
     destination: str,
+    *,
+    compression: Compression = Compression.none,
+    batch_size: int = default_batch_size,
+    jobs: int = default_jobs,
 ):
-    destination = Path(destination)
-    if destination.exists() and not destination.is_dir():
-        msg = 'The export_tree destination path must be a directory.'
-        raise ValueError(msg)
-
-    destination.mkdir(parents=True, exist_ok=True)
-    for collection in instance_config.collections:
-        export_collection(
-            instance_config,
-            collection,
-            destination,
-        )
+    """Export all collections of `instance_config` as record directories
+
+    :param destination: The destination directory. If `compression` is not
+        `none`, the path of a compressed tar-archive, `-` for stdout.
+    :param compression: Write a tar-archive that is compressed with the given
+        method.
+    :param batch_size: The number of records that are read and serialized
+        together.
+    :param jobs: The number of worker processes that serialize records.
+    """
+    compression = Compression(compression)
+    if compression == Compression.none:
+        writer = _DirectoryWriter(Path(destination))
+        output = None
+    else:
+        if destination == '-':
+            output = sys.stdout.buffer
+        else:
+            output = Path(destination).open('wb')  # noqa: SIM115
+        writer = _TarWriter(output, compression)
+
+    try:
+        with create_executor(jobs) as executor:
+            for collection in instance_config.collections:
+                export_collection(
+                    instance_config,
+                    collection,
+                    writer,
+                    executor,
+                    batch_size,
+                    2 * jobs,
+                )
+        writer.close()
+    finally:
+        if output is sys.stdout.buffer:
+            output.flush()
+        elif output is not None:
+            output.close()
 
 
 def export_collection(
     instance_config: InstanceConfig,
     collection: str,
-    destination: Path,
+    writer: _DirectoryWriter | _TarWriter,
+    executor: Executor | None,
+    batch_size: int,
+    depth: int,
 ):
-    collection_destination = destination / collection
-    collection_destination.mkdir(parents=True, exist_ok=True)
-
-    config_content = (
-        'type: records\n'
-        'version: 1\n'
-        f'schema: {instance_config.schemas[collection]}\n'
-        'format: yaml\n'
-        'idfx: digest-md5-p3-p3\n'
-    )
+    def export_store(
+        store: ModelStore,
+        store_destination: str,
+    ):
+        if id(store) in exported_stores:
+            # Already exported this store, make `store_destination` a link
+            # to the existing export.
+            writer.symlink(store_destination, exported_stores[id(store)])
+            return
+        exported_stores[id(store)] = store_destination
+        export_classes(
+            store,
+            instance_config.schemas[collection],
+            store_destination,
+            writer,
+            executor,
+            batch_size,
+            depth,
+        )
 
-    curated_destination = collection_destination / 'curated'
-    curated_destination.mkdir(parents=True, exist_ok=True)
-    (curated_destination / '.dumpthings.yaml').write_text(config_content)
-    exported_stores = {
-        id(instance_config.curated_stores[collection]): curated_destination
-    }
-    export_classes(instance_config.curated_stores[collection], curated_destination)
-
-    # Determine stores for incoming zones
-    zones = {
-        label: instance_config.token_stores[token]['collections']
-        .get(collection, {})
-        .get('store')
-        for token, label in instance_config.zones.get(collection, {}).items()
-        if instance_config.token_stores[token]['collections']
-        .get(collection, {})
-        .get('store')
-        is not None
-    }
-
-    if zones:
-        incoming_destination = collection_destination / 'incoming'
-        for zone, store in zones.items():
-            zone_destination = incoming_destination / zone
-            if id(store) in exported_stores:
-                # Already exported this store, make `zone_destination` a link
-                # to the existing export.
-                zone_destination.parent.mkdir(parents=True, exist_ok=True)
-                zone_destination.symlink_to(exported_stores[id(store)])
-                continue
-            exported_stores[id(store)] = zone_destination = (
-                collection_destination / 'incoming' / zone
-            )
-            zone_destination.mkdir(parents=True, exist_ok=True)
-            (zone_destination / '.dumpthings.yaml').write_text(config_content)
-            export_classes(store, zone_destination)
+    exported_stores = {}
+    export_store(instance_config.curated_stores[collection], f'{collection}/curated')
+    for zone, store in get_incoming_stores(instance_config, collection).items():
+        export_store(store, f'{collection}/incoming/{zone}')
 
 
 def export_classes(
     store: ModelStore,
-    destination: Path,
+    schema: str,
+    destination: str,
+    writer: _DirectoryWriter | _TarWriter,
+    executor: Executor | None,
+    batch_size: int,
+    depth: int,
 ):
-    class_names = get_classes(store.model)
-    for class_name in class_names:
-        # We know that pure `Thing` instances are not stored in the store.
-        if class_name == 'Thing':
-            continue
+    # Records of plain record_dir-stores are exported by linking or copying
+    # their files, if the store uses a known mapping function.
+    backend = store.backend
+    idfx_name = _get_idfx_name(backend) if isinstance(backend, _RecordDirStore) else None
 
-        record_infos = store.get_objects_of_class(class_name, include_subclasses=False)
-        if record_infos:
-            class_destination = destination / class_name
-            class_destination.mkdir(parents=True, exist_ok=True)
-            for record_info in record_infos:
-                json_object = record_info.json_object
-                instance_destination = class_destination / idfx(
-                    json_object['pid'],
-                    'yaml',
-                )
-                instance_destination.parent.mkdir(parents=True, exist_ok=True)
-                instance_destination.write_text(
-                    yaml.dump(
-                        data=json_object,
-                        sort_keys=False,
-                        allow_unicode=True,
-                        default_flow_style=False,
-                    )
+    writer.write(
+        f'{destination}/.dumpthings.yaml',
+        (
+            'type: records\n'
+            'version: 1\n'
+            f'schema: {schema}\n'
+            'format: yaml\n'
+            f'idfx: {idfx_name or default_idfx_name}\n'
+        ).encode('utf-8'),
+    )
+
+    for class_name, result_list in get_exported_classes(store):
+        class_destination = f'{destination}/{class_name}'
+        if idfx_name:
+            class_root = backend.root / class_name
+            for info in result_list.list_info:
+                path = Path(info.private)
+                writer.copy(
+                    f'{class_destination}/{path.relative_to(class_root).as_posix()}',
+                    path,
                 )
+            continue
+
+        serialized_batches = map_ordered(
+            _dump_yaml_batch,
+            read_batches(result_list, batch_size),
+            executor,
+            depth,
+        )
+        for serialized_batch in serialized_batches:
+            for path, data in serialized_batch:
+                writer.write(f'{class_destination}/{path}', data)
+
+
+def _get_idfx_name(backend: _RecordDirStore) -> str | None:
+    if backend.suffix != 'yaml':
+        return None
+    for method, mapping_function in mapping_functions.items():
+        if mapping_function is backend.pid_mapping_function:
+            return method.value
+    return None
+
+
+def _dump_yaml_batch(
+    json_objects: list[dict],
+) -> list[tuple[str, bytes]]:
+    """Serialize a batch of records, this is executed in worker processes
+
+    :return: A list of tuples containing the relative path and the content of
+        the record files.
+    """
+    return [
+        (
+            idfx(json_object['pid'], 'yaml'),
+            yaml.dump(
+                data=json_object,
+                sort_keys=False,
+                allow_unicode=True,
+                default_flow_style=False,
+            ).encode('utf-8'),
+        )
+        for json_object in json_objects
+    ]
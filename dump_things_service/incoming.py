@@ -8,7 +8,9 @@ from fastapi import (
     APIRouter,
     Depends,
     FastAPI,
+    Header,
     HTTPException,
+    Query,
 )
 from fastapi_pagination import (
     Page,
@@ -27,19 +29,25 @@ from dump_things_service.config import get_config
 from dump_things_service.exceptions import CurieResolutionError
 from dump_things_service.lazy_list import ModifierList
 from dump_things_service.utils import (
-    authenticate_token,
+    authenticate_token_async,
     check_bounds,
     check_collection,
     check_label,
     cleaned_json,
     create_token_store,
+    fields_description,
+    filters_description,
     get_config_labels,
     get_on_disk_labels,
+    parse_fields,
+    parse_filters,
+    read_record_response,
     wrap_http_exception,
 )
 
 if TYPE_CHECKING:
     from pydantic import BaseModel
+    from starlette.responses import Response
 
     from dump_things_service.backends import StorageBackend
     from dump_things_service.lazy_list import LazyList
@@ -98,6 +106,12 @@ async def incoming_read_records_of_type(
     label: str,
     class_name: str,
     matching: str | None = None,
+    fields: str | None = Query(default=None, description=fields_description),
+    filters: list[str] = Query(
+        default=[],
+        alias='filter',
+        description=filters_description,
+    ),
     api_key: str | None = Depends(api_key_header_scheme),
 ):
     instance_config = get_config()
@@ -113,6 +127,8 @@ async def incoming_read_records_of_type(
         class_name=class_name,
         pid=None,
         matching=matching,
+        fields=fields,
+        filters=filters,
         api_key=api_key,
         upper_bound=500,
     )
@@ -128,6 +144,12 @@ async def incoming_read_records_of_type_paginated(
     label: str,
     class_name: str,
     matching: str | None = None,
+    fields: str | None = Query(default=None, description=fields_description),
+    filters: list[str] = Query(
+        default=[],
+        alias='filter',
+        description=filters_description,
+    ),
     api_key: str | None = Depends(api_key_header_scheme),
 ) -> Page[dict]:
 
@@ -144,6 +166,8 @@ async def incoming_read_records_of_type_paginated(
         class_name=class_name,
         pid=None,
         matching=matching,
+        fields=fields,
+        filters=filters,
         api_key=api_key,
     )
     return paginate(record_list)
@@ -158,6 +182,12 @@ async def incoming_read_all_records(
     collection: str,
     label: str,
     matching: str | None = None,
+    fields: str | None = Query(default=None, description=fields_description),
+    filters: list[str] = Query(
+        default=[],
+        alias='filter',
+        description=filters_description,
+    ),
     api_key: str | None = Depends(api_key_header_scheme),
 ):
     return await _incoming_read_records(
@@ -166,6 +196,8 @@ async def incoming_read_all_records(
         class_name=None,
         pid=None,
         matching=matching,
+        fields=fields,
+        filters=filters,
         api_key=api_key,
         upper_bound=500,
     )
@@ -180,6 +212,12 @@ async def incoming_read_all_records_paginated(
         collection: str,
         label: str,
         matching: str | None = None,
+        fields: str | None = Query(default=None, description=fields_description),
+        filters: list[str] = Query(
+            default=[],
+            alias='filter',
+            description=filters_description,
+        ),
         api_key: str | None = Depends(api_key_header_scheme),
 ) -> Page[dict]:
     record_list = await _incoming_read_records(
@@ -188,6 +226,8 @@ async def incoming_read_all_records_paginated(
         class_name=None,
         pid=None,
         matching=matching,
+        fields=fields,
+        filters=filters,
         api_key=api_key,
         upper_bound=None,
     )
@@ -204,6 +244,7 @@ async def incoming_read_record_with_pid(
         label: str,
         pid: str,
         api_key: str = Depends(api_key_header_scheme),
+        if_none_match: str | None = Header(default=None),
 ):
     return await _incoming_read_records(
         collection=collection,
@@ -211,6 +252,7 @@ async def incoming_read_record_with_pid(
         class_name=None,
         pid=pid,
         api_key=api_key,
+        if_none_match=if_none_match,
     )
 
 
@@ -239,21 +281,28 @@ async def _incoming_read_records(
         class_name: str | None,
         pid: str | None,
         matching: str | None = None,
+        fields: str | None = None,
+        filters: list[str] | None = None,
         api_key: str | None = None,
         upper_bound: int = 1000,
-) -> LazyList | dict | None:
+        if_none_match: str | None = None,
+) -> LazyList | Response | None:
 
     model_store, backend = await _get_store_and_backend(collection, label, api_key)
 
     if pid:
-        record_info = backend.get_record_by_iri(model_store.pid_to_iri(pid))
-        if record_info:
-            return record_info.json_object
-        return None
+        return read_record_response(model_store, backend, pid, if_none_match)
+    selected_fields = parse_fields(fields)
+    selected_filters = parse_filters(filters)
     if class_name:
-        result_list = backend.get_records_of_classes([class_name], matching)
+        result_list = backend.get_records_of_classes(
+            [class_name],
+            matching,
+            selected_filters,
+        )
     else:
-        result_list = backend.get_all_records(matching)
+        result_list = backend.get_all_records(matching, selected_filters)
+    result_list.select_fields(selected_fields)
 
     if upper_bound is not None:
         check_bounds(
@@ -359,7 +408,11 @@ async def authorize_zones(
     # Check that the collection exists
     check_collection(instance_config, collection)
 
-    auth_info = authenticate_token(instance_config, collection, plain_token)
+    auth_info = await authenticate_token_async(
+        instance_config,
+        collection,
+        plain_token,
+    )
     permissions = auth_info.token_permission
     if permissions.zones_access is False:
         raise HTTPException(
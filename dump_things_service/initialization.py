@@ -0,0 +1,152 @@
+"""
+Initialization of the curated stores of collections
+
+Opening a curated store might take a long time, e.g., if the index of a large
+`record_dir`-store has to be built, or if a database has to be migrated.
+Collection stores are therefore initialized in a pool of worker threads,
+independently of each other. Depending on the `CollectionInitialization`
+mode, `process_config` waits for the initialization of all collections, or
+the service starts serving requests while the collections are initialized.
+Requests to collections that are not yet initialized are answered with
+status 503 and a `Retry-After`-header (see `utils.check_collection`).
+
+Models, converters, and type adapters of all collections are created before
+the stores are initialized, because they are required to create the
+endpoints of the service.
+"""
+
+from __future__ import annotations
+
+import enum
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from dump_things_service.store.model_store import _ModelStore
+
+
+__all__ = [
+    'CollectionInitialization',
+    'CollectionInitializer',
+    'CollectionState',
+]
+
+logger = logging.getLogger('dump_things_service')
+
+# Default number of collections that are initialized concurrently
+default_workers = 4
+
+
+class CollectionInitialization(str, enum.Enum):
+    """When the curated stores of collections are initialized
+
+    - `blocking`: all collections are initialized concurrently, before
+      `process_config` returns.
+    - `background`: all collections are initialized concurrently in the
+      background, `process_config` returns immediately.
+    - `lazy`: a collection is initialized in the background when it is
+      accessed for the first time.
+    """
+    blocking = 'blocking'
+    background = 'background'
+    lazy = 'lazy'
+
+
+class CollectionState(str, enum.Enum):
+    pending = 'pending'
+    initializing = 'initializing'
+    ready = 'ready'
+    failed = 'failed'
+
+
+class CollectionInitializer:
+    """Initialize the curated stores of collections in a thread pool"""
+
+    def __init__(
+        self,
+        initializers: dict[str, Callable[[], _ModelStore]],
+        stores: dict[str, _ModelStore],
+        workers: int = default_workers,
+    ):
+        """
+        Create an initializer, no collection is initialized yet.
+
+        :param initializers: Maps collection names to functions that create
+            the curated store of the collection.
+        :param stores: Initialized stores are added to this dictionary.
+        :param workers: The maximum number of collections that are
+            initialized concurrently.
+        """
+        self.initializers = initializers
+        self.stores = stores
+        self.states = {
+            collection: CollectionState.pending for collection in initializers
+        }
+        self.errors: dict[str, str] = {}
+        self.futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(initializers))),
+            thread_name_prefix='collection-initialization',
+        )
+
+    def start(
+        self,
+        collection: str,
+    ) -> CollectionState:
+        """Start the initialization of `collection` if it is pending
+
+        :return: The state of the collection.
+        """
+        with self._lock:
+            if self.states[collection] == CollectionState.pending:
+                self.states[collection] = CollectionState.initializing
+                self.futures[collection] = self._executor.submit(
+                    self._initialize,
+                    collection,
+                )
+            return self.states[collection]
+
+    def start_all(self):
+        for collection in self.initializers:
+            self.start(collection)
+
+    def wait(self):
+        """Initialize all collections and wait until they are initialized
+
+        :raise Exception: The first exception that was raised by an
+            initializer.
+        """
+        self.start_all()
+        for future in list(self.futures.values()):
+            future.result()
+
+    def _initialize(
+        self,
+        collection: str,
+    ):
+        start = time.perf_counter()
+        try:
+            store = self.initializers[collection]()
+        except Exception as e:
+            logger.exception('Initialization of collection `%s` failed', collection)
+            with self._lock:
+                self.states[collection] = CollectionState.failed
+                self.errors[collection] = str(e)
+            raise
+        self.stores[collection] = store
+        with self._lock:
+            self.states[collection] = CollectionState.ready
+        logger.info(
+            'Initialized collection `%s` in %.2f s',
+            collection,
+            time.perf_counter() - start,
+        )
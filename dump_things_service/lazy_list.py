@@ -35,6 +35,11 @@ if TYPE_CHECKING:
 
 
 class LazyList(list, metaclass=ABCMeta):
+    # Lists of the same family generate the same kind of elements and can be
+    # combined in a `PriorityList`. `None` restricts combinations to lists of
+    # the same class.
+    family: str | None = None
+
     class LazyListIterator:
         def __init__(self, lazy_list: LazyList):
             self.lazy_list = lazy_list
@@ -189,7 +194,11 @@ class PriorityList(LazyList):
     ) -> PriorityList:
         # Check the type
         if self.type:
-            if not isinstance(input_list, self.type):
+            if (
+                input_list.family != self.type.family
+                if self.type.family
+                else not isinstance(input_list, self.type)
+            ):
                 msg = f'Expected input_list of type {self.type}, got {type(input_list)}'
                 raise TypeError(msg)
         else:
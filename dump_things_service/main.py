@@ -1,7 +1,11 @@
 from __future__ import annotations  # noqa: I001 -- the patches have to be imported early
 
 import argparse
+import asyncio
+import functools
+import json
 import logging
+import time
 from pathlib import Path
 from typing import (
     Annotated,  # noqa F401 -- used by generated code
@@ -17,7 +21,9 @@ from fastapi import (
     Body,  # noqa F401 -- used by generated code
     Depends,
     FastAPI,
+    Header,
     HTTPException,
+    Query,
     Response,  # noqa F401 -- used by generated code
 )
 from fastapi.middleware.cors import CORSMiddleware
@@ -29,32 +35,35 @@ from fastapi_pagination import (
 from fastapi_pagination.utils import disable_installed_extensions_check
 from pydantic import (
     BaseModel,
-    TypeAdapter,
     ValidationError,
 )
 from starlette.responses import (
     JSONResponse,
     PlainTextResponse,
     RedirectResponse,
+    StreamingResponse,
 )
 
 from dump_things_service import (
+    HTTP_200_OK,
     HTTP_400_BAD_REQUEST,
     HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
     HTTP_422_UNPROCESSABLE_CONTENT,
+    HTTP_503_SERVICE_UNAVAILABLE,
     Format,
     config_file_name,
 )
 from dump_things_service.__about__ import __version__
 from dump_things_service.api_key import api_key_header_scheme
+from dump_things_service.backends import create_content_hash
 from dump_things_service.config import (
     get_config,
     process_config,
 )
 from dump_things_service.converter import (
-    FormatConverter,
     ConvertingList,
+    get_format_converter,
 )
 from dump_things_service.curated import (
     create_curated_endpoints,
@@ -62,6 +71,10 @@ from dump_things_service.curated import (
     store_curated_record,  # noqa F401 -- used by generated code
 )
 from dump_things_service.exceptions import CurieResolutionError
+from dump_things_service.initialization import (
+    CollectionInitialization,
+    CollectionState,
+)
 from dump_things_service.incoming import (
     create_incoming_endpoints,
     router as incoming_router,
@@ -75,23 +88,46 @@ from dump_things_service.lazy_list import (
     PriorityList,
     ModifierList,
 )
-from dump_things_service.model import (
-    get_classes,
-    get_subclasses,
+from dump_things_service.metrics import (
+    MetricsMiddleware,
+    render_metrics,
+)
+from dump_things_service.openapi_cache import (
+    OpenAPICache,
+    get_openapi_cache_key,
+    install_openapi_cache,
 )
+from dump_things_service.parametrized_endpoints import create_parametrized_endpoints
+from dump_things_service.store.model_store import inline_references
 from dump_things_service.utils import (
     check_bounds,
     check_collection,
     combine_ttl,
+    create_etag,
+    create_record_headers,
+    etag_matches,
+    fields_description,
+    filters_description,
     get_default_token_name,
     get_token_store,
     join_default_token_permissions,
+    not_modified_response,
+    parse_fields,
+    parse_filters,
     process_token,
+    retry_after,
     wrap_http_exception,
 )
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from dump_things_service.backends import (
+        ChangeInfo,
+        StorageBackend,
+    )
     from dump_things_service.lazy_list import LazyList
+    from dump_things_service.store.model_store import _ModelStore
 
 
 class TokenCapabilityRequest(BaseModel):
@@ -112,10 +148,30 @@ class ServerResponse(BaseModel):
     collections: list[ServerCollectionResponse|ServerCollectionCountedResponse]
 
 
+class ReadinessCollectionResponse(BaseModel):
+    name: str
+    state: CollectionState
+    error: str | None = None
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    collections: list[ReadinessCollectionResponse]
+
+
 logging.basicConfig(level=logging.WARNING)
 
 logger = logging.getLogger('dump_things_service')
 
+# Number of changes that are read from a backend in one query
+change_chunk_size = 1000
+# Interval in seconds between two change queries during long polling
+change_poll_interval = 0.2
+# Maximum long polling time in seconds
+max_change_wait = 60.0
+# Maximum depth of inlined references in record reads
+max_inline_depth = 5
+
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--host', default='0.0.0.0')  # noqa S104
@@ -137,6 +193,23 @@ parser.add_argument(
     default='WARNING',
     help="Set the log level for the service, allowed values are 'ERROR', 'WARNING', 'INFO', 'DEBUG'. Default is 'warning'.",
 )
+parser.add_argument(
+    '--endpoints',
+    choices=['per-class', 'parametrized'],
+    default='per-class',
+    help="Select how record-write endpoints are created. 'per-class' creates a route for every class in every collection. 'parametrized' creates a single route per endpoint with 'collection' and 'class_name' path parameters, which reduces startup time and routing overhead for large schemas. Default is 'per-class'.",
+)
+parser.add_argument(
+    '--class-docs',
+    action='store_true',
+    help="Add per-class documentation to the OpenAPI schema if '--endpoints parametrized' is used. The documentation is created when the OpenAPI schema is requested for the first time.",
+)
+parser.add_argument(
+    '--collection-initialization',
+    choices=[mode.value for mode in CollectionInitialization],
+    default=CollectionInitialization.blocking.value,
+    help="Select when the curated stores of collections are initialized, e.g., when indices are built. 'blocking' initializes all collections concurrently before the service starts. 'background' starts the service immediately and initializes all collections concurrently in the background. 'lazy' initializes a collection when it is accessed for the first time. Requests to collections that are not yet initialized are answered with status 503. Default is 'blocking'.",
+)
 parser.add_argument(
     'store',
     help='The root of the data stores, it should contain a global_store and token_stores.',
@@ -240,6 +313,9 @@ process_config(
     config_file=config_path,
     order_by=['pid'],
     globals_dict=globals(),
+    collection_initialization=CollectionInitialization(
+        arguments.collection_initialization
+    ),
 )
 g_instance_config = get_config()
 
@@ -303,13 +379,13 @@ def store_record(
 
     if input_format == Format.ttl:
         with wrap_http_exception(ValueError, status_code=HTTP_422_UNPROCESSABLE_CONTENT, header='Conversion error'):
-            json_object = FormatConverter(
+            json_object = get_format_converter(
                 g_instance_config.schemas[collection],
                 input_format=Format.ttl,
                 output_format=Format.json,
             ).convert(data, class_name)
         with wrap_http_exception(ValidationError, status_code=HTTP_422_UNPROCESSABLE_CONTENT, header='Validation error'):
-            record = TypeAdapter(getattr(model, class_name)).validate_python(json_object)
+            record = g_instance_config.type_adapters[collection][class_name].validate_python(json_object)
     else:
         record = data
 
@@ -320,7 +396,7 @@ def store_record(
         stored_records = store.store_object(obj=record, submitter=user_id)
 
     if input_format == Format.ttl:
-        format_converter = FormatConverter(
+        format_converter = get_format_converter(
             g_instance_config.schemas[collection],
             input_format=Format.json,
             output_format=Format.ttl,
@@ -383,13 +459,13 @@ def validate_record(
 
     if input_format == Format.ttl:
         with wrap_http_exception(ValueError, status_code=HTTP_422_UNPROCESSABLE_CONTENT, header='Conversion error'):
-            json_object = FormatConverter(
+            json_object = get_format_converter(
                 g_instance_config.schemas[collection],
                 input_format=Format.ttl,
                 output_format=Format.json,
             ).convert(data, class_name)
         with wrap_http_exception(ValidationError, status_code=HTTP_422_UNPROCESSABLE_CONTENT, header='Validation error'):
-            TypeAdapter(getattr(model, class_name)).validate_python(json_object)
+            g_instance_config.type_adapters[collection][class_name].validate_python(json_object)
     else:
         # Try to convert it into TTL to detect potential errors before storing
         # the record
@@ -422,6 +498,57 @@ async def server() -> ServerResponse:
     )
 
 
+@app.get(
+    '/ready',
+    tags=['Server info'],
+    name='get the initialization state of collections',
+    responses={HTTP_503_SERVICE_UNAVAILABLE: {'model': ReadinessResponse}},
+)
+async def ready(
+    collection: list[str] | None = Query(
+        default=None,
+        description='The collections that should be reported. All collections are reported if no collection is given.',
+    ),
+) -> JSONResponse:
+    if collection:
+        for name in collection:
+            check_collection(g_instance_config, name, require_ready=False)
+    initializer = g_instance_config.collection_initializer
+    collection_responses = [
+        ReadinessCollectionResponse(
+            name=name,
+            state=initializer.states[name],
+            error=initializer.errors.get(name),
+        )
+        for name in collection or g_instance_config.collections
+    ]
+    all_ready = all(
+        collection_response.state == CollectionState.ready
+        for collection_response in collection_responses
+    )
+    return JSONResponse(
+        ReadinessResponse(
+            ready=all_ready,
+            collections=collection_responses,
+        ).model_dump(mode='json'),
+        status_code=HTTP_200_OK if all_ready else HTTP_503_SERVICE_UNAVAILABLE,
+        headers=None if all_ready else {'Retry-After': str(retry_after)},
+    )
+
+
+@app.get(
+    '/metrics',
+    tags=['Server info'],
+    name='get server metrics in Prometheus text format',
+    response_class=PlainTextResponse,
+)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        render_metrics(),
+        media_type='text/plain; version=0.0.4',
+    )
+
+
 @app.get(
     '/{collection}/record',
     tags=['Read records'],
@@ -431,38 +558,117 @@ async def read_record_with_pid(
     collection: str,
     pid: str,
     format: Format = Format.json,  # noqa A002
+    inline_depth: int = Query(
+        default=0,
+        ge=0,
+        le=max_inline_depth,
+        description='Replace references to other records with the referenced '
+                    'records, up to the given depth.',
+    ),
     api_key: str = Depends(api_key_header_scheme),
+    if_none_match: str | None = Header(default=None),
 ):
     check_collection(g_instance_config, collection)
+    model_stores = await _get_readable_stores(collection, api_key)
 
-    final_permissions, token_store = await process_token(
-        g_instance_config, api_key, collection
-    )
-
-    class_name, json_object = None, None
-    if final_permissions.incoming_read:
+    # Determine the store that holds the record and the entity tag of the
+    # record. Backends determine the content hash from their index, i.e.,
+    # conditional requests are answered without reading the record.
+    model_store, content_hash = None, None
+    for model_store in model_stores:
         with wrap_http_exception(CurieResolutionError, header='CURIE error:'):
-            class_name, json_object = token_store.get_object_by_pid(pid)
+            content_hash = model_store.get_content_hash_by_pid(pid)
+        if content_hash:
+            break
 
-    if not json_object and final_permissions.curated_read:
-        with wrap_http_exception(CurieResolutionError, header='CURIE error:'):
-            class_name, json_object = g_instance_config.curated_stores[
-                collection
-            ].get_object_by_pid(pid)
+    if not content_hash:
+        return None
+
+    etag = create_etag(content_hash, format)
+    if not inline_depth and etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    with wrap_http_exception(CurieResolutionError, header='CURIE error:'):
+        class_name, json_object = model_store.get_object_by_pid(pid)
 
     if not json_object:
         return None
 
+    if inline_depth:
+        # The representation depends on the referenced records, the entity
+        # tag is determined from the result.
+        json_object = inline_references(json_object, model_stores, inline_depth)
+        etag = create_etag(create_content_hash(json_object), format)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+
+    headers = create_record_headers(
+        etag,
+        model_store.get_submission_time(json_object),
+    )
     if format == Format.ttl:
-        converter = FormatConverter(
+        converter = get_format_converter(
             schema=g_instance_config.schemas[collection],
             input_format=Format.json,
             output_format=format,
         )
         with wrap_http_exception(ValueError, header='Conversion error'):
             ttl_record = converter.convert(json_object, class_name)
-        return PlainTextResponse(ttl_record, media_type='text/turtle')
-    return json_object
+        return PlainTextResponse(
+            ttl_record,
+            media_type='text/turtle',
+            headers=headers,
+        )
+    return JSONResponse(json_object, headers=headers)
+
+
+@app.get(
+    '/{collection}/record/referrers',
+    tags=['Read records'],
+    name='Read the references to the record with the given PID from the given collection',
+)
+async def read_referrers(
+    collection: str,
+    pid: str,
+    api_key: str = Depends(api_key_header_scheme),
+) -> list[dict]:
+    check_collection(g_instance_config, collection)
+    model_stores = await _get_readable_stores(collection, api_key)
+
+    # References are looked up in the reference index of the backends, i.e.,
+    # without reading records. References from incoming areas are returned
+    # first.
+    result, seen = [], set()
+    for model_store in model_stores:
+        with wrap_http_exception(CurieResolutionError, header='CURIE error:'):
+            references = model_store.get_referrers(pid)
+        for reference in references:
+            if (reference.iri, reference.slot) in seen:
+                continue
+            seen.add((reference.iri, reference.slot))
+            result.append({
+                'pid': reference.pid,
+                'class_name': reference.class_name,
+                'slot': reference.slot,
+            })
+    return result
+
+
+async def _get_readable_stores(
+    collection: str,
+    api_key: str | None,
+) -> list[_ModelStore]:
+    """Get the stores that the token can read, incoming stores first"""
+    final_permissions, token_store = await process_token(
+        g_instance_config, api_key, collection
+    )
+
+    model_stores = []
+    if final_permissions.incoming_read:
+        model_stores.append(token_store)
+    if final_permissions.curated_read:
+        model_stores.append(g_instance_config.curated_stores[collection])
+    return model_stores
 
 
 @app.get(
@@ -474,12 +680,20 @@ async def read_all_records(
         collection: str,
         matching: str | None = None,
         format: Format = Format.json,  # noqa A002
+        fields: str | None = Query(default=None, description=fields_description),
+        filters: list[str] = Query(
+            default=[],
+            alias='filter',
+            description=filters_description,
+        ),
         api_key: str = Depends(api_key_header_scheme),
 ):
     return await _read_all_records(
         collection=collection,
         matching=matching,
         format=format,
+        fields=fields,
+        filters=filters,
         api_key=api_key,
         # Set an upper limit for the number of non-paginated result records to
         # keep processing time for individual requests short and avoid
@@ -497,12 +711,20 @@ async def read_all_records_paginated(
         collection: str,
         matching: str | None = None,
         format: Format = Format.json,  # noqa A002
+        fields: str | None = Query(default=None, description=fields_description),
+        filters: list[str] = Query(
+            default=[],
+            alias='filter',
+            description=filters_description,
+        ),
         api_key: str = Depends(api_key_header_scheme),
 ) -> Page[dict | str]:
     result_list = await _read_all_records(
         collection=collection,
         matching=matching,
         format=format,
+        fields=fields,
+        filters=filters,
         api_key=api_key,
         bound=None,
     )
@@ -519,6 +741,12 @@ async def read_records_of_type(
     class_name: str,
     matching: str | None = None,
     format: Format = Format.json,  # noqa A002
+    fields: str | None = Query(default=None, description=fields_description),
+    filters: list[str] = Query(
+        default=[],
+        alias='filter',
+        description=filters_description,
+    ),
     api_key: str = Depends(api_key_header_scheme),
 ):
     return await _read_records_of_type(
@@ -526,6 +754,8 @@ async def read_records_of_type(
         class_name=class_name,
         matching=matching,
         format=format,
+        fields=fields,
+        filters=filters,
         api_key=api_key,
         # Set an upper limit for the number of non-paginated result records to
         # keep processing time for individual requests short and avoid
@@ -544,6 +774,12 @@ async def read_records_of_type_paginated(
     class_name: str,
     matching: str | None = None,
     format: Format = Format.json,  # noqa A002
+    fields: str | None = Query(default=None, description=fields_description),
+    filters: list[str] = Query(
+        default=[],
+        alias='filter',
+        description=filters_description,
+    ),
     api_key: str = Depends(api_key_header_scheme),
 ) -> Page[dict | str]:
     result_list = await _read_records_of_type(
@@ -551,16 +787,88 @@ async def read_records_of_type_paginated(
         class_name=class_name,
         matching=matching,
         format=format,
+        fields=fields,
+        filters=filters,
         api_key=api_key,
         bound=None,
     )
     return paginate(result_list)
 
 
+@app.get(
+    '/{collection}/changes',
+    tags=['Read records'],
+    name='Read changes of the curated area of the given collection',
+    response_class=StreamingResponse,
+)
+async def read_changes(
+    collection: str,
+    since: int = Query(default=0, ge=0),
+    limit: int | None = Query(default=None, gt=0),
+    wait: float = Query(default=0.0, ge=0.0, le=max_change_wait),
+    api_key: str = Depends(api_key_header_scheme),
+) -> StreamingResponse:
+    check_collection(g_instance_config, collection)
+    final_permissions, _ = await process_token(
+        g_instance_config, api_key, collection
+    )
+    if not final_permissions.curated_read:
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN,
+            detail=f"No read access to curated data in collection '{collection}'.",
+        )
+
+    backend = g_instance_config.curated_stores[collection].backend
+
+    # Long polling: wait up to `wait` seconds for the first change
+    chunk_size = min(limit or change_chunk_size, change_chunk_size)
+    deadline = time.monotonic() + wait
+    changes = await asyncio.to_thread(backend.get_changes, since, chunk_size)
+    while not changes and time.monotonic() < deadline:
+        await asyncio.sleep(min(change_poll_interval, deadline - time.monotonic()))
+        changes = await asyncio.to_thread(backend.get_changes, since, chunk_size)
+
+    return StreamingResponse(
+        _stream_changes(backend, changes, limit),
+        media_type='application/x-ndjson',
+    )
+
+
+async def _stream_changes(
+    backend: StorageBackend,
+    changes: list[ChangeInfo],
+    limit: int | None,
+) -> AsyncGenerator[str]:
+    # Changes are read in chunks, i.e., the size of the response is not
+    # limited by the available memory.
+    remaining = limit
+    while changes:
+        for change in changes:
+            yield json.dumps({
+                'seq': change.seq,
+                'iri': change.iri,
+                'class_name': change.class_name,
+                'operation': change.operation.value,
+            }) + '\n'
+        if remaining is not None:
+            remaining -= len(changes)
+            if remaining <= 0:
+                return
+        if len(changes) < change_chunk_size:
+            return
+        changes = await asyncio.to_thread(
+            backend.get_changes,
+            changes[-1].seq,
+            min(remaining or change_chunk_size, change_chunk_size),
+        )
+
+
 async def _read_all_records(
         collection: str,
         matching: str | None = None,
         format: Format = Format.json,  # noqa A002
+        fields: str | None = None,
+        filters: list[str] | None = None,
         api_key: str = Depends(api_key_header_scheme),
         bound: int | None = None,
 ) -> LazyList:
@@ -572,13 +880,18 @@ async def _read_all_records(
         ) from e
 
     check_collection(g_instance_config, collection)
+    selected_fields = parse_fields(fields, format)
+    selected_filters = parse_filters(filters)
     final_permissions, token_store = await process_token(
         g_instance_config, api_key, collection
     )
 
     result_list = PriorityList()
     if final_permissions.incoming_read:
-        token_store_list = token_store.get_all_objects(matching=matching)
+        token_store_list = token_store.get_all_objects(
+            matching=matching,
+            filters=selected_filters,
+        ).select_fields(selected_fields)
         if bound:
             check_bounds(len(token_store_list), bound, collection, 'records/p/')
         result_list.add_list(token_store_list)
@@ -588,7 +901,8 @@ async def _read_all_records(
             collection
         ].get_all_objects(
             matching=matching,
-        )
+            filters=selected_filters,
+        ).select_fields(selected_fields)
         if bound:
             check_bounds(len(curated_store_list), bound, collection, 'records/p/')
         result_list.add_list(curated_store_list)
@@ -617,6 +931,8 @@ async def _read_records_of_type(
     class_name: str,
     matching: str | None = None,
     format: Format = Format.json,  # noqa A002
+    fields: str | None = None,
+    filters: list[str] | None = None,
     api_key: str = Depends(api_key_header_scheme),
     bound: int | None = None,
 ) -> LazyList:
@@ -627,39 +943,42 @@ async def _read_records_of_type(
         ) from e
 
     check_collection(g_instance_config, collection)
-    model = g_instance_config.model_info[collection][0]
     if class_name not in g_instance_config.use_classes[collection]:
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND,
             detail=f"No '{class_name}'-class in collection '{collection}'.",
         )
+    selected_fields = parse_fields(fields, format)
+    selected_filters = parse_filters(filters)
 
     final_permissions, token_store = await process_token(
         g_instance_config, api_key, collection
     )
 
     result_list = PriorityList()
+    # `get_objects_of_class` includes all subclasses of `class_name` in a
+    # single backend query.
     if final_permissions.incoming_read:
-        for search_class_name in get_subclasses(model, class_name):
-            token_store_list = token_store.get_objects_of_class(
-                class_name=search_class_name,
-                matching=matching,
-            )
-            if bound:
-                check_bounds(len(token_store_list), bound, collection, f'/records/p/{class_name}')
-            result_list.add_list(token_store_list)
+        token_store_list = token_store.get_objects_of_class(
+            class_name=class_name,
+            matching=matching,
+            filters=selected_filters,
+        ).select_fields(selected_fields)
+        if bound:
+            check_bounds(len(token_store_list), bound, collection, f'/records/p/{class_name}')
+        result_list.add_list(token_store_list)
 
     if final_permissions.curated_read:
-        for search_class_name in get_subclasses(model, class_name):
-            curated_store_list = g_instance_config.curated_stores[
-                collection
-            ].get_objects_of_class(
-                class_name=search_class_name,
-                matching=matching,
-            )
-            if bound:
-                check_bounds(len(curated_store_list), bound, collection, f'/records/p/{class_name}')
-            result_list.add_list(curated_store_list)
+        curated_store_list = g_instance_config.curated_stores[
+            collection
+        ].get_objects_of_class(
+            class_name=class_name,
+            matching=matching,
+            filters=selected_filters,
+        ).select_fields(selected_fields)
+        if bound:
+            check_bounds(len(curated_store_list), bound, collection, f'/records/p/{class_name}')
+        result_list.add_list(curated_store_list)
 
     # Sort the result list.
     result_list.sort(key=result_list.sort_key)
@@ -714,12 +1033,46 @@ async def delete_record(
 
 # Create dynamic endpoints and rebuild the app to include all dynamically
 # created endpoints.
-create_store_endpoints(app, g_instance_config, tag_info, 'placeholder_write', globals())
-create_validate_endpoints(app, g_instance_config, tag_info, 'placeholder_validate', globals())
-create_curated_endpoints(app, tag_info, 'placeholder_curated_write', globals())
-create_incoming_endpoints(app, tag_info, 'placeholder_incoming_write', globals())
-app.openapi_schema = None
-app.setup()
+if arguments.endpoints == 'parametrized':
+    create_parametrized_endpoints(
+        app,
+        g_instance_config,
+        tag_info,
+        {
+            'store': 'placeholder_write',
+            'validate': 'placeholder_validate',
+            'curated': 'placeholder_curated_write',
+            'incoming': 'placeholder_incoming_write',
+        },
+        store_record,
+        validate_record,
+        class_docs=arguments.class_docs,
+    )
+else:
+    create_store_endpoints(app, g_instance_config, tag_info, 'placeholder_write', globals())
+    create_validate_endpoints(app, g_instance_config, tag_info, 'placeholder_validate', globals())
+    create_curated_endpoints(app, tag_info, 'placeholder_curated_write', globals())
+    create_incoming_endpoints(app, tag_info, 'placeholder_incoming_write', globals())
+
+
+# Serve the OpenAPI schema from a persistent cache. The schema is generated in
+# the background when the application starts.
+install_openapi_cache(
+    app,
+    OpenAPICache(
+        app.openapi,
+        store_path / '.openapi_cache',
+        # The key covers the JSON schemas of all models, it is computed in
+        # the background generation thread, not at import time.
+        functools.partial(
+            get_openapi_cache_key,
+            app,
+            g_instance_config,
+            config_path.read_text(),
+            extra=(arguments.endpoints, str(arguments.class_docs)),
+        ),
+    ),
+)
 
 
 # Add CORS origins
@@ -731,6 +1084,9 @@ app.add_middleware(
     allow_headers=['*'],
 )
 
+# Add request timing
+app.add_middleware(MetricsMiddleware)
+
 # Add pagination
 add_pagination(app)
 
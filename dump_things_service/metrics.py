@@ -0,0 +1,271 @@
+"""Runtime metrics in the Prometheus text exposition format
+
+The service records timings of HTTP requests, storage backend operations,
+format conversions, and authentication requests in histograms. The metrics
+are exposed via the `/metrics` endpoint, together with the statistics of all
+caches that are created with `dump_things_service.cache.TTLCache`.
+
+Timings are collected by instrumentation hooks and not by timers in the
+individual code paths:
+
+- `MetricsMiddleware` times all requests per route template,
+- `instrument_methods` wraps methods of a class, it is used by
+  `StorageBackend.__init_subclass__` to time all backend operations,
+- `Histogram.time` can be used as context manager or decorator.
+"""
+
+from __future__ import annotations
+
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+)
+
+from dump_things_service.cache import get_cache_statistics
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        Generator,
+        Iterable,
+    )
+
+
+__all__ = [
+    'Histogram',
+    'MetricsMiddleware',
+    'auth_seconds',
+    'backend_seconds',
+    'conversion_seconds',
+    'instrument_methods',
+    'render_metrics',
+    'request_seconds',
+]
+
+
+default_buckets = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Label value for requests that do not match any route. This keeps the number
+# of label values bounded.
+unmatched_route = '<unmatched>'
+
+_histograms: dict[str, Histogram] = {}
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str],
+        buckets: Iterable[float] = default_buckets,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> [bucket counts..., count, sum]
+        self._values: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        _histograms[name] = self
+
+    def observe(
+        self,
+        value: float,
+        **labels: str,
+    ):
+        label_values = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(label_values)
+            if values is None:
+                values = [0] * (len(self.buckets) + 1) + [0.0]
+                self._values[label_values] = values
+            # Bucket counts are not cumulative here, they are accumulated in
+            # `render`.
+            if index < len(self.buckets):
+                values[index] += 1
+            values[-2] += 1
+            values[-1] += value
+
+    @contextmanager
+    def time(
+        self,
+        **labels: str,
+    ) -> Generator[None, None, None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            values = {key: list(value) for key, value in self._values.items()}
+        for label_values, counts in sorted(values.items()):
+            labels = _format_labels(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le_labels = _format_labels(
+                    [*zip(self.label_names, label_values), ('le', repr(bound))]
+                )
+                lines.append(f'{self.name}_bucket{le_labels} {cumulative}')
+            le_labels = _format_labels(
+                [*zip(self.label_names, label_values), ('le', '+Inf')]
+            )
+            lines.append(f'{self.name}_bucket{le_labels} {counts[-2]}')
+            lines.append(f'{self.name}_count{labels} {counts[-2]}')
+            lines.append(f'{self.name}_sum{labels} {counts[-1]!r}')
+        return lines
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    def escape(value: str) -> str:
+        return (
+            value.replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n')
+        )
+
+    content = ','.join(f'{name}="{escape(value)}"' for name, value in labels)
+    return '{' + content + '}' if content else ''
+
+
+request_seconds = Histogram(
+    'dump_things_request_duration_seconds',
+    'Duration of HTTP requests per route template',
+    ('method', 'route', 'status'),
+)
+
+backend_seconds = Histogram(
+    'dump_things_backend_operation_duration_seconds',
+    'Duration of storage backend operations',
+    ('backend', 'operation'),
+)
+
+conversion_seconds = Histogram(
+    'dump_things_conversion_duration_seconds',
+    'Duration of format conversions',
+    ('input_format', 'output_format'),
+)
+
+auth_seconds = Histogram(
+    'dump_things_authentication_duration_seconds',
+    'Duration of token authentication per authentication source',
+    ('source',),
+)
+
+
+def instrument_methods(
+    cls: type,
+    method_names: Iterable[str],
+    histogram: Histogram,
+    **labels: str,
+):
+    """Time all calls of the methods `method_names` that are defined in `cls`
+
+    Only methods that are defined in `cls` itself are wrapped, inherited
+    methods are already wrapped in the class that defines them. The label
+    `operation` is set to the method name.
+    """
+    for name in method_names:
+        method = cls.__dict__.get(name)
+        if method is None or getattr(method, '__isabstractmethod__', False):
+            continue
+        setattr(cls, name, _timed_method(method, histogram, name, labels))
+
+
+def _timed_method(
+    method: Callable,
+    histogram: Histogram,
+    operation: str,
+    labels: dict[str, str],
+) -> Callable:
+    if inspect.iscoroutinefunction(method):
+        @wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            with histogram.time(operation=operation, **labels):
+                return await method(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with histogram.time(operation=operation, **labels):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records the duration of HTTP requests
+
+    Requests are labeled with the route template, e.g.,
+    `/{collection}/record`, and not with the request path, to keep the number
+    of label values bounded.
+    """
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = ['500']
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = str(message['status'])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matching route in the scope.
+            route = scope.get('route')
+            request_seconds.observe(
+                time.perf_counter() - start,
+                method=scope['method'],
+                route=getattr(route, 'path', unmatched_route),
+                status=status[0],
+            )
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    lines = []
+    for histogram in _histograms.values():
+        lines.extend(histogram.render())
+
+    cache_statistics = get_cache_statistics()
+    for name, metric_type, documentation in (
+        ('hits', 'counter', 'Number of cache hits'),
+        ('stale_hits', 'counter', 'Number of stale cache hits'),
+        ('misses', 'counter', 'Number of cache misses'),
+        ('evictions', 'counter', 'Number of evicted cache entries'),
+        ('expirations', 'counter', 'Number of expired cache entries'),
+        ('hit_ratio', 'gauge', 'Ratio of cache hits to cache lookups'),
+        ('size', 'gauge', 'Number of entries in the cache'),
+    ):
+        metric_name = f'dump_things_cache_{name}'
+        if metric_type == 'counter':
+            metric_name += '_total'
+        lines.append(f'# HELP {metric_name} {documentation}')
+        lines.append(f'# TYPE {metric_name} {metric_type}')
+        lines.extend(
+            f'{metric_name}{_format_labels([("cache", cache)])} {statistics[name]}'
+            for cache, statistics in sorted(cache_statistics.items())
+        )
+    return '\n'.join(lines) + '\n'
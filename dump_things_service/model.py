@@ -19,10 +19,10 @@ from linkml.generators import (
     PythonGenerator,
 )
 from linkml_runtime import SchemaView
-from pydantic._internal._model_construction import ModelMetaclass
 
 # Ensure linkml is patched
 import dump_things_service.patches.enabled  # noqa F401 -- apply patches
+from dump_things_service.schema_index import get_schema_index
 
 if TYPE_CHECKING:
     from types import ModuleType
@@ -58,12 +58,7 @@ def get_subclasses(
     class_name: str,
 ) -> list[str]:
     """get names of all subclasses (includes class_name itself)"""
-    super_class = getattr(model, class_name)
-    return [
-        name
-        for name, obj in model.__dict__.items()
-        if isinstance(obj, ModelMetaclass) and issubclass(obj, super_class)
-    ]
+    return get_schema_index(model).get_subclasses(class_name)
 
 
 def compile_module_with_increasing_recursion_limit(
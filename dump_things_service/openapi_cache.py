@@ -0,0 +1,320 @@
+"""Persistent cache for the OpenAPI schema of the service
+
+Generating the OpenAPI schema of an instance with many collections and classes
+takes a long time. FastAPI generates the schema on the first request to
+`/openapi.json` or `/docs`, in the event loop, i.e., the worker does not
+process other requests during the generation.
+
+`OpenAPICache` generates the schema once, in a background thread that is
+started when the application starts, and stores it on disk. The file name
+contains a hash of everything that determines the schema, i.e., the service
+version, the configuration, the JSON schemas of the models, and the routes.
+Computing the JSON schemas of large models takes a noticeable amount of time,
+the hash is therefore computed in the background thread as well. After a
+restart with an unchanged configuration and unchanged schemas, the schema is
+read from disk.
+
+The cache also provides per-collection schemas, which contain only the
+paths of a single collection and the component schemas that they reference.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+)
+
+from fastapi import HTTPException
+from pydantic.json_schema import models_json_schema
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from dump_things_service import HTTP_404_NOT_FOUND
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from fastapi import FastAPI
+    from starlette.requests import Request
+
+    from dump_things_service.config import InstanceConfig
+
+
+__all__ = [
+    'OpenAPICache',
+    'get_openapi_cache_key',
+    'install_openapi_cache',
+]
+
+logger = logging.getLogger('dump_things_service')
+
+cache_file_prefix = 'openapi-'
+
+
+def get_openapi_cache_key(
+    app: FastAPI,
+    instance_config: InstanceConfig,
+    config_text: str,
+    extra: Iterable[str] = (),
+) -> str:
+    """Get a hash of all inputs that determine the OpenAPI schema of `app`
+
+    :param app: The application, its version and its routes are hashed.
+    :param instance_config: The instance configuration, the JSON schemas of
+        all classes that are used in any collection are hashed. They contain
+        the descriptions, enums, and patterns of the LinkML schema, i.e.,
+        changes of a schema at an unchanged location change the key.
+    :param config_text: The content of the configuration file.
+    :param extra: Additional strings that affect the schema, e.g., command
+        line options.
+    """
+    digest = hashlib.sha256()
+
+    def update(*values: Any):
+        for value in values:
+            digest.update(str(value).encode())
+            digest.update(b'\0')
+
+    update(app.version, config_text, *extra)
+    for route in app.routes:
+        update(
+            getattr(route, 'path', ''),
+            sorted(getattr(route, 'methods', None) or []),
+            getattr(route, 'name', ''),
+        )
+    for collection, (model, _, _) in sorted(instance_config.model_info.items()):
+        class_names = instance_config.use_classes[collection]
+        _, json_schema = models_json_schema(
+            [
+                (getattr(model, class_name), 'validation')
+                for class_name in class_names
+            ]
+        )
+        update(
+            collection,
+            instance_config.schemas[collection],
+            *class_names,
+            json.dumps(json_schema, sort_keys=True, default=str),
+        )
+    return digest.hexdigest()
+
+
+class OpenAPICache:
+    def __init__(
+        self,
+        generate: Callable[[], dict[str, Any]],
+        cache_dir: Path,
+        key: str | Callable[[], str],
+    ):
+        """
+        Create an OpenAPI schema cache.
+
+        :param generate: A callable that generates the OpenAPI schema, e.g.,
+            the original `FastAPI.openapi`-method.
+        :param cache_dir: The directory in which the schema is stored.
+        :param key: A hash of all inputs that determine the schema, see
+            `get_openapi_cache_key`, or a callable that returns the hash.
+            The callable is called when the schema is requested for the
+            first time.
+        """
+        self.generate = generate
+        self.cache_dir = cache_dir
+        self.key = key
+        self.path: Path | None = None
+        self.schema: dict[str, Any] | None = None
+        self.collection_schemas: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_schema(self) -> dict[str, Any]:
+        """Get the OpenAPI schema, read or generate it if necessary
+
+        Concurrent callers wait for a single generation.
+        """
+        with self._lock:
+            if self.schema is None:
+                key = self.key() if callable(self.key) else self.key
+                self.path = self.cache_dir / f'{cache_file_prefix}{key}.json'
+                self.schema = self._read() or self._generate_and_write()
+            return self.schema
+
+    def get_collection_schema(
+        self,
+        collection: str,
+    ) -> dict[str, Any] | None:
+        """Get an OpenAPI schema that only contains paths of `collection`
+
+        The result contains all paths that start with `/<collection>/`, and
+        all paths that have a `collection` path parameter. It contains only
+        the component schemas that are referenced by these paths.
+
+        :return: The schema or `None` if no path belongs to `collection`.
+        """
+        schema = self.get_schema()
+        with self._lock:
+            if collection not in self.collection_schemas:
+                self.collection_schemas[collection] = _get_collection_schema(
+                    schema,
+                    collection,
+                )
+            return self.collection_schemas[collection]
+
+    def start_background_generation(self):
+        threading.Thread(
+            target=self.get_schema,
+            name='openapi-generator',
+            daemon=True,
+        ).start()
+
+    def _read(self) -> dict[str, Any] | None:
+        try:
+            with self.path.open('rt', encoding='utf-8') as f:
+                schema = json.load(f)
+        except (OSError, ValueError):
+            return None
+        logger.info('Read OpenAPI schema from %s', self.path)
+        return schema
+
+    def _generate_and_write(self) -> dict[str, Any]:
+        logger.info('Generating OpenAPI schema...')
+        schema = self.generate()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, to never expose a partially
+            # written schema to other processes.
+            temporary_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            with temporary_path.open('wt', encoding='utf-8') as f:
+                json.dump(schema, f)
+            temporary_path.replace(self.path)
+            # Remove schemas of previous configurations
+            for path in self.cache_dir.glob(f'{cache_file_prefix}*.json'):
+                if path != self.path:
+                    path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning('Could not store OpenAPI schema: %s', e)
+        logger.info('Generation of OpenAPI schema completed.')
+        return schema
+
+
+def _get_collection_schema(
+    schema: dict[str, Any],
+    collection: str,
+) -> dict[str, Any] | None:
+    prefix = f'/{collection}/'
+    paths = {
+        path: path_info
+        for path, path_info in schema['paths'].items()
+        if path.startswith(prefix) or path.startswith('/{collection}/')
+    }
+    if not any(path.startswith(prefix) for path in paths):
+        return None
+
+    # Collect all transitively referenced component schemas
+    component_schemas = schema.get('components', {}).get('schemas', {})
+    referenced = set()
+    pending = [paths]
+    while pending:
+        for reference in _get_references(pending.pop()):
+            name = reference.rsplit('/', 1)[-1]
+            if name not in referenced and name in component_schemas:
+                referenced.add(name)
+                pending.append(component_schemas[name])
+
+    components = {
+        **schema.get('components', {}),
+        'schemas': {
+            name: component_schemas[name]
+            for name in sorted(referenced)
+        },
+    }
+    return {
+        **schema,
+        'paths': paths,
+        'components': components,
+    }
+
+
+def _get_references(value: Any) -> Iterable[str]:
+    if isinstance(value, dict):
+        for key, element in value.items():
+            if key == '$ref' and isinstance(element, str):
+                yield element
+            else:
+                yield from _get_references(element)
+    elif isinstance(value, list):
+        for element in value:
+            yield from _get_references(element)
+
+
+def install_openapi_cache(
+    app: FastAPI,
+    cache: OpenAPICache,
+):
+    """Serve the OpenAPI schema of `app` from `cache`
+
+    The schema is generated in a background thread when the application
+    starts. Requests for the schema are answered without blocking the event
+    loop. The per-collection schemas are available at
+    `/openapi/<collection>.json`.
+    """
+    app.openapi = cache.get_schema
+    app.router.on_startup.append(cache.start_background_generation)
+
+    async def openapi(request: Request) -> JSONResponse:
+        return JSONResponse(
+            _add_root_path(
+                app,
+                request,
+                await asyncio.to_thread(cache.get_schema),
+            )
+        )
+
+    async def collection_openapi(request: Request) -> JSONResponse:
+        collection = request.path_params['collection']
+        schema = await asyncio.to_thread(cache.get_collection_schema, collection)
+        if schema is None:
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND,
+                detail=f"No such collection: '{collection}'.",
+            )
+        return JSONResponse(_add_root_path(app, request, schema))
+
+    # Replace FastAPI's OpenAPI route, which generates the schema in the
+    # event loop, and keep its position in the route list.
+    routes = app.router.routes
+    for index, route in enumerate(routes):
+        if isinstance(route, Route) and route.path == app.openapi_url:
+            routes[index] = Route(app.openapi_url, openapi, include_in_schema=False)
+            break
+    else:
+        app.add_route(app.openapi_url, openapi, include_in_schema=False)
+    app.add_route(
+        '/openapi/{collection}.json',
+        collection_openapi,
+        include_in_schema=False,
+    )
+
+
+def _add_root_path(
+    app: FastAPI,
+    request: Request,
+    schema: dict[str, Any],
+) -> dict[str, Any]:
+    # Like FastAPI, add the root path to the servers of the schema
+    root_path = request.scope.get('root_path', '').rstrip('/')
+    if root_path and app.root_path_in_servers:
+        server_urls = {server.get('url') for server in schema.get('servers', [])}
+        if root_path not in server_urls:
+            return {
+                **schema,
+                'servers': [{'url': root_path}, *schema.get('servers', [])],
+            }
+    return schema
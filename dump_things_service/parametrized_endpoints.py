@@ -0,0 +1,376 @@
+"""Parametrized record-write endpoints
+
+By default, the service creates one route per class and collection for every
+record-write endpoint, i.e., for storing, validating, curated storing, and
+incoming storing of records (see `dynamic_endpoints.py`, `curated.py`, and
+`incoming.py`). With many classes, this results in thousands of routes,
+which slows down startup, OpenAPI generation, and route matching.
+
+In parametrized mode, each record-write endpoint is a single route with
+`collection` and `class_name` path parameters. The request body is validated
+with the per-class `TypeAdapter` from `InstanceConfig.type_adapters`, which is
+created during configuration processing.
+
+Per-class documentation of the endpoints is optional. If it is enabled,
+documentation-only routes are created when the OpenAPI schema is generated
+for the first time. They are not added to the router.
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+from json import loads as json_loads
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    Callable,
+)
+
+from fastapi import (
+    Body,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Request,
+)
+from fastapi.exceptions import RequestValidationError
+from fastapi.openapi.utils import get_openapi
+from fastapi.routing import APIRoute
+from pydantic import ValidationError
+
+from dump_things_service import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+    HTTP_405_METHOD_NOT_ALLOWED,
+    Format,
+)
+from dump_things_service.api_key import api_key_header_scheme
+from dump_things_service.curated import store_curated_record
+from dump_things_service.incoming import store_incoming_record
+from dump_things_service.utils import check_collection
+
+if TYPE_CHECKING:
+    from pydantic import (
+        BaseModel,
+        TypeAdapter,
+    )
+
+    from dump_things_service.config import InstanceConfig
+
+
+__all__ = [
+    'create_parametrized_endpoints',
+]
+
+logger = logging.getLogger('dump_things_service')
+
+
+def create_parametrized_endpoints(
+    app: FastAPI,
+    instance_config: InstanceConfig,
+    tag_info: list[dict[str, str]],
+    placeholders: dict[str, str],
+    store_handler: Callable,
+    validate_handler: Callable,
+    *,
+    class_docs: bool = False,
+):
+    """Create one parametrized route for each record-write endpoint
+
+    :param app: The FastAPI application.
+    :param instance_config: The instance configuration.
+    :param tag_info: The tag list of the application, the placeholders in
+        the list are replaced by the tags of the generated routes.
+    :param placeholders: A mapping from endpoint kind, i.e., `store`,
+        `validate`, `curated`, and `incoming`, to the name of the placeholder
+        tag in `tag_info`.
+    :param store_handler: The handler for storing records, i.e.,
+        `main.store_record`.
+    :param validate_handler: The handler for validating records, i.e.,
+        `main.validate_record`.
+    :param class_docs: If `True`, add per-class documentation for all
+        endpoints to the OpenAPI schema, when it is generated.
+    """
+    logger.info('Creating parametrized endpoints...')
+    type_adapters = instance_config.type_adapters
+
+    def get_type_adapter(collection: str, class_name: str) -> TypeAdapter:
+        check_collection(instance_config, collection)
+        type_adapter = type_adapters[collection].get(class_name)
+        if type_adapter is None:
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND,
+                detail=f"No '{class_name}'-class in collection '{collection}'.",
+            )
+        return type_adapter
+
+    async def store_endpoint(
+        collection: str,
+        class_name: str,
+        request: Request,
+        format: Format = Format.json,  # noqa A002
+        api_key: str | None = Depends(api_key_header_scheme),
+    ):
+        data = await _read_body(
+            request,
+            get_type_adapter(collection, class_name),
+        )
+        return store_handler(
+            collection,
+            data,
+            class_name,
+            instance_config.model_info[collection][0],
+            format,
+            api_key,
+        )
+
+    async def validate_endpoint(
+        collection: str,
+        class_name: str,
+        request: Request,
+        format: Format = Format.json,  # noqa A002
+        api_key: str | None = Depends(api_key_header_scheme),
+    ):
+        data = await _read_body(
+            request,
+            get_type_adapter(collection, class_name),
+        )
+        return validate_handler(
+            collection,
+            data,
+            class_name,
+            instance_config.model_info[collection][0],
+            format,
+            api_key,
+        )
+
+    async def curated_endpoint(
+        collection: str,
+        class_name: str,
+        request: Request,
+        api_key: str | None = Depends(api_key_header_scheme),
+    ):
+        data = await _read_json_body(
+            request,
+            get_type_adapter(collection, class_name),
+        )
+        return await store_curated_record(collection, data, class_name, api_key)
+
+    async def incoming_endpoint(
+        collection: str,
+        label: str,
+        class_name: str,
+        request: Request,
+        api_key: str | None = Depends(api_key_header_scheme),
+    ):
+        data = await _read_json_body(
+            request,
+            get_type_adapter(collection, class_name),
+        )
+        return await store_incoming_record(
+            collection,
+            label,
+            data,
+            class_name,
+            api_key,
+        )
+
+    endpoints = {
+        'store': (
+            '/{collection}/record/{class_name}',
+            store_endpoint,
+            'Write records',
+            'store object of class `class_name` in collection `collection`',
+            True,
+        ),
+        'validate': (
+            '/{collection}/validate/record/{class_name}',
+            validate_endpoint,
+            'Validate records',
+            'validate object of class `class_name` for collection `collection`',
+            True,
+        ),
+        'curated': (
+            '/{collection}/curated/record/{class_name}',
+            curated_endpoint,
+            'Curated area: write records',
+            'curated area: store object of class `class_name` in collection `collection`',
+            False,
+        ),
+        'incoming': (
+            '/{collection}/incoming/{label}/record/{class_name}',
+            incoming_endpoint,
+            'Incoming area: write records',
+            'incoming area: store object of class `class_name` in collection `collection`',
+            False,
+        ),
+    }
+
+    for kind, (path, endpoint, tag_name, name, accepts_ttl) in endpoints.items():
+        app.add_api_route(
+            path=path,
+            endpoint=endpoint,
+            methods=['POST'],
+            name=name,
+            response_model=None,
+            tags=[tag_name],
+            openapi_extra=_request_body_documentation(accepts_ttl=accepts_ttl),
+        )
+        index = tag_info.index({'name': placeholders[kind], 'description': ''})
+        tag_info[index] = {
+            'name': tag_name,
+            'description': '' if accepts_ttl else '(requires **curator token**)',
+        }
+
+    if class_docs:
+        _add_lazy_class_documentation(app, instance_config, endpoints)
+
+    logger.info('Creation of %d parametrized endpoints completed.', len(endpoints))
+
+
+async def _read_body(
+    request: Request,
+    type_adapter: TypeAdapter,
+) -> BaseModel | str:
+    # Like the per-class endpoints, accept JSON-records and plain text, e.g.,
+    # TTL. The handlers check that the data matches the `format` parameter.
+    content_type = request.headers.get('content-type', 'application/json')
+    if not content_type.split(';')[0].strip().endswith('json'):
+        return (await request.body()).decode()
+    return await _read_json_body(request, type_adapter)
+
+
+async def _read_json_body(
+    request: Request,
+    type_adapter: TypeAdapter,
+) -> BaseModel:
+    try:
+        json_object = json_loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail='Invalid JSON data provided.',
+        ) from e
+    try:
+        return type_adapter.validate_python(json_object)
+    except ValidationError as e:
+        # Report validation errors in the same way as the per-class endpoints
+        raise RequestValidationError(
+            [
+                {**error, 'loc': ('body', *error['loc'])}
+                for error in e.errors(include_url=False)
+            ],
+            body=json_object,
+        ) from e
+
+
+def _request_body_documentation(*, accepts_ttl: bool) -> dict[str, Any]:
+    content = {'application/json': {'schema': {'type': 'object'}}}
+    if accepts_ttl:
+        content['text/turtle'] = {'schema': {'type': 'string'}}
+    return {'requestBody': {'required': True, 'content': content}}
+
+
+def _add_lazy_class_documentation(
+    app: FastAPI,
+    instance_config: InstanceConfig,
+    endpoints: dict[str, tuple],
+):
+    def openapi() -> dict[str, Any]:
+        if app.openapi_schema is None:
+            logger.info('Creating per-class endpoint documentation...')
+            app.openapi_schema = get_openapi(
+                title=app.title,
+                version=app.version,
+                openapi_version=app.openapi_version,
+                summary=app.summary,
+                description=app.description,
+                terms_of_service=app.terms_of_service,
+                contact=app.contact,
+                license_info=app.license_info,
+                routes=[
+                    *app.routes,
+                    *_create_documentation_routes(instance_config, endpoints),
+                ],
+                webhooks=app.webhooks.routes,
+                tags=app.openapi_tags,
+                servers=app.servers,
+                separate_input_output_schemas=app.separate_input_output_schemas,
+            )
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+def _create_documentation_routes(
+    instance_config: InstanceConfig,
+    endpoints: dict[str, tuple],
+) -> list[APIRoute]:
+    routes = []
+    for collection, (model, _, _) in instance_config.model_info.items():
+        schema_id = model.linkml_meta['id']
+        for class_name in instance_config.use_classes[collection]:
+            model_class = getattr(model, class_name)
+            for kind, (path, _, tag_name, _, accepts_ttl) in endpoints.items():
+                routes.append(APIRoute(
+                    path=path.format(
+                        collection=collection,
+                        label='{label}',
+                        class_name=class_name,
+                    ),
+                    endpoint=_documentation_endpoint(
+                        model_class,
+                        accepts_ttl=accepts_ttl,
+                        has_label=kind == 'incoming',
+                    ),
+                    methods=['POST'],
+                    name=f'{kind}: "{class_name}" object (schema: {schema_id})',
+                    response_model=None,
+                    tags=[tag_name],
+                ))
+    return routes
+
+
+def _documentation_endpoint(
+    model_class: type[BaseModel],
+    *,
+    accepts_ttl: bool,
+    has_label: bool,
+) -> Callable:
+    # Documentation routes are only passed to `get_openapi` and are never
+    # mounted. FastAPI reads the signature of the endpoint to document the
+    # parameters and the request body. Should a documentation route ever be
+    # called, it rejects the request instead of failing with a server error.
+    async def documentation_endpoint(**_):
+        raise HTTPException(
+            status_code=HTTP_405_METHOD_NOT_ALLOWED,
+            detail='Documentation-only endpoint, use the generic endpoint.',
+        )
+
+    keyword = inspect.Parameter.KEYWORD_ONLY
+    parameters = []
+    if has_label:
+        parameters.append(inspect.Parameter('label', keyword, annotation=str))
+    data_type = (
+        model_class | Annotated[str, Body(media_type='text/plain')]
+        if accepts_ttl
+        else model_class
+    )
+    parameters.append(inspect.Parameter('data', keyword, annotation=data_type))
+    parameters.append(inspect.Parameter(
+        'api_key',
+        keyword,
+        annotation=str | None,
+        default=Depends(api_key_header_scheme),
+    ))
+    if accepts_ttl:
+        parameters.append(inspect.Parameter(
+            'format',
+            keyword,
+            annotation=Format,
+            default=Format.json,
+        ))
+    documentation_endpoint.__signature__ = inspect.Signature(parameters)
+    return documentation_endpoint
@@ -51,6 +51,103 @@ class Pointer:
     obj: str
 
 
+# PATCH >>>>>
+# Schema-derived lookup tables are computed once per `SchemaView` instead of
+# once per call of `from_rdf_graph`. Slot information is memoized per
+# (predicate, class)-pair.
+@dataclass
+class _SlotInfo:
+    slot: SlotDefinition
+    slot_name: str
+    range_applicable_elements: list[str]
+    is_inlined: bool
+    range_is_class: bool
+    range_id_slot: SlotDefinition | None
+
+
+class _SchemaTables:
+    def __init__(self, schemaview: SchemaView):
+        self.schemaview = schemaview
+        self.modifications = schemaview.modifications
+        self.class_names = set(schemaview.all_classes())
+        self.uri_to_class_map = {}
+        for cn, c in schemaview.all_classes().items():
+            uri = schemaview.get_uri(c, expand=True)
+            if uri in self.uri_to_class_map:
+                c2 = self.uri_to_class_map[uri]
+                if c2.name in schemaview.class_ancestors(cn):
+                    continue
+                else:
+                    logger.error(f'Inconsistent URI to class map: {uri} -> {c2.name}, {c.name}')
+            self.uri_to_class_map[uri] = c
+        self.uri_to_slot = {
+            URIRef(schemaview.get_uri(s, expand=True)): s
+            for s in schemaview.all_slots().values()
+        }
+        self.slot_infos: dict[tuple[URIRef, str], _SlotInfo] = {}
+        self.type_designators: dict[str, tuple[SlotDefinition, URIRef] | None] = {}
+        self.class_uris: dict[str, str | None] = {}
+
+    def get_slot_info(self, predicate: URIRef, class_name: str) -> _SlotInfo:
+        key = predicate, class_name
+        slot_info = self.slot_infos.get(key)
+        if slot_info is None:
+            schemaview = self.schemaview
+            slot = schemaview.induced_slot(self.uri_to_slot[predicate].name, class_name)
+            range_is_class = slot.range in self.class_names
+            slot_info = _SlotInfo(
+                slot=slot,
+                slot_name=underscore(slot.name),
+                range_applicable_elements=schemaview.slot_applicable_range_elements(slot),
+                is_inlined=schemaview.is_inlined(slot),
+                range_is_class=range_is_class,
+                range_id_slot=(
+                    schemaview.get_identifier_slot(slot.range)
+                    if range_is_class
+                    else None
+                ),
+            )
+            self.slot_infos[key] = slot_info
+        return slot_info
+
+    def get_type_designator(
+        self,
+        class_name: str,
+    ) -> tuple[SlotDefinition, URIRef] | None:
+        if class_name not in self.type_designators:
+            type_designator_slot = self.schemaview.get_type_designator_slot(class_name)
+            self.type_designators[class_name] = (
+                (
+                    type_designator_slot,
+                    URIRef(self.schemaview.get_uri(type_designator_slot, expand=True)),
+                )
+                if type_designator_slot
+                else None
+            )
+        return self.type_designators[class_name]
+
+    def get_class_uri(self, class_definition: ClassDefinition) -> str | None:
+        if class_definition.name not in self.class_uris:
+            self.class_uris[class_definition.name] = self.schemaview.get_uri(
+                class_definition
+            )
+        return self.class_uris[class_definition.name]
+
+
+# Tables are stored by the id of the schema view. The tables keep a reference
+# to the schema view, which ensures that the id is not reused.
+_schema_tables: dict[int, _SchemaTables] = {}
+
+
+def _get_schema_tables(schemaview: SchemaView) -> _SchemaTables:
+    tables = _schema_tables.get(id(schemaview))
+    if tables is None or tables.modifications != schemaview.modifications:
+        tables = _SchemaTables(schemaview)
+        _schema_tables[id(schemaview)] = tables
+    return tables
+# PATCH <<<<<
+
+
 def from_rdf_graph(
         self,
         graph: Graph,
@@ -73,16 +170,10 @@ def from_rdf_graph(
     :return: all instances of target class type
     """
     namespaces = schemaview.namespaces()
-    uri_to_class_map = {}
-    for cn, c in schemaview.all_classes().items():
-        uri = schemaview.get_uri(c, expand=True)
-        if uri in uri_to_class_map:
-            c2 = uri_to_class_map[uri]
-            if c2.name in schemaview.class_ancestors(cn):
-                continue
-            else:
-                logger.error(f'Inconsistent URI to class map: {uri} -> {c2.name}, {c.name}')
-        uri_to_class_map[uri] = c
+    # PATCH >>>>>
+    tables = _get_schema_tables(schemaview)
+    uri_to_class_map = tables.uri_to_class_map
+    # PATCH <<<<<
     # data prefix map: supplements or overrides existing schema prefix map
     if isinstance(prefix_map, Converter):
         # TODO replace with `prefix_map = prefix_map.bimap` after making minimum requirement on python 3.8
@@ -100,7 +191,9 @@ def from_rdf_graph(
     node_tuples_to_visit: list[tuple[VALID_SUBJECT, ClassDefinitionName]]  ## nodes and their type still to visit
     node_tuples_to_visit = [(subject, target_class.class_name) for subject in root_subjects]
     uri_to_slot: dict[str, SlotDefinition]  ## lookup table for RDF predicates -> slots
-    uri_to_slot = {URIRef(schemaview.get_uri(s, expand=True)): s for s in schemaview.all_slots().values()}
+    # PATCH >>>>>
+    uri_to_slot = tables.uri_to_slot
+    # PATCH <<<<<
     processed: set[VALID_SUBJECT] = set()  ## track nodes already visited, or already scheduled
     for n, _ in node_tuples_to_visit:
         processed.add(n)
@@ -114,10 +207,12 @@ def from_rdf_graph(
         if subject in root_subjects:
             root_dicts.append(dict_obj)
         obj_map[subject] = dict_obj
-        type_designator_slot = schemaview.get_type_designator_slot(subject_class)
-        if type_designator_slot:
-            td_iri = schemaview.get_uri(type_designator_slot, expand=True)
-            type_vals = list(graph.objects(subject, URIRef(td_iri)))
+        # PATCH >>>>>
+        type_designator = tables.get_type_designator(subject_class)
+        if type_designator:
+            type_designator_slot, td_iri = type_designator
+            type_vals = list(graph.objects(subject, td_iri))
+            # PATCH <<<<<
             if len(type_vals) > 0:
                 type_classes = [uri_to_class_map[str(x)] for x in type_vals]
                 if len(type_classes) > 1:
@@ -125,7 +220,7 @@ def from_rdf_graph(
                 logger.info(f'Replacing {subject_class} with {type_classes}')
                 subject_class = type_classes[0].name
                 # PATCH >>>>>
-                type_class_iri = schemaview.get_uri(type_classes[0])
+                type_class_iri = tables.get_class_uri(type_classes[0])
                 if type_class_iri is not None:
                     dict_obj[type_designator_slot.name] = type_class_iri
                 # PATCH <<<<<
@@ -141,10 +236,13 @@ def from_rdf_graph(
                 else:
                     raise MappingError(f'No pred for {p} {type(p)}')
             else:
-                slot = schemaview.induced_slot(uri_to_slot[p].name, subject_class)
-                range_applicable_elements = schemaview.slot_applicable_range_elements(slot)
-                is_inlined = schemaview.is_inlined(slot)
-                slot_name = underscore(slot.name)
+                # PATCH >>>>>
+                slot_info = tables.get_slot_info(p, subject_class)
+                slot = slot_info.slot
+                range_applicable_elements = slot_info.range_applicable_elements
+                is_inlined = slot_info.is_inlined
+                slot_name = slot_info.slot_name
+                # PATCH <<<<<
                 if isinstance(o, Literal):
                     if EnumDefinition.class_name in range_applicable_elements:
                         logger.debug(f'Assuming no meaning assigned for value {o} for Enum {slot.range}')
@@ -157,9 +255,8 @@ def from_rdf_graph(
                     v = Pointer(o)
                 else:
                     if ClassDefinition.class_name in range_applicable_elements:
-                        if slot.range in schemaview.all_classes():
-                            id_slot = schemaview.get_identifier_slot(slot.range)
-                            v = self._uri_to_id(o, id_slot, schemaview)
+                        if slot_info.range_is_class:
+                            v = self._uri_to_id(o, slot_info.range_id_slot, schemaview)
                         else:
                             v = namespaces.curie_for(o)
                         if v is None:
@@ -198,7 +295,7 @@ def from_rdf_graph(
                 if o not in processed:
                     # if o instantiates a class, add to list of nodes to be visited.
                     # force type based on range constraint
-                    if slot.range in schemaview.all_classes():
+                    if slot_info.range_is_class:
                         node_tuples_to_visit.append((o, ClassDefinitionName(slot.range)))
     if unmapped_predicates:
         logger.info(f'Unmapped predicated: {unmapped_predicates}')
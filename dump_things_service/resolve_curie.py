@@ -4,6 +4,7 @@ import re
 from typing import TYPE_CHECKING
 
 from dump_things_service.exceptions import CurieResolutionError
+from dump_things_service.schema_index import get_schema_index
 
 if TYPE_CHECKING:
     import types
@@ -26,15 +27,16 @@ def resolve_curie(
         return curie_or_iri
 
     prefix, identifier = curie_or_iri.split(':', 1)
-    prefix_value = model.linkml_meta.root.get('prefixes', {}).get(prefix)
-    if prefix_value is None:
+    schema_index = get_schema_index(model)
+    prefix_reference = schema_index.get_prefix_reference(prefix)
+    if prefix_reference is None:
         msg = (
             f"cannot resolve CURIE '{curie_or_iri}'. No such prefix: '{prefix}' in "
-            f'schema: {model.linkml_meta.root["id"]}'
+            f'schema: {schema_index.schema_id}'
         )
         raise CurieResolutionError(msg)
 
-    return prefix_value['prefix_reference'] + identifier
+    return prefix_reference + identifier
 
 
 def is_curie(
@@ -0,0 +1,129 @@
+"""Precomputed lookup tables for a schema model
+
+Several code paths, e.g., PID resolution, record annotation, and reading
+records of a class and its subclasses, need information that is derived from
+the schema model. Computing this information on every request is expensive,
+because it requires iterating over all classes or all prefixes of the schema.
+
+A `SchemaIndex` computes the following tables once per model:
+
+- class name -> names of all subclasses (including the class itself)
+- prefix -> IRI reference
+- IRI reference -> CURIE prefix, with longest-prefix matching
+
+Use `get_schema_index` to get the index for a model.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pydantic._internal._model_construction import ModelMetaclass
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+
+__all__ = [
+    'SchemaIndex',
+    'get_schema_index',
+]
+
+
+_schema_index_cache = {}
+
+
+class SchemaIndex:
+    def __init__(
+        self,
+        model: ModuleType,
+    ):
+        self.schema_id = model.linkml_meta.root['id']
+        self.subclasses = self._build_class_hierarchy(model)
+        self.prefixes = {
+            prefix: prefix_info['prefix_reference']
+            for prefix, prefix_info in (
+                model.linkml_meta.root.get('prefixes') or {}
+            ).items()
+        }
+
+        # The reverse table maps IRI references to prefixes. To support
+        # longest-prefix matching, we store the lengths of all IRI references
+        # in descending order. A lookup checks the reverse table with the
+        # leading characters of an IRI for every length, i.e., the number of
+        # dictionary lookups is bounded by the number of distinct lengths and
+        # not by the number of prefixes.
+        self.references = {}
+        for prefix, reference in self.prefixes.items():
+            # Keep the first prefix if multiple prefixes share a reference
+            self.references.setdefault(reference, prefix)
+        self.reference_lengths = sorted(
+            {len(reference) for reference in self.references},
+            reverse=True,
+        )
+
+    @staticmethod
+    def _build_class_hierarchy(
+        model: ModuleType,
+    ) -> dict[str, tuple[str, ...]]:
+        # The table is shared by all users of the model, its entries are
+        # immutable.
+        classes = [
+            (name, obj)
+            for name, obj in model.__dict__.items()
+            if isinstance(obj, ModelMetaclass)
+        ]
+        return {
+            super_name: tuple(
+                name
+                for name, obj in classes
+                if issubclass(obj, super_class)
+            )
+            for super_name, super_class in classes
+        }
+
+    def get_subclasses(
+        self,
+        class_name: str,
+    ) -> list[str]:
+        """get names of all subclasses (includes class_name itself)
+
+        The result is a new list, callers may modify it.
+        """
+        try:
+            return list(self.subclasses[class_name])
+        except KeyError:
+            msg = f'no class `{class_name}` in schema {self.schema_id}'
+            raise AttributeError(msg) from None
+
+    def get_prefix_reference(
+        self,
+        prefix: str,
+    ) -> str | None:
+        return self.prefixes.get(prefix)
+
+    def get_curie(
+        self,
+        iri: str,
+    ) -> str | None:
+        """Get a CURIE for `iri`, using the longest matching IRI reference
+
+        :param iri: The IRI that should be converted into a CURIE.
+        :return: The CURIE, or `None` if no IRI reference matches `iri`.
+        """
+        for length in self.reference_lengths:
+            prefix = self.references.get(iri[:length])
+            if prefix is not None:
+                return prefix + ':' + iri[length:]
+        return None
+
+
+def get_schema_index(
+    model: ModuleType,
+) -> SchemaIndex:
+    """Get the schema index for the given model, create it if necessary"""
+    if id(model) not in _schema_index_cache:
+        # We store a pointer to the model in the value to ensure that the
+        # model object exists while we use its `id` as a key.
+        _schema_index_cache[id(model)] = SchemaIndex(model), model
+    return _schema_index_cache[id(model)][0]
@@ -1,25 +1,32 @@
 from __future__ import annotations
 
+from copy import deepcopy
 from datetime import datetime
-from itertools import chain
-from typing import TYPE_CHECKING
-
-from dump_things_service.model import (
-    get_model_for_schema,
-    get_subclasses,
+from functools import cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    get_args,
 )
+
+from pydantic import BaseModel
+
+from dump_things_service.backends import reference_slots
+from dump_things_service.exceptions import CurieResolutionError
+from dump_things_service.model import get_model_for_schema
 from dump_things_service.resolve_curie import is_curie, resolve_curie
+from dump_things_service.schema_index import get_schema_index
 from dump_things_service.utils import cleaned_json
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
-    from pydantic import BaseModel
-
     from dump_things_service.backends import (
         RecordInfo,
+        ReferenceInfo,
         StorageBackend,
     )
+    from dump_things_service.backends.filters import Filter
     from dump_things_service.lazy_list import LazyList
 
 
@@ -36,6 +43,7 @@ class _ModelStore:
     ):
         self.schema = schema
         self.model = get_model_for_schema(self.schema)[0]
+        self.schema_index = get_schema_index(self.model)
         self.backend = backend
         self.tags = tags
 
@@ -55,13 +63,14 @@ class _ModelStore:
         # and return the list of stored records.
         return [
             (
-                obj.__class__.__name__,
+                class_name,
                 self._store_flat_object(
-                    obj=obj,
+                    class_name=class_name,
+                    json_object=json_object,
                     submitter=submitter,
                 ),
             )
-            for obj in self.extract_inlined(obj)
+            for class_name, json_object in self.extract_inlined(obj)
         ]
 
     def pid_to_iri(
@@ -72,16 +81,11 @@ class _ModelStore:
 
     def _store_flat_object(
         self,
-        obj: BaseModel,
+        class_name: str,
+        json_object: dict,
         submitter: str,
     ) -> dict:
-        iri = self.pid_to_iri(obj.pid)
-        class_name = obj.__class__.__name__
-
-        json_object = cleaned_json(
-            obj.model_dump(exclude_none=True, mode='json'),
-            remove_keys=('@type',),
-        )
+        iri = self.pid_to_iri(json_object['pid'])
 
         # Add the submitter id to the record annotations
         self.annotate(json_object, submitter)
@@ -111,45 +115,49 @@ class _ModelStore:
     ) -> str:
         if is_curie(curie_or_iri):
             return curie_or_iri
-        prefixes = self.model.linkml_meta.root.get('prefixes')
-        if prefixes:
-            for prefix_info in prefixes.values():
-                reference = prefix_info['prefix_reference']
-                if curie_or_iri.startswith(reference):
-                    return curie_or_iri.replace(
-                        reference,
-                        prefix_info['prefix_prefix'] + ':',
-                        1,
-                    )
-        return curie_or_iri
+        return self.schema_index.get_curie(curie_or_iri) or curie_or_iri
 
     def extract_inlined(
         self,
         record: BaseModel,
-    ) -> list[BaseModel]:
-        # The trivial case: no relations
-        if not hasattr(record, 'relations') or record.relations is None:
-            return [record]
-
-        extracted_sub_records = list(
-            chain(
-                *[
-                    self.extract_inlined(sub_record)
-                    for sub_record in record.relations.values()
-                    # Do not extract 'empty'-Thing records, those are just
-                    # placeholders for already extracted records.
-                    if sub_record != self.model.Thing(pid=sub_record.pid)
-                ]
+    ) -> list[tuple[str, dict]]:
+        """Split `record` into flat JSON objects of itself and inlined records
+
+        The model tree is walked once. Every record is serialized without its
+        reference slots, i.e., without the inlined records, which are replaced
+        by `Thing`-placeholders. Inlined records that are themselves
+        placeholders, i.e., `Thing`-records that contain only a pid, are not
+        extracted.
+
+        :return: Class name and JSON object of `record` and of all extracted
+            records in depth-first order, `record` first.
+        """
+        result = []
+        pending = [record]
+        while pending:
+            obj = pending.pop()
+            json_object = obj.model_dump(
+                exclude_none=True,
+                mode='json',
+                exclude=set(reference_slots),
             )
-        )
-        # Simplify the relations in this record. We use "empty" Thing objects
-        # as placeholders for extracted records.
-        new_record = record.model_copy()
-        new_record.relations = {
-            sub_record_pid: self.model.Thing(pid=sub_record_pid)
-            for sub_record_pid in record.relations
-        }
-        return [new_record, *extracted_sub_records]
+            inlined = {
+                slot: getattr(obj, slot)
+                for slot in reference_slots
+                if getattr(obj, slot, None) is not None
+            }
+            if _requires_cleaning(obj.__class__):
+                json_object = cleaned_json(json_object, remove_keys=('@type',))
+            if inlined:
+                json_object = _insert_placeholders(obj, json_object, inlined)
+            result.append((obj.__class__.__name__, json_object))
+            pending.extend(
+                sub_record
+                for sub_records in reversed(inlined.values())
+                for sub_record in reversed(sub_records.values())
+                if not _is_placeholder_record(sub_record, self.model.Thing)
+            )
+        return result
 
     def get_object_by_pid(
         self,
@@ -166,12 +174,66 @@ class _ModelStore:
             return record_info.class_name, record_info.json_object
         return None, None
 
+    def get_objects_by_pids(
+        self,
+        pids: Iterable[str],
+    ) -> dict[str, tuple[str, dict]]:
+        """Get multiple records with a single backend lookup
+
+        :return: A mapping from pid to class name and record, pids of
+            non-existing records and unresolvable pids are not included.
+        """
+        iris = {}
+        for pid in pids:
+            try:
+                iris[self.pid_to_iri(pid)] = pid
+            except CurieResolutionError:
+                continue
+        return {
+            iris[iri]: (record_info.class_name, record_info.json_object)
+            for iri, record_info in self.backend.get_records_by_iris(iris).items()
+        }
+
+    def get_referrers(
+        self,
+        pid: str,
+    ) -> list[ReferenceInfo]:
+        """Get the references to the record with pid `pid`
+
+        References are stored as they are written in the referencing records,
+        i.e., as CURIE or as IRI. Both forms of `pid` are looked up.
+        """
+        iri = self.pid_to_iri(pid)
+        return self.backend.get_referrers({pid, iri, self.get_curie(iri)})
+
+    def get_content_hash_by_pid(
+        self,
+        pid: str,
+    ) -> str | None:
+        return self.backend.get_content_hash(self.pid_to_iri(pid))
+
+    def get_submission_time(
+        self,
+        json_object: dict,
+    ) -> datetime | None:
+        """Get the submission time from the annotations of a record"""
+        annotations = json_object.get('annotations') or {}
+        for key in (self.get_curie(self.tags['time']), self.tags['time']):
+            value = annotations.get(key)
+            if isinstance(value, str):
+                try:
+                    return datetime.fromisoformat(value)
+                except ValueError:
+                    return None
+        return None
+
     def get_objects_of_class(
         self,
         class_name: str,
         matching: str | None,
         *,
         include_subclasses: bool = True,
+        filters: Iterable[Filter] | None = None,
     ) -> LazyList[RecordInfo]:
         """
         Get all objects of a specific class.
@@ -181,25 +243,28 @@ class _ModelStore:
         :param include_subclasses: If `True`, return records of class `class_name`
             and its subclasses, if `False` return only records of class
             `class_name`.
+        :param filters: Return only records that match all filters.
         :return: A lazy list of objects of the specified class and its subclasses.
         """
         if include_subclasses:
-            class_names = get_subclasses(self.model, class_name)
+            class_names = self.schema_index.get_subclasses(class_name)
         else:
             class_names = [class_name]
-        return self.backend.get_records_of_classes(class_names, matching)
+        return self.backend.get_records_of_classes(class_names, matching, filters)
 
     def get_all_objects(
         self,
         matching: str | None = None,
+        filters: Iterable[Filter] | None = None,
     ) -> LazyList[RecordInfo]:
         """
         Get all objects of a specific class.
 
         :param matching: Return only records with a value that matches `matching`.
+        :param filters: Return only records that match all filters.
         :return: A lazy list of all objects in the store.
         """
-        return self.backend.get_all_records(matching)
+        return self.backend.get_all_records(matching, filters)
 
     def delete_object(
         self,
@@ -230,3 +295,132 @@ def ModelStore(  # noqa: N802
         # backend object exists while we use its `id` as a key.
         _existing_model_stores[id(backend)] = existing_model_store, backend
     return existing_model_store
+
+
+def inline_references(
+    json_object: dict,
+    model_stores: list[_ModelStore],
+    depth: int,
+) -> dict:
+    """Replace `Thing`-placeholders in `json_object` with the referenced records
+
+    Placeholders are replaced up to `depth` levels. Each level is read with a
+    single lookup per store. If a record is contained in multiple stores, the
+    record from the first store in `model_stores` is used.
+
+    :return: `json_object` with inlined records.
+    """
+    level = [json_object]
+    for _ in range(depth):
+        placeholders = {
+            target
+            for record in level
+            for slot in reference_slots
+            for target, value in _get_placeholders(record, slot)
+        }
+        if not placeholders:
+            break
+
+        found = {}
+        for model_store in model_stores:
+            missing = placeholders - found.keys()
+            if not missing:
+                break
+            found.update({
+                pid: record
+                for pid, (_, record) in model_store.get_objects_by_pids(
+                    missing
+                ).items()
+            })
+
+        next_level = []
+        for record in level:
+            for slot in reference_slots:
+                for target, _ in _get_placeholders(record, slot):
+                    if target in found:
+                        # Copy the record, it might be modified on the next
+                        # level.
+                        record[slot][target] = deepcopy(found[target])
+                        next_level.append(record[slot][target])
+        level = next_level
+    return json_object
+
+
+def _get_placeholders(
+    json_object: dict,
+    slot: str,
+) -> list[tuple[str, dict]]:
+    value = json_object.get(slot)
+    if not isinstance(value, dict):
+        return []
+    return [
+        (target, placeholder)
+        for target, placeholder in value.items()
+        if _is_placeholder(placeholder)
+    ]
+
+
+def _insert_placeholders(
+    obj: BaseModel,
+    json_object: dict,
+    inlined: dict[str, dict[str, BaseModel]],
+) -> dict:
+    """Add placeholders for `inlined` to `json_object` in field order"""
+    result = {}
+    for name in obj.__class__.model_fields:
+        if name in inlined:
+            result[name] = {pid: {'pid': pid} for pid in inlined[name]}
+        elif name in json_object:
+            result[name] = json_object[name]
+    # Add values of extra fields
+    result.update(json_object)
+    return result
+
+
+def _is_placeholder(value: Any) -> bool:
+    # Placeholders contain only the pid, and a `schema_type` that might be
+    # added by the schema type layer.
+    return isinstance(value, dict) and value.keys() <= {'pid', 'schema_type'}
+
+
+def _is_placeholder_record(
+    record: BaseModel,
+    thing_class: type[BaseModel],
+) -> bool:
+    # Only `Thing`-records are placeholders, records of other classes that
+    # contain only a pid are stored as records of their class.
+    return type(record) is thing_class and all(
+        value is None
+        for name, value in record.__dict__.items()
+        if name not in ('pid', 'schema_type')
+    )
+
+
+@cache
+def _requires_cleaning(model_class: type[BaseModel]) -> bool:
+    """Check whether serialized instances might contain `None` or `@type`
+
+    `model_dump(exclude_none=True)` removes `None` values of model fields, but
+    not `None` values or `@type` keys in untyped values, i.e., in values of
+    slots with range `Any`. Records of classes that can contain such values,
+    outside of their reference slots, are cleaned with `cleaned_json`.
+    """
+    seen = set()
+    pending = [
+        field.annotation
+        for name, field in model_class.model_fields.items()
+        if name not in reference_slots
+    ]
+    while pending:
+        annotation = pending.pop()
+        if annotation is Any:
+            return True
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            if annotation not in seen:
+                seen.add(annotation)
+                pending.extend(
+                    field.annotation for field in annotation.model_fields.values()
+                )
+            continue
+        pending.extend(get_args(annotation))
+    return False
@@ -0,0 +1,92 @@
+"""A fake Forgejo instance for offline authentication tests and benchmarks
+
+The fake instance is built on `pytest_httpserver.HTTPServer`. It serves the
+API endpoints that are used by `ForgejoAuthenticationSource`. Every response
+can be delayed by `latency` seconds to simulate a remote Forgejo instance.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import TYPE_CHECKING
+
+from werkzeug import Response
+
+if TYPE_CHECKING:
+    from pytest_httpserver import HTTPServer
+    from werkzeug import Request
+
+api_path = '/api/v1'
+
+user_1 = {
+    'id': 1,
+    'login': 'user_1',
+    'email': 'user_1@example.com',
+    'username': 'user_1',
+    '@type': 'user',
+}
+
+org_1 = {
+    'id': 1,
+    'name': 'org_1',
+    '@type': 'org'
+}
+
+repo_1 = {
+    'id': 3,
+    'owner': user_1,
+    'name': 'repo_1',
+}
+
+team_template = """{{
+    "id": {id},
+    "name": "team_{id}",
+    "units_map": {{
+        "repo.code": "read",
+        "repo.actions": "{action}"
+    }},
+    "@type": "team"
+}}
+"""
+
+team_1 = json.loads(team_template.format(id=1, action='none'))
+team_2 = json.loads(team_template.format(id=2, action='none'))
+team_3 = json.loads(team_template.format(id=3, action='write'))
+
+endpoints = {
+    '/user': user_1,
+    '/user/teams': [team_1, team_3],
+    '/orgs/org_1': org_1,
+    '/orgs/org_1/teams': [team_1, team_2, team_3],
+    '/repos/org_1/repo_1/teams': [team_1, team_2, team_3],
+}
+
+invalid_token = 'invalid-token'
+
+
+def _create_handler(content: dict | list, latency: float):
+    def handler(request: Request) -> Response:
+        if latency:
+            time.sleep(latency)
+        if request.headers.get('Authorization') == f'token {invalid_token}':
+            return Response('{"message": "token is invalid"}', status=401)
+        return Response(json.dumps(content), content_type='application/json')
+    return handler
+
+
+def setup_fake_forgejo(
+    http_server: HTTPServer,
+    latency: float = 0.0,
+) -> str:
+    """Register the fake Forgejo API in `http_server`
+
+    :param http_server: The HTTP server that should serve the API.
+    :param latency: Delay in seconds for every response.
+    :return: The API URL of the fake Forgejo instance.
+    """
+    for endpoint, content in endpoints.items():
+        http_server.expect_request(api_path + endpoint).respond_with_handler(
+            _create_handler(content, latency),
+        )
+    return http_server.url_for(api_path)
@@ -15,6 +15,7 @@ from dump_things_service.tests.create_store import (
     test_record_curated,
     test_record_trr,
 )
+from dump_things_service.tests.fake_forgejo import setup_fake_forgejo
 
 # String representation of curated- and incoming-path
 curated = 'curated'
@@ -328,3 +329,9 @@ def fastapi_client_simple(fastapi_app_simple):
     from fastapi.testclient import TestClient
 
     return TestClient(fastapi_app_simple[0]), fastapi_app_simple[1]
+
+
+@pytest.fixture
+def fake_forgejo(httpserver):
+    """Serve a fake Forgejo API and return its URL"""
+    return setup_fake_forgejo(httpserver)
@@ -1,62 +1,42 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import threading
+from types import SimpleNamespace
 
 import pytest
 
-from dump_things_service.auth.forgejo import ForgejoAuthenticationSource
+from dump_things_service.auth import (
+    AuthenticationInfo,
+    AuthenticationSource,
+    InvalidTokenError,
+)
+from dump_things_service.config import InstanceConfig
+from dump_things_service.auth.forgejo import (
+    ForgejoAuthenticationSource,
+    RemoteAuthenticationError,
+    forgejo_cache,
+)
+from dump_things_service.tests.fake_forgejo import (
+    invalid_token,
+    setup_fake_forgejo,
+)
 from dump_things_service.token import TokenPermission
+from dump_things_service.utils import process_token
 
-user_1 = {
-    'id': 1,
-    'login': 'user_1',
-    'email': 'user_1@example.com',
-    'username': 'user_1',
-    '@type': 'user',
-}
-
-org_1 = {
-    'id': 1,
-    'name': 'org_1',
-    '@type': 'org'
-}
-
-repo_1 = {
-    'id': 3,
-    'owner': user_1,
-    'name': 'repo_1',
-}
-
-team_template = """{{
-    "id": {id},
-    "name": "team_{id}",
-    "units_map": {{
-        "repo.code": "read",
-        "repo.actions": "{action}"
-    }},
-    "@type": "team"
-}}
-"""
-
-team_1 = json.loads(team_template.format(id=1, action='none'))
-team_2 = json.loads(team_template.format(id=2, action='none'))
-team_3 = json.loads(team_template.format(id=3, action='write'))
-
-def setup_http_server(http_server) -> None:
-    http_server.expect_request('/api/v1/user').respond_with_json(user_1)
-    http_server.expect_request('/api/v1/user/teams').respond_with_json([team_1, team_3])
-    http_server.expect_request('/api/v1/orgs/org_1').respond_with_json(org_1)
-    http_server.expect_request('/api/v1/orgs/org_1/teams').respond_with_json([team_1, team_2, team_3])
-    http_server.expect_request('/api/v1/repos/org_1/repo_1/teams').respond_with_json([team_1, team_2, team_3])
+
+@pytest.fixture(autouse=True)
+def clear_forgejo_cache():
+    # All tests use the same fake Forgejo URL, prevent cached results from
+    # leaking between tests.
+    forgejo_cache.clear()
 
 
 @pytest.mark.parametrize('repository', ['repo_1', None])
 @pytest.mark.parametrize('label_type', ['user', 'team'])
-def test_forgejo_auth_team(httpserver, label_type, repository):
-    setup_http_server(httpserver)
-
+def test_forgejo_auth_team(fake_forgejo, label_type, repository):
     forgejo_auth_source = ForgejoAuthenticationSource(
-        api_url=httpserver.url_for('/api/v1'),
+        api_url=fake_forgejo,
         organization='org_1',
         team='team_1',
         label_type=label_type,
@@ -78,11 +58,9 @@ def test_forgejo_auth_team(httpserver, label_type, repository):
 
 @pytest.mark.parametrize('repository', ['repo_1', None])
 @pytest.mark.parametrize('label_type', ['user', 'team'])
-def test_forgejo_auth_curator(httpserver, label_type, repository):
-    setup_http_server(httpserver)
-
+def test_forgejo_auth_curator(fake_forgejo, label_type, repository):
     forgejo_auth_source = ForgejoAuthenticationSource(
-        api_url=httpserver.url_for('/api/v1'),
+        api_url=fake_forgejo,
         organization='org_1',
         team='team_3',
         label_type=label_type,
@@ -102,3 +80,119 @@ def test_forgejo_auth_curator(httpserver, label_type, repository):
         zones_access=True,
     )
     assert r.user_id == 'user_1@example.com'
+
+
+@pytest.mark.parametrize('label_type', ['user', 'team'])
+def test_forgejo_auth_curator_async(fake_forgejo, label_type):
+    forgejo_auth_source = ForgejoAuthenticationSource(
+        api_url=fake_forgejo,
+        organization='org_1',
+        team='team_3',
+        label_type=label_type,
+        repository='repo_1',
+    )
+
+    r = asyncio.run(forgejo_auth_source.authenticate_async(token='something'))
+    if label_type == 'team':
+        assert r.incoming_label == 'forgejo-team-org_1-team_3'
+    else:
+        assert r.incoming_label == 'forgejo-user-user_1'
+    assert r.token_permission == TokenPermission(
+        curated_read=True,
+        incoming_read=True,
+        incoming_write=True,
+        curated_write=True,
+        zones_access=True,
+    )
+    assert r.user_id == 'user_1@example.com'
+
+
+def test_forgejo_auth_invalid_token(fake_forgejo):
+    forgejo_auth_source = ForgejoAuthenticationSource(
+        api_url=fake_forgejo,
+        organization='org_1',
+        team='team_1',
+        label_type='user',
+    )
+    with pytest.raises(InvalidTokenError):
+        forgejo_auth_source.authenticate(token=invalid_token)
+
+
+def test_forgejo_auth_timeout(httpserver):
+    api_url = setup_fake_forgejo(httpserver, latency=1.0)
+    forgejo_auth_source = ForgejoAuthenticationSource(
+        api_url=api_url,
+        organization='org_1',
+        team='team_1',
+        label_type='user',
+        timeout=0.2,
+    )
+    with pytest.raises(RemoteAuthenticationError):
+        forgejo_auth_source.authenticate(token='something')
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_forgejo_auth_blocked_client_loop(monkeypatch, use_async):
+    forgejo_auth_source = ForgejoAuthenticationSource(
+        api_url='http://localhost:1/api/v1',
+        organization='org_1',
+        team='team_1',
+        label_type='user',
+        timeout=0.05,
+    )
+    release = threading.Event()
+
+    async def blocked_authenticate(token):
+        # Block the client loop, request timeouts do not fire.
+        release.wait()
+
+    monkeypatch.setattr(
+        forgejo_auth_source,
+        '_authenticate',
+        blocked_authenticate,
+    )
+    try:
+        with pytest.raises(RemoteAuthenticationError, match='timeout'):
+            if use_async:
+                asyncio.run(forgejo_auth_source.authenticate_async(token='x'))
+            else:
+                forgejo_auth_source.authenticate(token='x')
+    finally:
+        release.set()
+
+
+class AsyncOnlyAuthenticationSource(AuthenticationSource):
+    def authenticate(self, token: str) -> AuthenticationInfo:
+        msg = 'blocking authentication in an async endpoint'
+        raise AssertionError(msg)
+
+    async def authenticate_async(self, token: str) -> AuthenticationInfo:
+        return AuthenticationInfo(
+            token_permission=TokenPermission(curated_read=True),
+            user_id='user_1',
+            incoming_label=None,
+        )
+
+
+def test_process_token_does_not_block(tmp_path):
+    instance_config = InstanceConfig(store_path=tmp_path)
+    instance_config.collections = {
+        'collection_1': SimpleNamespace(default_token='anonymous'),
+    }
+    instance_config.tokens = {
+        'collection_1': {
+            'anonymous': {'permissions': TokenPermission()},
+        },
+    }
+    instance_config.auth_providers = {
+        'collection_1': [AsyncOnlyAuthenticationSource()],
+    }
+    instance_config.token_stores = {'collection_1': {}}
+
+    permissions, token_store = asyncio.run(
+        process_token(instance_config, 'token_1', 'collection_1')
+    )
+    assert permissions.curated_read is True
+    assert token_store is None
+    # The result is cached for the token
+    assert 'token_1' in instance_config.token_stores['collection_1']
@@ -440,6 +440,34 @@ def test_server(fastapi_client_simple):
     }
 
 
+def test_ready(fastapi_client_simple):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.get('/ready')
+    assert response.status_code == HTTP_200_OK
+    assert response.json()['ready'] is True
+    assert {
+        collection['state']
+        for collection in response.json()['collections']
+    } == {'ready'}
+
+    response = test_client.get(
+        '/ready',
+        params={'collection': ['collection_1', 'collection_2']},
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == {
+        'ready': True,
+        'collections': [
+            {'name': 'collection_1', 'state': 'ready', 'error': None},
+            {'name': 'collection_2', 'state': 'ready', 'error': None},
+        ],
+    }
+
+    response = test_client.get('/ready', params={'collection': 'no_such'})
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
 def test_ignore_classes(fastapi_client_simple):
     test_client, _ = fastapi_client_simple
 
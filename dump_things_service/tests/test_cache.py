@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from dump_things_service.cache import (
+    TTLCache,
+    cached,
+    get_cache_statistics,
+)
+
+
+def test_ttl_expiration():
+    cache = TTLCache('test-ttl', ttl=0.05)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.1)
+    assert cache.get('a') is None
+    assert cache.sweep() == 1
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = TTLCache('test-lru', max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Access `a` to make `b` the least recently used entry
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.get_statistics()['evictions'] == 1
+
+
+def test_exceptions_are_not_cached():
+    cache = TTLCache('test-exceptions')
+    calls = []
+
+    @cached(cache)
+    def fail(x):
+        calls.append(x)
+        raise ValueError(x)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            fail(1)
+    assert calls == [1, 1]
+
+
+def test_single_flight_sync():
+    cache = TTLCache('test-single-flight-sync')
+    calls = []
+
+    @cached(cache)
+    def compute(x):
+        calls.append(x)
+        time.sleep(0.1)
+        return x * 2
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(compute(3)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [6] * 5
+    assert calls == [3]
+
+
+def test_single_flight_async():
+    cache = TTLCache('test-single-flight-async')
+    calls = []
+
+    @cached(cache)
+    async def compute(x):
+        calls.append(x)
+        await asyncio.sleep(0.1)
+        return x * 2
+
+    async def run():
+        return await asyncio.gather(*[compute(3) for _ in range(5)])
+
+    assert asyncio.run(run()) == [6] * 5
+    assert calls == [3]
+
+
+def test_stale_while_revalidate():
+    cache = TTLCache('test-stale', ttl=0.2, stale_ttl=10)
+    values = iter(range(10))
+    revalidated = threading.Event()
+
+    @cached(cache, key=lambda: 'key')
+    def compute():
+        value = next(values)
+        if value > 0:
+            revalidated.set()
+        return value
+
+    assert compute() == 0
+    time.sleep(0.3)
+    # The stale value is returned, and a new value is computed in the
+    # background.
+    assert compute() == 0
+    assert revalidated.wait(1)
+    time.sleep(0.02)
+    assert compute() == 1
+
+    statistics = get_cache_statistics()['test-stale']
+    assert statistics['hits'] == 1
+    assert statistics['stale_hits'] == 1
+    assert statistics['misses'] == 1
+    assert statistics['hit_ratio'] == pytest.approx(2 / 3)
+
+
+def test_single_revalidation_sync_and_async():
+    cache = TTLCache('test-revalidation', ttl=0.05, stale_ttl=10)
+    cache.set('key', 0)
+    time.sleep(0.1)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append('sync')
+        release.wait(1)
+        return 1
+
+    async def compute_async():
+        calls.append('async')
+        return 2
+
+    # A revalidation in a thread prevents a concurrent revalidation in an
+    # event loop, and vice versa.
+    assert cache.get_or_compute('key', compute, ttl=10) == 0
+
+    async def get():
+        value = await cache.get_or_compute_async('key', compute_async)
+        await asyncio.sleep(0.01)
+        return value
+
+    assert asyncio.run(get()) == 0
+    release.set()
+    time.sleep(0.05)
+    assert calls == ['sync']
+    assert cache.get('key') == 1
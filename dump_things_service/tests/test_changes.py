@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from dump_things_service import HTTP_200_OK
+
+change_record = {
+    'schema_type': 'abc:Person',
+    'pid': 'abc:change-me',
+    'given_name': 'Chris',
+}
+change_iri = 'http://example.org/person-schema/abc/change-me'
+
+
+def read_changes(test_client, collection, **parameters):
+    response = test_client.get(
+        f'/{collection}/changes',
+        params=parameters,
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize('collection', ('collection_1', 'collection_8'))
+def test_change_feed(fastapi_client_simple, collection):
+    test_client, _ = fastapi_client_simple
+
+    changes = read_changes(test_client, collection)
+    assert changes
+    last_seq = changes[-1]['seq']
+
+    response = test_client.post(
+        f'/{collection}/curated/record/Person',
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+        json=change_record,
+    )
+    assert response.status_code == HTTP_200_OK
+    response = test_client.delete(
+        f'/{collection}/curated/record?pid=abc:change-me',
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+    )
+    assert response.status_code == HTTP_200_OK
+
+    changes = read_changes(test_client, collection, since=last_seq)
+    assert [
+        (change['iri'], change['class_name'], change['operation'])
+        for change in changes
+    ] == [
+        (change_iri, 'Person', 'add'),
+        (change_iri, 'Person', 'remove'),
+    ]
+    assert changes[0]['seq'] > last_seq
+    assert changes[1]['seq'] > changes[0]['seq']
+
+    assert read_changes(test_client, collection, since=last_seq, limit=1) == changes[:1]
+
+
+def test_change_feed_long_polling(fastapi_client_simple):
+    test_client, _ = fastapi_client_simple
+
+    last_seq = read_changes(test_client, 'collection_8')[-1]['seq']
+    start = time.monotonic()
+    assert read_changes(test_client, 'collection_8', since=last_seq, wait=0.3) == []
+    assert time.monotonic() - start >= 0.3
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from dump_things_service.backends.record_dir import RecordDirStore
+from dump_things_service.backends.record_dir_index import index_file_name
+from dump_things_service.backends.sqlite import SQLiteBackend
+from dump_things_service.commands.check_pids import (
+    _extract_pid,
+    check_pids,
+    check_pids_in_stores,
+)
+from dump_things_service.config import get_mapping_function_by_name
+from dump_things_service.store.model_store import ModelStore
+
+schema_path = Path(__file__).parent / 'testschema.yaml'
+
+
+@pytest.mark.parametrize(
+    ('text', 'pid'),
+    (
+        ('pid: abc:1\ngiven_name: Alice\n', 'abc:1'),
+        ("given_name: Alice\npid: 'abc:2'\n", 'abc:2'),
+        ('pid: >-\n  abc:a-very-long\n  -pid\ngiven_name: Alice\n', 'abc:a-very-long -pid'),
+        # No top-level `pid`-entry in block style, the record is fully parsed
+        ('{pid: abc:3, given_name: Alice}\n', 'abc:3'),
+    ),
+)
+def test_extract_pid(text, pid):
+    assert _extract_pid(text) == pid
+
+
+def test_check_pids(fastapi_client_simple, capsys):
+    assert check_pids(jobs=1) == 0
+    assert 'pids/s' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('jobs', (1, 2))
+def test_unresolvable_pids(tmp_path, capsys, jobs):
+    (tmp_path / 'record_dir').mkdir()
+    record_dir_backend = RecordDirStore(
+        root=tmp_path / 'record_dir',
+        pid_mapping_function=get_mapping_function_by_name('digest-md5'),
+        suffix='yaml',
+    )
+    sqlite_backend = SQLiteBackend(db_path=tmp_path / 'records.db')
+    stores = []
+    for backend in (record_dir_backend, sqlite_backend):
+        # Records with unknown prefixes can only be stored via the backend
+        for index in range(5):
+            backend.add_record(
+                iri=f'http://example.org/{index}',
+                class_name='Person',
+                json_object={'pid': f'abc:{index}'},
+            )
+        backend.add_record(
+            iri='http://example.org/unknown',
+            class_name='Person',
+            json_object={'pid': 'unknown:1'},
+        )
+        stores.append(ModelStore(
+            schema=str(schema_path),
+            backend=backend,
+            tags={'id': 'abc:id', 'time': 'abc:time'},
+        ))
+
+    assert check_pids_in_stores(stores, jobs) == 2
+    output = capsys.readouterr()
+    assert output.out.splitlines() == [
+        f'unknown:1 {store.get_uri()}' for store in stores
+    ]
+    assert 'checked 12 pids in 2 stores' in output.err
+
+
+@pytest.mark.parametrize('jobs', (1, 2))
+def test_unreadable_pids(tmp_path, capsys, jobs):
+    backend = RecordDirStore(
+        root=tmp_path,
+        pid_mapping_function=get_mapping_function_by_name('digest-md5'),
+        suffix='yaml',
+    )
+    for index in range(4):
+        backend.add_record(
+            iri=f'http://example.org/{index}',
+            class_name='Person',
+            json_object={'pid': f'abc:{index}'},
+        )
+
+    # Simulate an index that was created before pids were indexed, with a
+    # record file without pid and a record file with invalid YAML.
+    with sqlite3.connect(tmp_path / index_file_name) as connection:
+        connection.execute('UPDATE index_entry SET pid = NULL')
+    connection.close()
+    paths = [path for _, path in backend.index.get_paths_without_pid()]
+    Path(paths[0]).write_text('given_name: Alice\n')
+    Path(paths[1]).write_text('pid: [abc:1\n')
+    store = ModelStore(
+        schema=str(schema_path),
+        backend=backend,
+        tags={'id': 'abc:id', 'time': 'abc:time'},
+    )
+
+    assert check_pids_in_stores([store], jobs) == 2
+    output = capsys.readouterr()
+    assert output.out == ''
+    errors = [line for line in output.err.splitlines() if line.startswith('error:')]
+    assert len(errors) == 2
+    assert errors[0] == f'error: {paths[0]}: no top-level pid-entry'
+    assert errors[1].startswith(f'error: {paths[1]}: ')
+    assert 'checked 2 pids in 1 stores' in output.err
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import pytest
+
+from dump_things_service import (
+    HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
+)
+from dump_things_service.tests.create_store import pid
+from dump_things_service.utils import etag_matches
+
+conditional_record = {
+    'schema_type': 'abc:Person',
+    'pid': 'abc:conditional',
+    'given_name': 'Conny',
+}
+
+
+@pytest.mark.parametrize('collection', ('collection_1', 'collection_8'))
+def test_conditional_get(fastapi_client_simple, collection):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.get(
+        f'/{collection}/record?pid={pid}',
+        headers={'x-dumpthings-token': 'basic_access'},
+    )
+    assert response.status_code == HTTP_200_OK
+    etag = response.headers['etag']
+
+    response = test_client.get(
+        f'/{collection}/record?pid={pid}',
+        headers={
+            'x-dumpthings-token': 'basic_access',
+            'if-none-match': etag,
+        },
+    )
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response.headers['etag'] == etag
+    assert response.content == b''
+
+    response = test_client.get(
+        f'/{collection}/record?pid={pid}',
+        headers={
+            'x-dumpthings-token': 'basic_access',
+            'if-none-match': '"other"',
+        },
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.headers['etag'] == etag
+
+    # The TTL representation has a different entity tag
+    response = test_client.get(
+        f'/{collection}/record?pid={pid}&format=ttl',
+        headers={
+            'x-dumpthings-token': 'basic_access',
+            'if-none-match': etag,
+        },
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.headers['etag'] != etag
+
+
+def test_etag_changes_on_update(fastapi_client_simple):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.post(
+        '/collection_1/record/Person',
+        headers={'x-dumpthings-token': 'token-1'},
+        json=conditional_record,
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = test_client.get(
+        '/collection_1/record?pid=abc:conditional',
+        headers={'x-dumpthings-token': 'token-1'},
+    )
+    assert response.status_code == HTTP_200_OK
+    first_etag = response.headers['etag']
+    # The record is annotated with its submission time
+    assert response.headers['last-modified'].endswith(' GMT')
+
+    response = test_client.post(
+        '/collection_1/record/Person',
+        headers={'x-dumpthings-token': 'token-1'},
+        json={**conditional_record, 'given_name': 'Cornelia'},
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = test_client.get(
+        '/collection_1/record?pid=abc:conditional',
+        headers={
+            'x-dumpthings-token': 'token-1',
+            'if-none-match': first_etag,
+        },
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.headers['etag'] != first_etag
+    assert response.json()['given_name'] == 'Cornelia'
+
+
+def test_curated_conditional_get(fastapi_client_simple):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.get(
+        f'/collection_8/curated/record?pid={pid}',
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+    )
+    assert response.status_code == HTTP_200_OK
+    etag = response.headers['etag']
+
+    response = test_client.get(
+        f'/collection_8/curated/record?pid={pid}',
+        headers={
+            'x-dumpthings-token': 'token_1_xxxxx',
+            'if-none-match': f'"other", W/{etag}',
+        },
+    )
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response.headers['etag'] == etag
+
+
+def test_etag_matches():
+    assert etag_matches('"a-json"', '"a-json"')
+    assert etag_matches('"b-json", W/"a-json"', '"a-json"')
+    assert etag_matches('*', '"a-json"')
+    assert not etag_matches('"a-ttl"', '"a-json"')
+    assert not etag_matches(None, '"a-json"')
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from dump_things_service.backends.record_dir import _RecordDirStore
+from dump_things_service.backends.sqlite import _SQLiteBackend
+from dump_things_service.commands.copy_store import copy_records
+
+record_count = 25
+
+
+@pytest.fixture
+def source_store(tmp_path):
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    store = _RecordDirStore(
+        root=source_dir,
+        pid_mapping_function=lambda pid, suffix: f'{pid}.{suffix}',
+        suffix='yaml',
+    )
+    for i in range(record_count):
+        store.add_record(
+            iri=f'pid-{i:02d}',
+            class_name='Person',
+            json_object={'pid': f'pid-{i:02d}', 'given_name': f'name {i}'},
+        )
+    return store
+
+
+def test_copy_in_chunks(tmp_path, source_store):
+    destination = _SQLiteBackend(tmp_path / 'destination.db')
+    reports = []
+    progress = copy_records(
+        source_store,
+        destination,
+        chunk_size=10,
+        jobs=3,
+        report=lambda p: reports.append(p.processed),
+    )
+    assert reports == [10, 20, 25]
+    assert progress.copied == record_count
+    assert len(destination.get_all_records()) == record_count
+    assert destination.get_record_by_iri('pid-07').json_object == {
+        'pid': 'pid-07',
+        'given_name': 'name 7',
+    }
+
+
+def test_copy_resume(tmp_path, source_store):
+    destination = _SQLiteBackend(tmp_path / 'destination.db')
+    checkpoint = tmp_path / 'checkpoint.json'
+
+    def fail_after_first_chunk(progress):
+        if progress.processed == 10:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        copy_records(
+            source_store,
+            destination,
+            chunk_size=10,
+            checkpoint=checkpoint,
+            report=fail_after_first_chunk,
+        )
+    assert json.loads(checkpoint.read_text())['position'] == 10
+    assert len(destination.get_all_records()) == 10
+
+    progress = copy_records(
+        source_store,
+        destination,
+        chunk_size=10,
+        checkpoint=checkpoint,
+    )
+    assert progress.copied == 15
+    assert not checkpoint.exists()
+    assert len(destination.get_all_records()) == record_count
+
+    # A checkpoint of other stores is rejected
+    checkpoint.write_text(json.dumps({
+        'source': 'file:///other',
+        'destination': destination.get_uri(),
+        'position': 10,
+        'last_iri': 'pid-09',
+    }))
+    with pytest.raises(ValueError, match='does not match'):
+        copy_records(source_store, destination, checkpoint=checkpoint)
+
+
+def test_copy_only_changed(tmp_path, source_store):
+    destination = _SQLiteBackend(tmp_path / 'destination.db')
+    copy_records(source_store, destination)
+
+    source_store.add_record(
+        iri='pid-03',
+        class_name='Person',
+        json_object={'pid': 'pid-03', 'given_name': 'changed'},
+    )
+    source_store.add_record(
+        iri='pid-99',
+        class_name='Person',
+        json_object={'pid': 'pid-99', 'given_name': 'new'},
+    )
+    progress = copy_records(source_store, destination, only_changed=True)
+    assert progress.copied == 2
+    assert progress.skipped == record_count - 1
+    assert destination.get_record_by_iri('pid-03').json_object['given_name'] == 'changed'
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import gzip
+import json
+import tarfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+from dump_things_service.backends.record_dir import RecordDirStore
+from dump_things_service.compression import (
+    Compression,
+    get_zstd_module,
+)
+from dump_things_service.config import (
+    get_config,
+    get_mapping_function_by_name,
+)
+from dump_things_service.export import (
+    export_json,
+    export_tree,
+)
+from dump_things_service.export.tree import (
+    _DirectoryWriter,
+    export_classes,
+)
+from dump_things_service.store.model_store import ModelStore
+from dump_things_service.tests.create_store import pid
+
+schema_path = Path(__file__).parent / 'testschema.yaml'
+
+
+def _read_output(path: Path, compression: Compression) -> bytes:
+    if compression == Compression.gzip:
+        return gzip.decompress(path.read_bytes())
+    if compression == Compression.zstd:
+        return get_zstd_module().decompress(path.read_bytes())
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize('compression', tuple(Compression))
+@pytest.mark.parametrize('jobs', (1, 2))
+def test_export_json(fastapi_client_simple, tmp_path, compression, jobs):
+    destination = tmp_path / 'export.json'
+    export_json(
+        get_config(),
+        str(destination),
+        compression=compression,
+        batch_size=1,
+        jobs=jobs,
+    )
+
+    export = json.loads(_read_output(destination, compression))
+    assert export.keys() == get_config().collections.keys()
+    curated = export['collection_8']['curated']
+    assert pid in [record['pid'] for record in curated['Person']]
+    assert export['collection_8']['schema'] == get_config().schemas['collection_8']
+
+
+def test_export_tree(fastapi_client_simple, tmp_path):
+    destination = tmp_path / 'tree'
+    export_tree(get_config(), str(destination), jobs=2)
+
+    curated = destination / 'collection_8' / 'curated'
+    assert 'idfx: digest-md5-p3-p3' in (curated / '.dumpthings.yaml').read_text()
+    idfx = get_mapping_function_by_name('digest-md5-p3-p3')
+    record = yaml.safe_load((curated / 'Person' / idfx(pid, 'yaml')).read_text())
+    assert record['pid'] == pid
+
+
+def test_export_tree_archive(fastapi_client_simple, tmp_path):
+    destination = tmp_path / 'tree.tar.gz'
+    export_tree(get_config(), str(destination), compression=Compression.gzip)
+
+    idfx = get_mapping_function_by_name('digest-md5-p3-p3')
+    with tarfile.open(destination, mode='r:gz') as archive:
+        names = archive.getnames()
+        assert 'collection_1/curated/.dumpthings.yaml' in names
+        record = yaml.safe_load(
+            archive.extractfile(f'collection_1/curated/Person/{idfx(pid, "yaml")}')
+        )
+    assert record['pid'] == pid
+
+
+def test_export_links_record_files(tmp_path):
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    backend = RecordDirStore(
+        root=source_dir,
+        pid_mapping_function=get_mapping_function_by_name('digest-md5'),
+        suffix='yaml',
+    )
+    backend.add_record(
+        iri='abc:export-1',
+        class_name='Person',
+        json_object={'pid': 'abc:export-1', 'given_name': 'Exporter'},
+    )
+    store = ModelStore(
+        schema=str(schema_path),
+        backend=backend,
+        tags={'id': 'abc:id', 'time': 'abc:time'},
+    )
+
+    destination = tmp_path / 'destination'
+    export_classes(
+        store,
+        str(schema_path),
+        'curated',
+        _DirectoryWriter(destination),
+        None,
+        10,
+        1,
+    )
+
+    assert 'idfx: digest-md5\n' in (
+        destination / 'curated' / '.dumpthings.yaml'
+    ).read_text()
+    source_file = next((source_dir / 'Person').rglob('*.yaml'))
+    exported_file = (
+        destination / 'curated' / source_file.relative_to(source_dir)
+    )
+    assert exported_file.read_text() == source_file.read_text()
+    assert exported_file.stat().st_ino == source_file.stat().st_ino
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import dataclasses
 import sys
-from copy import copy
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -16,8 +15,6 @@ from dump_things_service.store.model_store import ModelStore
 from dump_things_service.utils import cleaned_json
 
 if TYPE_CHECKING:
-    from pydantic import BaseModel
-
     from dump_things_service import JSON
 
 
@@ -30,9 +27,6 @@ class Thing:
     pid: str
     relations: dict[str, Thing] | None = None
 
-    def model_copy(self):
-        return copy(self)
-
 
 @dataclasses.dataclass
 class Agent(Thing):
@@ -49,13 +43,6 @@ class Person(Agent):
     given_name: str | None = None
 
 
-class MockedModule:
-    Agent = Agent
-    Thing = Thing
-    Person = Person
-    InstantaneousEvent = InstantaneousEvent
-
-
 def get_inlined_object(model_module):
     return model_module.Person(
         pid='dlflatsocial:test_extract_1',
@@ -170,27 +157,15 @@ def test_inline_extraction_locally():
             'time': 'abc:time',
         }
     )
-    store.model = MockedModule()
-    records = store.extract_inlined(inlined_object)
-    _check_result_objects(records, tree)
-
-
-def _check_result_objects(
-    records: list[BaseModel],
-    tree: tuple[tuple[str, tuple[str, ...]]],
-):
-    def get_record_by_pid(record_pid: str):
-        for record in records:
-            if record.pid == record_pid:
-                return record
-        return None
-
-    for record_pid, linked_pids in tree:
-        record = get_record_by_pid(record_pid)
-        assert len(record.relations or {}) == len(linked_pids)
-        for linked_pid in linked_pids:
-            # Processing might add `schema_type` to records, ignore it.
-            assert record.relations[linked_pid].pid == linked_pid
+    records = store.extract_inlined(get_inlined_object(store.model))
+    assert [class_name for class_name, _ in records] == [
+        'Person', 'Person', 'Agent', 'InstantaneousEvent',
+    ]
+    _check_result_json([json_object for _, json_object in records], tree)
+    assert records[2][1] == {
+        'pid': 'dlflatsocial:test_extract_1_1_1',
+        'acted_on_behalf_of': ['dlflatsocial:test_extract_1_1'],
+    }
 
 
 def test_dont_extract_empty_things_locally():
@@ -202,10 +177,44 @@ def test_dont_extract_empty_things_locally():
             'time': 'https://time',
         }
     )
-    store.model = MockedModule()
-    records = store.extract_inlined(empty_inlined_object)
-    assert len(records) == 1
-    assert records[0] == empty_inlined_object
+    model = store.model
+    records = store.extract_inlined(
+        model.Person(
+            pid='dlflatsocial:test_extract_a',
+            given_name='Opa',
+            relations={
+                'dlflatsocial:test_extract_a_a': model.Thing(
+                    pid='dlflatsocial:test_extract_a_a',
+                ),
+                'dlflatsocial:test_extract_a_b': model.Thing(
+                    pid='dlflatsocial:test_extract_a_b',
+                    schema_type='abc:Thing',
+                ),
+                # Records of other classes are not placeholders
+                'dlflatsocial:test_extract_a_c': model.Person(
+                    pid='dlflatsocial:test_extract_a_c',
+                ),
+            },
+        )
+    )
+    assert records == [
+        (
+            'Person',
+            {
+                'pid': 'dlflatsocial:test_extract_a',
+                'given_name': 'Opa',
+                'relations': {
+                    pid: {'pid': pid}
+                    for pid in (
+                        'dlflatsocial:test_extract_a_a',
+                        'dlflatsocial:test_extract_a_b',
+                        'dlflatsocial:test_extract_a_c',
+                    )
+                },
+            },
+        ),
+        ('Person', {'pid': 'dlflatsocial:test_extract_a_c'}),
+    ]
 
 
 # We skip this test because the dlflatsocial-schema does not support inlined
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from dump_things_service import (
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
+)
+
+
+@pytest.mark.parametrize('collection', ('collection_1', 'collection_8'))
+@pytest.mark.parametrize(
+    'path',
+    (
+        'records/',
+        'records/p/',
+        'records/Person',
+        'records/p/Person',
+        'curated/records/',
+        'curated/records/p/',
+    ),
+)
+def test_select_fields(fastapi_client_simple, collection, path):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.get(
+        f'/{collection}/{path}?fields=pid,schema_type,given_name',
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+    )
+    assert response.status_code == HTTP_200_OK
+    json_object = response.json()
+    records = json_object['items'] if 'items' in json_object else json_object
+    assert records
+    for record in records:
+        assert {'pid', 'schema_type'} <= record.keys()
+        assert record.keys() <= {'pid', 'schema_type', 'given_name'}
+
+
+@pytest.mark.parametrize(
+    'query',
+    ('fields=pid,schema-type', 'fields=,', 'fields=pid&format=ttl'),
+)
+def test_select_invalid_fields(fastapi_client_simple, query):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.get(
+        f'/collection_1/records/?{query}',
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+    )
+    assert response.status_code == HTTP_400_BAD_REQUEST
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+
+from dump_things_service import (
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
+)
+from dump_things_service.tests.create_store import (
+    given_name,
+    pid,
+)
+
+
+@pytest.mark.parametrize('collection', ('collection_1', 'collection_8'))
+@pytest.mark.parametrize(
+    'path',
+    (
+        'records/',
+        'records/p/',
+        'records/Person',
+        'records/p/Person',
+        'curated/records/',
+        'curated/records/p/',
+    ),
+)
+def test_filter_records(fastapi_client_simple, collection, path):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.get(
+        f'/{collection}/{path}',
+        params={'filter': [f'given_name:eq:{given_name}', 'pid:contains:timee']},
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+    )
+    assert response.status_code == HTTP_200_OK
+    json_object = response.json()
+    records = json_object['items'] if 'items' in json_object else json_object
+    assert [record['pid'] for record in records] == [pid]
+
+
+def test_filter_schema_type(fastapi_client_simple):
+    test_client, _ = fastapi_client_simple
+
+    for schema_type, expected in (('abc:Person', True), ('abc:Thing', False)):
+        response = test_client.get(
+            '/collection_1/curated/records/',
+            params={'filter': f'schema_type:eq:{schema_type}'},
+            headers={'x-dumpthings-token': 'token_1_xxxxx'},
+        )
+        assert response.status_code == HTTP_200_OK
+        assert bool(response.json()) is expected
+
+
+@pytest.mark.parametrize(
+    'value',
+    ('given_name', 'given_name:like:x', 'given-name:eq:x'),
+)
+def test_invalid_filter(fastapi_client_simple, value):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.get(
+        '/collection_1/records/',
+        params={'filter': value},
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+    )
+    assert response.status_code == HTTP_400_BAD_REQUEST
@@ -0,0 +1,159 @@
+import threading
+
+import pytest
+import yaml
+from fastapi import HTTPException
+
+from dump_things_service import (
+    HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
+from dump_things_service.config import (
+    GlobalConfig,
+    get_config,
+    process_config_object,
+)
+from dump_things_service.initialization import (
+    CollectionInitialization,
+    CollectionInitializer,
+    CollectionState,
+)
+from dump_things_service.utils import check_collection
+
+config_text = """
+type: collections
+version: 1
+collections:
+  collection_1:
+    default_token: basic_access
+    curated: curated/in_token_1
+  collection_2:
+    default_token: basic_access
+    curated: curated/collection_2
+tokens:
+  basic_access:
+    user_id: anonymous
+    collections:
+      collection_1:
+        mode: READ_CURATED
+        incoming_label: ''
+      collection_2:
+        mode: READ_CURATED
+        incoming_label: ''
+"""
+
+
+def test_collections_are_initialized_independently():
+    release = threading.Event()
+
+    def slow_initializer():
+        release.wait()
+        return 'slow store'
+
+    stores = {}
+    initializer = CollectionInitializer(
+        {
+            'slow': slow_initializer,
+            'fast': lambda: 'fast store',
+        },
+        stores,
+    )
+    assert initializer.states == {
+        'slow': CollectionState.pending,
+        'fast': CollectionState.pending,
+    }
+
+    assert initializer.start('slow') == CollectionState.initializing
+    initializer.start('fast')
+    initializer.futures['fast'].result()
+    assert initializer.states['fast'] == CollectionState.ready
+    assert initializer.states['slow'] == CollectionState.initializing
+    assert stores == {'fast': 'fast store'}
+
+    release.set()
+    initializer.wait()
+    assert initializer.states['slow'] == CollectionState.ready
+    assert stores == {'fast': 'fast store', 'slow': 'slow store'}
+
+
+def test_failed_initialization():
+    def failing_initializer():
+        msg = 'cannot open store'
+        raise ValueError(msg)
+
+    stores = {}
+    initializer = CollectionInitializer(
+        {
+            'failing': failing_initializer,
+            'working': lambda: 'store',
+        },
+        stores,
+    )
+    with pytest.raises(ValueError, match='cannot open store'):
+        initializer.wait()
+    assert initializer.states['failing'] == CollectionState.failed
+    assert initializer.errors == {'failing': 'cannot open store'}
+
+    # Other collections are not affected, failed collections are not retried
+    initializer.futures['working'].result()
+    assert stores == {'working': 'store'}
+    assert initializer.start('failing') == CollectionState.failed
+
+
+def test_lazy_initialization(dump_stores_simple):
+    config_object = GlobalConfig(
+        **yaml.load(config_text, Loader=yaml.SafeLoader)
+    )
+    instance_config = process_config_object(
+        dump_stores_simple,
+        config_object,
+        [],
+        {},
+        collection_initialization=CollectionInitialization.lazy,
+    )
+    initializer = instance_config.collection_initializer
+    assert instance_config.curated_stores == {}
+    assert set(initializer.states.values()) == {CollectionState.pending}
+
+    # Accessing a collection starts its initialization
+    with pytest.raises(HTTPException) as e:
+        check_collection(instance_config, 'collection_1')
+    assert e.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+    assert 'Retry-After' in e.value.headers
+    assert initializer.states['collection_2'] == CollectionState.pending
+
+    initializer.futures['collection_1'].result()
+    check_collection(instance_config, 'collection_1')
+    assert set(instance_config.curated_stores) == {'collection_1'}
+
+    # Collections can be checked without initializing them
+    check_collection(instance_config, 'collection_2', require_ready=False)
+    assert initializer.states['collection_2'] == CollectionState.pending
+
+
+def test_failed_collection_check(dump_stores_simple):
+    config_object = GlobalConfig(
+        **yaml.load(config_text, Loader=yaml.SafeLoader)
+    )
+    instance_config = process_config_object(
+        dump_stores_simple,
+        config_object,
+        [],
+        {},
+        collection_initialization=CollectionInitialization.lazy,
+    )
+    initializer = instance_config.collection_initializer
+    initializer.states['collection_1'] = CollectionState.failed
+    initializer.errors['collection_1'] = 'cannot open store'
+    with pytest.raises(HTTPException) as e:
+        check_collection(instance_config, 'collection_1')
+    assert e.value.status_code == HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def test_blocking_is_default(fastapi_app_simple):
+    from dump_things_service.main import parser
+
+    arguments = parser.parse_args(['store'])
+    assert arguments.collection_initialization == CollectionInitialization.blocking
+    initializer = get_config().collection_initializer
+    assert set(initializer.states.values()) == {CollectionState.ready}
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from .. import HTTP_200_OK
+from ..metrics import Histogram
+
+
+def test_histogram_rendering():
+    histogram = Histogram(
+        'test_histogram_seconds',
+        'A test histogram',
+        ('operation',),
+        buckets=(0.1, 1.0),
+    )
+    histogram.observe(0.05, operation='a')
+    histogram.observe(0.5, operation='a')
+    histogram.observe(5.0, operation='a')
+    assert histogram.render() == [
+        '# HELP test_histogram_seconds A test histogram',
+        '# TYPE test_histogram_seconds histogram',
+        'test_histogram_seconds_bucket{operation="a",le="0.1"} 1',
+        'test_histogram_seconds_bucket{operation="a",le="1.0"} 2',
+        'test_histogram_seconds_bucket{operation="a",le="+Inf"} 3',
+        'test_histogram_seconds_count{operation="a"} 3',
+        'test_histogram_seconds_sum{operation="a"} 5.55',
+    ]
+
+
+def test_metrics_endpoint(fastapi_client_simple):
+    test_client, _ = fastapi_client_simple
+
+    response = test_client.get(
+        '/collection_1/records/Person',
+        headers={'x-dumpthings-token': 'basic_access'},
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = test_client.get('/metrics')
+    assert response.status_code == HTTP_200_OK
+    assert response.headers['content-type'].startswith('text/plain')
+    metrics = response.text
+    assert (
+        'dump_things_request_duration_seconds_count{method="GET",'
+        'route="/{collection}/records/{class_name}",status="200"}'
+    ) in metrics
+    assert (
+        'dump_things_backend_operation_duration_seconds_count{'
+        'backend="_RecordDirStore",operation="get_records_of_classes"}'
+    ) in metrics
+    assert 'dump_things_authentication_duration_seconds_count{' in metrics
+    assert 'dump_things_cache_hit_ratio{cache="forgejo"}' in metrics
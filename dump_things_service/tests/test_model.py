@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from dump_things_service.model import (
+    get_model_for_schema,
+    get_subclasses,
+)
+from dump_things_service.schema_index import get_schema_index
+
+# Path to a local simple test schema
+schema_path = Path(__file__).parent / 'testschema.yaml'
+
+
+def test_class_hierarchy():
+    model = get_model_for_schema(str(schema_path))[0]
+
+    assert set(get_subclasses(model, 'Agent')) == {'Agent', 'Person'}
+    assert set(get_subclasses(model, 'Thing')) == {
+        'Thing',
+        'Agent',
+        'InstantaneousEvent',
+        'Person',
+    }
+    assert get_subclasses(model, 'Person') == ['Person']
+
+    # The table is computed only once per model
+    assert get_schema_index(model) is get_schema_index(model)
+
+    # Modifying a result does not modify the table
+    get_subclasses(model, 'Person').append('Thing')
+    assert get_subclasses(model, 'Person') == ['Person']
+
+
+def test_unknown_class():
+    model = get_model_for_schema(str(schema_path))[0]
+    with pytest.raises(AttributeError):
+        get_subclasses(model, 'NoSuchClass')
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi import FastAPI
+
+from .. import (
+    HTTP_200_OK,
+    HTTP_404_NOT_FOUND,
+)
+from ..config import InstanceConfig
+from ..model import (
+    _model_cache,
+    get_model_for_schema,
+)
+from ..openapi_cache import (
+    OpenAPICache,
+    get_openapi_cache_key,
+)
+
+# Path to a local simple test schema
+schema_path = Path(__file__).parent / 'testschema.yaml'
+
+schema = {
+    'openapi': '3.1.0',
+    'paths': {
+        '/server': {'get': {}},
+        '/{collection}/record': {'get': {}},
+        '/c1/record/A': {
+            'post': {'requestBody': {'$ref': '#/components/schemas/A'}},
+        },
+        '/c2/record/B': {
+            'post': {'requestBody': {'$ref': '#/components/schemas/B'}},
+        },
+    },
+    'components': {
+        'schemas': {
+            'A': {'properties': {'c': {'$ref': '#/components/schemas/C'}}},
+            'B': {},
+            'C': {},
+        },
+    },
+}
+
+
+def test_openapi_cache(tmp_path):
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return schema
+
+    cache = OpenAPICache(generate, tmp_path / 'cache', 'key-1')
+    assert cache.get_schema() == schema
+    assert cache.get_schema() == schema
+    assert len(calls) == 1
+
+    # A new cache with the same key reads the stored schema
+    assert OpenAPICache(generate, tmp_path / 'cache', 'key-1').get_schema() == schema
+    assert len(calls) == 1
+
+    # A new key leads to a new generation and removes the old schema
+    assert OpenAPICache(generate, tmp_path / 'cache', 'key-2').get_schema() == schema
+    assert len(calls) == 2
+    assert [path.name for path in (tmp_path / 'cache').iterdir()] == [
+        'openapi-key-2.json',
+    ]
+
+
+def test_openapi_cache_key_function(tmp_path):
+    keys = []
+
+    def get_key():
+        keys.append(1)
+        return 'key-1'
+
+    # The key is computed when the schema is requested for the first time
+    cache = OpenAPICache(lambda: schema, tmp_path, get_key)
+    assert keys == []
+    assert cache.get_schema() == schema
+    assert cache.get_schema() == schema
+    assert keys == [1]
+    assert cache.path == tmp_path / 'openapi-key-1.json'
+
+
+def test_collection_schema(tmp_path):
+    cache = OpenAPICache(lambda: schema, tmp_path, 'key')
+    collection_schema = cache.get_collection_schema('c1')
+    assert set(collection_schema['paths']) == {
+        '/{collection}/record',
+        '/c1/record/A',
+    }
+    assert set(collection_schema['components']['schemas']) == {'A', 'C'}
+    assert cache.get_collection_schema('c3') is None
+
+
+def test_openapi_endpoints(fastapi_client_simple):
+    test_client, store_path = fastapi_client_simple
+
+    response = test_client.get('/openapi.json')
+    assert response.status_code == HTTP_200_OK
+    assert '/collection_1/record/Person' in response.json()['paths']
+    assert len(list((store_path / '.openapi_cache').glob('openapi-*.json'))) == 1
+
+    response = test_client.get('/openapi/collection_1.json')
+    assert response.status_code == HTTP_200_OK
+    paths = response.json()['paths']
+    assert '/collection_1/record/Person' in paths
+    assert '/collection_2/record/Person' not in paths
+
+    response = test_client.get('/openapi/no_such_collection.json')
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+def test_cache_key_covers_schema_content(tmp_path):
+    schema_text = schema_path.read_text()
+    schema_file = tmp_path / 'schema.yaml'
+    app = FastAPI()
+
+    def get_key(text: str) -> str:
+        schema_file.write_text(text)
+        instance_config = InstanceConfig(store_path=tmp_path)
+        instance_config.model_info['c1'] = get_model_for_schema(
+            str(schema_file)
+        )
+        instance_config.schemas['c1'] = str(schema_file)
+        instance_config.use_classes['c1'] = ['Person']
+        key = get_openapi_cache_key(app, instance_config, 'config')
+        # Models are cached by schema location, force rebuilding the model
+        # from the modified schema.
+        del _model_cache[str(schema_file)]
+        return key
+
+    key = get_key(schema_text)
+    assert get_key(schema_text) == key
+
+    # A changed description at the same schema location changes the key
+    modified_text = schema_text.replace(
+        'The actual annotation.',
+        'The actual, modified annotation.',
+    )
+    assert modified_text != schema_text
+    assert get_key(modified_text) != key
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import (
+    FastAPI,
+    HTTPException,
+)
+from fastapi.testclient import TestClient
+
+from .. import (
+    HTTP_200_OK,
+    HTTP_404_NOT_FOUND,
+    HTTP_405_METHOD_NOT_ALLOWED,
+    HTTP_422_UNPROCESSABLE_CONTENT,
+)
+from ..config import get_config
+from ..parametrized_endpoints import (
+    _create_documentation_routes,
+    create_parametrized_endpoints,
+)
+
+placeholders = {
+    'store': 'placeholder_write',
+    'validate': 'placeholder_validate',
+    'curated': 'placeholder_curated_write',
+    'incoming': 'placeholder_incoming_write',
+}
+
+
+@pytest.fixture(scope='module')
+def parametrized_client(fastapi_app_simple):
+    from ..main import (
+        store_record,
+        validate_record,
+    )
+
+    app = FastAPI()
+    create_parametrized_endpoints(
+        app,
+        get_config(),
+        [{'name': name, 'description': ''} for name in placeholders.values()],
+        placeholders,
+        store_record,
+        validate_record,
+        class_docs=True,
+    )
+    return TestClient(app)
+
+
+def test_parametrized_routes(parametrized_client):
+    assert len(parametrized_client.app.routes) == len(placeholders) + 4
+
+    response = parametrized_client.post(
+        '/collection_1/record/Person',
+        headers={'x-dumpthings-token': 'token-1'},
+        json={'pid': 'abc:parametrized-1', 'given_name': 'Paula'},
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.json()[0]['pid'] == 'abc:parametrized-1'
+
+    response = parametrized_client.post(
+        '/collection_1/validate/record/Person',
+        headers={'x-dumpthings-token': 'token-1'},
+        json={'pid': 'abc:parametrized-2', 'given_name': 'Paul'},
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = parametrized_client.post(
+        '/collection_1/curated/record/Person',
+        headers={'x-dumpthings-token': 'token_1_xxxxx'},
+        json={'pid': 'abc:parametrized-3', 'given_name': 'Pia'},
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = parametrized_client.post(
+        '/collection_1/incoming/admin_1/record/Person',
+        headers={'x-dumpthings-token': 'token_admin'},
+        json={'pid': 'abc:parametrized-4', 'given_name': 'Piet'},
+    )
+    assert response.status_code == HTTP_200_OK
+
+
+def test_parametrized_errors(parametrized_client):
+    response = parametrized_client.post(
+        '/collection_1/record/NoSuchClass',
+        headers={'x-dumpthings-token': 'token-1'},
+        json={'pid': 'abc:parametrized-5'},
+    )
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+    response = parametrized_client.post(
+        '/no_such_collection/record/Person',
+        headers={'x-dumpthings-token': 'token-1'},
+        json={'pid': 'abc:parametrized-6'},
+    )
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+    response = parametrized_client.post(
+        '/collection_1/record/Person',
+        headers={'x-dumpthings-token': 'token-1'},
+        json={'pid': 'abc:parametrized-7', 'given_name': 1234},
+    )
+    assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+    assert response.json()['detail'][0]['loc'] == ['body', 'given_name']
+
+
+def test_lazy_class_documentation(parametrized_client):
+    response = parametrized_client.get('/openapi.json')
+    assert response.status_code == HTTP_200_OK
+    paths = response.json()['paths']
+    assert '/{collection}/record/{class_name}' in paths
+    assert '/collection_1/record/Person' in paths
+    assert '/collection_1/incoming/{label}/record/Person' in paths
+
+    # Documentation routes are not mounted
+    assert '/collection_1/record/Person' not in {
+        route.path for route in parametrized_client.app.routes
+    }
+
+
+def test_documentation_routes_reject_requests(parametrized_client):
+    endpoints = {
+        'curated': (
+            '/{collection}/curated/record/{class_name}',
+            None,
+            placeholders['curated'],
+            None,
+            True,
+        ),
+    }
+    route = _create_documentation_routes(get_config(), endpoints)[0]
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(route.endpoint(data={}))
+    assert e.value.status_code == HTTP_405_METHOD_NOT_ALLOWED
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from dump_things_service import Format
+from dump_things_service.converter import (
+    get_conversion_objects,
+    get_format_converter,
+)
+from dump_things_service.patches.rdflib_loader import _get_schema_tables
+
+schema = str(Path(__file__).parent / 'testschema.yaml')
+
+ttl_record = """@prefix abc: <http://example.org/person-schema/abc/> .
+@prefix oxo: <http://purl.obolibrary.org/obo/> .
+@prefix xyz: <http://example.org/person-schema/xyz/> .
+
+xyz:HenryAdams a abc:Person ;
+    abc:annotations [ a abc:Annotation ;
+            abc:annotation_tag oxo:NCIT_C54269 ;
+            abc:annotation_value "test_user_1" ] ;
+    abc:given_name "Henry" ;
+    abc:schema_type "abc:Person" .
+"""
+
+
+def test_schema_tables_are_reused():
+    converter = get_format_converter(schema, Format.ttl, Format.json)
+    schema_view = get_conversion_objects(schema)['schema_view']
+
+    expected = {
+        'pid': 'xyz:HenryAdams',
+        'schema_type': 'abc:Person',
+        'given_name': 'Henry',
+        'annotations': {
+            'oxo:NCIT_C54269': {
+                'annotation_tag': 'oxo:NCIT_C54269',
+                'annotation_value': 'test_user_1',
+            },
+        },
+    }
+    assert converter.convert(ttl_record, 'Person') == expected
+    tables = _get_schema_tables(schema_view)
+    assert tables.slot_infos
+
+    # A second conversion uses the same tables and gives the same result
+    assert converter.convert(ttl_record, 'Person') == expected
+    assert _get_schema_tables(schema_view) is tables
+
+    # Modifications of the schema view invalidate the tables
+    schema_view.set_modified()
+    assert _get_schema_tables(schema_view) is not tables
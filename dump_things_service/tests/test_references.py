@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import pytest
+
+from dump_things_service import (
+    HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_422_UNPROCESSABLE_CONTENT,
+)
+
+
+def create_record(collection: str) -> dict:
+    # Inlined records are `Thing`s, the service stores them as separate
+    # records and annotates them.
+    return {
+        'pid': f'abc:reference-root-{collection}',
+        'given_name': 'Root',
+        'relations': {
+            f'abc:reference-child-{collection}': {
+                'pid': f'abc:reference-child-{collection}',
+                'relations': {
+                    f'abc:reference-grandchild-{collection}': {
+                        'pid': f'abc:reference-grandchild-{collection}',
+                        'annotations': {
+                            'abc:name': {
+                                'annotation_tag': 'abc:name',
+                                'annotation_value': 'Grandchild',
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    }
+
+
+@pytest.mark.parametrize('collection', ('collection_1', 'collection_8'))
+def test_referrers_and_inlining(fastapi_client_simple, collection):
+    test_client, _ = fastapi_client_simple
+    headers = {'x-dumpthings-token': 'token_1_xxxxx'}
+    root, child, grandchild = (
+        f'abc:reference-{name}-{collection}'
+        for name in ('root', 'child', 'grandchild')
+    )
+
+    response = test_client.post(
+        f'/{collection}/record/Person',
+        headers=headers,
+        json=create_record(collection),
+    )
+    assert response.status_code == HTTP_200_OK, response.text
+
+    # Referrers are reported with the pid as CURIE and as IRI
+    for pid in (child, 'http://example.org/person-schema/abc/' + child[4:]):
+        response = test_client.get(
+            f'/{collection}/record/referrers',
+            params={'pid': pid},
+            headers=headers,
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == [
+            {'pid': root, 'class_name': 'Person', 'slot': 'relations'},
+        ]
+    response = test_client.get(
+        f'/{collection}/record/referrers',
+        params={'pid': grandchild},
+        headers=headers,
+    )
+    assert response.json() == [
+        {'pid': child, 'class_name': 'Thing', 'slot': 'relations'},
+    ]
+
+    # Stored records contain placeholders
+    response = test_client.get(
+        f'/{collection}/record',
+        params={'pid': root},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.json()['relations'][child].keys() <= {'pid', 'schema_type'}
+
+    # Placeholders are replaced up to the given depth
+    response = test_client.get(
+        f'/{collection}/record',
+        params={'pid': root, 'inline_depth': 1},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_200_OK
+    child_record = response.json()['relations'][child]
+    assert child_record['relations'][grandchild].keys() <= {'pid', 'schema_type'}
+
+    response = test_client.get(
+        f'/{collection}/record',
+        params={'pid': root, 'inline_depth': 2},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_200_OK
+    child_record = response.json()['relations'][child]
+    grandchild_record = child_record['relations'][grandchild]
+    assert grandchild_record['annotations']['abc:name']['annotation_value'] == 'Grandchild'
+
+    # The entity tag depends on the inlined records
+    etag = response.headers['ETag']
+    response = test_client.get(
+        f'/{collection}/record',
+        params={'pid': root, 'inline_depth': 2},
+        headers={**headers, 'If-None-Match': etag},
+    )
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    response = test_client.get(
+        f'/{collection}/record',
+        params={'pid': root},
+        headers={**headers, 'If-None-Match': etag},
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = test_client.get(
+        f'/{collection}/record',
+        params={'pid': root, 'inline_depth': 100},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from dump_things_service.exceptions import CurieResolutionError
+from dump_things_service.resolve_curie import resolve_curie
+from dump_things_service.schema_index import SchemaIndex
+
+
+def _create_model(prefixes: dict[str, str]) -> SimpleNamespace:
+    return SimpleNamespace(
+        linkml_meta=SimpleNamespace(
+            root={
+                'id': 'https://example.org/schema',
+                'prefixes': {
+                    prefix: {
+                        'prefix_prefix': prefix,
+                        'prefix_reference': reference,
+                    }
+                    for prefix, reference in prefixes.items()
+                },
+            },
+        ),
+    )
+
+
+model = _create_model({
+    'ex': 'https://example.org/',
+    'exs': 'https://example.org/sub/',
+    'obo': 'http://purl.obolibrary.org/obo/',
+})
+
+
+def test_get_curie_longest_prefix():
+    schema_index = SchemaIndex(model)
+    assert schema_index.get_curie('https://example.org/sub/a') == 'exs:a'
+    assert schema_index.get_curie('https://example.org/a') == 'ex:a'
+    assert schema_index.get_curie('http://purl.obolibrary.org/obo/X') == 'obo:X'
+    assert schema_index.get_curie('https://unknown.org/a') is None
+
+
+def test_resolve_curie():
+    assert resolve_curie(model, 'exs:a') == 'https://example.org/sub/a'
+    assert resolve_curie(model, 'https://example.org/a') == 'https://example.org/a'
+    assert resolve_curie(model, 'no_colon') == 'no_colon'
+    with pytest.raises(CurieResolutionError):
+        resolve_curie(model, 'unknown:a')
@@ -3,6 +3,8 @@ from __future__ import annotations
 import logging
 import sys
 from contextlib import contextmanager
+from datetime import timezone
+from email.utils import format_datetime
 from functools import reduce
 from typing import (
     TYPE_CHECKING,
@@ -12,29 +14,46 @@ from typing import (
 import fsspec
 from fastapi import HTTPException
 from rdflib import Graph
+from starlette.responses import (
+    JSONResponse,
+    Response,
+)
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 
 from dump_things_service import (
+    HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
     HTTP_401_UNAUTHORIZED,
     HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
     HTTP_413_CONTENT_TOO_LARGE,
+    HTTP_503_SERVICE_UNAVAILABLE,
+    Format,
 )
 from dump_things_service.auth import (
     AuthenticationError,
     AuthenticationInfo,
+    AuthenticationSource,
 )
+from dump_things_service.initialization import CollectionState
+from dump_things_service.metrics import auth_seconds
 from dump_things_service.token import (
     TokenPermission,
     get_token_parts,
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from datetime import datetime
     from pathlib import Path
 
     from dump_things_service import JSON
-    from dump_things_service.backends.record_dir import RecordDirStore
+    from dump_things_service.backends import StorageBackend
+    from dump_things_service.backends.filters import Filter
+    from dump_things_service.backends.record_dir import (
+        Durability,
+        RecordDirStore,
+    )
     from dump_things_service.backends.sqlite import SQLiteBackend
     from dump_things_service.config import InstanceConfig
     from dump_things_service.store.model_store import ModelStore
@@ -42,6 +61,10 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger('dump_things_service')
 
+# Seconds that clients should wait before retrying requests to collections
+# that are being initialized
+retry_after = 5
+
 
 @contextmanager
 def sys_path(paths: list[str | Path]):
@@ -107,6 +130,69 @@ def wrap_http_exception(
         ) from e
 
 
+fields_description = (
+    'Comma-separated list of top-level slots, e.g., `pid,schema_type`. If '
+    'given, records contain only these slots.'
+)
+
+
+def parse_fields(
+    fields: str | None,
+    format: Format = Format.json,  # noqa A002
+) -> list[str] | None:
+    """Parse the `fields`-parameter of list endpoints
+
+    :param fields: A comma-separated list of top-level slots, or `None`.
+    :param format: The requested format, fields can only be selected in JSON.
+    :return: The names of the slots, or `None` if `fields` is `None`.
+    """
+    from dump_things_service.backends import field_name_regex
+
+    if fields is None:
+        return None
+    if format != Format.json:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f'Fields can only be selected in format {Format.json.value}.',
+        )
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    if not names:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail='No fields selected.',
+        )
+    for name in names:
+        if not field_name_regex.match(name):
+            raise HTTPException(
+                status_code=HTTP_400_BAD_REQUEST,
+                detail=f'Invalid field name: {name!r}.',
+            )
+    return names
+
+
+filters_description = (
+    'Filter on a top-level slot of the form `<slot>:<operator>:<value>`, '
+    'e.g., `given_name:eq:Alice`. Operators are `eq`, `ne`, `lt`, `le`, `gt`, '
+    '`ge`, and `contains`. Values that are JSON numbers are compared to '
+    'numbers, values in double quotes and all other values are compared to '
+    'text. Can be given multiple times, records must match all filters.'
+)
+
+
+def parse_filters(
+    filters: Iterable[str] | None,
+) -> list[Filter]:
+    """Parse the `filter`-parameters of list endpoints
+
+    :param filters: Filters of the form `<slot>:<operator>:<value>`.
+    :return: The parsed filters.
+    """
+    from dump_things_service.backends.filters import parse_filter
+
+    with wrap_http_exception(ValueError, header='Invalid filter'):
+        return [parse_filter(text) for text in filters or ()]
+
+
 def join_default_token_permissions(
         instance_config: InstanceConfig,
         permissions: TokenPermission,
@@ -130,12 +216,37 @@ def join_default_token_permissions(
 def check_collection(
     instance_config: InstanceConfig,
     collection: str,
+    *,
+    require_ready: bool = True,
 ):
+    """Check that `collection` exists and that its stores are initialized
+
+    Collections that are not yet initialized are initialized in the
+    background, see `dump_things_service.initialization`.
+
+    :param require_ready: If `False`, only check that `collection` exists.
+    """
     if collection not in instance_config.collections:
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND,
             detail=f"No such collection: '{collection}'.",
         )
+    initializer = instance_config.collection_initializer
+    if not require_ready or initializer is None:
+        return
+
+    state = initializer.start(collection)
+    if state == CollectionState.failed:
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Initialization of collection '{collection}' failed.",
+        )
+    if state != CollectionState.ready:
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Collection '{collection}' is being initialized.",
+            headers={'Retry-After': str(retry_after)},
+        )
 
 
 def check_label(
@@ -186,6 +297,31 @@ def get_on_disk_labels(
     }
 
 
+def get_incoming_stores(
+    instance_config: InstanceConfig,
+    collection: str,
+) -> dict[str, ModelStore]:
+    """Get the stores of all incoming zones of `collection`
+
+    Incoming zones are defined in the configuration, or are generated by
+    external authentication sources. In the latter case, they are manifest as
+    directories in the incoming area of the collection.
+
+    :return: A dictionary that maps incoming labels to stores.
+    """
+    incoming_path = (
+        instance_config.store_path
+        / instance_config.collections[collection].incoming
+    )
+    all_labels = get_config_labels(instance_config, collection).union(
+        get_on_disk_labels(instance_config, collection)
+    )
+    return {
+        label: create_token_store(instance_config, collection, incoming_path / label)
+        for label in sorted(all_labels)
+    }
+
+
 def get_default_token_name(
     instance_config: InstanceConfig,
     collection: str
@@ -205,7 +341,7 @@ async def process_token(
         else api_key
     )
 
-    token_store, token, token_permissions, _ = get_token_store(
+    token_store, token, token_permissions, _ = await get_token_store_async(
         instance_config,
         collection,
         token,
@@ -245,33 +381,64 @@ def authenticate_token(
 
     # Try to authenticate the token with the authentication providers that
     # are associated with the collection.
-    auth_info = None
     messages = []
     for auth_provider in instance_config.auth_providers[collection_name]:
         try:
             logger.debug('trying to authenticate with %s', auth_provider)
-            auth_info = auth_provider.authenticate(plain_token)
-            break
+            with auth_seconds.time(source=auth_provider.__class__.__name__):
+                return auth_provider.authenticate(plain_token)
         except AuthenticationError as ae:
-            logger.debug(
-                'Authentication provider %s could not '
-                'authenticate token for collection %s: %s',
-                auth_provider,
-                collection_name,
-                str(ae),
+            messages.append(
+                _authentication_failure(auth_provider, collection_name, ae)
             )
-            messages.append(f'{auth_provider.__class__.__name__} failed with: {ae}')
-            continue
+    raise _invalid_token_exception(collection_name, messages)
+
+
+async def authenticate_token_async(
+        instance_config: InstanceConfig,
+        collection_name: str,
+        plain_token: str,
+) -> AuthenticationInfo:
+    """Like `authenticate_token`, but does not block the event loop"""
+    messages = []
+    for auth_provider in instance_config.auth_providers[collection_name]:
+        try:
+            logger.debug('trying to authenticate with %s', auth_provider)
+            with auth_seconds.time(source=auth_provider.__class__.__name__):
+                return await auth_provider.authenticate_async(plain_token)
+        except AuthenticationError as ae:
+            messages.append(
+                _authentication_failure(auth_provider, collection_name, ae)
+            )
+    raise _invalid_token_exception(collection_name, messages)
 
-    if not auth_info:
-        detail = f'invalid token for collection {collection_name}: ' + ', '.join(
-            messages,
-        )
-        raise HTTPException(
-            status_code=HTTP_401_UNAUTHORIZED,
-            detail=detail,
-        )
-    return auth_info
+
+def _authentication_failure(
+        auth_provider: AuthenticationSource,
+        collection_name: str,
+        error: AuthenticationError,
+) -> str:
+    logger.debug(
+        'Authentication provider %s could not '
+        'authenticate token for collection %s: %s',
+        auth_provider,
+        collection_name,
+        str(error),
+    )
+    return f'{auth_provider.__class__.__name__} failed with: {error}'
+
+
+def _invalid_token_exception(
+        collection_name: str,
+        messages: list[str],
+) -> HTTPException:
+    detail = f'invalid token for collection {collection_name}: ' + ', '.join(
+        messages,
+    )
+    return HTTPException(
+        status_code=HTTP_401_UNAUTHORIZED,
+        detail=detail,
+    )
 
 
 def get_token_store(
@@ -290,6 +457,49 @@ def get_token_store(
     # Try to authenticate the token with the authentication providers that
     # are associated with the collection.
     auth_info = authenticate_token(instance_config, collection_name, plain_token)
+    return _add_token_store_info(
+        instance_config,
+        collection_name,
+        plain_token,
+        auth_info,
+    )
+
+
+async def get_token_store_async(
+        instance_config: InstanceConfig,
+        collection_name: str,
+        plain_token: str
+) -> tuple[ModelStore, str, TokenPermission, str] | tuple[None, None, None, None]:
+    """Like `get_token_store`, but does not block the event loop
+
+    Use it in `async` endpoints, authentication sources might perform
+    network requests.
+    """
+    check_collection(instance_config, collection_name)
+
+    store_info = instance_config.token_stores[collection_name].get(plain_token)
+    if store_info:
+        return store_info
+
+    auth_info = await authenticate_token_async(
+        instance_config,
+        collection_name,
+        plain_token,
+    )
+    return _add_token_store_info(
+        instance_config,
+        collection_name,
+        plain_token,
+        auth_info,
+    )
+
+
+def _add_token_store_info(
+        instance_config: InstanceConfig,
+        collection_name: str,
+        plain_token: str,
+        auth_info: AuthenticationInfo,
+) -> tuple[ModelStore, str, TokenPermission, str] | tuple[None, None, None, None]:
     permissions = auth_info.token_permission
 
     # If the token is hashed, get the hashed value. This is required because
@@ -341,6 +551,7 @@ def create_token_store(
         store_dir: Path,
 ) -> ModelStore:
     from dump_things_service.backends.schema_type_layer import SchemaTypeLayer
+    from dump_things_service.backends.write_behind import WriteBehindBackend
     from dump_things_service.config import (
         ConfigError,
         get_backend_and_extension,
@@ -388,18 +599,31 @@ def create_token_store(
             schema_uri=instance_config.schemas[collection_name],
             mapping_function=backend.pid_mapping_function,
             suffix=backend.suffix,
+            durability=backend.durability,
+            group_commit_interval=backend.group_commit_interval,
+            summary_fields=backend.index.summary_fields,
+            indexed_slots=backend.index.indexed_slots,
         )
     elif backend_name == 'sqlite':
         token_store = create_sqlite_token_store(
             store_dir=store_dir,
             order_by=backend.order_by,
+            indexed_slots=backend.indexed_slots,
         )
+        # Incoming stores share the compression dictionary of the curated
+        # store, unless they have their own.
+        dictionary = backend.get_compression_dictionary()
+        if dictionary and token_store.get_compression_dictionary() is None:
+            token_store.set_compression_dictionary(*dictionary)
     else:
         # This should not happen because we base our decision on already
         # existing backends.
         msg = f'Unsupported backend type: `{backend_type}`.'
         raise ConfigError(msg)
 
+    if instance_config.collections[collection_name].write_behind:
+        token_store = WriteBehindBackend(backend=token_store, journal_dir=store_dir)
+
     if extension == 'stl':
         token_store = SchemaTypeLayer(backend=token_store, schema=schema_uri)
 
@@ -420,14 +644,26 @@ def create_record_dir_token_store(
         schema_uri: str,
         mapping_function: Callable,
         suffix: str,
+        durability: Durability | None = None,
+        group_commit_interval: int | None = None,
+        summary_fields: Iterable[str] = (),
+        indexed_slots: Iterable[str] = (),
 ) -> RecordDirStore:
-    from dump_things_service.backends.record_dir import RecordDirStore
+    from dump_things_service.backends.record_dir import (
+        Durability,
+        RecordDirStore,
+        default_group_commit_interval,
+    )
 
     store_backend = RecordDirStore(
         root=store_dir,
         pid_mapping_function=mapping_function,
         suffix=suffix,
         order_by=order_by,
+        durability=durability or Durability.none,
+        group_commit_interval=group_commit_interval or default_group_commit_interval,
+        summary_fields=summary_fields,
+        indexed_slots=indexed_slots,
     )
     store_backend.build_index_if_needed(schema=schema_uri)
     return store_backend
@@ -436,6 +672,7 @@ def create_record_dir_token_store(
 def create_sqlite_token_store(
         store_dir: Path,
         order_by: list[str],
+        indexed_slots: Iterable[str] = (),
 )  -> SQLiteBackend:
     from dump_things_service.backends.sqlite import SQLiteBackend
     from dump_things_service.backends.sqlite import (
@@ -445,6 +682,7 @@ def create_sqlite_token_store(
     return SQLiteBackend(
         db_path=store_dir / sqlite_record_file_name,
         order_by=order_by,
+        indexed_slots=indexed_slots,
     )
 
 
@@ -460,3 +698,79 @@ def check_bounds(
             detail=f"Too many records found in collection '{collection}'. "
                    f'Please use pagination (/{collection}{alternative_url}).',
         )
+
+
+def create_etag(
+    content_hash: str,
+    format: Format = Format.json,  # noqa A002
+) -> str:
+    # The representation depends on the format, so the format is part of the
+    # entity tag.
+    return f'"{content_hash}-{format.value}"'
+
+
+def etag_matches(
+    if_none_match: str | None,
+    etag: str,
+) -> bool:
+    """Check whether `etag` matches an `If-None-Match` header value"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        # `If-None-Match` uses the weak comparison function
+        if tag == '*' or tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+def create_record_headers(
+    etag: str,
+    submission_time: datetime | None,
+) -> dict[str, str]:
+    headers = {'ETag': etag}
+    if submission_time is not None:
+        # Submission times without time zone are local times, see
+        # `ModelStore.annotate`.
+        headers['Last-Modified'] = format_datetime(
+            submission_time.astimezone(timezone.utc),
+            usegmt=True,
+        )
+    return headers
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def read_record_response(
+    model_store: ModelStore,
+    backend: StorageBackend,
+    pid: str,
+    if_none_match: str | None,
+) -> Response | None:
+    """Read the record with the given PID from `backend`, support conditional requests
+
+    If `if_none_match` matches the entity tag of the record, the response has
+    status 304 and is created from the content hash of the record alone,
+    i.e., without reading the record.
+    """
+    iri = model_store.pid_to_iri(pid)
+    content_hash = backend.get_content_hash(iri)
+    if content_hash is None:
+        return None
+
+    etag = create_etag(content_hash)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    record_info = backend.get_record_by_iri(iri)
+    if record_info is None:
+        return None
+    return JSONResponse(
+        record_info.json_object,
+        headers=create_record_headers(
+            etag,
+            model_store.get_submission_time(record_info.json_object),
+        ),
+    )